@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Retention, rollups and archive for agent_actions_log.
+
+Every chat message, tool call, escalation and flagged injection lands in
+agent_actions_log. To keep the hot table small on the Pi's SD card:
+
+- `agent_actions_hourly` / `agent_actions_daily` hold counts and successes
+  per (bucket, action_type, source), maintained by an INSERT trigger, so
+  stats never need the raw rows
+- rows older than their action_type's retention window are appended to
+  monthly gzip'd NDJSON files (ACTION_LOG_ARCHIVE_DIR/YYYY-MM.ndjson.gz) and
+  deleted; hourly buckets are pruned after HOURLY_RETENTION_DAYS, daily ones
+  are kept
+- the agent scheduler runs `run_retention` once a night (kind 'retention')
+
+Windows are configurable per type:
+    ACTION_LOG_RETENTION="chat=14,chat_tool_call=14,default=60"
+
+Usage:
+    python action_log.py run      # archive + purge now
+    python action_log.py stats    # table size, oldest row per type, policy
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DATA_DIR, DB_PATH  # noqa: E402
+
+ARCHIVE_DIR = os.environ.get('ACTION_LOG_ARCHIVE_DIR', os.path.join(DATA_DIR, 'archive', 'agent_actions'))
+HOURLY_RETENTION_DAYS = 30
+BATCH_SIZE = 5000
+RUN_HOUR = 3
+
+DEFAULT_RETENTION_DAYS = {
+    'chat': 30,
+    'chat_tool_call': 30,
+    'chat_error': 60,
+    'injection_flagged': 180,
+    'coo_report': 400,      # /api/agent/daily-report?date=… reads these
+    'default': 90,
+}
+# Rows other code still queries — never shorten below these
+MIN_RETENTION_DAYS = {
+    'email_sent': 8,        # provider email quota looks back 7 days
+    'coo_report': 2,
+}
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS agent_actions_hourly (
+        hour TEXT NOT NULL,
+        action_type TEXT NOT NULL,
+        source TEXT NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        succeeded INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (hour, action_type, source)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS agent_actions_daily (
+        day TEXT NOT NULL,
+        action_type TEXT NOT NULL,
+        source TEXT NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        succeeded INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, action_type, source)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_agent_actions_daily_type ON agent_actions_daily(action_type, day);
+
+    CREATE TRIGGER IF NOT EXISTS trg_agent_actions_rollup AFTER INSERT ON agent_actions_log BEGIN
+        INSERT INTO agent_actions_hourly (hour, action_type, source, total, succeeded)
+        VALUES (COALESCE(strftime('%Y-%m-%d %H:00', NEW.created_at), strftime('%Y-%m-%d %H:00', 'now', 'localtime')),
+                NEW.action_type, NEW.source, 1, COALESCE(NEW.success, 1) != 0)
+        ON CONFLICT(hour, action_type, source) DO UPDATE SET
+            total = total + 1, succeeded = succeeded + excluded.succeeded;
+        INSERT INTO agent_actions_daily (day, action_type, source, total, succeeded)
+        VALUES (COALESCE(date(NEW.created_at), date('now', 'localtime')),
+                NEW.action_type, NEW.source, 1, COALESCE(NEW.success, 1) != 0)
+        ON CONFLICT(day, action_type, source) DO UPDATE SET
+            total = total + 1, succeeded = succeeded + excluded.succeeded;
+    END;
+'''
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    """Create rollup tables/trigger and backfill them from the existing log."""
+    conn.executescript(schema)
+    if conn.execute('SELECT 1 FROM agent_actions_daily LIMIT 1').fetchone():
+        return
+    conn.executescript('''
+        INSERT OR IGNORE INTO agent_actions_daily (day, action_type, source, total, succeeded)
+            SELECT date(created_at), action_type, source, COUNT(*), SUM(COALESCE(success, 1) != 0)
+            FROM agent_actions_log WHERE date(created_at) IS NOT NULL
+            GROUP BY 1, 2, 3;
+        INSERT OR IGNORE INTO agent_actions_hourly (hour, action_type, source, total, succeeded)
+            SELECT strftime('%Y-%m-%d %H:00', created_at), action_type, source, COUNT(*),
+                   SUM(COALESCE(success, 1) != 0)
+            FROM agent_actions_log
+            WHERE created_at >= datetime('now', '-30 days') AND strftime('%Y-%m-%d %H:00', created_at) IS NOT NULL
+            GROUP BY 1, 2, 3;
+    ''')
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def retention_policy() -> dict:
+    """Days to keep per action_type ('default' for everything else)."""
+    policy = dict(DEFAULT_RETENTION_DAYS)
+    for part in os.environ.get('ACTION_LOG_RETENTION', '').split(','):
+        name, _, days = part.partition('=')
+        if name.strip() and days.strip().isdigit():
+            policy[name.strip()] = int(days)
+    for name, minimum in MIN_RETENTION_DAYS.items():
+        policy[name] = max(policy.get(name, policy['default']), minimum)
+    return policy
+
+
+def _archive_path(month: str) -> str:
+    return os.path.join(ARCHIVE_DIR, f'{month}.ndjson.gz')
+
+
+def _archive_rows(rows: list) -> None:
+    """Append rows to their month's file. gzip members concatenate, so appending is safe."""
+    by_month: dict[str, list] = {}
+    for row in rows:
+        month = (row['created_at'] or 'unknown')[:7]
+        by_month.setdefault(month, []).append(row)
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    for month, month_rows in by_month.items():
+        with open(_archive_path(month), 'ab') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as gz:
+                for row in month_rows:
+                    gz.write((json.dumps(dict(row), ensure_ascii=False, default=str) + '\n').encode('utf-8'))
+            raw.flush()
+            os.fsync(raw.fileno())
+
+
+def archive_expired(conn: sqlite3.Connection, now: datetime | None = None) -> dict:
+    """Move rows past their window to the NDJSON archive. Returns {action_type: rows}.
+
+    Rows are written (and fsync'd) before they are deleted; a crash in between
+    re-archives the batch on the next run — readers dedupe on `id`.
+    """
+    now = now or datetime.now()
+    policy = retention_policy()
+    types = [r[0] for r in conn.execute('SELECT DISTINCT action_type FROM agent_actions_daily')]
+    moved = {}
+    for action_type in types:
+        days = policy.get(action_type, policy['default'])
+        cutoff = (now - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+        while True:
+            # (action_type, created_at) index order — no sort over the whole backlog
+            rows = conn.execute(
+                'SELECT * FROM agent_actions_log WHERE action_type = ? AND created_at < ? '
+                'ORDER BY created_at LIMIT ?',
+                (action_type, cutoff, BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                break
+            _archive_rows(rows)
+            conn.execute(
+                'DELETE FROM agent_actions_log WHERE id IN (SELECT value FROM json_each(?))',
+                (json.dumps([r['id'] for r in rows]),),
+            )
+            conn.commit()
+            moved[action_type] = moved.get(action_type, 0) + len(rows)
+            if len(rows) < BATCH_SIZE:
+                break
+    return moved
+
+
+def prune_hourly(conn: sqlite3.Connection, now: datetime | None = None) -> int:
+    now = now or datetime.now()
+    cutoff = (now - timedelta(days=HOURLY_RETENTION_DAYS)).strftime('%Y-%m-%d %H:00')
+    cur = conn.execute('DELETE FROM agent_actions_hourly WHERE hour < ?', (cutoff,))
+    conn.commit()
+    return cur.rowcount
+
+
+def run_retention(conn: sqlite3.Connection, now: datetime | None = None) -> dict:
+    moved = archive_expired(conn, now)
+    pruned = prune_hourly(conn, now)
+    if moved:
+        # Let the planner see the smaller table
+        conn.execute('PRAGMA optimize')
+    return {'archived': moved, 'archived_total': sum(moved.values()), 'hourly_pruned': pruned}
+
+
+def get_stats(conn: sqlite3.Connection, days: int = 7) -> list[dict]:
+    """Counts and success rate per action_type over the last `days` days (rollup only)."""
+    since = (datetime.now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    rows = conn.execute(
+        'SELECT action_type, SUM(total) AS total, SUM(succeeded) AS succeeded '
+        'FROM agent_actions_daily WHERE day >= ? GROUP BY action_type ORDER BY total DESC',
+        (since,),
+    ).fetchall()
+    return [{'action_type': r['action_type'], 'total': r['total'], 'succeeded': r['succeeded'],
+             'success_rate': round(r['succeeded'] / r['total'], 3) if r['total'] else None}
+            for r in rows]
+
+
+def get_hourly(conn: sqlite3.Connection, hours: int = 24, action_type: str | None = None) -> list[dict]:
+    since = (datetime.now() - timedelta(hours=hours)).strftime('%Y-%m-%d %H:00')
+    sql = ('SELECT hour, SUM(total) AS total, SUM(succeeded) AS succeeded FROM agent_actions_hourly '
+           'WHERE hour >= ?')
+    params = [since]
+    if action_type:
+        sql += ' AND action_type = ?'
+        params.append(action_type)
+    rows = conn.execute(sql + ' GROUP BY hour ORDER BY hour', params).fetchall()
+    return [dict(r) for r in rows]
+
+
+def handle_retention(conn: sqlite3.Connection, item, now: datetime) -> dict:
+    """agent_scheduler handler: run once, then again tomorrow at RUN_HOUR."""
+    from agent_scheduler import schedule, tomorrow_at
+    result = run_retention(conn, now)
+    if result['archived_total']:
+        print(f"[action_log] archived {result['archived_total']} rows: {json.dumps(result['archived'])}")
+    schedule(conn, 'retention', 0, tomorrow_at(now, RUN_HOUR))
+    return {'action': 'retention', **result}
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='agent_actions_log retention / rollups')
+    parser.add_argument('command', choices=['run', 'stats'])
+    args = parser.parse_args(argv)
+    conn = get_db()
+    try:
+        if args.command == 'run':
+            print(json.dumps(run_retention(conn), indent=2))
+        else:
+            oldest = conn.execute(
+                'SELECT action_type, COUNT(*) AS n, MIN(created_at) AS oldest FROM agent_actions_log '
+                'GROUP BY action_type ORDER BY n DESC'
+            ).fetchall()
+            print(json.dumps({'policy_days': retention_policy(),
+                              'hot_rows': {r['action_type']: {'rows': r['n'], 'oldest': r['oldest']} for r in oldest},
+                              'last_7d': get_stats(conn)}, indent=2))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
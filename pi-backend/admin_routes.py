@@ -0,0 +1,373 @@
+"""Admin dashboard: stats, users, bookings, request profiles, garden costs, email drafts."""
+
+from flask import Blueprint, request, jsonify, send_from_directory
+
+from db import get_db
+from api_helpers import generic_patch
+from auth import require_admin, require_auth
+import request_profiler
+
+try:
+    from email_draft_service import get_drafts, get_draft, approve_draft, reject_draft, update_draft
+    EMAIL_DRAFT_AVAILABLE = True
+except ImportError:
+    EMAIL_DRAFT_AVAILABLE = False
+    print("Warning: email_draft_service not available")
+
+bp = Blueprint('admin', __name__)
+
+
+# ============ Admin Routes ============
+
+@bp.route('/api/admin/stats', methods=['GET'])
+@require_admin
+def admin_stats(user):
+    """Get admin dashboard statistics."""
+    conn = get_db()
+
+    # Pending bookings
+    pending_bookings = conn.execute(
+        "SELECT COUNT(*) as count FROM bookings WHERE status = 'pending'"
+    ).fetchone()['count']
+
+    # Unconfirmed completions
+    unconfirmed = conn.execute(
+        "SELECT COUNT(*) as count FROM projects WHERE status = 'done' AND confirmed_at IS NULL"
+    ).fetchone()['count']
+
+    # Total credits
+    total_credits = conn.execute(
+        "SELECT COALESCE(SUM(earned), 0) as total FROM credit_balances"
+    ).fetchone()['total']
+
+    # Projects by status
+    project_stats = conn.execute('''
+        SELECT status, COUNT(*) as count FROM projects GROUP BY status
+    ''').fetchall()
+
+    conn.close()
+
+    return jsonify({
+        'pendingBookings': pending_bookings,
+        'unconfirmedCompletions': unconfirmed,
+        'totalCreditsAwarded': total_credits,
+        'projectsByStatus': {row['status']: row['count'] for row in project_stats}
+    })
+
+
+@bp.route('/api/admin/pending-confirmations', methods=['GET'])
+@require_admin
+def pending_confirmations(user):
+    """Get projects awaiting confirmation."""
+    conn = get_db()
+    projects = conn.execute('''
+        SELECT * FROM projects
+        WHERE status = 'done' AND confirmed_at IS NULL
+        ORDER BY completed_at DESC
+    ''').fetchall()
+    conn.close()
+
+    return jsonify({
+        'projects': [dict(p) for p in projects],
+        'total': len(projects)
+    })
+
+
+@bp.route('/api/admin/users', methods=['GET'])
+@require_admin
+def list_users(user):
+    """List all users (admin only)."""
+    conn = get_db()
+    users = conn.execute('''
+        SELECT id, email, username, name, role, last_login, created_at
+        FROM users ORDER BY created_at DESC
+    ''').fetchall()
+    conn.close()
+
+    return jsonify({
+        'users': [dict(u) for u in users],
+        'total': len(users)
+    })
+
+
+@bp.route('/api/admin/users/<int:user_id>', methods=['PATCH'])
+@require_admin
+def update_user(user_id, user):
+    """Update user role or details (admin only)."""
+    data = request.json
+
+    conn = get_db()
+    target_user = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+
+    if not target_user:
+        conn.close()
+        return jsonify({'error': 'User nicht gefunden'}), 404
+
+    # Prevent demoting protected admins
+    protected_admins = ['moritzvoigt42@gmail.com', 'konny.voigt@web.de']
+    if target_user['email'] in protected_admins and data.get('role') != 'admin':
+        conn.close()
+        return jsonify({'error': 'Haupt-Admin kann nicht herabgestuft werden'}), 403
+
+    updates = []
+    params = []
+
+    if 'role' in data and data['role'] in ['user', 'admin']:
+        updates.append('role = ?')
+        params.append(data['role'])
+
+    if 'name' in data:
+        updates.append('name = ?')
+        params.append(data['name'])
+
+    if updates:
+        params.append(user_id)
+        conn.execute(f'''
+            UPDATE users SET {', '.join(updates)} WHERE id = ?
+        ''', params)
+        conn.commit()
+
+    conn.close()
+
+    return jsonify({'success': True, 'message': 'User aktualisiert'})
+
+
+@bp.route('/api/admin/bookings', methods=['GET'])
+@require_admin
+def admin_bookings(user):
+    """Get all bookings with full details."""
+    status = request.args.get('status')
+
+    conn = get_db()
+    query = 'SELECT * FROM bookings'
+    params = []
+
+    if status:
+        query += ' WHERE status = ?'
+        params.append(status)
+
+    query += ' ORDER BY created_at DESC'
+
+    bookings_list = conn.execute(query, params).fetchall()
+    conn.close()
+
+    return jsonify({
+        'bookings': [dict(b) for b in bookings_list],
+        'total': len(bookings_list)
+    })
+
+
+@bp.route('/api/admin/bookings/<int:booking_id>', methods=['PATCH'])
+@require_admin
+def update_booking(booking_id, user):
+    """Update booking details."""
+    data = request.json
+    return generic_patch('bookings', booking_id, data,
+        ['guest_name', 'guest_email', 'guest_phone', 'check_in', 'check_out',
+         'guests', 'has_pets', 'total_price', 'discount_code', 'notes', 'status'],
+        timestamp_field=None)
+
+
+# ============ Request Profiling ============
+
+@bp.route('/api/admin/profiles', methods=['GET'])
+@require_admin
+def list_request_profiles(user):
+    """List stored request profiles (newest first)."""
+    limit = min(request.args.get('limit', 100, type=int), 500)
+    profiles = request_profiler.list_profiles(limit)
+    return jsonify({
+        'profiles': profiles,
+        'total': len(profiles),
+        'sample_rate': request_profiler.PROFILE_SAMPLE_RATE,
+    })
+
+
+@bp.route('/api/admin/profiles/<profile_id>.folded', methods=['GET'])
+@require_admin
+def download_request_profile(profile_id, user):
+    """Download collapsed stacks (flamegraph.pl / speedscope compatible)."""
+    filename = request_profiler.profile_filename(profile_id)
+    if not filename:
+        return jsonify({'error': 'Profil nicht gefunden'}), 404
+    return send_from_directory(request_profiler.PROFILE_DIR, filename,
+                               mimetype='text/plain', as_attachment=True)
+
+
+@bp.route('/api/admin/profiles/<profile_id>', methods=['DELETE'])
+@require_admin
+def delete_request_profile(profile_id, user):
+    """Delete a stored request profile."""
+    if not request_profiler.delete_profile(profile_id):
+        return jsonify({'error': 'Profil nicht gefunden'}), 404
+    return jsonify({'success': True})
+
+
+@bp.route('/api/admin/users/<int:user_id>', methods=['DELETE'])
+@require_admin
+def delete_user(user_id, user):
+    """Admin: Delete a user."""
+    conn = get_db()
+    target_user = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+
+    if not target_user:
+        conn.close()
+        return jsonify({'error': 'User nicht gefunden'}), 404
+
+    # Prevent deleting the main admin
+    if target_user['email'] == 'moritzvoigt42@gmail.com':
+        conn.close()
+        return jsonify({'error': 'Haupt-Admin kann nicht gelöscht werden'}), 403
+
+    # Prevent self-deletion
+    if target_user['id'] == user['user_id']:
+        conn.close()
+        return jsonify({'error': 'Eigener Account kann nicht gelöscht werden'}), 403
+
+    # Delete user's tokens
+    conn.execute('DELETE FROM auth_tokens WHERE user_id = ?', (user_id,))
+    # Delete user
+    conn.execute('DELETE FROM users WHERE id = ?', (user_id,))
+    conn.commit()
+    conn.close()
+
+    return jsonify({'success': True, 'message': 'User gelöscht'})
+
+
+# ============ Garden Costs Routes ============
+
+@bp.route('/api/costs', methods=['GET'])
+@require_auth
+def get_costs(user):
+    """Get all garden costs."""
+    conn = get_db()
+    costs = conn.execute('SELECT * FROM garden_costs ORDER BY is_active DESC, created_at DESC').fetchall()
+    conn.close()
+    return jsonify({'costs': [dict(c) for c in costs]})
+
+
+@bp.route('/api/costs', methods=['POST'])
+@require_admin
+def create_cost(user):
+    """Admin: Create a garden cost entry."""
+    data = request.json
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO garden_costs (title, description, amount, frequency, category, date, end_date, is_active, related_project_id, created_by)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (data['title'], data.get('description'), data['amount'],
+          data.get('frequency', 'einmalig'), data.get('category'),
+          data.get('date'), data.get('end_date'),
+          data.get('is_active', 1), data.get('related_project_id'),
+          user['email']))
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True})
+
+
+@bp.route('/api/costs/<int:cost_id>', methods=['PATCH'])
+@require_admin
+def update_cost(cost_id, user):
+    """Admin: Update a garden cost entry."""
+    return generic_patch('garden_costs', cost_id, request.json,
+        ['title', 'description', 'amount', 'frequency', 'category',
+         'date', 'end_date', 'is_active', 'related_project_id'],
+        timestamp_field=None)
+
+
+@bp.route('/api/costs/<int:cost_id>', methods=['DELETE'])
+@require_admin
+def delete_cost(cost_id, user):
+    """Admin: Delete a garden cost entry."""
+    conn = get_db()
+    conn.execute('DELETE FROM garden_costs WHERE id = ?', (cost_id,))
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True})
+
+
+@bp.route('/api/costs/summary', methods=['GET'])
+@require_auth
+def costs_summary(user):
+    """Get cost summary with monthly/yearly totals."""
+    conn = get_db()
+    costs = conn.execute('SELECT * FROM garden_costs WHERE is_active = 1').fetchall()
+    conn.close()
+    monthly = sum(c['amount'] for c in costs if c['frequency'] == 'monatlich')
+    yearly = sum(c['amount'] for c in costs if c['frequency'] == 'jährlich')
+    once = sum(c['amount'] for c in costs if c['frequency'] == 'einmalig')
+    total_yearly = monthly * 12 + yearly + once
+    return jsonify({
+        'monthly': monthly,
+        'yearly': yearly,
+        'once': once,
+        'total_yearly': total_yearly
+    })
+
+
+# ─── Email Drafts API ────────────────────────────────────────
+
+@bp.route('/api/admin/email-drafts', methods=['GET'])
+@require_admin
+def get_email_drafts(user=None):
+    """Get email drafts (Admin only)."""
+    if not EMAIL_DRAFT_AVAILABLE:
+        return jsonify({'error': 'Email Draft Service nicht verfügbar'}), 503
+
+    status = request.args.get('status')
+    drafts = get_drafts(status)
+    return jsonify({'drafts': drafts})
+
+
+@bp.route('/api/admin/email-drafts/<int:draft_id>', methods=['GET'])
+@require_admin
+def get_email_draft(draft_id, user=None):
+    """Get a single email draft."""
+    if not EMAIL_DRAFT_AVAILABLE:
+        return jsonify({'error': 'Email Draft Service nicht verfügbar'}), 503
+
+    draft_data = get_draft(draft_id)
+    if not draft_data:
+        return jsonify({'error': 'Draft nicht gefunden'}), 404
+    return jsonify(draft_data)
+
+
+@bp.route('/api/admin/email-drafts/<int:draft_id>/approve', methods=['POST'])
+@require_admin
+def approve_email_draft(draft_id, user=None):
+    """Approve and send an email draft."""
+    if not EMAIL_DRAFT_AVAILABLE:
+        return jsonify({'error': 'Email Draft Service nicht verfügbar'}), 503
+
+    result = approve_draft(draft_id, approved_by=user.get('email', 'admin'))
+    if result['success']:
+        return jsonify(result)
+    return jsonify(result), 400
+
+
+@bp.route('/api/admin/email-drafts/<int:draft_id>/reject', methods=['POST'])
+@require_admin
+def reject_email_draft(draft_id, user=None):
+    """Reject an email draft."""
+    if not EMAIL_DRAFT_AVAILABLE:
+        return jsonify({'error': 'Email Draft Service nicht verfügbar'}), 503
+
+    result = reject_draft(draft_id, rejected_by=user.get('email', 'admin'))
+    return jsonify(result)
+
+
+@bp.route('/api/admin/email-drafts/<int:draft_id>', methods=['PATCH'])
+@require_admin
+def update_email_draft(draft_id, user=None):
+    """Update a pending email draft."""
+    if not EMAIL_DRAFT_AVAILABLE:
+        return jsonify({'error': 'Email Draft Service nicht verfügbar'}), 503
+
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Keine Daten'}), 400
+
+    result = update_draft(draft_id, **data)
+    if result['success']:
+        return jsonify(result)
+    return jsonify(result), 400
@@ -4,12 +4,18 @@ Garten-Agent Escalation Logic.
 3-stage escalation (Phase 1): reminder → email → slack-dm (+ telegram fallback).
 Emergency categories (wasser, elektrik) escalate faster.
 
+Stage executors write through an "actions" sink instead of a connection:
+DirectActions (single task, immediate writes — trigger endpoint) or
+BatchActions (agent_worker: prefetched providers, thread-safe quota
+reservation, buffered log rows flushed in one transaction).
+
 Stage 4 (voice call) is Phase 2 — Task #101.
 """
 
 import os
 import json
 import sqlite3
+import threading
 from datetime import datetime, date, timedelta
 from typing import Any
 
@@ -60,6 +66,19 @@ def calculate_stage(category: str | None, days_overdue: int) -> int:
     return stage
 
 
+def next_escalation_date(category: str | None, due_date_str: str | None, stage: int | None) -> date | None:
+    """Day on which a task at `stage` reaches the next stage (None after stage 3 / without due date)."""
+    stage = stage or 0
+    if stage >= 3 or not due_date_str:
+        return None
+    try:
+        due = datetime.strptime(due_date_str[:10], "%Y-%m-%d").date()
+    except (ValueError, TypeError):
+        return None
+    thresholds = EMERGENCY_THRESHOLDS if category in EMERGENCY_CATEGORIES else STANDARD_THRESHOLDS
+    return due + timedelta(days=thresholds[stage + 1])
+
+
 def should_escalate(prev_stage: int | None, target_stage: int) -> bool:
     """Only escalate if target stage is strictly higher than last executed stage."""
     if target_stage <= 0:
@@ -69,24 +88,33 @@ def should_escalate(prev_stage: int | None, target_stage: int) -> bool:
     return target_stage > prev_stage
 
 
-def get_default_provider(conn: sqlite3.Connection, category: str) -> dict | None:
-    """Return first non-disabled provider whose default_for_categories contains the task category."""
+def fetch_active_providers(conn: sqlite3.Connection) -> list[dict]:
     rows = conn.execute(
         "SELECT id, category, name, email, phone, default_for_categories, "
         "agent_disabled, last_agent_action_at "
         "FROM service_providers WHERE COALESCE(agent_disabled, 0) = 0"
     ).fetchall()
-    for row in rows:
+    return [dict(r) for r in rows]
+
+
+def match_provider(providers: list[dict], category: str) -> dict | None:
+    """First provider whose default_for_categories (or primary category) matches."""
+    for row in providers:
         cats_raw = row["default_for_categories"] or "[]"
         try:
             cats = json.loads(cats_raw) if isinstance(cats_raw, str) else []
         except (json.JSONDecodeError, TypeError):
             cats = []
         if category in cats or row["category"] == category:
-            return dict(row)
+            return row
     return None
 
 
+def get_default_provider(conn: sqlite3.Connection, category: str) -> dict | None:
+    """Return first non-disabled provider whose default_for_categories contains the task category."""
+    return match_provider(fetch_active_providers(conn), category)
+
+
 def provider_rate_limit_ok(conn: sqlite3.Connection, provider_id: int) -> bool:
     """Max 3 auto-emails per provider per 7 days."""
     row = conn.execute(
@@ -99,13 +127,99 @@ def provider_rate_limit_ok(conn: sqlite3.Connection, provider_id: int) -> bool:
     return (row["c"] if row else 0) < PROVIDER_EMAIL_MAX_PER_PERIOD
 
 
+def provider_email_counts(conn: sqlite3.Connection) -> dict[int, int]:
+    """Auto-emails per provider in the cooldown window, in one pass (batch form of provider_rate_limit_ok)."""
+    rows = conn.execute(
+        "SELECT json_extract(details, '$.provider_id') AS provider_id, COUNT(*) AS c "
+        "FROM agent_actions_log "
+        "WHERE source = 'garten_agent' AND action_type = 'email_sent' "
+        "AND created_at >= datetime('now', ?) AND json_valid(details) "
+        "GROUP BY 1",
+        (f'-{PROVIDER_EMAIL_COOLDOWN_DAYS} days',),
+    ).fetchall()
+    return {r["provider_id"]: r["c"] for r in rows if r["provider_id"] is not None}
+
+
+_LOG_SQL = (
+    "INSERT INTO agent_actions_log (action_type, source, description, details, success, created_at) "
+    "VALUES (?, 'garten_agent', ?, ?, ?, datetime('now', 'localtime'))"
+)
+
+
+def _log_row(action_type: str, description: str, details: dict, success: bool) -> tuple:
+    return (action_type, description, json.dumps(details, ensure_ascii=False), 1 if success else 0)
+
+
 def log_action(conn: sqlite3.Connection, action_type: str, description: str,
                details: dict, success: bool = True) -> None:
-    conn.execute(
-        "INSERT INTO agent_actions_log (action_type, source, description, details, success, created_at) "
-        "VALUES (?, 'garten_agent', ?, ?, ?, datetime('now', 'localtime'))",
-        (action_type, description, json.dumps(details, ensure_ascii=False), 1 if success else 0),
-    )
+    conn.execute(_LOG_SQL, _log_row(action_type, description, details, success))
+
+
+class DirectActions:
+    """Executor sink for a single escalation: reads and writes go straight to conn."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def provider_for(self, category: str) -> dict | None:
+        return get_default_provider(self.conn, category)
+
+    def reserve_provider_email(self, provider_id: int) -> bool:
+        return provider_rate_limit_ok(self.conn, provider_id)
+
+    def touch_provider(self, provider_id: int, at: str) -> None:
+        self.conn.execute("UPDATE service_providers SET last_agent_action_at = ? WHERE id = ?",
+                          (at, provider_id))
+
+    def log(self, action_type: str, description: str, details: dict, success: bool = True) -> None:
+        log_action(self.conn, action_type, description, details, success)
+
+
+class BatchActions:
+    """Thread-safe executor sink for agent_worker's pool.
+
+    Providers and per-provider email counts are prefetched once; quota is
+    reserved under a lock so parallel stage-2 runs can't exceed
+    PROVIDER_EMAIL_MAX_PER_PERIOD. Writes are buffered until flush().
+    """
+
+    def __init__(self, providers: list[dict], email_counts: dict[int, int]):
+        self.providers = providers
+        self.email_counts = dict(email_counts)
+        self._lock = threading.Lock()
+        self._logs: list[tuple] = []
+        self._touched: dict[int, str] = {}
+
+    def provider_for(self, category: str) -> dict | None:
+        return match_provider(self.providers, category)
+
+    def reserve_provider_email(self, provider_id: int) -> bool:
+        with self._lock:
+            if self.email_counts.get(provider_id, 0) >= PROVIDER_EMAIL_MAX_PER_PERIOD:
+                return False
+            self.email_counts[provider_id] = self.email_counts.get(provider_id, 0) + 1
+            return True
+
+    def touch_provider(self, provider_id: int, at: str) -> None:
+        with self._lock:
+            self._touched[provider_id] = at
+
+    def log(self, action_type: str, description: str, details: dict, success: bool = True) -> None:
+        row = _log_row(action_type, description, details, success)
+        with self._lock:
+            self._logs.append(row)
+
+    def flush(self, conn: sqlite3.Connection) -> int:
+        """Write buffered rows on conn (caller commits). Returns number of log rows."""
+        with self._lock:
+            logs, self._logs = self._logs, []
+            touched, self._touched = self._touched, {}
+        if logs:
+            conn.executemany(_LOG_SQL, logs)
+        if touched:
+            conn.executemany("UPDATE service_providers SET last_agent_action_at = ? WHERE id = ?",
+                             [(at, pid) for pid, at in touched.items()])
+        return len(logs)
 
 
 def upsert_escalation_state(conn: sqlite3.Connection, task_id: int, stage: int,
@@ -138,6 +252,27 @@ def upsert_escalation_state(conn: sqlite3.Connection, task_id: int, stage: int,
     return esc_id
 
 
+def upsert_escalation_states(conn: sqlite3.Connection, states: list[tuple]) -> None:
+    """Batch form of upsert_escalation_state for (task_id, stage, next_action_at) tuples."""
+    if not states:
+        return
+    now_str = _now().strftime("%Y-%m-%d %H:%M:%S")
+    rows = [(task_id, stage, now_str, next_at.strftime("%Y-%m-%d %H:%M:%S") if next_at else None, now_str, now_str)
+            for task_id, stage, next_at in states]
+    conn.executemany(
+        "INSERT INTO agent_escalation_state (task_id, current_stage, last_action_at, "
+        "next_action_at, cancelled, created_at, updated_at) VALUES (?, ?, ?, ?, 0, ?, ?) "
+        "ON CONFLICT(task_id) DO UPDATE SET current_stage = excluded.current_stage, "
+        "last_action_at = excluded.last_action_at, next_action_at = excluded.next_action_at, "
+        "updated_at = excluded.updated_at, cancelled = 0",
+        rows,
+    )
+    conn.executemany(
+        "UPDATE projects SET escalation_state = ?, last_escalation_at = ? WHERE id = ?",
+        [(f"stage_{stage}", now_str, task_id) for task_id, stage, _ in states],
+    )
+
+
 def _next_action_at_for(category: str | None, stage: int) -> datetime | None:
     """Compute rough next_action_at preview for COO/display. Returns None if at stage 3."""
     if stage >= 3:
@@ -148,7 +283,7 @@ def _next_action_at_for(category: str | None, stage: int) -> datetime | None:
     return _now() + timedelta(days=days_until)
 
 
-def execute_stage_1(conn: sqlite3.Connection, task: dict, days_overdue: int) -> dict:
+def execute_stage_1(actions, task: dict, days_overdue: int) -> dict:
     """Stage 1: Slack channel post (passive reminder) + COO daily plan entry."""
     blocks = slack_service.build_escalation_blocks(task, 1, days_overdue)
     resp = slack_service.post_channel(
@@ -157,7 +292,7 @@ def execute_stage_1(conn: sqlite3.Connection, task: dict, days_overdue: int) ->
         blocks=blocks,
     )
     ok = bool(resp.get("ok"))
-    log_action(conn, "reminder",
+    actions.log("reminder",
                f"Stage 1 reminder for task #{task['id']}",
                {"task_id": task["id"], "category": task.get("category"),
                 "days_overdue": days_overdue, "slack_ts": resp.get("ts"),
@@ -166,13 +301,13 @@ def execute_stage_1(conn: sqlite3.Connection, task: dict, days_overdue: int) ->
     return {"ok": ok, "slack_ts": resp.get("ts"), "error": resp.get("error")}
 
 
-def execute_stage_2(conn: sqlite3.Connection, task: dict, days_overdue: int) -> dict:
+def execute_stage_2(actions, task: dict, days_overdue: int) -> dict:
     """Stage 2: Email to default provider + slack channel note."""
     from email_service import send_provider_reminder
     category = task.get("category") or ""
-    provider = get_default_provider(conn, category)
+    provider = actions.provider_for(category)
     if not provider:
-        log_action(conn, "email_sent",
+        actions.log("email_sent",
                    f"Stage 2: no provider match for task #{task['id']} ({category})",
                    {"task_id": task["id"], "category": category,
                     "reason": "no_provider_for_category"},
@@ -186,15 +321,15 @@ def execute_stage_2(conn: sqlite3.Connection, task: dict, days_overdue: int) ->
         return {"ok": False, "reason": "no_provider_for_category"}
 
     if not provider.get("email"):
-        log_action(conn, "email_sent",
+        actions.log("email_sent",
                    f"Stage 2: provider #{provider['id']} has no email",
                    {"task_id": task["id"], "provider_id": provider["id"],
                     "reason": "no_email"},
                    success=False)
         return {"ok": False, "reason": "provider_no_email"}
 
-    if not provider_rate_limit_ok(conn, provider["id"]):
-        log_action(conn, "email_sent",
+    if not actions.reserve_provider_email(provider["id"]):
+        actions.log("email_sent",
                    f"Stage 2: provider #{provider['id']} rate-limited",
                    {"task_id": task["id"], "provider_id": provider["id"],
                     "reason": "rate_limited"},
@@ -203,11 +338,8 @@ def execute_stage_2(conn: sqlite3.Connection, task: dict, days_overdue: int) ->
 
     email_ok = send_provider_reminder(provider, task, days_overdue)
     now_str = _now().strftime("%Y-%m-%d %H:%M:%S")
-    conn.execute(
-        "UPDATE service_providers SET last_agent_action_at = ? WHERE id = ?",
-        (now_str, provider["id"]),
-    )
-    log_action(conn, "email_sent",
+    actions.touch_provider(provider["id"], now_str)
+    actions.log("email_sent",
                f"Stage 2 email to {provider['name']} for task #{task['id']}",
                {"task_id": task["id"], "provider_id": provider["id"],
                 "provider_name": provider["name"], "provider_email": provider["email"],
@@ -223,10 +355,10 @@ def execute_stage_2(conn: sqlite3.Connection, task: dict, days_overdue: int) ->
     return {"ok": email_ok, "provider_id": provider["id"]}
 
 
-def execute_stage_3(conn: sqlite3.Connection, task: dict, days_overdue: int) -> dict:
+def execute_stage_3(actions, task: dict, days_overdue: int) -> dict:
     """Stage 3: Slack DM to Moritz + Telegram fallback + channel post."""
     category = task.get("category") or ""
-    provider = get_default_provider(conn, category)
+    provider = actions.provider_for(category)
     blocks = slack_service.build_escalation_blocks(task, 3, days_overdue, provider=provider)
     moritz_user = slack_service.GARTEN_MORITZ_SLACK_USER_ID
     dm_resp = slack_service.send_dm(
@@ -245,7 +377,7 @@ def execute_stage_3(conn: sqlite3.Connection, task: dict, days_overdue: int) ->
 
     tg_ok = _telegram_fallback(task, days_overdue, provider)
 
-    log_action(conn, "slack_dm",
+    actions.log("slack_dm",
                f"Stage 3 DM to Moritz for task #{task['id']}",
                {"task_id": task["id"], "category": category,
                 "days_overdue": days_overdue,
@@ -291,8 +423,8 @@ EXECUTORS = {
 }
 
 
-def escalate_task(conn: sqlite3.Connection, task: dict) -> dict:
-    """Decide target stage and execute it if it's a step up. Returns summary."""
+def plan_escalation(task: dict, prev_stage: int | None, cancelled: bool = False) -> dict:
+    """Pure stage decision. Returns {'skipped': True, ...} or {'skipped': False, 'stage', 'days_overdue'}."""
     category = task.get("category") or ""
     if category == IT_CATEGORY:
         return {"skipped": True, "reason": "it_category"}
@@ -302,22 +434,33 @@ def escalate_task(conn: sqlite3.Connection, task: dict) -> dict:
     if target_stage == 0:
         return {"skipped": True, "reason": "no_stage_yet", "days_overdue": days_overdue}
 
-    existing = conn.execute(
-        "SELECT current_stage, cancelled FROM agent_escalation_state WHERE task_id = ?",
-        (task["id"],),
-    ).fetchone()
-    if existing and existing["cancelled"]:
+    if cancelled:
         return {"skipped": True, "reason": "escalation_cancelled"}
-    prev_stage = existing["current_stage"] if existing else None
 
     if not should_escalate(prev_stage, target_stage):
         return {"skipped": True, "reason": "already_at_or_past_stage",
                 "prev_stage": prev_stage, "target_stage": target_stage}
 
+    return {"skipped": False, "stage": target_stage, "days_overdue": days_overdue}
+
+
+def escalate_task(conn: sqlite3.Connection, task: dict) -> dict:
+    """Decide target stage and execute it if it's a step up. Returns summary."""
+    existing = conn.execute(
+        "SELECT current_stage, cancelled FROM agent_escalation_state WHERE task_id = ?",
+        (task["id"],),
+    ).fetchone()
+    plan = plan_escalation(task,
+                           existing["current_stage"] if existing else None,
+                           bool(existing and existing["cancelled"]))
+    if plan["skipped"]:
+        return plan
+
+    target_stage, days_overdue = plan["stage"], plan["days_overdue"]
     executor = EXECUTORS[target_stage]
-    result = executor(conn, task, days_overdue)
+    result = executor(DirectActions(conn), task, days_overdue)
 
-    next_at = _next_action_at_for(category, target_stage)
+    next_at = _next_action_at_for(task.get("category") or "", target_stage)
     upsert_escalation_state(conn, task["id"], target_stage, next_at)
     conn.commit()
 
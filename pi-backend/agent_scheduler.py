@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Garten-Agent Scheduler — event-driven replacement for the 6-hourly full scan.
+
+Everything the agent has to do at a point in time lives in one indexed queue,
+`agent_schedule(kind, ref_id, due_at)`:
+
+  escalation  projects.id         next escalation stage (agent_escalation)
+  recurring   recurring_tasks.id  maintenance due → admin notification
+  payment     invoices.id         sent invoice past due → payment reminder (AGENT_PAYMENT_REMINDERS=1)
+  retention   0                   nightly agent_actions_log archive (action_log.py)
+  credit_reconcile 0              nightly credit_balances check (credit_ledger.py)
+  map_area_status  0              nightly due-status refresh of map_area_stats
+  change_log       0              nightly change_log retention (change_feed.py)
+  upload_sessions  0              nightly cleanup of abandoned resumable uploads
+  storage_audit    0              nightly orphan/missing file report (storage_audit.py)
+  media_backfill   0              one-off phash/metadata/panorama tile backlog (media_backfill.py)
+
+The daemon pops due rows, re-evaluates each item against the current data,
+acts if needed and stores the item's real next due time (or drops it). Then
+it sleeps until the next due row. Table triggers (db.py migration 006) are the
+change hook: a write to a task, recurring task or invoice re-queues it as due
+now; the daemon notices via PRAGMA data_version without re-running any query
+while idle.
+
+Usage:
+    python agent_scheduler.py run       # daemon (start.sh, AGENT_SCHEDULER=1)
+    python agent_scheduler.py once      # process due items and exit
+    python agent_scheduler.py rebuild   # re-queue all candidates (reconcile)
+    python agent_scheduler.py status
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DB_PATH  # noqa: E402
+from action_log import handle_retention  # noqa: E402
+from credit_ledger import handle_reconcile  # noqa: E402
+from map_area_stats import handle_refresh as handle_map_area_status  # noqa: E402
+from change_feed import handle_prune as handle_change_log  # noqa: E402
+from upload_sessions import handle_prune as handle_upload_sessions  # noqa: E402
+from storage_audit import handle_audit as handle_storage_audit  # noqa: E402
+from media_backfill import handle_backfill as handle_media_backfill  # noqa: E402
+from agent_escalation import (  # noqa: E402
+    IT_CATEGORY, escalate_task, log_action, next_escalation_date,
+)
+
+# Escalations and reminders fire at this local hour instead of midnight
+ACTION_HOUR = int(os.environ.get('AGENT_SCHEDULER_HOUR', '8'))
+# How often the idle daemon checks PRAGMA data_version for writes from the app
+POLL_SECONDS = float(os.environ.get('AGENT_SCHEDULER_POLL', '2'))
+MAX_SLEEP_SECONDS = 3600
+BATCH_SIZE = 50
+
+# Payment reminder emails to guests are opt-in (the old agent never sent any)
+PAYMENT_REMINDERS = os.environ.get('AGENT_PAYMENT_REMINDERS', '0') == '1'
+RECURRING_REPEAT_DAYS = 7
+PAYMENT_REPEAT_DAYS = 7
+PAYMENT_REMINDER_MAX = 2
+INVOICE_DEFAULT_TERM_DAYS = 14
+
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def _at_action_hour(day) -> datetime:
+    return datetime(day.year, day.month, day.day, ACTION_HOUR)
+
+
+def tomorrow_at(now: datetime, hour: int) -> datetime:
+    """Next day's run time for nightly maintenance kinds."""
+    day = now.date() + timedelta(days=1)
+    return datetime(day.year, day.month, day.day, hour)
+
+
+def _before_action_hour(now: datetime) -> bool:
+    """No Slack DMs / emails at night: due items wait for ACTION_HOUR."""
+    return now < _at_action_hour(now.date())
+
+
+def _parse_day(value: str | None):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value[:10], '%Y-%m-%d').date()
+    except (ValueError, TypeError):
+        return None
+
+
+def schedule(conn: sqlite3.Connection, kind: str, ref_id: int, due_at: datetime,
+             attempts: int | None = None) -> None:
+    if attempts is None:
+        conn.execute(
+            "INSERT INTO agent_schedule (kind, ref_id, due_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(kind, ref_id) DO UPDATE SET due_at = excluded.due_at",
+            (kind, ref_id, due_at.strftime(TS_FORMAT)),
+        )
+    else:
+        conn.execute(
+            "INSERT OR REPLACE INTO agent_schedule (kind, ref_id, due_at, attempts) VALUES (?, ?, ?, ?)",
+            (kind, ref_id, due_at.strftime(TS_FORMAT), attempts),
+        )
+
+
+def unschedule(conn: sqlite3.Connection, kind: str, ref_id: int) -> None:
+    conn.execute("DELETE FROM agent_schedule WHERE kind = ? AND ref_id = ?", (kind, ref_id))
+
+
+# ============ Handlers ============
+#
+# Each handler gets the queue row, looks at the current state of the item and
+# returns a short result dict. It must leave the row rescheduled or removed.
+
+def handle_escalation(conn: sqlite3.Connection, item: sqlite3.Row, now: datetime) -> dict:
+    task_id = item['ref_id']
+    row = conn.execute(
+        "SELECT p.id, p.title, p.description, p.category, p.status, p.assigned_to, p.due_date, "
+        "p.escalation_state, p.last_escalation_at, s.current_stage, COALESCE(s.cancelled, 0) AS cancelled "
+        "FROM projects p LEFT JOIN agent_escalation_state s ON s.task_id = p.id WHERE p.id = ?",
+        (task_id,),
+    ).fetchone()
+    if not row or not row['due_date'] or (row['category'] or '') == IT_CATEGORY:
+        unschedule(conn, 'escalation', task_id)
+        return {'action': 'dropped'}
+    if (row['status'] or 'offen') != 'offen':
+        conn.execute(
+            "UPDATE agent_escalation_state SET cancelled = 1, cancel_reason = 'task_completed', "
+            "updated_at = datetime('now', 'localtime') WHERE task_id = ? AND cancelled = 0",
+            (task_id,),
+        )
+        unschedule(conn, 'escalation', task_id)
+        return {'action': 'cancelled'}
+    if row['cancelled']:
+        unschedule(conn, 'escalation', task_id)
+        return {'action': 'dropped', 'reason': 'escalation_cancelled'}
+
+    if _before_action_hour(now):
+        schedule(conn, 'escalation', task_id, _at_action_hour(now.date()))
+        return {'action': 'deferred'}
+
+    task = {k: row[k] for k in row.keys() if k not in ('current_stage', 'cancelled')}
+    stage = row['current_stage']
+    result = escalate_task(conn, task)
+    if result.get('skipped'):
+        result = {'action': 'waiting'}
+    else:
+        stage = result['stage']
+        result = {'action': 'escalated', 'stage': stage, 'result': result.get('result')}
+
+    next_day = next_escalation_date(task['category'], task['due_date'], stage)
+    if next_day is None:
+        unschedule(conn, 'escalation', task_id)
+    else:
+        next_at = max(_at_action_hour(next_day), now + timedelta(hours=1))
+        schedule(conn, 'escalation', task_id, next_at)
+        # Exact time instead of the rough preview, shown by /api/garten/agent/status
+        conn.execute("UPDATE agent_escalation_state SET next_action_at = ? WHERE task_id = ?",
+                     (next_at.strftime(TS_FORMAT), task_id))
+    return result
+
+
+def handle_recurring(conn: sqlite3.Connection, item: sqlite3.Row, now: datetime) -> dict:
+    task_id = item['ref_id']
+    row = conn.execute(
+        "SELECT id, title, category, next_due, is_active FROM recurring_tasks WHERE id = ?", (task_id,)
+    ).fetchone()
+    due_day = _parse_day(row['next_due']) if row else None
+    if not row or not row['is_active'] or due_day is None:
+        unschedule(conn, 'recurring', task_id)
+        return {'action': 'dropped'}
+
+    due_at = _at_action_hour(due_day)
+    if due_at > now:
+        schedule(conn, 'recurring', task_id, due_at, attempts=0)
+        return {'action': 'waiting'}
+    if _before_action_hour(now):
+        schedule(conn, 'recurring', task_id, _at_action_hour(now.date()))
+        return {'action': 'deferred'}
+
+    from notifications import notify_admin
+    days_overdue = (now.date() - due_day).days
+    ok = notify_admin('maintenance_due', {
+        'Aufgabe': row['title'],
+        'Kategorie': row['category'],
+        'Fällig seit': row['next_due'],
+        'Überfällig': f"{days_overdue} Tage" if days_overdue else 'heute',
+    })
+    log_action(conn, 'maintenance_reminder',
+               f"Wartung fällig: {row['title']} ({days_overdue} Tage)",
+               {'recurring_task_id': task_id, 'days_overdue': days_overdue}, success=ok)
+    schedule(conn, 'recurring', task_id, now + timedelta(days=RECURRING_REPEAT_DAYS),
+             attempts=item['attempts'] + 1)
+    return {'action': 'reminded', 'days_overdue': days_overdue}
+
+
+def handle_payment(conn: sqlite3.Connection, item: sqlite3.Row, now: datetime) -> dict:
+    invoice_id = item['ref_id']
+    if not PAYMENT_REMINDERS:
+        unschedule(conn, 'payment', invoice_id)
+        return {'action': 'disabled'}
+    row = conn.execute(
+        "SELECT i.id, i.invoice_number, i.status, i.guest_name, i.guest_email, i.total, "
+        "i.due_date, i.sent_at, b.check_in "
+        "FROM invoices i LEFT JOIN bookings b ON b.id = i.booking_id WHERE i.id = ?",
+        (invoice_id,),
+    ).fetchone()
+    if not row or row['status'] != 'sent' or item['attempts'] >= PAYMENT_REMINDER_MAX:
+        unschedule(conn, 'payment', invoice_id)
+        return {'action': 'dropped'}
+
+    due_day = _parse_day(row['due_date'])
+    if due_day is None:
+        sent_day = _parse_day(row['sent_at']) or now.date()
+        due_day = sent_day + timedelta(days=INVOICE_DEFAULT_TERM_DAYS)
+    due_at = _at_action_hour(due_day + timedelta(days=PAYMENT_REPEAT_DAYS * item['attempts']))
+    if due_at > now:
+        schedule(conn, 'payment', invoice_id, due_at)
+        return {'action': 'waiting'}
+    if _before_action_hour(now):
+        schedule(conn, 'payment', invoice_id, _at_action_hour(now.date()))
+        return {'action': 'deferred'}
+
+    from email_service import send_payment_reminder
+    days_since = (now.date() - due_day).days
+    ok = send_payment_reminder({
+        'email': row['guest_email'],
+        'name': row['guest_name'],
+        'checkIn': row['check_in'] or '',
+        'totalPrice': row['total'],
+    }, days_since)
+    log_action(conn, 'payment_reminder',
+               f"Zahlungserinnerung {row['invoice_number']} an {row['guest_email']}",
+               {'invoice_id': invoice_id, 'days_since_due': days_since,
+                'reminder': item['attempts'] + 1}, success=ok)
+    schedule(conn, 'payment', invoice_id, now + timedelta(days=PAYMENT_REPEAT_DAYS),
+             attempts=item['attempts'] + 1)
+    return {'action': 'reminded', 'days_since_due': days_since}
+
+
+HANDLERS = {
+    'escalation': handle_escalation,
+    'recurring': handle_recurring,
+    'payment': handle_payment,
+    'retention': handle_retention,
+    'credit_reconcile': handle_reconcile,
+    'map_area_status': handle_map_area_status,
+    'change_log': handle_change_log,
+    'upload_sessions': handle_upload_sessions,
+    'storage_audit': handle_storage_audit,
+    'media_backfill': handle_media_backfill,
+}
+
+
+# ============ Queue processing ============
+
+def next_due_at(conn: sqlite3.Connection) -> datetime | None:
+    row = conn.execute("SELECT MIN(due_at) FROM agent_schedule").fetchone()
+    return datetime.strptime(row[0], TS_FORMAT) if row and row[0] else None
+
+
+def process_due(conn: sqlite3.Connection, now: datetime | None = None) -> dict:
+    """Run every item that is due, oldest first. Each item commits on its own."""
+    now = now or datetime.now()
+    summary = {'processed': 0, 'errors': 0, 'actions': {}}
+    while True:
+        items = conn.execute(
+            "SELECT kind, ref_id, due_at, attempts FROM agent_schedule WHERE due_at <= ? "
+            "ORDER BY due_at LIMIT ?",
+            (now.strftime(TS_FORMAT), BATCH_SIZE),
+        ).fetchall()
+        if not items:
+            return summary
+        for item in items:
+            handler = HANDLERS.get(item['kind'])
+            try:
+                if handler is None:
+                    unschedule(conn, item['kind'], item['ref_id'])
+                    action = 'unknown_kind'
+                else:
+                    action = handler(conn, item, now).get('action', 'done')
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                summary['errors'] += 1
+                action = 'error'
+                print(f"[agent_scheduler] {item['kind']} #{item['ref_id']} failed: {e}")
+                # Back off instead of spinning on a broken item
+                schedule(conn, item['kind'], item['ref_id'], now + timedelta(hours=1))
+                conn.commit()
+            summary['processed'] += 1
+            key = f"{item['kind']}:{action}"
+            summary['actions'][key] = summary['actions'].get(key, 0) + 1
+
+
+def rebuild(conn: sqlite3.Connection) -> int:
+    """Re-queue every candidate as due now (reconcile after manual DB edits or downtime)."""
+    now_str = datetime.now().strftime(TS_FORMAT)
+    before = conn.total_changes
+    conn.execute(
+        "INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at) "
+        "SELECT 'escalation', id, ? FROM projects "
+        "WHERE COALESCE(status, 'offen') = 'offen' AND due_date IS NOT NULL AND COALESCE(category, '') != ?",
+        (now_str, IT_CATEGORY),
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at) "
+        "SELECT 'recurring', id, ? FROM recurring_tasks WHERE is_active = 1 AND next_due IS NOT NULL",
+        (now_str,),
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at) "
+        "SELECT 'payment', id, ? FROM invoices WHERE status = 'sent'",
+        (now_str,),
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at) VALUES (?, 0, ?)",
+        [('retention', now_str), ('credit_reconcile', now_str), ('map_area_status', now_str),
+         ('change_log', now_str), ('upload_sessions', now_str), ('storage_audit', now_str)],
+    )
+    conn.commit()
+    return conn.total_changes - before
+
+
+class Scheduler:
+    """Long-running loop: process due items, then sleep until the next one or a DB change."""
+
+    def __init__(self, poll_seconds: float = POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.stopped = threading.Event()
+
+    def stop(self, *_args) -> None:
+        self.stopped.set()
+
+    def _data_version(self, conn: sqlite3.Connection) -> int:
+        return conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def run(self) -> None:
+        conn = get_db()
+        try:
+            queued = rebuild(conn)
+            print(f"[agent_scheduler] started, {queued} items re-queued")
+            while not self.stopped.is_set():
+                started = time.perf_counter()
+                summary = process_due(conn)
+                if summary['processed']:
+                    took = (time.perf_counter() - started) * 1000
+                    print(f"[agent_scheduler] {json.dumps(summary)} in {took:.0f}ms")
+
+                nxt = next_due_at(conn)
+                wait_s = MAX_SLEEP_SECONDS if nxt is None else (nxt - datetime.now()).total_seconds()
+                deadline = time.monotonic() + min(max(wait_s, 0), MAX_SLEEP_SECONDS)
+                version = self._data_version(conn)
+                # Idle: one PRAGMA per poll, no queries until something changes or is due
+                while not self.stopped.is_set():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.stopped.wait(min(self.poll_seconds, remaining))
+                    if self._data_version(conn) != version:
+                        break
+        finally:
+            conn.close()
+
+
+def status(conn: sqlite3.Connection) -> dict:
+    rows = conn.execute(
+        "SELECT kind, COUNT(*) AS n, MIN(due_at) AS next_due, "
+        "SUM(due_at <= ?) AS overdue FROM agent_schedule GROUP BY kind",
+        (datetime.now().strftime(TS_FORMAT),),
+    ).fetchall()
+    return {r['kind']: {'queued': r['n'], 'due_now': r['overdue'], 'next_due': r['next_due']} for r in rows}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Garten-Agent event scheduler')
+    parser.add_argument('command', choices=['run', 'once', 'rebuild', 'status'])
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        # Exactly one daemon per database
+        with open(DB_PATH + '.scheduler.lock', 'w') as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                print("[agent_scheduler] already running")
+                return 1
+            scheduler = Scheduler()
+            signal.signal(signal.SIGTERM, scheduler.stop)
+            signal.signal(signal.SIGINT, scheduler.stop)
+            scheduler.run()
+        return 0
+
+    conn = get_db()
+    try:
+        if args.command == 'once':
+            print(json.dumps(process_due(conn), indent=2))
+        elif args.command == 'rebuild':
+            print(f"{rebuild(conn)} items queued")
+        print(json.dumps(status(conn), indent=2))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
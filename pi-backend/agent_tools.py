@@ -331,17 +331,20 @@ def get_open_tasks(args):
     role_required='guest',
 )
 def search_inventory(args):
+    from search_index import ranked_refs
     query = args.get('query', '')
     conn = None
     try:
         conn = get_db()
+        refs, refs_params = ranked_refs(query, 'inventory')
         rows = conn.execute(
-            "SELECT i.name, i.category, i.quantity, i.condition, r.name as room "
-            "FROM inventory_items i "
+            "SELECT i.name, i.category, i.quantity, i.ablageort, r.name as room "
+            f"FROM ({refs}) s "
+            "JOIN inventory_items i ON i.id = s.ref "
             "LEFT JOIN inventory_rooms r ON i.room_id = r.id "
-            "WHERE i.name LIKE ? OR i.category LIKE ? "
+            "ORDER BY s.rank "
             "LIMIT 10",
-            (f'%{query}%', f'%{query}%'),
+            refs_params,
         ).fetchall()
         if not rows:
             return json.dumps({'info': f"Nichts gefunden für '{query}'."})
@@ -353,6 +356,35 @@ def search_inventory(args):
             conn.close()
 
 
+@register_tool(
+    name='get_inventory_overview',
+    description='Gibt die Inventar-Struktur zurück: Gebäude, Etagen und Räume mit Anzahl vorhandener Gegenstände.',
+    parameters={'type': 'object', 'properties': {}, 'required': []},
+    role_required='guest',
+)
+def get_inventory_overview(args):
+    from inventory_tree import get_tree, iter_rooms
+    conn = None
+    try:
+        conn = get_db()
+        tree = get_tree(conn)
+        if not tree:
+            return json.dumps({'info': 'Inventar ist noch leer.'})
+        return json.dumps([
+            {
+                'building': b['name'],
+                'items': b['present_count'],
+                'rooms': [{'room': r['name'], 'items': r['present_count']} for r in iter_rooms(b)],
+            }
+            for b in tree
+        ])
+    except Exception as e:
+        return json.dumps({'error': str(e)})
+    finally:
+        if conn:
+            conn.close()
+
+
 @register_tool(
     name='get_gallery_stats',
     description='Gibt Statistiken zur Galerie zurück (Anzahl Bilder, Kategorien).',
@@ -711,23 +743,22 @@ def get_credits_summary(args):
     conn = None
     try:
         conn = get_db()
-        # Per-guest summary
+        # Per-guest summary from the materialized balances (credit_ledger.py);
+        # balance = earned minus every non-earned entry
         per_guest = conn.execute(
-            "SELECT guest_email, "
-            "SUM(CASE WHEN type = 'earned' THEN amount ELSE 0 END) as earned, "
-            "SUM(CASE WHEN type = 'redeemed' THEN amount ELSE 0 END) as redeemed, "
-            "SUM(CASE WHEN type = 'earned' THEN amount ELSE -amount END) as balance "
-            "FROM credits GROUP BY guest_email "
+            "SELECT guest_email, earned, redeemed, "
+            "earned - (total - earned) as balance "
+            "FROM credit_balances "
             "ORDER BY balance DESC"
         ).fetchall()
 
         # Totals
-        total_earned = conn.execute(
-            "SELECT COALESCE(SUM(amount), 0) as total FROM credits WHERE type = 'earned'"
-        ).fetchone()['total']
-        total_redeemed = conn.execute(
-            "SELECT COALESCE(SUM(amount), 0) as total FROM credits WHERE type = 'redeemed'"
-        ).fetchone()['total']
+        totals = conn.execute(
+            "SELECT COALESCE(SUM(earned), 0) as earned, COALESCE(SUM(redeemed), 0) as redeemed "
+            "FROM credit_balances"
+        ).fetchone()
+        total_earned = totals['earned']
+        total_redeemed = totals['redeemed']
 
         return json.dumps({
             'total_earned': total_earned,
@@ -3,9 +3,18 @@
 Garten-Agent Cron Worker.
 
 Scans overdue operational tasks (category != 'it') and escalates in 3 stages.
-Designed for 6-hourly invocation (cron / systemd-timer).
-
-Runtime budget: < 30 seconds. Max 10 escalation actions per run.
+Full-scan fallback / manual run (/api/garten/agent/run-now); in the container the
+event-driven agent_scheduler.py fires escalations when they are due.
+
+One run:
+  1. one LEFT JOIN projects × agent_escalation_state → candidates with prev stage
+  2. stage transitions planned in memory (agent_escalation.plan_escalation)
+  3. side effects (Slack / Resend / Telegram) on a bounded thread pool;
+     provider email quota is reserved atomically across the pool
+  4. action logs + state upserts committed in batches
+
+Runtime budget: < 30 seconds (AGENT_RUNTIME_BUDGET). No new work is started
+once elapsed + average action time would exceed the budget.
 """
 
 import os
@@ -13,17 +22,22 @@ import sys
 import time
 import json
 import sqlite3
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 DATA_DIR = os.environ.get('DATA_DIR', '/app/data')
 DB_PATH = os.path.join(DATA_DIR, 'garten.db')
 
-MAX_ACTIONS_PER_RUN = 10
-RUNTIME_BUDGET_SECONDS = 30
+MAX_ACTIONS_PER_RUN = int(os.environ.get('AGENT_MAX_ACTIONS', '50'))
+RUNTIME_BUDGET_SECONDS = float(os.environ.get('AGENT_RUNTIME_BUDGET', '30'))
+WORKERS = int(os.environ.get('AGENT_WORKERS', '4'))
+COMMIT_BATCH = 20
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from agent_escalation import escalate_task, IT_CATEGORY  # noqa: E402
+from agent_escalation import (  # noqa: E402
+    EXECUTORS, IT_CATEGORY, BatchActions, _next_action_at_for, fetch_active_providers,
+    plan_escalation, provider_email_counts, upsert_escalation_states,
+)
 
 
 def get_db() -> sqlite3.Connection:
@@ -34,16 +48,18 @@ def get_db() -> sqlite3.Connection:
 
 
 def fetch_overdue_tasks(conn: sqlite3.Connection) -> list[dict]:
-    """Fetch all non-IT tasks with status='offen' and due_date in the past."""
+    """Fetch all non-IT tasks with status='offen' and due_date in the past, with their escalation state."""
     rows = conn.execute(
-        "SELECT id, title, description, category, status, assigned_to, due_date, "
-        "escalation_state, last_escalation_at "
-        "FROM projects "
-        "WHERE COALESCE(category, '') != ? "
-        "AND COALESCE(status, 'offen') = 'offen' "
-        "AND due_date IS NOT NULL "
-        "AND due_date < DATE('now', 'localtime') "
-        "ORDER BY due_date ASC",
+        "SELECT p.id, p.title, p.description, p.category, p.status, p.assigned_to, p.due_date, "
+        "p.escalation_state, p.last_escalation_at, "
+        "s.current_stage AS prev_stage, COALESCE(s.cancelled, 0) AS esc_cancelled "
+        "FROM projects p "
+        "LEFT JOIN agent_escalation_state s ON s.task_id = p.id "
+        "WHERE COALESCE(p.category, '') != ? "
+        "AND COALESCE(p.status, 'offen') = 'offen' "
+        "AND p.due_date IS NOT NULL "
+        "AND p.due_date < DATE('now', 'localtime') "
+        "ORDER BY p.due_date ASC",
         (IT_CATEGORY,),
     ).fetchall()
     return [dict(r) for r in rows]
@@ -62,7 +78,21 @@ def cleanup_completed_escalations(conn: sqlite3.Connection) -> int:
     return cur.rowcount or 0
 
 
-def run(max_actions: int = MAX_ACTIONS_PER_RUN) -> dict:
+def _execute(actions: BatchActions, task: dict, stage: int, days_overdue: int) -> tuple[dict, float]:
+    t0 = time.perf_counter()
+    result = EXECUTORS[stage](actions, task, days_overdue)
+    return result, time.perf_counter() - t0
+
+
+def _flush(conn: sqlite3.Connection, actions: BatchActions, states: list[tuple]) -> None:
+    actions.flush(conn)
+    upsert_escalation_states(conn, states)
+    conn.commit()
+    states.clear()
+
+
+def run(max_actions: int = MAX_ACTIONS_PER_RUN, workers: int = WORKERS,
+        budget_seconds: float = RUNTIME_BUDGET_SECONDS) -> dict:
     start = time.time()
     conn = get_db()
     try:
@@ -70,34 +100,73 @@ def run(max_actions: int = MAX_ACTIONS_PER_RUN) -> dict:
         tasks = fetch_overdue_tasks(conn)
         print(f"[agent_worker] {len(tasks)} overdue tasks, {cleaned} escalations cleaned")
 
-        summary = {"scanned": len(tasks), "cleaned": cleaned,
-                   "escalated": 0, "skipped": 0, "errors": 0, "per_task": []}
+        summary = {"scanned": len(tasks), "cleaned": cleaned, "planned": 0,
+                   "escalated": 0, "skipped": 0, "pending": 0, "errors": 0, "per_task": []}
 
+        # Plan all transitions in memory, no per-task queries
+        plans = []
         for task in tasks:
-            if summary["escalated"] >= max_actions:
-                print(f"[agent_worker] reached max_actions={max_actions}, stopping")
-                break
-            if time.time() - start > RUNTIME_BUDGET_SECONDS:
-                print("[agent_worker] runtime budget exceeded, stopping")
-                break
-            try:
-                result = escalate_task(conn, task)
-                if result.get("skipped"):
-                    summary["skipped"] += 1
-                else:
+            plan = plan_escalation(task, task.pop("prev_stage"), bool(task.pop("esc_cancelled")))
+            if plan["skipped"]:
+                summary["skipped"] += 1
+                summary["per_task"].append({"task_id": task["id"], **plan})
+            else:
+                plans.append((task, plan))
+        summary["planned"] = len(plans)
+        if len(plans) > max_actions:
+            print(f"[agent_worker] {len(plans)} planned, capped at max_actions={max_actions}")
+            summary["pending"] += len(plans) - max_actions
+            plans = plans[:max_actions]
+
+        actions = BatchActions(fetch_active_providers(conn), provider_email_counts(conn))
+        states: list[tuple] = []
+        action_time = 0.0
+        queue = list(reversed(plans))
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="escalate") as pool:
+            while queue or in_flight:
+                # Budget: only start work we expect to finish in time
+                avg = action_time / summary["escalated"] if summary["escalated"] else 0.0
+                while queue and len(in_flight) < workers:
+                    if time.time() - start + avg > budget_seconds:
+                        print("[agent_worker] runtime budget exhausted, deferring remaining tasks")
+                        summary["pending"] += len(queue)
+                        queue.clear()
+                        break
+                    task, plan = queue.pop()
+                    fut = pool.submit(_execute, actions, task, plan["stage"], plan["days_overdue"])
+                    in_flight[fut] = (task, plan)
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    task, plan = in_flight.pop(fut)
+                    try:
+                        result, took = fut.result()
+                    except Exception as e:
+                        summary["errors"] += 1
+                        summary["per_task"].append({"task_id": task["id"], "error": str(e)})
+                        print(f"[agent_worker] error on task #{task['id']}: {e}")
+                        continue
+                    action_time += took
                     summary["escalated"] += 1
-                summary["per_task"].append({"task_id": task["id"], **result})
-            except Exception as e:
-                summary["errors"] += 1
-                summary["per_task"].append({"task_id": task["id"], "error": str(e)})
-                print(f"[agent_worker] error on task #{task['id']}: {e}")
-                try:
-                    conn.rollback()
-                except Exception:
-                    pass
+                    states.append((task["id"], plan["stage"],
+                                   _next_action_at_for(task.get("category") or "", plan["stage"])))
+                    summary["per_task"].append({"task_id": task["id"], "skipped": False, "stage": plan["stage"],
+                                                "days_overdue": plan["days_overdue"], "result": result})
+
+                if len(states) >= COMMIT_BATCH:
+                    _flush(conn, actions, states)
+
+        _flush(conn, actions, states)
 
         elapsed = time.time() - start
         summary["elapsed_seconds"] = round(elapsed, 2)
+        summary["actions_per_second"] = round(summary["escalated"] / elapsed, 2) if elapsed else 0.0
+        summary["avg_action_ms"] = round(action_time / summary["escalated"] * 1000, 1) if summary["escalated"] else 0.0
+        summary["workers"] = workers
         print(f"[agent_worker] done: {json.dumps({k: v for k, v in summary.items() if k != 'per_task'})}")
         return summary
     finally:
@@ -0,0 +1,48 @@
+"""Small helpers shared by the JSON API blueprints."""
+
+import json
+from datetime import datetime
+from flask import jsonify
+
+from db import get_db
+
+
+def generic_patch(table, record_id, data, allowed_fields, id_column='id',
+                  json_fields=None, timestamp_field='updated_at'):
+    """Generic PATCH helper for updating database records."""
+    json_fields = json_fields or set()
+    conn = get_db()
+    record = conn.execute(f'SELECT 1 FROM {table} WHERE {id_column} = ?', (record_id,)).fetchone()
+    if not record:
+        conn.close()
+        return jsonify({'error': 'Nicht gefunden'}), 404
+    updates, params = [], []
+    for field in allowed_fields:
+        if field in data:
+            value = data[field]
+            if field in json_fields and not isinstance(value, str):
+                value = json.dumps(value)
+            updates.append(f'{field} = ?')
+            params.append(value)
+    if not updates:
+        conn.close()
+        return jsonify({'error': 'Keine Felder'}), 400
+    if timestamp_field:
+        updates.append(f'{timestamp_field} = ?')
+        params.append(datetime.now().isoformat())
+    params.append(record_id)
+    conn.execute(f'UPDATE {table} SET {", ".join(updates)} WHERE {id_column} = ?', params)
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True})
+
+
+def parse_json_fields(row_dict, fields=('assigned_to_list', 'dependencies')):
+    """Parse JSON string fields in a database row dict."""
+    for f in fields:
+        if row_dict.get(f) and isinstance(row_dict[f], str):
+            try:
+                row_dict[f] = json.loads(row_dict[f])
+            except (json.JSONDecodeError, TypeError):
+                row_dict[f] = []
+    return row_dict
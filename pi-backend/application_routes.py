@@ -0,0 +1,235 @@
+"""Job applications (public submit + admin review)."""
+
+from flask import Blueprint, request, jsonify, send_file
+import os
+import re
+import uuid
+from datetime import datetime
+
+from email_service import send_application_confirmation, send_application_notification_admin
+from notifications import notify_job_application
+from config import DATA_DIR
+from db import get_db
+from extensions import limiter
+from auth import require_admin
+
+bp = Blueprint('applications', __name__)
+
+
+# ============ Job Applications ============
+
+ALLOWED_APPLICATION_POSITIONS = {'tech_student', 'elektro_meister', 'gaertner', 'initiativ'}
+ALLOWED_HOURS_PER_WEEK = {5, 10, 20, 40}
+MAX_RESUME_SIZE_BYTES = 5 * 1024 * 1024  # 5 MB
+APPLICATIONS_DIR = os.path.join(DATA_DIR, 'applications')
+_EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+def _get_application_dict(row) -> dict:
+    item = dict(row)
+    if item.get('resume_path'):
+        item['resume_url'] = f"/api/admin/applications/{item['id']}/resume"
+    return item
+
+
+@bp.route('/api/applications', methods=['POST'])
+@limiter.limit("3 per minute")
+def create_application():
+    """Public endpoint to submit a job application (JSON or multipart)."""
+    # Accept both JSON and multipart/form-data (wegen optionalem PDF-Upload)
+    if request.content_type and request.content_type.startswith('multipart/'):
+        data = request.form
+        resume_file = request.files.get('resume')
+    else:
+        data = request.get_json(silent=True) or {}
+        resume_file = None
+
+    name = (data.get('name') or '').strip()
+    email = (data.get('email') or '').strip().lower()
+    position = (data.get('position') or '').strip()
+    motivation = (data.get('motivation') or '').strip()
+    phone = (data.get('phone') or '').strip() or None
+    available_from = (data.get('available_from') or '').strip() or None
+    preferred_times = (data.get('preferred_times') or '').strip() or None
+
+    # Required fields
+    if not name or not email or not position or not motivation:
+        return jsonify({'error': 'Name, Email, Position und Motivation sind erforderlich'}), 400
+
+    if not _EMAIL_RE.match(email):
+        return jsonify({'error': 'Ungültige Email-Adresse'}), 400
+
+    if position not in ALLOWED_APPLICATION_POSITIONS:
+        return jsonify({'error': 'Ungültige Position'}), 400
+
+    # hours_per_week optional
+    hours_raw = data.get('hours_per_week')
+    hours_per_week = None
+    if hours_raw not in (None, '', 'null'):
+        try:
+            hours_per_week = int(hours_raw)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Ungültige Stundenangabe'}), 400
+        if hours_per_week not in ALLOWED_HOURS_PER_WEEK:
+            return jsonify({'error': 'Stunden/Woche muss 5, 10, 20 oder 40 sein'}), 400
+
+    # Optional resume upload
+    resume_path = None
+    if resume_file and resume_file.filename:
+        filename_lower = resume_file.filename.lower()
+        if not filename_lower.endswith('.pdf'):
+            return jsonify({'error': 'Nur PDF-Dateien erlaubt'}), 400
+
+        # Size check
+        resume_file.stream.seek(0, os.SEEK_END)
+        size = resume_file.stream.tell()
+        resume_file.stream.seek(0)
+        if size > MAX_RESUME_SIZE_BYTES:
+            return jsonify({'error': 'Datei zu groß (max 5 MB)'}), 400
+        if size == 0:
+            return jsonify({'error': 'Datei ist leer'}), 400
+
+        # Magic-number check
+        header = resume_file.stream.read(5)
+        resume_file.stream.seek(0)
+        if not header.startswith(b'%PDF'):
+            return jsonify({'error': 'Datei ist kein gültiges PDF'}), 400
+
+        # Ensure target dir, save with uuid filename (kein User-Input im Pfad)
+        os.makedirs(APPLICATIONS_DIR, exist_ok=True)
+        safe_filename = uuid.uuid4().hex + '.pdf'
+        target_abs = os.path.join(APPLICATIONS_DIR, safe_filename)
+        resume_file.save(target_abs)
+        resume_path = safe_filename  # store only filename, not full path
+
+    # Insert into DB
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO job_applications
+            (name, email, phone, position, available_from, hours_per_week,
+             preferred_times, motivation, resume_path, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending', ?)
+    ''', (
+        name, email, phone, position, available_from, hours_per_week,
+        preferred_times, motivation, resume_path, datetime.utcnow().isoformat()
+    ))
+    app_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    conn.commit()
+    conn.close()
+
+    # Build data dict for notifications
+    notify_data = {
+        'id': app_id,
+        'name': name,
+        'email': email,
+        'phone': phone,
+        'position': position,
+        'available_from': available_from,
+        'hours_per_week': hours_per_week,
+        'preferred_times': preferred_times,
+        'motivation': motivation,
+        'resume_path': resume_path,
+    }
+
+    # Notifications — isolated so failures don't kill the insert
+    try:
+        send_application_confirmation(notify_data)
+    except Exception as e:
+        print(f"Application confirmation email error: {e}")
+    try:
+        send_application_notification_admin(notify_data)
+    except Exception as e:
+        print(f"Application admin email error: {e}")
+    try:
+        notify_job_application(notify_data)
+    except Exception as e:
+        print(f"Application telegram notify error: {e}")
+
+    return jsonify({'success': True, 'id': app_id})
+
+
+@bp.route('/api/admin/applications', methods=['GET'])
+@require_admin
+def admin_list_applications():
+    """List all job applications (admin only)."""
+    conn = get_db()
+    rows = conn.execute(
+        'SELECT * FROM job_applications ORDER BY created_at DESC'
+    ).fetchall()
+    conn.close()
+    return jsonify({
+        'applications': [_get_application_dict(r) for r in rows]
+    })
+
+
+@bp.route('/api/admin/applications/<int:app_id>', methods=['PATCH'])
+@require_admin
+def admin_update_application(app_id: int):
+    """Update application status and/or admin notes."""
+    data = request.json or {}
+    allowed_statuses = {'pending', 'contacted', 'rejected', 'hired'}
+
+    updates = []
+    params = []
+
+    if 'status' in data:
+        if data['status'] not in allowed_statuses:
+            return jsonify({'error': 'Ungültiger Status'}), 400
+        updates.append('status = ?')
+        params.append(data['status'])
+
+    if 'admin_notes' in data:
+        updates.append('admin_notes = ?')
+        params.append(data['admin_notes'])
+
+    if not updates:
+        return jsonify({'error': 'Keine Felder zum Aktualisieren'}), 400
+
+    updates.append('updated_at = CURRENT_TIMESTAMP')
+    params.append(app_id)
+
+    conn = get_db()
+    cursor = conn.execute(
+        f"UPDATE job_applications SET {', '.join(updates)} WHERE id = ?",
+        params
+    )
+    conn.commit()
+    affected = cursor.rowcount
+    conn.close()
+
+    if affected == 0:
+        return jsonify({'error': 'Bewerbung nicht gefunden'}), 404
+
+    return jsonify({'success': True})
+
+
+@bp.route('/api/admin/applications/<int:app_id>/resume', methods=['GET'])
+@require_admin
+def admin_download_resume(app_id: int):
+    """Download resume PDF for an application (admin only, path-traversal safe)."""
+    conn = get_db()
+    row = conn.execute(
+        'SELECT resume_path FROM job_applications WHERE id = ?', (app_id,)
+    ).fetchone()
+    conn.close()
+
+    if not row or not row['resume_path']:
+        return jsonify({'error': 'Kein Lebenslauf vorhanden'}), 404
+
+    filename = row['resume_path']
+    target_path = os.path.join(APPLICATIONS_DIR, filename)
+    # Path-traversal protection: resolved path must be under APPLICATIONS_DIR
+    real_target = os.path.realpath(target_path)
+    real_base = os.path.realpath(APPLICATIONS_DIR)
+    if not (real_target == real_base or real_target.startswith(real_base + os.sep)):
+        return jsonify({'error': 'Ungültiger Dateipfad'}), 400
+
+    if not os.path.exists(real_target):
+        return jsonify({'error': 'Datei nicht gefunden'}), 404
+
+    return send_file(
+        real_target,
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f'Bewerbung_{app_id}.pdf'
+    )
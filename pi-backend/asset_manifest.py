@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Per-page asset manifests for background videos (hero sections).
+
+/api/background-video used to query background_videos on every page view
+and return only the MP4 URL; the page then discovered poster and video one
+after the other. Now each page with a background video gets a manifest
+
+    DATA_DIR/manifest/<page>.json
+    {"page", "version", "poster": {...}, "teaser": {...}, "video": {...}}
+
+where every asset carries url (with ?v=<hash> for immutable caching),
+bytes, sha256, width/height and type. `poster` is a WebP of the first
+frame, `teaser` the first TEASER_SECONDS at 480p without audio (starts
+playing after a few hundred KB), `video` the assigned full video. Hashes
+and derived files are reused while the source's size/mtime don't change.
+
+Pages opt in with `<Layout assetPage="...">`, which renders
+`<meta name="asset-manifest" content="<page>">`. `inject` inserts
+`<link rel="preload">` for the poster and the manifest as inline JSON
+right after that tag in the built HTML (STATIC_DIR), so VideoBackground
+needs no request at all. Built at container start (start.sh) and
+refreshed by set_background_video.
+
+Usage:
+    python asset_manifest.py build            # all pages (deploy)
+    python asset_manifest.py build <page>
+    python asset_manifest.py show <page>
+"""
+
+import hashlib
+import html
+import json
+import mimetypes
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DATA_DIR, DB_PATH, GALLERY_DIR, STATIC_DIR  # noqa: E402
+from storage import CHUNK_SIZE  # noqa: E402
+
+MANIFEST_DIR = os.path.join(DATA_DIR, 'manifest')
+URL_PREFIX = '/images/gallery'
+TEASER_SECONDS = 4
+TEASER_HEIGHT = 480
+POSTER_WIDTH = 1280
+PAGE_PATTERN = re.compile(r'^[a-z0-9-]{1,64}$')
+
+META_TAG = re.compile(r'<meta name="asset-manifest" content="([a-z0-9-]+)"\s*/?>')
+# Everything inject() wrote after the meta tag (replaced on refresh)
+INJECTED = re.compile(r'(?:<link [^>]*data-asset-manifest[^>]*>|'
+                      r'<script type="application/json" id="asset-manifest-data">.*?</script>)', re.S)
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def manifest_path(page: str) -> str:
+    return os.path.join(MANIFEST_DIR, f'{page}.json')
+
+
+def load(page: str) -> dict | None:
+    if not PAGE_PATTERN.match(page or ''):
+        return None
+    try:
+        with open(manifest_path(page)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_atomic(path: str, data: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.tmp-{os.getpid()}'
+    with open(tmp, 'w') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def describe(relative_path: str, previous: dict | None = None) -> dict | None:
+    """Asset entry for a gallery file; hash/dimensions reused if size+mtime are unchanged."""
+    full = os.path.join(GALLERY_DIR, relative_path)
+    try:
+        st = os.stat(full)
+    except FileNotFoundError:
+        return None
+    if previous and previous.get('path') == relative_path and previous.get('bytes') == st.st_size \
+            and previous.get('mtime') == int(st.st_mtime):
+        return previous
+    entry = {'path': relative_path, 'bytes': st.st_size, 'mtime': int(st.st_mtime), 'sha256': _sha256(full)}
+    entry['url'] = f"{URL_PREFIX}/{relative_path}?v={entry['sha256'][:12]}"
+    if not relative_path.endswith('.mp4'):
+        entry['type'] = mimetypes.guess_type(relative_path)[0] or 'image/webp'
+        try:
+            from PIL import Image
+            with Image.open(full) as img:
+                entry['width'], entry['height'] = img.size
+        except Exception:
+            pass
+    else:
+        from video_transcode import probe
+        info = probe(full)
+        stream = next((s for s in info.get('streams', []) if s.get('codec_type') == 'video'), {})
+        entry['type'] = 'video/mp4'
+        entry['width'], entry['height'] = stream.get('width'), stream.get('height')
+        entry['duration'] = round(float(info.get('format', {}).get('duration') or 0), 2) or None
+    return entry
+
+
+def _derived(video_path: str, suffix: str) -> str:
+    return f'{os.path.splitext(video_path)[0]}_{suffix}'
+
+
+def _ffmpeg(args: list[str], output: str, timeout: int) -> bool:
+    tmp = f'{output}.part'
+    try:
+        result = subprocess.run(['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error', *args, tmp],
+                                capture_output=True, timeout=timeout)
+    except Exception as e:
+        print(f"[asset_manifest] ffmpeg failed for {output}: {e}")
+        result = None
+    if result is not None and result.returncode == 0 and os.path.exists(tmp):
+        os.replace(tmp, output)
+        return True
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    return False
+
+
+def make_poster(video_path: str) -> str | None:
+    """First frame as WebP (POSTER_WIDTH wide); relative path or None."""
+    rel = _derived(video_path, 'poster.webp')
+    src, out = os.path.join(GALLERY_DIR, video_path), os.path.join(GALLERY_DIR, rel)
+    if os.path.exists(out) and os.path.getmtime(out) >= os.path.getmtime(src):
+        return rel
+    ok = _ffmpeg(['-i', src, '-frames:v', '1', '-vf', f"scale='min({POSTER_WIDTH},iw)':-2",
+                  '-c:v', 'libwebp', '-quality', '80', '-f', 'webp'], out, 60)
+    return rel if ok else None
+
+
+def make_teaser(video_path: str) -> str | None:
+    """First TEASER_SECONDS at TEASER_HEIGHT, no audio, faststart; relative path or None."""
+    rel = _derived(video_path, 'teaser.mp4')
+    src, out = os.path.join(GALLERY_DIR, video_path), os.path.join(GALLERY_DIR, rel)
+    if os.path.exists(out) and os.path.getmtime(out) >= os.path.getmtime(src):
+        return rel
+    ok = _ffmpeg(['-i', src, '-t', str(TEASER_SECONDS), '-an',
+                  '-vf', f"scale=-2:'min({TEASER_HEIGHT},trunc(ih/2)*2)'", '-pix_fmt', 'yuv420p',
+                  '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '30',
+                  '-movflags', '+faststart', '-f', 'mp4'], out, 120)
+    return rel if ok else None
+
+
+def build_page(conn, page: str) -> dict | None:
+    """(Re)write the manifest of one page; None (and file removed) without a video."""
+    row = conn.execute('SELECT * FROM background_videos WHERE page = ?', (page,)).fetchone()
+    video = row and describe(row['video_path'], (load(page) or {}).get('video'))
+    if not video:
+        if os.path.exists(manifest_path(page)):
+            os.remove(manifest_path(page))
+        return None
+    previous = load(page) or {}
+    poster_rel = make_poster(row['video_path']) or row['thumbnail_path']
+    teaser_rel = make_teaser(row['video_path'])
+    manifest = {
+        'page': page,
+        'video': video,
+        'poster': describe(poster_rel, previous.get('poster')) if poster_rel else None,
+        'teaser': describe(teaser_rel, previous.get('teaser')) if teaser_rel else None,
+    }
+    manifest['version'] = hashlib.sha256(
+        ''.join((a or {}).get('sha256', '') for a in (manifest['video'], manifest['poster'], manifest['teaser'])).encode()
+    ).hexdigest()[:12]
+    _write_atomic(manifest_path(page), json.dumps(manifest, indent=1))
+    return manifest
+
+
+def api_response(manifest: dict) -> dict:
+    """/api/background-video payload: manifest plus the old video_url/thumbnail_url keys."""
+    public = {k: v for k, v in manifest.items() if k not in ('video', 'poster', 'teaser')}
+    for key in ('video', 'poster', 'teaser'):
+        asset = manifest.get(key)
+        public[key] = {k: v for k, v in asset.items() if k not in ('path', 'mtime')} if asset else None
+    public['video_url'] = manifest['video']['url']
+    public['thumbnail_url'] = manifest['poster']['url'] if manifest.get('poster') else None
+    return public
+
+
+def _head_block(manifest: dict | None) -> str:
+    if not manifest:
+        return ''
+    parts = []
+    if manifest.get('poster'):
+        parts.append(f'<link rel="preload" as="image" href="{html.escape(manifest["poster"]["url"])}" '
+                     f'fetchpriority="high" data-asset-manifest>')
+    # JSON inside <script>: only "</" could end the element early
+    data = json.dumps(api_response(manifest)).replace('</', '<\\/')
+    parts.append(f'<script type="application/json" id="asset-manifest-data">{data}</script>')
+    return ''.join(parts)
+
+
+def inject(pages: set[str] | None = None) -> int:
+    """Rewrite preload links + inline manifest in built HTML files. Returns files changed."""
+    changed = 0
+    for dirpath, _, filenames in os.walk(STATIC_DIR):
+        for name in filenames:
+            if not name.endswith('.html'):
+                continue
+            path = os.path.join(dirpath, name)
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+            m = META_TAG.search(text)
+            if not m or (pages is not None and m.group(1) not in pages):
+                continue
+            rest = INJECTED.sub('', text[m.end():])
+            new = text[:m.end()] + _head_block(load(m.group(1))) + rest
+            if new != text:
+                _write_atomic(path, new)
+                changed += 1
+    return changed
+
+
+def refresh(page: str) -> dict | None:
+    """Rebuild one page's manifest and its HTML (set_background_video, in a thread)."""
+    conn = get_db()
+    try:
+        manifest = build_page(conn, page)
+    finally:
+        conn.close()
+    inject({page})
+    return manifest
+
+
+def build_all(conn) -> dict:
+    pages = [r[0] for r in conn.execute('SELECT page FROM background_videos ORDER BY page')]
+    built = [p for p in pages if PAGE_PATTERN.match(p) and build_page(conn, p)]
+    # Manifests of pages whose video was removed
+    if os.path.isdir(MANIFEST_DIR):
+        for name in os.listdir(MANIFEST_DIR):
+            if name.endswith('.json') and name[:-5] not in pages:
+                os.remove(os.path.join(MANIFEST_DIR, name))
+    return {'pages': built, 'html_updated': inject()}
+
+
+def referenced_paths() -> set[str]:
+    """Gallery files only the manifests point at (posters, teasers) — for storage_audit."""
+    paths = set()
+    if os.path.isdir(MANIFEST_DIR):
+        for name in os.listdir(MANIFEST_DIR):
+            manifest = load(name[:-5]) if name.endswith('.json') else None
+            for key in ('poster', 'teaser'):
+                if manifest and manifest.get(key):
+                    paths.add(manifest[key]['path'])
+    return paths
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Background video asset manifests')
+    parser.add_argument('command', choices=['build', 'show'])
+    parser.add_argument('page', nargs='?')
+    args = parser.parse_args(argv)
+    if args.command == 'show':
+        print(json.dumps(load(args.page or ''), indent=2))
+        return 0
+    conn = get_db()
+    try:
+        if args.page:
+            print(json.dumps({'manifest': build_page(conn, args.page), 'html_updated': inject({args.page})}))
+        else:
+            print(json.dumps(build_all(conn)))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
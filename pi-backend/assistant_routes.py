@@ -0,0 +1,275 @@
+"""AI assistant chat and the COO/CLI agent API."""
+
+from flask import Blueprint, request, jsonify
+import importlib.util
+import json
+import functools
+from datetime import datetime
+
+from config import COO_API_SECRET
+from db import get_db
+from extensions import limiter
+from auth import get_current_user, require_admin
+
+ASSISTANT_AVAILABLE = importlib.util.find_spec('assistant_service') is not None
+if not ASSISTANT_AVAILABLE:
+    print("Warning: assistant_service not available")
+
+# Only reported by /api/agent/status; the drafts API lives in admin_routes.
+EMAIL_DRAFT_AVAILABLE = importlib.util.find_spec('email_draft_service') is not None
+
+try:
+    from coo_reporting import generate_daily_report, get_history, get_report_for_date
+    COO_REPORTING_AVAILABLE = True
+except ImportError:
+    COO_REPORTING_AVAILABLE = False
+    print("Warning: coo_reporting not available")
+
+bp = Blueprint('assistant', __name__)
+
+
+# ─── AI Assistant ─────────────────────────────────────────────
+
+def _get_assistant_rate_limit():
+    """Dynamic rate limit based on user role."""
+    user = get_current_user()
+    if user and user.get('role') == 'admin':
+        return "100 per hour"
+    elif user:
+        return "30 per hour"
+    return "10 per hour"
+
+
+@bp.route('/api/assistant/chat', methods=['POST'])
+@limiter.limit(_get_assistant_rate_limit)
+def assistant_chat():
+    """AI assistant chat endpoint with role-based tools.
+
+    F.5: Auth ist jetzt Pflicht — anonyme Nutzer bekommen 401. Grund: Wir
+    wollen bei einer Hilfe-Anfrage immer eine bestaetigte Email-Adresse
+    haben, damit Moritz antworten kann.
+    """
+    if not ASSISTANT_AVAILABLE:
+        return jsonify({'error': 'Assistant nicht verfügbar'}), 503
+    from assistant_service import process_message, refine_draft
+
+    data = request.get_json()
+    if not data or not data.get('message'):
+        return jsonify({'error': 'Nachricht fehlt'}), 400
+
+    message = data['message'].strip()[:2000]
+    mode = data.get('mode')
+    draft = data.get('draft')
+
+    user = get_current_user()
+    if not user:
+        return jsonify({
+            'error': 'Bitte logge dich ein, um den Chat zu nutzen.',
+            'requires_login': True,
+        }), 401
+
+    user_role = 'admin' if user.get('role') == 'admin' else 'guest'
+    user_email = user.get('email')
+
+    try:
+        if mode == 'refine' and draft:
+            result = refine_draft(message, draft)
+            return jsonify({
+                'intent': draft.get('type', 'feedback'),
+                'answer': result['answer'],
+                'draft': result['draft'],
+            })
+        else:
+            # Get context from request (client sends previous messages)
+            context = data.get('context', [])
+            result = process_message(
+                message,
+                context_messages=context if context else None,
+                user_role=user_role,
+                user_email=user_email,
+                user_name=user.get('name') if user else None,
+            )
+
+            # Log to agent_actions_log
+            try:
+                conn = get_db()
+                conn.execute('''
+                    INSERT INTO agent_actions_log (action_type, source, user_id, description, details, created_at)
+                    VALUES ('chat', 'chat_widget', ?, ?, ?, ?)
+                ''', (
+                    user.get('id') if user else None,
+                    f'Chat ({user_role}): {message[:100]}',
+                    json.dumps({'role': user_role, 'intent': result.get('intent')}),
+                    datetime.now().isoformat()
+                ))
+                conn.commit()
+                conn.close()
+            except Exception:
+                pass
+
+            return jsonify(result)
+
+    except Exception as e:
+        import traceback
+        err_str = str(e)
+        tb_str = traceback.format_exc()
+        print(f"[assistant] Error: {err_str}\n{tb_str}")
+        try:
+            log_conn = get_db()
+            log_conn.execute(
+                "INSERT INTO agent_actions_log (action_type, source, user_id, description, details, success, created_at) "
+                "VALUES ('chat_error', 'chat_widget', ?, ?, ?, 0, ?)",
+                (user.get('id') if user else None,
+                 f"Chat error ({user_role}): {err_str[:300]}",
+                 json.dumps({"error": err_str[:1000], "role": user_role},
+                            ensure_ascii=False),
+                 datetime.now().isoformat()),
+            )
+            log_conn.commit()
+            log_conn.close()
+        except Exception:
+            pass
+        return jsonify({
+            'error': 'Chat-Backend-Fehler',
+            'detail': err_str[:400],
+            'hint': ('Bitte pruefe die OpenRouter-Konfiguration (OPENAI_API_KEY, '
+                     'OPENAI_MODEL) und versuche es erneut.'),
+        }), 502
+
+
+# ─── Agent API (COO + CLI-Agent) ─────────────────────────────
+
+def require_agent_secret(f):
+    """Decorator to require COO API secret."""
+    @functools.wraps(f)
+    def decorated(*args, **kwargs):
+        secret = request.headers.get('X-Agent-Secret', '')
+        if not COO_API_SECRET or secret != COO_API_SECRET:
+            return jsonify({'error': 'Ungültiger Agent-Secret'}), 401
+        return f(*args, **kwargs)
+    return decorated
+
+
+@bp.route('/api/agent/status', methods=['GET'])
+def agent_status():
+    """Agent health check."""
+    return jsonify({
+        'status': 'ok',
+        'assistant_available': ASSISTANT_AVAILABLE,
+        'email_draft_available': EMAIL_DRAFT_AVAILABLE,
+        'coo_reporting_available': COO_REPORTING_AVAILABLE,
+    })
+
+
+@bp.route('/api/agent/daily-report', methods=['GET'])
+@require_agent_secret
+def agent_daily_report():
+    """COO fetches the daily report (cached until data changes; ?date=YYYY-MM-DD for history)."""
+    if not COO_REPORTING_AVAILABLE:
+        return jsonify({'error': 'COO Reporting nicht verfügbar'}), 503
+
+    day = request.args.get('date')
+    if day:
+        try:
+            datetime.strptime(day, '%Y-%m-%d')
+        except ValueError:
+            return jsonify({'error': 'Ungültiges Datum (YYYY-MM-DD)'}), 400
+        report = get_report_for_date(day)
+        if not report:
+            return jsonify({'error': 'Kein Report für dieses Datum'}), 404
+        return jsonify(report)
+
+    generate_new = request.args.get('generate', 'false').lower() == 'true'
+    report = generate_daily_report(use_cache=not generate_new)
+    return jsonify(report)
+
+
+@bp.route('/api/agent/daily-report/history', methods=['GET'])
+@require_agent_secret
+def agent_report_history():
+    """Daily counters (rollup) and week-over-week trend."""
+    if not COO_REPORTING_AVAILABLE:
+        return jsonify({'error': 'COO Reporting nicht verfügbar'}), 503
+    days = min(max(request.args.get('days', 28, type=int), 1), 366)
+    return jsonify(get_history(days))
+
+
+@bp.route('/api/agent/trigger', methods=['POST'])
+@require_agent_secret
+def agent_trigger():
+    """COO sends an instruction to the agent."""
+    data = request.get_json()
+    if not data or not data.get('instruction'):
+        return jsonify({'error': 'Instruction fehlt'}), 400
+
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO coo_instructions (instruction, priority, status, received_at)
+        VALUES (?, ?, 'pending', ?)
+    ''', (
+        data['instruction'],
+        data.get('priority', 'normal'),
+        datetime.now().isoformat()
+    ))
+    conn.commit()
+    instruction_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    conn.close()
+
+    return jsonify({'success': True, 'id': instruction_id})
+
+
+@bp.route('/api/agent/actions', methods=['GET'])
+@require_admin
+def agent_actions_log_endpoint(user=None):
+    """Get recent agent actions (Admin only).
+
+    Newest first, keyset-paginated: pass the returned `next_cursor` as
+    `?cursor=` for the next page. Archived rows (see action_log.py) are not
+    included.
+    """
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    action_type = request.args.get('type')
+    cursor = request.args.get('cursor', type=int)
+
+    where, params = [], []
+    if action_type:
+        where.append('action_type = ?')
+        params.append(action_type)
+    if cursor:
+        where.append('id < ?')
+        params.append(cursor)
+    sql = 'SELECT * FROM agent_actions_log'
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    sql += ' ORDER BY id DESC LIMIT ?'
+    params.append(limit + 1)
+
+    conn = get_db()
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return jsonify({
+        'actions': [dict(r) for r in rows],
+        'next_cursor': rows[-1]['id'] if has_more else None,
+    })
+
+
+@bp.route('/api/agent/actions/stats', methods=['GET'])
+@require_admin
+def agent_actions_stats(user=None):
+    """Counts and success rates from the rollup tables (Admin only)."""
+    from action_log import get_hourly, get_stats, retention_policy
+    days = min(max(request.args.get('days', 7, type=int), 1), 366)
+    hours = min(max(request.args.get('hours', 24, type=int), 1), 24 * 30)
+    conn = get_db()
+    try:
+        result = {
+            'by_type': get_stats(conn, days),
+            'hourly': get_hourly(conn, hours, request.args.get('type')),
+            'retention_days': retention_policy(),
+        }
+    finally:
+        conn.close()
+    return jsonify(result)
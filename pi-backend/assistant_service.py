@@ -227,14 +227,17 @@ def execute_tool_call(tool_name, args):
             return json.dumps([dict(r) for r in rows])
 
         elif tool_name == "search_inventory":
+            from search_index import ranked_refs
             query = args.get("query", "")
+            refs, refs_params = ranked_refs(query, 'inventory')
             rows = conn.execute(
-                "SELECT i.name, i.category, i.quantity, i.condition, r.name as room "
-                "FROM inventory_items i "
+                "SELECT i.name, i.category, i.quantity, i.ablageort, r.name as room "
+                f"FROM ({refs}) s "
+                "JOIN inventory_items i ON i.id = s.ref "
                 "LEFT JOIN inventory_rooms r ON i.room_id = r.id "
-                "WHERE i.name LIKE ? OR i.category LIKE ? "
+                "ORDER BY s.rank "
                 "LIMIT 10",
-                (f'%{query}%', f'%{query}%')
+                refs_params
             ).fetchall()
             conn.close()
             if not rows:
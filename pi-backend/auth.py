@@ -0,0 +1,121 @@
+"""JWT auth helpers and the `require_auth` / `require_admin` route decorators."""
+
+import functools
+import hashlib
+import jwt
+from datetime import datetime, timedelta
+from flask import request, jsonify
+
+from config import JWT_SECRET, JWT_EXPIRY_HOURS
+from db import get_db
+
+if JWT_SECRET == 'voigt-garten-secret-key-change-in-production-2026':
+    print("WARNING: Using default JWT secret! Set JWT_SECRET environment variable in production.")
+
+
+def create_token(user_id, email, role):
+    """Create JWT token for user."""
+    expiry = datetime.utcnow() + timedelta(hours=JWT_EXPIRY_HOURS)
+    payload = {
+        'user_id': user_id,
+        'email': email,
+        'role': role,
+        'exp': expiry
+    }
+    token = jwt.encode(payload, JWT_SECRET, algorithm='HS256')
+
+    # Store token hash in database
+    conn = get_db()
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    conn.execute('''
+        INSERT INTO auth_tokens (user_id, token_hash, expires_at)
+        VALUES (?, ?, ?)
+    ''', (user_id, token_hash, expiry.isoformat()))
+    conn.commit()
+    conn.close()
+
+    return token
+
+
+def verify_token(token):
+    """Verify JWT token and return user data."""
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+
+        # Check if token exists in database and is not expired
+        conn = get_db()
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        row = conn.execute('''
+            SELECT * FROM auth_tokens WHERE token_hash = ? AND expires_at > ?
+        ''', (token_hash, datetime.utcnow().isoformat())).fetchone()
+        conn.close()
+
+        if not row:
+            return None
+
+        return payload
+    except jwt.ExpiredSignatureError:
+        return None
+    except jwt.InvalidTokenError:
+        return None
+
+
+def create_scoped_token(user, scope, seconds):
+    """Short-lived token for one purpose (e.g. ?token= on /api/events).
+
+    Not stored in auth_tokens, so verify_token() rejects it and it can't be
+    used as a login token; a leaked one (URL in access logs) expires quickly.
+    """
+    payload = {
+        'user_id': user.get('user_id'),
+        'email': user.get('email'),
+        'role': user.get('role'),
+        'scope': scope,
+        'exp': datetime.utcnow() + timedelta(seconds=seconds),
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm='HS256')
+
+
+def verify_scoped_token(token, scope):
+    """Verify a create_scoped_token() token for `scope` and return its user data."""
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        return None
+    if payload.get('scope') != scope:
+        return None
+    return payload
+
+
+def get_current_user():
+    """Get current user from Authorization header."""
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+
+    token = auth_header.split(' ')[1]
+    return verify_token(token)
+
+
+def require_auth(f):
+    """Decorator to require authentication."""
+    @functools.wraps(f)
+    def decorated(*args, **kwargs):
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'Authentifizierung erforderlich'}), 401
+        return f(*args, user=user, **kwargs)
+    return decorated
+
+
+def require_admin(f):
+    """Decorator to require admin role."""
+    @functools.wraps(f)
+    def decorated(*args, **kwargs):
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'Authentifizierung erforderlich'}), 401
+        if user.get('role') != 'admin':
+            return jsonify({'error': 'Admin-Berechtigung erforderlich'}), 403
+        return f(*args, user=user, **kwargs)
+    return decorated
@@ -0,0 +1,539 @@
+"""Login/logout, magic-link and Google OAuth registration, admin user creation."""
+
+from flask import Blueprint, request, jsonify
+import sqlite3
+import hashlib
+import json
+import secrets
+import urllib.parse
+from datetime import datetime, timedelta
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from email_service import send_activity_notification, send_magic_link_email, send_welcome_email
+from config import GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, GOOGLE_REDIRECT_URI
+from db import get_db
+from extensions import limiter
+from auth import create_token, get_current_user, require_admin, require_auth
+
+bp = Blueprint('auth', __name__)
+
+
+# ============ Auth Routes ============
+
+@bp.route('/api/auth/login', methods=['POST'])
+@limiter.limit("5 per minute")
+def login():
+    """User login with email/username and password."""
+    data = request.json
+    login_id = data.get('email') or data.get('username')
+    password = data.get('password')
+
+    if not login_id or not password:
+        return jsonify({'error': 'Email/Username und Passwort erforderlich'}), 400
+
+    conn = get_db()
+    # Try both email and username
+    user = conn.execute('''
+        SELECT * FROM users WHERE email = ? OR username = ?
+    ''', (login_id, login_id)).fetchone()
+    conn.close()
+
+    if not user:
+        return jsonify({'error': 'Ungueltige Anmeldedaten'}), 401
+
+    # Block password login for Google-only users (empty password_hash)
+    if not user['password_hash']:
+        return jsonify({'error': 'Dieser Account nutzt Google-Anmeldung. Bitte mit Google anmelden.'}), 401
+
+    if not check_password_hash(user['password_hash'], password):
+        return jsonify({'error': 'Ungueltige Anmeldedaten'}), 401
+
+    # Update last login
+    conn = get_db()
+    conn.execute('UPDATE users SET last_login = ? WHERE id = ?',
+                 (datetime.now().isoformat(), user['id']))
+    conn.commit()
+    conn.close()
+
+    token = create_token(user['id'], user['email'], user['role'])
+
+    return jsonify({
+        'success': True,
+        'token': token,
+        'user': {
+            'id': user['id'],
+            'email': user['email'],
+            'username': user['username'],
+            'name': user['name'],
+            'role': user['role'],
+            'profile_image_url': user['profile_image_url'] if user['profile_image_url'] else None
+        }
+    })
+
+
+@bp.route('/api/auth/logout', methods=['POST'])
+@require_auth
+def logout(user):
+    """Invalidate current token."""
+    auth_header = request.headers.get('Authorization')
+    token = auth_header.split(' ')[1]
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+
+    conn = get_db()
+    conn.execute('DELETE FROM auth_tokens WHERE token_hash = ?', (token_hash,))
+    conn.commit()
+    conn.close()
+
+    return jsonify({'success': True, 'message': 'Erfolgreich abgemeldet'})
+
+
+@bp.route('/api/auth/verify', methods=['GET'])
+def verify_auth():
+    """Verify current token and return user data."""
+    user = get_current_user()
+    if not user:
+        return jsonify({'authenticated': False}), 401
+
+    # Fetch additional user details from DB
+    conn = get_db()
+    db_user = conn.execute('SELECT name, username, profile_image_url FROM users WHERE id = ?',
+                           (user['user_id'],)).fetchone()
+    conn.close()
+
+    user_data = {
+        'id': user['user_id'],
+        'email': user['email'],
+        'role': user['role']
+    }
+    if db_user:
+        if db_user['name']:
+            user_data['name'] = db_user['name']
+        if db_user['username']:
+            user_data['username'] = db_user['username']
+        if db_user['profile_image_url']:
+            user_data['profile_image_url'] = db_user['profile_image_url']
+
+    return jsonify({
+        'authenticated': True,
+        'user': user_data
+    })
+
+
+@bp.route('/api/auth/register', methods=['POST'])
+@limiter.limit("5 per minute")
+def register_user():
+    """Self-registration for guests (creates user role)."""
+    data = request.json
+
+    email = data.get('email')
+    username = data.get('username')
+    password = data.get('password')
+    name = data.get('name')
+
+    if not email or not username or not password:
+        return jsonify({'error': 'Email, Username und Passwort erforderlich'}), 400
+
+    # Validate email format
+    if '@' not in email or '.' not in email:
+        return jsonify({'error': 'Ungültiges Email-Format'}), 400
+
+    # Validate password length
+    if len(password) < 6:
+        return jsonify({'error': 'Passwort muss mindestens 6 Zeichen haben'}), 400
+
+    # Validate username length
+    if len(username) < 3:
+        return jsonify({'error': 'Username muss mindestens 3 Zeichen haben'}), 400
+
+    conn = get_db()
+    try:
+        password_hash = generate_password_hash(password)
+        conn.execute('''
+            INSERT INTO users (email, username, password_hash, name, role)
+            VALUES (?, ?, ?, ?, 'user')
+        ''', (email, username, password_hash, name))
+        user_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+        conn.commit()
+
+        # Auto-login: create token
+        token = create_token(user_id, email, 'user')
+        conn.close()
+
+        # Send notification to admin
+        send_activity_notification('user_registered', {
+            'Name': name or username,
+            'Email': email,
+            'Username': username
+        })
+
+        return jsonify({
+            'success': True,
+            'token': token,
+            'user': {
+                'id': user_id,
+                'email': email,
+                'username': username,
+                'name': name,
+                'role': 'user'
+            }
+        })
+    except sqlite3.IntegrityError:
+        conn.close()
+        return jsonify({'error': 'Email oder Username bereits vergeben'}), 409
+
+
+# ============ Magic Link Auth ============
+
+@bp.route('/api/auth/request-magic-link', methods=['POST'])
+@limiter.limit("5 per minute")
+def request_magic_link():
+    """Send magic link email for registration/login."""
+    data = request.json
+    email = data.get('email', '').strip().lower()
+    name = data.get('name', '').strip()
+
+    if not email or '@' not in email or '.' not in email:
+        return jsonify({'error': 'Gueltige Email-Adresse erforderlich'}), 400
+
+    # Generate secure token
+    token = secrets.token_urlsafe(48)
+    expires_at = (datetime.utcnow() + timedelta(minutes=30)).isoformat()
+
+    conn = get_db()
+    # Invalidate any existing unused tokens for this email
+    conn.execute('''
+        UPDATE email_verification_tokens SET used = 1
+        WHERE email = ? AND used = 0
+    ''', (email,))
+
+    # Store new token
+    conn.execute('''
+        INSERT INTO email_verification_tokens (email, token, expires_at)
+        VALUES (?, ?, ?)
+    ''', (email, token, expires_at))
+    conn.commit()
+    conn.close()
+
+    # Send magic link email
+    send_magic_link_email(email, token, name=name or None)
+
+    return jsonify({
+        'success': True,
+        'message': 'Email gesendet. Pruefe dein Postfach!'
+    })
+
+
+@bp.route('/api/auth/verify-email', methods=['GET'])
+def verify_email_token():
+    """Verify magic link token."""
+    token = request.args.get('token', '').strip()
+
+    if not token:
+        return jsonify({'error': 'Token erforderlich'}), 400
+
+    conn = get_db()
+    row = conn.execute('''
+        SELECT * FROM email_verification_tokens
+        WHERE token = ? AND used = 0 AND expires_at > ?
+    ''', (token, datetime.utcnow().isoformat())).fetchone()
+
+    if not row:
+        conn.close()
+        return jsonify({'error': 'Token ungueltig oder abgelaufen'}), 400
+
+    email = row['email']
+
+    # Mark token as used
+    conn.execute('UPDATE email_verification_tokens SET used = 1 WHERE id = ?', (row['id'],))
+    conn.commit()
+
+    # Check if user already exists
+    user = conn.execute('SELECT * FROM users WHERE email = ?', (email,)).fetchone()
+    conn.close()
+
+    if user:
+        # Existing user: auto-login
+        conn = get_db()
+        conn.execute('UPDATE users SET last_login = ? WHERE id = ?',
+                     (datetime.now().isoformat(), user['id']))
+        conn.commit()
+        conn.close()
+
+        auth_token = create_token(user['id'], user['email'], user['role'])
+
+        return jsonify({
+            'success': True,
+            'authenticated': True,
+            'token': auth_token,
+            'user': {
+                'id': user['id'],
+                'email': user['email'],
+                'username': user['username'],
+                'name': user['name'],
+                'role': user['role']
+            }
+        })
+    else:
+        # New user: needs to complete registration
+        return jsonify({
+            'success': True,
+            'needs_password': True,
+            'email': email,
+            'token': token
+        })
+
+
+@bp.route('/api/auth/complete-registration', methods=['POST'])
+@limiter.limit("5 per minute")
+def complete_registration():
+    """Complete registration after magic link verification."""
+    data = request.json
+    token = data.get('token', '').strip()
+    password = data.get('password', '').strip()
+    username = data.get('username', '').strip()
+    name = data.get('name', '').strip()
+
+    if not token or not password or not username:
+        return jsonify({'error': 'Token, Passwort und Username erforderlich'}), 400
+
+    if len(password) < 6:
+        return jsonify({'error': 'Passwort muss mindestens 6 Zeichen haben'}), 400
+
+    if len(username) < 3:
+        return jsonify({'error': 'Username muss mindestens 3 Zeichen haben'}), 400
+
+    conn = get_db()
+    # Token must be used=1 (verified) and not older than 60 minutes
+    cutoff = (datetime.utcnow() - timedelta(minutes=60)).isoformat()
+    row = conn.execute('''
+        SELECT * FROM email_verification_tokens
+        WHERE token = ? AND used = 1 AND created_at > ?
+    ''', (token, cutoff)).fetchone()
+
+    if not row:
+        conn.close()
+        return jsonify({'error': 'Token ungueltig oder abgelaufen'}), 400
+
+    email = row['email']
+
+    # Check if user already exists
+    existing = conn.execute('SELECT id FROM users WHERE email = ?', (email,)).fetchone()
+    if existing:
+        conn.close()
+        return jsonify({'error': 'Benutzer existiert bereits. Bitte anmelden.'}), 409
+
+    try:
+        password_hash = generate_password_hash(password)
+        conn.execute('''
+            INSERT INTO users (email, username, password_hash, name, role)
+            VALUES (?, ?, ?, ?, 'user')
+        ''', (email, username, password_hash, name or None))
+        user_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+        conn.commit()
+        conn.close()
+
+        # Create auth token
+        auth_token = create_token(user_id, email, 'user')
+
+        # Send welcome email
+        send_welcome_email(email, name or username)
+
+        # Notify admin
+        send_activity_notification('user_registered', {
+            'Name': name or username,
+            'Email': email,
+            'Username': username,
+            'Methode': 'Magic Link'
+        })
+
+        return jsonify({
+            'success': True,
+            'token': auth_token,
+            'user': {
+                'id': user_id,
+                'email': email,
+                'username': username,
+                'name': name,
+                'role': 'user'
+            }
+        })
+    except sqlite3.IntegrityError:
+        conn.close()
+        return jsonify({'error': 'Email oder Username bereits vergeben'}), 409
+
+
+@bp.route('/api/auth/google/url', methods=['GET'])
+def google_auth_url():
+    """Return Google OAuth authorization URL."""
+    if not GOOGLE_CLIENT_ID:
+        return jsonify({'error': 'Google OAuth nicht konfiguriert'}), 503
+
+    params = urllib.parse.urlencode({
+        'client_id': GOOGLE_CLIENT_ID,
+        'redirect_uri': GOOGLE_REDIRECT_URI,
+        'response_type': 'code',
+        'scope': 'openid email profile',
+        'access_type': 'offline',
+        'prompt': 'select_account',
+    })
+    url = f'https://accounts.google.com/o/oauth2/v2/auth?{params}'
+    return jsonify({'url': url})
+
+
+@bp.route('/api/auth/google/callback', methods=['GET'])
+def google_callback():
+    """Handle Google OAuth callback, create/find user, issue JWT."""
+    code = request.args.get('code')
+    error = request.args.get('error')
+
+    if error or not code:
+        return f'<script>window.location.href="/auth/google-success?error={error or "no_code"}"</script>'
+
+    if not GOOGLE_CLIENT_ID or not GOOGLE_CLIENT_SECRET:
+        return '<script>window.location.href="/auth/google-success?error=not_configured"</script>'
+
+    try:
+        import requests as http_requests
+
+        # Exchange code for tokens
+        token_resp = http_requests.post('https://oauth2.googleapis.com/token', data={
+            'code': code,
+            'client_id': GOOGLE_CLIENT_ID,
+            'client_secret': GOOGLE_CLIENT_SECRET,
+            'redirect_uri': GOOGLE_REDIRECT_URI,
+            'grant_type': 'authorization_code',
+        }, timeout=10)
+
+        if not token_resp.ok:
+            return '<script>window.location.href="/auth/google-success?error=token_exchange"</script>'
+
+        tokens = token_resp.json()
+        access_token = tokens.get('access_token')
+
+        # Get user info
+        userinfo_resp = http_requests.get('https://www.googleapis.com/oauth2/v2/userinfo',
+                                          headers={'Authorization': f'Bearer {access_token}'}, timeout=10)
+        if not userinfo_resp.ok:
+            return '<script>window.location.href="/auth/google-success?error=userinfo"</script>'
+
+        ginfo = userinfo_resp.json()
+        google_id = ginfo.get('id')
+        email = ginfo.get('email')
+        name = ginfo.get('name')
+        picture = ginfo.get('picture')
+
+        if not email:
+            return '<script>window.location.href="/auth/google-success?error=no_email"</script>'
+
+        conn = get_db()
+
+        # Try to find user by google_id or email
+        user = conn.execute('SELECT * FROM users WHERE google_id = ? OR email = ?',
+                            (google_id, email)).fetchone()
+
+        if user:
+            # Update google info
+            conn.execute('''
+                UPDATE users SET google_id = ?, profile_image_url = ?, name = COALESCE(name, ?), last_login = ?
+                WHERE id = ?
+            ''', (google_id, picture, name, datetime.now().isoformat(), user['id']))
+            conn.commit()
+            user_id = user['id']
+            role = user['role']
+            username = user['username']
+        else:
+            # Create new user (no password needed for Google-only users)
+            # Generate unique username from email
+            base_username = email.split('@')[0][:20]
+            username = base_username
+            suffix = 1
+            while conn.execute('SELECT id FROM users WHERE username = ?', (username,)).fetchone():
+                username = f"{base_username}{suffix}"
+                suffix += 1
+
+            conn.execute('''
+                INSERT INTO users (email, username, password_hash, name, role, google_id, profile_image_url, last_login)
+                VALUES (?, ?, '', ?, 'user', ?, ?, ?)
+            ''', (email, username, name, google_id, picture, datetime.now().isoformat()))
+            user_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+            conn.commit()
+            role = 'user'
+
+            # Notify admin
+            send_activity_notification('user_registered', {
+                'Name': name or username,
+                'Email': email,
+                'Methode': 'Google OAuth'
+            })
+
+        conn.close()
+
+        # Create JWT
+        auth_token = create_token(user_id, email, role)
+
+        # Build user JSON for frontend
+        user_json = json.dumps({
+            'id': user_id,
+            'email': email,
+            'username': username,
+            'name': name,
+            'role': role,
+            'profile_image_url': picture,
+        })
+        user_json_escaped = user_json.replace("'", "\\'")
+
+        # Redirect to frontend success page with token
+        return f'''<script>
+            localStorage.setItem('voigt-garten-token', '{auth_token}');
+            localStorage.setItem('voigt-garten-user', '{user_json_escaped}');
+            window.dispatchEvent(new CustomEvent('auth-change', {{ detail: {{ user: {user_json} }} }}));
+            window.location.href = '/';
+        </script>'''
+
+    except Exception as e:
+        print(f"Google OAuth error: {e}")
+        return f'<script>window.location.href="/auth/google-success?error=server"</script>'
+
+
+@bp.route('/api/admin/users', methods=['POST'])
+@require_admin
+def admin_create_user(user):
+    """Admin: Create new user with custom role."""
+    data = request.json
+
+    email = data.get('email')
+    username = data.get('username')
+    password = data.get('password')
+    name = data.get('name')
+    role = data.get('role', 'user')
+
+    if not email or not username or not password:
+        return jsonify({'error': 'Email, Username und Passwort erforderlich'}), 400
+
+    if role not in ['user', 'admin']:
+        return jsonify({'error': 'Ungültige Rolle'}), 400
+
+    conn = get_db()
+    try:
+        password_hash = generate_password_hash(password)
+        conn.execute('''
+            INSERT INTO users (email, username, password_hash, name, role)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (email, username, password_hash, name, role))
+        user_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+        conn.commit()
+        conn.close()
+
+        return jsonify({
+            'success': True,
+            'user': {
+                'id': user_id,
+                'email': email,
+                'username': username,
+                'name': name,
+                'role': role
+            }
+        })
+    except sqlite3.IntegrityError:
+        conn.close()
+        return jsonify({'error': 'Email oder Username bereits vergeben'}), 409
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+API latency benchmark for the Flask backend.
+
+Seeds a scratch garten.db (see seed_synthetic.py), drives the hot endpoints
+through the Flask test client and reports p50/p95/p99 per endpoint.
+Results are written as JSON so two runs can be diffed (--baseline).
+
+Usage:
+    python benchmarks/bench_api.py --scale 0.1 --iterations 50 --output bench-api.json
+    python benchmarks/bench_api.py --baseline bench-api.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import seed_synthetic  # noqa: E402
+
+
+def _month(offset: int) -> str:
+    d = date.today().replace(day=1) + timedelta(days=32 * offset)
+    return d.strftime('%Y-%m')
+
+
+def _stay(days_ahead: int, nights: int) -> dict:
+    ci = date.today() + timedelta(days=days_ahead)
+    return {'checkIn': ci.isoformat(), 'checkOut': (ci + timedelta(days=nights)).isoformat(), 'guests': 4}
+
+
+# name -> (method, path, json body)
+SCENARIOS = {
+    'gallery': ('GET', '/api/gallery', None),
+    'gallery_category': ('GET', '/api/gallery?category=garten', None),
+    'tasks_unified': ('GET', '/api/tasks/unified', None),
+    'tasks_unified_search': ('GET', '/api/tasks/unified?search=Hecke&type=project', None),
+    'map_areas': ('GET', '/api/map/areas', None),
+    'map_points': ('GET', '/api/map/photo-points', None),
+    'map_points_viewport': ('GET', '/api/map/photo-points?zoom=1&bbox=0,0,800,400', None),
+    'availability': ('GET', f'/api/availability?month={_month(1)}', None),
+    'pricing_week': ('POST', '/api/pricing/calculate', _stay(30, 7)),
+    'pricing_month': ('POST', '/api/pricing/calculate', _stay(60, 28)),
+    'inventory_buildings': ('GET', '/api/inventory/buildings', None),
+    'inventory_search': ('GET', '/api/inventory/items?search=Kueche', None),
+    'search': ('GET', '/api/search?q=Brunnen%20Pumpe', None),
+}
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def run_scenario(client, method: str, path: str, body, iterations: int, warmup: int) -> dict:
+    samples = []
+    status = None
+    size = 0
+    for i in range(warmup + iterations):
+        t0 = time.perf_counter()
+        if method == 'GET':
+            resp = client.get(path)
+        else:
+            resp = client.open(path, method=method, json=body)
+        data = resp.get_data()
+        elapsed = (time.perf_counter() - t0) * 1000
+        status, size = resp.status_code, len(data)
+        if i >= warmup:
+            samples.append(elapsed)
+    samples.sort()
+    return {
+        'method': method,
+        'path': path,
+        'status': status,
+        'bytes': size,
+        'n': len(samples),
+        'mean_ms': round(sum(samples) / len(samples), 3),
+        'min_ms': round(samples[0], 3),
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'max_ms': round(samples[-1], 3),
+    }
+
+
+def compare(current: dict, baseline: dict) -> list[str]:
+    lines = [f"{'endpoint':<24} {'p50 old':>9} {'p50 new':>9} {'Δ%':>7}   {'p95 old':>9} {'p95 new':>9} {'Δ%':>7}"]
+    for name, cur in current['endpoints'].items():
+        old = baseline.get('endpoints', {}).get(name)
+        if not old:
+            lines.append(f"{name:<24} (new)")
+            continue
+
+        def delta(key):
+            return (cur[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+        lines.append(
+            f"{name:<24} {old['p50_ms']:>9.2f} {cur['p50_ms']:>9.2f} {delta('p50_ms'):>+6.1f}%"
+            f"   {old['p95_ms']:>9.2f} {cur['p95_ms']:>9.2f} {delta('p95_ms'):>+6.1f}%"
+        )
+    return lines
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return out.stdout.strip() or 'unknown'
+    except Exception:
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark hot API endpoints against synthetic data')
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--booking-years', type=int, default=seed_synthetic.DEFAULT_BOOKING_YEARS)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', nargs='*', help='run only these scenarios')
+    parser.add_argument('--data-dir', help='keep the seeded DB here instead of a temp dir')
+    parser.add_argument('--output', default='bench-api.json')
+    parser.add_argument('--baseline', help='previous result JSON to diff against')
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='garten-bench-')
+    try:
+        t0 = time.perf_counter()
+        seeded = seed_synthetic.prepare_database(data_dir, scale=args.scale, booking_years=args.booking_years)
+        print(f"[bench] seeded in {time.perf_counter() - t0:.1f}s: {seeded['rows']}")
+
+        from app import app, limiter
+        limiter.enabled = False
+        client = app.test_client()
+
+        results = {}
+        for name, (method, path, body) in SCENARIOS.items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = run_scenario(client, method, path, body, args.iterations, args.warmup)
+            r = results[name]
+            print(f"[bench] {name:<24} {r['status']} p50={r['p50_ms']:.2f}ms p95={r['p95_ms']:.2f}ms "
+                  f"p99={r['p99_ms']:.2f}ms ({r['bytes'] / 1024:.0f} KiB)")
+
+        report = {
+            'meta': {
+                'generated_at': datetime.now().isoformat(),
+                'commit': _git_commit(),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'scale': args.scale,
+                'iterations': args.iterations,
+                'rows': seeded['rows'],
+            },
+            'endpoints': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[bench] results written to {args.output}")
+
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            print('\n'.join(compare(report, baseline)))
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Contention benchmark for shared_state (SQLite counters shared by all workers).
+
+Spawns --procs processes x --threads threads that hammer one scratch DB, like
+gunicorn workers serving concurrent requests, and reports throughput and
+per-op latency. Also checks correctness: the hot counter must end at exactly
+procs * threads * ops and each dedup key must be claimed exactly once.
+
+Usage:
+    python benchmarks/bench_shared_state.py --procs 2 --threads 4 --ops 2000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_api import percentile  # noqa: E402
+
+SCENARIOS = ('incr_hot_key', 'incr_per_client', 'dedup')
+
+
+def _worker(db_path: str, scenario: str, proc: int, threads: int, ops: int, out_q):
+    from shared_state import SharedStore
+    store = SharedStore(db_path)
+    latencies, claimed = [], []
+    lock = threading.Lock()
+
+    def run(tid: int):
+        local, local_claims = [], 0
+        for i in range(ops):
+            t0 = time.perf_counter()
+            if scenario == 'incr_hot_key':
+                store.incr('bench:hot', 3600)
+            elif scenario == 'incr_per_client':
+                store.incr(f'bench:client:{proc}:{tid}:{i % 50}', 3600)
+            else:
+                # every process/thread races for the same event ids
+                local_claims += store.add_if_absent(f'bench:event:{i}', 3600)
+            local.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            latencies.extend(local)
+            claimed.append(local_claims)
+
+    pool = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    out_q.put((latencies, sum(claimed)))
+
+
+def run_scenario(db_path: str, scenario: str, procs: int, threads: int, ops: int) -> dict:
+    ctx = multiprocessing.get_context('fork')
+    q = ctx.Queue()
+    started = time.perf_counter()
+    workers = [ctx.Process(target=_worker, args=(db_path, scenario, p, threads, ops, q)) for p in range(procs)]
+    for w in workers:
+        w.start()
+    results = [q.get() for _ in workers]
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - started
+
+    latencies = sorted(lat for r, _ in results for lat in r)
+    total = procs * threads * ops
+    result = {
+        'ops': total,
+        'wall_s': round(wall, 3),
+        'ops_per_s': round(total / wall),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(latencies[-1], 3),
+    }
+
+    from shared_state import SharedStore
+    store = SharedStore(db_path)
+    if scenario == 'incr_hot_key':
+        result['correct'] = store.get('bench:hot') == total
+    elif scenario == 'dedup':
+        result['correct'] = sum(c for _, c in results) == ops
+    store.reset('bench:')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark shared_state under multi-process contention')
+    parser.add_argument('--procs', type=int, default=2, help='processes (gunicorn workers)')
+    parser.add_argument('--threads', type=int, default=4, help='threads per process')
+    parser.add_argument('--ops', type=int, default=2000, help='operations per thread')
+    parser.add_argument('--output', default='bench-shared-state.json')
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='garten-shared-')
+    db_path = os.path.join(data_dir, 'garten.db')
+    try:
+        results = {}
+        for scenario in SCENARIOS:
+            r = results[scenario] = run_scenario(db_path, scenario, args.procs, args.threads, args.ops)
+            ok = {True: 'ok', False: 'MISMATCH'}.get(r.get('correct'), '-')
+            print(f"[shared] {scenario:<16} {r['ops_per_s']:>7} ops/s  p50={r['p50_ms']:.3f}ms "
+                  f"p99={r['p99_ms']:.3f}ms max={r['max_ms']:.1f}ms  check={ok}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump({'procs': args.procs, 'threads': args.threads, 'ops': args.ops, 'scenarios': results}, f, indent=2)
+    print(f"[shared] results written to {args.output}")
+    if any(r.get('correct') is False for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: container DB setup (cold / warm) and gunicorn worker boot.
+
+Each scenario runs in a fresh interpreter (like start.sh / a new worker)
+against a scratch DATA_DIR and is timed end to end. Also reports which
+heavy optional modules got imported, to catch eager imports creeping back.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 10 --output bench-startup.json
+    python benchmarks/bench_startup.py --baseline bench-startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_api import _git_commit  # noqa: E402
+
+HEAVY_MODULES = ('PIL', 'reportlab', 'segno', 'resend', 'requests', 'openai')
+
+# name -> python snippet run with `python -c` inside BACKEND_DIR
+SCENARIOS = {
+    'db_migrate_cold': 'import db; db.main(["migrate"])',
+    'db_migrate_warm': 'import db; db.main(["migrate"])',
+    'app_import': 'import app',
+}
+
+_REPORT_MODULES = (
+    '; import sys, json; print("@@" + json.dumps(sorted(m for m in {mods!r} if m in sys.modules)))'
+)
+
+
+def run_once(snippet: str, env: dict) -> tuple[float, list]:
+    code = snippet + _REPORT_MODULES.format(mods=HEAVY_MODULES)
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env,
+                         capture_output=True, text=True, timeout=120)
+    elapsed = (time.perf_counter() - t0) * 1000
+    if out.returncode != 0:
+        raise SystemExit(f"scenario failed:\n{out.stderr[-2000:]}")
+    loaded = []
+    for line in out.stdout.splitlines():
+        if line.startswith('@@'):
+            loaded = json.loads(line[2:])
+    return elapsed, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark DB CLI and app import startup time')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--output', default='bench-startup.json')
+    parser.add_argument('--baseline', help='previous result JSON to diff against')
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='garten-startup-')
+    env = dict(os.environ, DATA_DIR=data_dir,
+               GALLERY_DIR=os.path.join(data_dir, 'gallery'),
+               STATIC_DIR=os.path.join(data_dir, 'static'))
+    results = {}
+    try:
+        for name, snippet in SCENARIOS.items():
+            samples, loaded = [], []
+            for i in range(args.runs):
+                if name == 'db_migrate_cold':
+                    # cold container start: empty data dir every run
+                    for entry in os.listdir(data_dir):
+                        path = os.path.join(data_dir, entry)
+                        shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+                elapsed, loaded = run_once(snippet, env)
+                samples.append(elapsed)
+            samples.sort()
+            results[name] = {
+                'n': len(samples),
+                'median_ms': round(statistics.median(samples), 1),
+                'min_ms': round(samples[0], 1),
+                'max_ms': round(samples[-1], 1),
+                'heavy_modules': loaded,
+            }
+            r = results[name]
+            print(f"[startup] {name:<18} median={r['median_ms']:.0f}ms min={r['min_ms']:.0f}ms "
+                  f"heavy={','.join(loaded) or '-'}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'generated_at': datetime.now().isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'runs': args.runs,
+        },
+        'scenarios': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[startup] results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get('scenarios', {})
+        for name, cur in results.items():
+            old = baseline.get(name)
+            if not old:
+                continue
+            delta = (cur['median_ms'] - old['median_ms']) / old['median_ms'] * 100 if old['median_ms'] else 0.0
+            print(f"{name:<18} {old['median_ms']:>8.0f}ms -> {cur['median_ms']:>8.0f}ms ({delta:+.1f}%)")
+
+
+if __name__ == '__main__':
+    main()
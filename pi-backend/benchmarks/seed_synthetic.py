@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for backend benchmarks.
+
+Fills a scratch garten.db with production-shaped data at configurable scale:
+gallery images, projects with dependencies/sub-tasks, years of bookings,
+inventory items, comments, credits and agent_actions_log rows.
+
+NEVER point this at the production DATA_DIR — it only appends rows.
+
+Usage:
+    DATA_DIR=/tmp/garten-bench python benchmarks/seed_synthetic.py --scale 0.1
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Row counts at --scale 1.0
+DEFAULT_COUNTS = {
+    'gallery_images': 10_000,
+    'projects': 5_000,
+    'recurring_tasks': 200,
+    'task_comments': 10_000,
+    'inventory_items': 3_000,
+    'credits': 2_000,
+    'agent_actions_log': 100_000,
+}
+DEFAULT_BOOKING_YEARS = 5
+
+GALLERY_CATEGORIES = ['garten', 'haus', 'umgebung', 'sonstiges', 'luftaufnahmen', 'events', 'projekte', 'tiere']
+TASK_CATEGORIES = ['rasen', 'beete', 'baeume', 'brennholz', 'elektrik', 'putzen', 'wasser', 'haus', 'garten', 'sonstiges', 'it']
+MAP_AREAS = ['haus', 'terrasse', 'geraeteschuppen', 'holzschuppen', 'baumhaus', 'werkstatt', 'teich',
+             'pool', 'brunnen', 'solaranlage', 'weinberg', 'kompost', 'eiche-1', 'rechter-teil']
+STATUSES = ['offen', 'offen', 'offen', 'next', 'in_arbeit', 'done', 'done']
+PRIORITIES = ['kritisch', 'hoch', 'mittel', 'mittel', 'niedrig']
+EFFORTS = ['leicht', 'mittel', 'schwer']
+ASSIGNEES = ['moritzvoigt42@gmail.com', 'konny.voigt@web.de', 'matti@example.org', 'gast@example.org']
+ACTION_TYPES = ['chat_message', 'tool_call', 'reminder', 'email_sent', 'slack_dm',
+                'injection_flagged', 'error', 'chat_response', 'coo_report']
+WORDS = ['Hecke', 'Rasen', 'Teich', 'Zaun', 'Pumpe', 'Solar', 'Kabel', 'Dach', 'Holz', 'Beet',
+         'Wasser', 'Schuppen', 'Brunnen', 'Weinberg', 'Kompost', 'Terrasse', 'Fenster', 'Tür',
+         'prüfen', 'reparieren', 'streichen', 'schneiden', 'reinigen', 'erneuern', 'bestellen']
+
+
+def scaled_counts(scale: float) -> dict:
+    return {table: max(1, int(n * scale)) for table, n in DEFAULT_COUNTS.items()}
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def _ts(rng: random.Random, days_back: int, days_ahead: int = 0) -> str:
+    offset = rng.uniform(-days_back, days_ahead)
+    return (datetime.now() + timedelta(days=offset)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _day(rng: random.Random, days_back: int, days_ahead: int = 0) -> str:
+    return (date.today() + timedelta(days=rng.randint(-days_back, days_ahead))).isoformat()
+
+
+def seed_gallery(conn, rng, n):
+    rows = []
+    for i in range(n):
+        category = rng.choice(GALLERY_CATEGORIES)
+        base = f"bench-{i:06d}"
+        placed = rng.random() < 0.2
+        rows.append((
+            f"b{i:011d}", f"{category}/{base}.webp", f"IMG_{i}.jpg", _text(rng, 3), _text(rng, 8),
+            category, 'video' if rng.random() < 0.05 else 'image', rng.randint(200_000, 8_000_000),
+            _ts(rng, 3 * 365), rng.choice(ASSIGNEES), f"{category}/{base}_thumb.webp",
+            f"{category}/{base}.webp", f"{category}/{base}_original.jpg",
+            'approved' if rng.random() < 0.9 else 'pending',
+            rng.choice(MAP_AREAS) if rng.random() < 0.3 else None,
+            rng.uniform(0, 1000) if placed else None, rng.uniform(0, 700) if placed else None,
+        ))
+    conn.executemany('''
+        INSERT INTO gallery_images (id, filename, original_name, name, description, category, type, size,
+            uploaded_at, uploaded_by, thumbnail_path, webp_path, original_path, status, map_area, map_x, map_y)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+
+
+def seed_projects(conn, rng, n):
+    first_id = (conn.execute('SELECT COALESCE(MAX(id), 0) FROM projects').fetchone()[0]) + 1
+    cat_ids = {r[1]: r[0] for r in conn.execute('SELECT id, name FROM categories').fetchall()}
+    rows, junction = [], []
+    for i in range(n):
+        pid = first_id + i
+        earlier = range(first_id, pid)
+        deps = rng.sample(earlier, k=min(len(earlier), rng.choice([0, 0, 0, 1, 2, 3])))
+        parent = rng.choice(earlier) if earlier and rng.random() < 0.1 else None
+        category = rng.choice(TASK_CATEGORIES)
+        status = rng.choice(STATUSES)
+        rows.append((
+            pid, f"{_text(rng, 3)} #{i}", _text(rng, 20), category, status, rng.choice(PRIORITIES),
+            rng.choice(EFFORTS), rng.choice(ASSIGNEES),
+            json.dumps(rng.sample(ASSIGNEES, k=rng.randint(0, 2))), json.dumps(deps), parent,
+            _day(rng, 400, 120) if rng.random() < 0.7 else None,
+            rng.choice(MAP_AREAS) if rng.random() < 0.4 else None,
+            _ts(rng, 2 * 365), _ts(rng, 60), 'bench-seed',
+        ))
+        junction.append((pid, cat_ids[category]) if category in cat_ids else None)
+    conn.executemany('''
+        INSERT INTO projects (id, title, description, category, status, priority, effort, assigned_to,
+            assigned_to_list, dependencies, parent_task_id, due_date, map_area, created_at, updated_at, created_by)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.executemany(
+        'INSERT OR IGNORE INTO project_categories (project_id, category_id) VALUES (?, ?)',
+        [j for j in junction if j]
+    )
+    return list(range(first_id, first_id + n))
+
+
+def seed_recurring(conn, rng, n):
+    rows = [(
+        f"{_text(rng, 2)} (wiederkehrend {i})", _text(rng, 10), rng.choice(TASK_CATEGORIES),
+        rng.choice([7, 14, 30, 90, 180, 365]), rng.choice([5, 10, 15, 30]), rng.choice(EFFORTS),
+        _day(rng, 30, 60), rng.choice(MAP_AREAS) if rng.random() < 0.5 else None,
+    ) for i in range(n)]
+    conn.executemany('''
+        INSERT INTO recurring_tasks (title, description, category, cycle_days, credit_value, effort, next_due, map_area)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+
+
+def seed_comments(conn, rng, n, project_ids):
+    rows = [(
+        rng.choice(project_ids), 'project', rng.choice(ASSIGNEES), 'Bench', _text(rng, 12), _ts(rng, 365),
+    ) for _ in range(n)]
+    conn.executemany('''
+        INSERT INTO task_comments (task_id, task_type, user_email, user_name, comment, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', rows)
+
+
+def seed_bookings(conn, rng, years):
+    """Non-overlapping stays from `years` back until ~1 year ahead."""
+    day = date.today() - timedelta(days=365 * years)
+    end = date.today() + timedelta(days=365)
+    rows, emails = [], []
+    i = 0
+    while day < end:
+        nights = rng.randint(1, 10)
+        check_out = day + timedelta(days=nights)
+        email = f"gast{rng.randint(1, 400)}@example.org"
+        emails.append(email)
+        status = 'cancelled' if rng.random() < 0.1 else ('pending' if check_out > date.today() and rng.random() < 0.5 else 'confirmed')
+        rows.append((
+            f"Gast {i}", email, day.isoformat(), check_out.isoformat(), rng.randint(1, 6),
+            round(nights * rng.uniform(30, 120), 2), status,
+            (datetime.combine(day, datetime.min.time()) - timedelta(days=rng.randint(1, 90))).isoformat(),
+        ))
+        day = check_out + timedelta(days=rng.randint(0, 6))
+        i += 1
+    conn.executemany('''
+        INSERT INTO bookings (guest_name, guest_email, check_in, check_out, guests, total_price, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    return sorted(set(emails))
+
+
+def seed_inventory_items(conn, rng, n):
+    rooms = [r[0] for r in conn.execute('SELECT id FROM inventory_rooms').fetchall()]
+    if not rooms:
+        return
+    conn.execute("UPDATE inventory_buildings SET map_area = 'haus' WHERE id = 'haus' AND map_area IS NULL")
+    conn.execute("UPDATE inventory_buildings SET map_area = 'werkstatt' WHERE id = 'werkstatt' AND map_area IS NULL")
+    rows = [(
+        f"bench-item-{i:06d}", f"{_text(rng, 2)} {i}", rng.choice(rooms), rng.choice(['Werkzeug', 'Küche', 'Garten', 'Elektro']),
+        _text(rng, 6), rng.randint(1, 10), rng.choice(['Regal', 'Schrank', 'Kiste', 'Wand']),
+        1 if rng.random() < 0.9 else 0, 'bench-seed', _ts(rng, 365),
+    ) for i in range(n)]
+    conn.executemany('''
+        INSERT INTO inventory_items (id, name, room_id, category, notes, quantity, ablageort, vorhanden, created_by, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+
+
+def seed_credits(conn, rng, n, emails):
+    rows = [(
+        rng.choice(emails), round(rng.uniform(-50, 80), 2), _text(rng, 4),
+        rng.choice(['earned', 'earned', 'redeemed']), _ts(rng, 3 * 365),
+    ) for _ in range(n)]
+    conn.executemany(
+        'INSERT INTO credits (guest_email, amount, reason, type, created_at) VALUES (?, ?, ?, ?, ?)',
+        rows
+    )
+
+
+def seed_agent_actions(conn, rng, n, batch=20_000):
+    for start in range(0, n, batch):
+        rows = []
+        for i in range(start, min(n, start + batch)):
+            action_type = rng.choice(ACTION_TYPES)
+            details = {'task_id': rng.randint(1, 5000), 'provider_id': rng.randint(1, 30),
+                       'text': _text(rng, rng.randint(5, 40))}
+            rows.append((
+                action_type, rng.choice(['garten_agent', 'web_chat', 'cli_agent', 'telegram']),
+                f"{action_type} #{i}", json.dumps(details, ensure_ascii=False),
+                round(rng.random(), 2), 1 if rng.random() < 0.95 else 0, _ts(rng, 2 * 365),
+            ))
+        conn.executemany('''
+            INSERT INTO agent_actions_log (action_type, source, description, details, risk_score, success, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+
+def seed(db_path: str, scale: float = 1.0, booking_years: int = DEFAULT_BOOKING_YEARS,
+         counts: dict | None = None, random_seed: int = 42) -> dict:
+    """Append synthetic rows to an already-migrated database. Returns row counts per table."""
+    counts = counts or scaled_counts(scale)
+    rng = random.Random(random_seed)
+    conn = sqlite3.connect(db_path)
+    timings = {}
+    try:
+        def timed(name, fn, *args):
+            t0 = time.perf_counter()
+            result = fn(conn, rng, *args)
+            conn.commit()
+            timings[name] = round(time.perf_counter() - t0, 3)
+            return result
+
+        timed('gallery_images', seed_gallery, counts['gallery_images'])
+        project_ids = timed('projects', seed_projects, counts['projects'])
+        timed('recurring_tasks', seed_recurring, counts['recurring_tasks'])
+        timed('task_comments', seed_comments, counts['task_comments'], project_ids)
+        emails = timed('bookings', seed_bookings, booking_years)
+        timed('inventory_items', seed_inventory_items, counts['inventory_items'])
+        timed('credits', seed_credits, counts['credits'], emails)
+        timed('agent_actions_log', seed_agent_actions, counts['agent_actions_log'])
+
+        totals = {}
+        for table in list(counts) + ['bookings']:
+            totals[table] = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    finally:
+        conn.close()
+    return {'rows': totals, 'seconds': timings}
+
+
+def prepare_database(data_dir: str, scale: float = 1.0, booking_years: int = DEFAULT_BOOKING_YEARS) -> dict:
+    """Create schema in a scratch DATA_DIR and seed it. DATA_DIR must be set before config is imported."""
+    os.makedirs(data_dir, exist_ok=True)
+    os.environ['DATA_DIR'] = data_dir
+    os.environ.setdefault('GALLERY_DIR', os.path.join(data_dir, 'gallery'))
+    os.environ.setdefault('STATIC_DIR', os.path.join(data_dir, 'static'))
+    db_path = os.path.join(data_dir, 'garten.db')
+    if os.path.exists(db_path):
+        raise SystemExit(f"{db_path} already exists — use an empty scratch directory")
+
+    from db import upgrade
+    upgrade()
+    return seed(db_path, scale=scale, booking_years=booking_years)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed a scratch garten.db with synthetic data')
+    parser.add_argument('--data-dir', default=os.environ.get('DATA_DIR', ''),
+                        help='scratch directory (must not contain a garten.db yet)')
+    parser.add_argument('--scale', type=float, default=1.0, help='row-count multiplier (1.0 = 10k images, 5k projects, 100k actions)')
+    parser.add_argument('--booking-years', type=int, default=DEFAULT_BOOKING_YEARS)
+    args = parser.parse_args()
+
+    if not args.data_dir or args.data_dir.rstrip('/') == '/app/data':
+        parser.error('--data-dir (or DATA_DIR) must point to a scratch directory, not production')
+
+    result = prepare_database(args.data_dir, scale=args.scale, booking_years=args.booking_years)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
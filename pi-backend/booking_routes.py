@@ -0,0 +1,581 @@
+"""Bookings, pricing/availability, cancellations, invoices, feedback, site config and credits."""
+
+from flask import Blueprint, request, jsonify, send_file
+import os
+from datetime import datetime
+
+from email_service import send_booking_confirmation, send_booking_notification_to_admin
+from notifications import notify_admin, notify_booking, notify_feedback
+from config import DATA_DIR, DB_PATH
+from db import get_db
+from extensions import limiter
+from api_helpers import generic_patch
+from credit_ledger import get_balance
+from auth import require_admin, require_auth
+
+try:
+    from pricing_service import calculate_booking_price, calculate_cancellation_refund, get_availability, validate_booking
+    PRICING_AVAILABLE = True
+except ImportError:
+    PRICING_AVAILABLE = False
+    print("Warning: pricing_service not available")
+
+try:
+    from invoice_service import create_invoice_from_booking, generate_invoice_pdf, get_site_config
+    INVOICE_AVAILABLE = True
+except ImportError:
+    INVOICE_AVAILABLE = False
+    print("Warning: invoice_service not available")
+
+bp = Blueprint('bookings', __name__)
+
+
+@bp.route('/api/bookings', methods=['GET', 'POST'])
+@limiter.limit("3 per minute", methods=["POST"])
+def bookings():
+    """Handle bookings."""
+    conn = get_db()
+
+    if request.method == 'POST':
+        data = request.json
+
+        # Validate required fields
+        check_in = data.get('checkIn') or data.get('check_in')
+        check_out = data.get('checkOut') or data.get('check_out')
+        email = data.get('email', '')
+        guests = data.get('guests', 2)
+
+        if not data.get('name') or not email or not check_in or not check_out:
+            conn.close()
+            return jsonify({'error': 'Name, Email, Anreise und Abreise sind erforderlich'}), 400
+
+        # Use pricing engine if available, otherwise fall back to client price
+        total_price = data.get('totalPrice', 0)
+        price_result = None
+
+        if PRICING_AVAILABLE:
+            # Validate booking
+            error = validate_booking(check_in, check_out, int(guests), email, DB_PATH)
+            if error:
+                conn.close()
+                return jsonify({'error': error}), 400
+
+            # Calculate price server-side
+            price_result = calculate_booking_price(
+                check_in=check_in,
+                check_out=check_out,
+                guests=int(guests),
+                db_path=DB_PATH,
+                is_first_year=True,
+            )
+
+            if 'error' in price_result:
+                conn.close()
+                return jsonify({'error': price_result['error']}), 400
+
+            total_price = price_result['total']
+
+        conn.execute('''
+            INSERT INTO bookings (guest_name, guest_email, guest_phone, check_in, check_out,
+                                 guests, has_pets, total_price, discount_code, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            data['name'], email, data.get('phone'),
+            check_in, check_out, int(guests),
+            data.get('pets', False), total_price,
+            data.get('discountCode'), data.get('notes'),
+        ))
+        booking_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+        conn.commit()
+        conn.close()
+
+        # Send emails
+        send_booking_confirmation(data)
+        send_booking_notification_to_admin(data)
+
+        # Telegram notification
+        notify_booking({
+            'guest_name': data['name'],
+            'guest_email': email,
+            'check_in': check_in,
+            'check_out': check_out,
+            'guests': guests,
+            'total_price': total_price,
+        })
+
+        result = {'success': True, 'bookingId': booking_id}
+        if price_result:
+            result['price'] = price_result
+        return jsonify(result)
+
+    # GET: Return booked dates for calendar
+    bookings_list = conn.execute('''
+        SELECT check_in, check_out FROM bookings
+        WHERE status IN ('pending', 'confirmed')
+    ''').fetchall()
+    conn.close()
+
+    return jsonify({
+        'bookings': [{'checkIn': b['check_in'], 'checkOut': b['check_out']} for b in bookings_list]
+    })
+
+
+# ============ Pricing & Availability Routes ============
+
+@bp.route('/api/pricing/calculate', methods=['POST'])
+def calculate_price():
+    """Calculate booking price with full breakdown."""
+    if not PRICING_AVAILABLE:
+        return jsonify({'error': 'Preisberechnung nicht verfügbar'}), 503
+
+    data = request.json or {}
+
+    check_in = data.get('checkIn') or data.get('check_in')
+    check_out = data.get('checkOut') or data.get('check_out')
+    guests = data.get('guests', 2)
+    is_day_only = data.get('isDayOnly', False)
+
+    if not check_in or not check_out:
+        return jsonify({'error': 'Anreise und Abreise erforderlich'}), 400
+
+    result = calculate_booking_price(
+        check_in=check_in,
+        check_out=check_out,
+        guests=int(guests),
+        db_path=DB_PATH,
+        is_day_only=is_day_only,
+        is_first_year=True,
+    )
+
+    if 'error' in result:
+        return jsonify({'error': result['error']}), 400
+
+    return jsonify(result)
+
+
+@bp.route('/api/availability', methods=['GET'])
+def get_availability_api():
+    """Get booked dates for a month."""
+    if not PRICING_AVAILABLE:
+        return jsonify({'error': 'Verfügbarkeitsprüfung nicht verfügbar'}), 503
+
+    month = request.args.get('month')  # YYYY-MM
+    if not month:
+        return jsonify({'error': 'month Parameter erforderlich (YYYY-MM)'}), 400
+
+    booked_dates = get_availability(month, DB_PATH)
+    return jsonify({'booked_dates': booked_dates, 'month': month})
+
+
+# ============ Cancellation Route ============
+
+@bp.route('/api/bookings/<int:booking_id>/cancel', methods=['POST'])
+@require_auth
+def cancel_booking(booking_id, user):
+    """Cancel a booking with refund calculation."""
+    if not PRICING_AVAILABLE:
+        return jsonify({'error': 'Stornierung nicht verfügbar'}), 503
+
+    data = request.json or {}
+
+    conn = get_db()
+    booking = conn.execute('SELECT * FROM bookings WHERE id = ?', (booking_id,)).fetchone()
+
+    if not booking:
+        conn.close()
+        return jsonify({'error': 'Buchung nicht gefunden'}), 404
+
+    if booking['status'] == 'cancelled':
+        conn.close()
+        return jsonify({'error': 'Buchung ist bereits storniert'}), 400
+
+    # Check authorization (user can cancel own booking, admin can cancel any)
+    if user.get('role') != 'admin' and user.get('email') != booking['guest_email']:
+        conn.close()
+        return jsonify({'error': 'Keine Berechtigung'}), 403
+
+    # Calculate refund
+    refund = calculate_cancellation_refund(
+        booking_total=booking['total_price'],
+        check_in=booking['check_in'],
+        is_first_year=True,
+    )
+
+    # Update booking status
+    conn.execute("UPDATE bookings SET status = 'cancelled' WHERE id = ?", (booking_id,))
+
+    # Record cancellation
+    conn.execute('''
+        INSERT INTO cancellations (booking_id, cancelled_by, policy_applied,
+            refund_percent, refund_amount, reason)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (
+        booking_id, user['email'], refund['policy'],
+        refund['refund_percent'], refund['refund_amount'],
+        data.get('reason', ''),
+    ))
+
+    conn.commit()
+    conn.close()
+
+    # Notify admin
+    notify_admin('booking_cancelled', {
+        'Gast': booking['guest_name'],
+        'Zeitraum': f"{booking['check_in']} - {booking['check_out']}",
+        'Erstattung': f"{refund['refund_amount']:.2f}€ ({refund['refund_percent']}%)",
+        'Grund': data.get('reason', 'Nicht angegeben'),
+    })
+
+    return jsonify({
+        'success': True,
+        'refund': refund,
+        'message': 'Buchung storniert',
+    })
+
+
+# ============ Invoice Routes ============
+
+@bp.route('/api/admin/invoices', methods=['GET'])
+@require_admin
+def get_invoices(user):
+    """Admin: Get all invoices."""
+    if not INVOICE_AVAILABLE:
+        return jsonify({'error': 'Rechnungssystem nicht verfügbar'}), 503
+
+    status = request.args.get('status')
+    conn = get_db()
+
+    if status:
+        invoices = conn.execute(
+            'SELECT * FROM invoices WHERE status = ? ORDER BY created_at DESC', (status,)
+        ).fetchall()
+    else:
+        invoices = conn.execute(
+            'SELECT * FROM invoices ORDER BY created_at DESC'
+        ).fetchall()
+    conn.close()
+
+    return jsonify({'invoices': [dict(i) for i in invoices], 'total': len(invoices)})
+
+
+@bp.route('/api/admin/invoices/<int:invoice_id>', methods=['PATCH'])
+@require_admin
+def update_invoice(invoice_id, user):
+    """Admin: Update invoice (edit draft)."""
+    return generic_patch('invoices', invoice_id, request.json,
+        ['guest_name', 'guest_email', 'guest_address', 'line_items',
+         'subtotal', 'credits_applied', 'total', 'tax_note', 'status', 'due_date'],
+        timestamp_field=None)
+
+
+@bp.route('/api/admin/invoices/<int:invoice_id>/generate-pdf', methods=['POST'])
+@require_admin
+def generate_invoice_pdf_route(invoice_id, user):
+    """Admin: Generate PDF for an invoice."""
+    if not INVOICE_AVAILABLE:
+        return jsonify({'error': 'PDF-Generierung nicht verfügbar'}), 503
+
+    invoice_dir = os.path.join(DATA_DIR, 'invoices')
+    pdf_path = generate_invoice_pdf(DB_PATH, invoice_id, invoice_dir)
+
+    if not pdf_path:
+        return jsonify({'error': 'PDF-Generierung fehlgeschlagen'}), 500
+
+    return jsonify({'success': True, 'pdf_path': pdf_path})
+
+
+@bp.route('/api/admin/invoices/<int:invoice_id>/pdf', methods=['GET'])
+@require_admin
+def download_invoice_pdf(invoice_id, user):
+    """Admin: Download invoice PDF."""
+    conn = get_db()
+    invoice = conn.execute('SELECT pdf_path FROM invoices WHERE id = ?', (invoice_id,)).fetchone()
+    conn.close()
+
+    if not invoice or not invoice['pdf_path']:
+        return jsonify({'error': 'PDF nicht gefunden'}), 404
+
+    pdf_full_path = os.path.join(DATA_DIR, invoice['pdf_path'])
+    if not os.path.exists(pdf_full_path):
+        return jsonify({'error': 'PDF-Datei nicht gefunden'}), 404
+
+    return send_file(pdf_full_path, mimetype='application/pdf')
+
+
+@bp.route('/api/admin/invoices/<int:invoice_id>/send', methods=['POST'])
+@require_admin
+def send_invoice(invoice_id, user):
+    """Admin: Send invoice via email."""
+    if not INVOICE_AVAILABLE:
+        return jsonify({'error': 'Rechnungsversand nicht verfügbar'}), 503
+
+    conn = get_db()
+    invoice = conn.execute('SELECT * FROM invoices WHERE id = ?', (invoice_id,)).fetchone()
+
+    if not invoice:
+        conn.close()
+        return jsonify({'error': 'Rechnung nicht gefunden'}), 404
+
+    # Generate PDF if not exists
+    if not invoice['pdf_path']:
+        invoice_dir = os.path.join(DATA_DIR, 'invoices')
+        pdf_path = generate_invoice_pdf(DB_PATH, invoice_id, invoice_dir)
+        if not pdf_path:
+            conn.close()
+            return jsonify({'error': 'PDF-Generierung fehlgeschlagen'}), 500
+
+    # Update status to sent
+    conn.execute('''
+        UPDATE invoices SET status = 'sent', sent_at = ? WHERE id = ?
+    ''', (datetime.now().isoformat(), invoice_id))
+    conn.commit()
+    conn.close()
+
+    # Notify admin via Telegram
+    notify_admin('invoice_sent', {
+        'Rechnung': invoice['invoice_number'],
+        'Gast': invoice['guest_name'],
+        'Betrag': f"{invoice['total']:.2f}€",
+    })
+
+    return jsonify({'success': True, 'message': 'Rechnung gesendet'})
+
+
+@bp.route('/api/admin/invoices/<int:invoice_id>/mark-paid', methods=['POST'])
+@require_admin
+def mark_invoice_paid(invoice_id, user):
+    """Admin: Mark invoice as paid."""
+    conn = get_db()
+    conn.execute(
+        "UPDATE invoices SET status = 'paid' WHERE id = ?", (invoice_id,)
+    )
+    conn.commit()
+
+    invoice = conn.execute('SELECT * FROM invoices WHERE id = ?', (invoice_id,)).fetchone()
+    conn.close()
+
+    if invoice:
+        notify_admin('invoice_paid', {
+            'Rechnung': invoice['invoice_number'],
+            'Gast': invoice['guest_name'],
+            'Betrag': f"{invoice['total']:.2f}€",
+        })
+
+    return jsonify({'success': True, 'message': 'Rechnung als bezahlt markiert'})
+
+
+@bp.route('/api/bookings/<int:booking_id>/create-invoice', methods=['POST'])
+@require_admin
+def create_invoice_route(booking_id, user):
+    """Admin: Create invoice for a booking."""
+    if not INVOICE_AVAILABLE:
+        return jsonify({'error': 'Rechnungserstellung nicht verfügbar'}), 503
+
+    invoice_id = create_invoice_from_booking(DB_PATH, booking_id)
+
+    if not invoice_id:
+        return jsonify({'error': 'Rechnungserstellung fehlgeschlagen'}), 500
+
+    return jsonify({'success': True, 'invoiceId': invoice_id})
+
+
+# ============ Feedback Routes ============
+
+@bp.route('/api/feedback', methods=['POST'])
+def submit_feedback():
+    """Submit guest feedback."""
+    data = request.json or {}
+
+    email = data.get('email', '').strip()
+    rating = data.get('rating')
+
+    if not email or not rating:
+        return jsonify({'error': 'Email und Bewertung erforderlich'}), 400
+
+    if not (1 <= int(rating) <= 5):
+        return jsonify({'error': 'Bewertung muss zwischen 1 und 5 liegen'}), 400
+
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO feedback (booking_id, guest_email, rating, cleanliness, communication,
+            location, accuracy, comment)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        data.get('bookingId'), email, int(rating),
+        data.get('cleanliness'), data.get('communication'),
+        data.get('location'), data.get('accuracy'),
+        data.get('comment'),
+    ))
+    conn.commit()
+    conn.close()
+
+    # Notify admin
+    notify_feedback(data)
+
+    return jsonify({'success': True, 'message': 'Danke für dein Feedback!'})
+
+
+@bp.route('/api/admin/feedback', methods=['GET'])
+@require_admin
+def get_all_feedback(user):
+    """Admin: Get all feedback."""
+    conn = get_db()
+    feedback = conn.execute('SELECT * FROM feedback ORDER BY created_at DESC').fetchall()
+    conn.close()
+    return jsonify({'feedback': [dict(f) for f in feedback], 'total': len(feedback)})
+
+
+@bp.route('/api/reviews', methods=['GET'])
+def get_public_reviews():
+    """Get public reviews (4-5 stars with comments)."""
+    conn = get_db()
+    reviews = conn.execute('''
+        SELECT f.rating, f.comment, f.created_at, b.guest_name
+        FROM feedback f
+        LEFT JOIN bookings b ON f.booking_id = b.id
+        WHERE f.rating >= 4 AND f.comment IS NOT NULL AND f.comment != ''
+        ORDER BY f.created_at DESC
+        LIMIT 10
+    ''').fetchall()
+    conn.close()
+
+    return jsonify({
+        'reviews': [{
+            'rating': r['rating'],
+            'comment': r['comment'],
+            'name': _anonymize_name(r['guest_name']) if r['guest_name'] else 'Gast',
+            'date': r['created_at'][:10] if r['created_at'] else None,
+        } for r in reviews]
+    })
+
+
+def _anonymize_name(name: str) -> str:
+    """Convert 'Max Mustermann' to 'Max M.'"""
+    if not name:
+        return 'Gast'
+    parts = name.strip().split()
+    if len(parts) >= 2:
+        return f"{parts[0]} {parts[-1][0]}."
+    return parts[0]
+
+
+# ============ Site Config Routes ============
+
+@bp.route('/api/admin/site-config', methods=['GET'])
+@require_admin
+def get_site_config_api(user):
+    """Admin: Get all site configuration."""
+    if not INVOICE_AVAILABLE:
+        return jsonify({'error': 'Site-Config nicht verfügbar'}), 503
+
+    config = get_site_config(DB_PATH)
+    return jsonify({'config': config})
+
+
+@bp.route('/api/admin/site-config', methods=['PATCH'])
+@require_admin
+def update_site_config(user):
+    """Admin: Update site configuration."""
+    data = request.json or {}
+    conn = get_db()
+    for key, value in data.items():
+        conn.execute('''
+            INSERT INTO site_config (key, value, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = ?, updated_at = ?
+        ''', (key, value, datetime.now().isoformat(), value, datetime.now().isoformat()))
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True})
+
+
+@bp.route('/api/credits', methods=['GET'])
+def get_credits():
+    """Get credits for a user."""
+    email = request.args.get('email')
+    if not email:
+        return jsonify({'error': 'Email erforderlich'}), 400
+
+    conn = get_db()
+    credits = conn.execute('''
+        SELECT * FROM credits WHERE guest_email = ? ORDER BY created_at DESC LIMIT 20
+    ''', (email,)).fetchall()
+
+    total = get_balance(conn, email)['total']
+
+    conn.close()
+
+    return jsonify({
+        'credits': [dict(c) for c in credits],
+        'total': total
+    })
+
+
+@bp.route('/api/admin/credits', methods=['GET'])
+@require_admin
+def get_all_credits(user):
+    """Admin: Get all credits."""
+    conn = get_db()
+    credits = conn.execute('SELECT * FROM credits ORDER BY created_at DESC').fetchall()
+    conn.close()
+    return jsonify({'credits': [dict(c) for c in credits]})
+
+
+@bp.route('/api/admin/credits', methods=['POST'])
+@require_admin
+def create_credit(user):
+    """Admin: Create a credit entry."""
+    data = request.json
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO credits (guest_email, amount, reason, type, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (data['guest_email'], data['amount'], data['reason'],
+          data.get('type', 'earned'), datetime.now().isoformat()))
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True})
+
+
+@bp.route('/api/admin/credits/<int:credit_id>', methods=['PATCH'])
+@require_admin
+def update_credit(credit_id, user):
+    """Admin: Update a credit entry."""
+    return generic_patch('credits', credit_id, request.json,
+        ['guest_email', 'amount', 'reason', 'type'],
+        timestamp_field=None)
+
+
+@bp.route('/api/admin/credits/<int:credit_id>', methods=['DELETE'])
+@require_admin
+def delete_credit(credit_id, user):
+    """Admin: Delete a credit entry."""
+    conn = get_db()
+    conn.execute('DELETE FROM credits WHERE id = ?', (credit_id,))
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True})
+
+
+@bp.route('/api/maintenance/complete', methods=['POST'])
+def complete_maintenance():
+    """Mark a maintenance task as complete."""
+    data = request.json
+
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO maintenance_log (task_id, completed_by, notes, photo_filename)
+        VALUES (?, ?, ?, ?)
+    ''', (data['taskId'], data['completedBy'], data.get('notes'), data.get('photoFilename')))
+
+    # Add credit if applicable
+    if data.get('creditValue', 0) > 0:
+        conn.execute('''
+            INSERT INTO credits (guest_email, amount, reason, type)
+            VALUES (?, ?, ?, 'earned')
+        ''', (data['completedBy'], data['creditValue'], data.get('taskTitle', 'Wartungsarbeit')))
+
+    conn.commit()
+    conn.close()
+
+    return jsonify({'success': True})
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Change feed for live board updates (Server-Sent Events, /api/events).
+
+Writes to projects, recurring_tasks, gallery_images and bookings append a
+row to `change_log` via triggers — the same transaction as the write, so
+every writer (generic_patch, the task/gallery/booking routes, the agent
+tools, telegram_agent) is covered. change_log.id is the SSE event id.
+
+Each gunicorn worker runs one poller thread (`ChangeFeed`) that notices
+commits from any process via PRAGMA data_version, reads the new rows once
+and wakes all of its streams; they filter by topic and send. A client that
+reconnects with `Last-Event-ID` gets what it missed from the ring buffer or,
+for longer gaps, from change_log. When the gap is older than the retained
+log it receives a `reset` event and should refetch.
+
+Topics: tasks (projects, recurring_tasks), gallery, bookings (admin only).
+
+Usage:
+    python change_feed.py tail [--topic tasks]   # print events as they arrive
+    python change_feed.py prune                  # drop rows past retention
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DB_PATH  # noqa: E402
+
+TOPICS = ('tasks', 'gallery', 'bookings')
+ADMIN_TOPICS = {'bookings'}
+RETENTION_HOURS = int(os.environ.get('CHANGE_LOG_RETENTION_HOURS', 48))
+POLL_SECONDS = float(os.environ.get('CHANGE_FEED_POLL', 0.5))
+BUFFER_SIZE = 1000
+RUN_HOUR = 4
+
+# table -> (topic, entity, json_object(...) fields shown to clients; never guest PII)
+SOURCES = {
+    'projects': ('tasks', 'project', ('id', 'title', 'status', 'priority', 'category', 'assigned_to',
+                                      'map_area', 'due_date', 'completed_at', 'confirmed_at')),
+    'recurring_tasks': ('tasks', 'recurring', ('id', 'title', 'category', 'next_due', 'is_active', 'map_area')),
+    'gallery_images': ('gallery', 'gallery', ('id', 'name', 'category', 'type', 'status', 'map_area')),
+    'bookings': ('bookings', 'booking', ('id', 'status', 'check_in', 'check_out', 'guests')),
+}
+
+
+def _schema() -> str:
+    parts = ['''
+    CREATE TABLE IF NOT EXISTS change_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        topic TEXT NOT NULL,
+        entity TEXT NOT NULL,
+        entity_id TEXT,
+        action TEXT NOT NULL,          -- insert / update / delete
+        data TEXT,                     -- JSON, selected columns of the row
+        created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+    );
+    CREATE INDEX IF NOT EXISTS idx_change_log_created ON change_log(created_at);''']
+    for table, (topic, entity, fields) in SOURCES.items():
+        for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+            data = 'json_object(' + ', '.join(f"'{f}', {row}.{f}" for f in fields) + ')'
+            parts.append(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_change_log_{table}_{event.lower()} AFTER {event} ON {table} BEGIN
+        INSERT INTO change_log (topic, entity, entity_id, action, data)
+        VALUES ('{topic}', '{entity}', {row}.id, '{event.lower()}', {data});
+    END;''')
+    return '\n'.join(parts)
+
+
+SCHEMA = _schema()
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    conn.executescript(schema)
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def _event(row) -> dict:
+    return {
+        'id': row['id'],
+        'topic': row['topic'],
+        'entity': row['entity'],
+        'entity_id': row['entity_id'],
+        'action': row['action'],
+        'data': json.loads(row['data']) if row['data'] else None,
+        'at': row['created_at'],
+    }
+
+
+def read_since(conn, after_id: int, limit: int = 500) -> list[dict]:
+    rows = conn.execute(
+        'SELECT * FROM change_log WHERE id > ? ORDER BY id LIMIT ?', (after_id, limit)
+    ).fetchall()
+    return [_event(r) for r in rows]
+
+
+def bounds(conn) -> tuple[int, int]:
+    """(oldest retained id, newest id); (0, 0) for an empty log."""
+    row = conn.execute('SELECT MIN(id), MAX(id) FROM change_log').fetchone()
+    return row[0] or 0, row[1] or 0
+
+
+class ChangeFeed:
+    """Per-process fan-out: one poller thread, many waiting streams."""
+
+    def __init__(self, db_path: str = DB_PATH, poll_seconds: float = POLL_SECONDS):
+        self.db_path = db_path
+        self.poll_seconds = poll_seconds
+        self.buffer = deque(maxlen=BUFFER_SIZE)
+        self.last_id = 0
+        self.cond = threading.Condition()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=15, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            conn = self._connect()
+            try:
+                self.last_id = bounds(conn)[1]
+            finally:
+                conn.close()
+            self._thread = threading.Thread(target=self._run, name='change-feed', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        conn = self._connect()
+        seen_version = None
+        while True:
+            try:
+                version = conn.execute('PRAGMA data_version').fetchone()[0]
+                if version != seen_version:
+                    seen_version = version
+                    events = read_since(conn, self.last_id)
+                    while events:
+                        with self.cond:
+                            self.buffer.extend(events)
+                            self.last_id = events[-1]['id']
+                            self.cond.notify_all()
+                        events = read_since(conn, self.last_id) if len(events) == 500 else []
+            except sqlite3.Error as e:
+                print(f"[change_feed] poll failed: {e}")
+            time.sleep(self.poll_seconds)
+
+    def wait(self, after_id: int, timeout: float) -> list[dict]:
+        """Events with id > after_id, blocking up to `timeout` seconds for new ones."""
+        self.start()
+        with self.cond:
+            if self.last_id <= after_id:
+                self.cond.wait(timeout)
+            if self.last_id <= after_id:
+                return []
+            if self.buffer and self.buffer[0]['id'] <= after_id + 1:
+                return [e for e in self.buffer if e['id'] > after_id]
+        # Gap older than the ring buffer: catch up from the table
+        conn = self._connect()
+        try:
+            return read_since(conn, after_id)
+        finally:
+            conn.close()
+
+
+feed = ChangeFeed()
+
+
+def prune(conn: sqlite3.Connection, now: datetime | None = None) -> int:
+    now = now or datetime.now()
+    cutoff = (now - timedelta(hours=RETENTION_HOURS)).strftime('%Y-%m-%d %H:%M:%S')
+    # Keep the newest row so AUTOINCREMENT ids and resume checks stay meaningful
+    cur = conn.execute(
+        'DELETE FROM change_log WHERE created_at < ? AND id < (SELECT MAX(id) FROM change_log)', (cutoff,)
+    )
+    conn.commit()
+    return cur.rowcount
+
+
+def handle_prune(conn: sqlite3.Connection, item, now: datetime) -> dict:
+    """agent_scheduler handler: nightly change_log retention."""
+    from agent_scheduler import schedule, tomorrow_at
+    removed = prune(conn, now)
+    schedule(conn, 'change_log', 0, tomorrow_at(now, RUN_HOUR))
+    return {'action': 'change_log_pruned', 'removed': removed}
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Live change feed (change_log)')
+    parser.add_argument('command', choices=['tail', 'prune'])
+    parser.add_argument('--topic', action='append', choices=TOPICS)
+    args = parser.parse_args(argv)
+    if args.command == 'prune':
+        conn = get_db()
+        try:
+            print(json.dumps({'removed': prune(conn)}))
+        finally:
+            conn.close()
+        return 0
+    last_id = None
+    try:
+        while True:
+            if last_id is None:
+                feed.start()
+                last_id = feed.last_id
+            for event in feed.wait(last_id, 15):
+                last_id = event['id']
+                if not args.topic or event['topic'] in args.topic:
+                    print(json.dumps(event, ensure_ascii=False), flush=True)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
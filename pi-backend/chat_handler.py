@@ -5,10 +5,11 @@ Endpoint: POST /api/garten/agent/slack-events  (registered in agent_routes.py)
 
 - Verifiziert Slack-Signing-Secret (5 Min Replay-Schutz).
 - Antwortet auf url_verification-Challenge (text/plain).
-- Dedupe via In-Memory-OrderedDict (event_id, TTL 10 min) — verhindert Slack-Retry-Doppelantworten.
+- Dedupe via shared_state (event_id, TTL 10 min, SQLite — gilt für beide gunicorn-Worker)
+  — verhindert Slack-Retry-Doppelantworten.
 - ACKt sofort 200 + dispatcht in Daemon-Thread (Claude-CLI braucht 5–30 s).
 - Whitelist auf GARTEN_MORITZ_SLACK_USER_ID (Phase 3a/3b: nur Moritz).
-- Rate-Limit: max GARTEN_CHAT_RATE_LIMIT_PER_HOUR pro User.
+- Rate-Limit: max GARTEN_CHAT_RATE_LIMIT_PER_HOUR pro User (Stundenfenster, shared_state).
 """
 
 from __future__ import annotations
@@ -18,12 +19,12 @@ import os
 import sqlite3
 import threading
 import time
-from collections import OrderedDict, defaultdict, deque
 
 import chat_approval
 import chat_context
 import claude_cli_backend
 import chat_tools
+import shared_state
 import slack_service
 
 DATA_DIR = os.environ.get('DATA_DIR', '/app/data')
@@ -39,46 +40,30 @@ WHITELIST_MODE = os.environ.get('GARTEN_CHAT_WHITELIST', 'moritz_only').lower()
 
 
 _DEDUP_TTL = 600
-_seen_events: "OrderedDict[str, float]" = OrderedDict()
-_dedup_lock = threading.Lock()
-
-_rate_lock = threading.Lock()
-_rate_calls: "dict[str, deque]" = defaultdict(deque)
 
 
 def _is_duplicate(event_id: str) -> bool:
     if not event_id:
         return False
-    with _dedup_lock:
-        now = time.time()
-        while _seen_events:
-            oldest_key = next(iter(_seen_events))
-            if _seen_events[oldest_key] < now - _DEDUP_TTL:
-                _seen_events.popitem(last=False)
-            else:
-                break
-        if event_id in _seen_events:
-            return True
-        _seen_events[event_id] = now
-        if len(_seen_events) > 1000:
-            _seen_events.popitem(last=False)
-    return False
+    try:
+        return not shared_state.store.add_if_absent(f"slack_event:{event_id}", _DEDUP_TTL)
+    except sqlite3.Error as e:
+        print(f"[chat] dedup store error, treating as new: {e}")
+        return False
 
 
 def _rate_limit_ok(user_id: str) -> tuple[bool, int]:
     """Returns (ok, retry_after_minutes_estimate)."""
     if not user_id:
         return True, 0
-    now = time.time()
-    cutoff = now - 3600
-    with _rate_lock:
-        dq = _rate_calls[user_id]
-        while dq and dq[0] < cutoff:
-            dq.popleft()
-        if len(dq) >= RATE_LIMIT_PER_HOUR:
-            wait_secs = max(1, int(3600 - (now - dq[0])))
+    key = f"chat_rate:{user_id}"
+    try:
+        count = shared_state.store.incr(key, 3600)
+        if count > RATE_LIMIT_PER_HOUR:
+            wait_secs = max(1, int(shared_state.store.get_expiry(key) - time.time()))
             return False, max(1, wait_secs // 60)
-        dq.append(now)
+    except sqlite3.Error as e:
+        print(f"[chat] rate-limit store error, allowing: {e}")
     return True, 0
 
 
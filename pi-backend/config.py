@@ -0,0 +1,44 @@
+"""
+Shared configuration for the Voigt-Garten backend.
+
+Plain constants read from the environment — no Flask, no database — so the
+app factory, the blueprints and the `db` CLI can all import it cheaply.
+"""
+
+import os
+
+# Paths (Docker environment)
+DATA_DIR = os.environ.get('DATA_DIR', '/app/data')
+STATIC_DIR = os.environ.get('STATIC_DIR', '/app/static')
+GALLERY_DIR = os.environ.get('GALLERY_DIR', '/app/public/images/gallery')
+DB_PATH = os.path.join(DATA_DIR, 'garten.db')
+
+# Allowed gallery categories (path traversal protection)
+ALLOWED_CATEGORIES = {'garten', 'haus', 'umgebung', 'sonstiges', 'luftaufnahmen', 'events', 'projekte', 'tiere'}
+
+# Upload limits in MB: multipart uploads / resumable uploads by admins (drone footage)
+GALLERY_MAX_UPLOAD_MB = int(os.environ.get('GALLERY_MAX_UPLOAD_MB', 50))
+GALLERY_MAX_RESUMABLE_MB = int(os.environ.get('GALLERY_MAX_RESUMABLE_MB', 4096))
+
+# GPS → garden map: reference points "lat,lon,x,y;…" (≥3, map units as in GardenMap's viewBox)
+GARDEN_GEO_CONTROL_POINTS = os.environ.get('GARDEN_GEO_CONTROL_POINTS', '')
+
+# JWT Secret Key (use env var in production)
+JWT_SECRET = os.environ.get('JWT_SECRET', 'voigt-garten-secret-key-change-in-production-2026')
+JWT_EXPIRY_HOURS = 24
+
+# Google OAuth
+GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID', '')
+GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET', '')
+GOOGLE_REDIRECT_URI = os.environ.get('GOOGLE_REDIRECT_URI', 'https://garten.infinityspace42.de/api/auth/google/callback')
+
+# COO API Secret
+COO_API_SECRET = os.environ.get('COO_API_SECRET', '')
+INFINILOOP_API_KEY = os.environ.get('INFINILOOP_API_KEY', '')
+INFINILOOP_URL = os.environ.get('INFINILOOP_URL', 'https://infiniloop.infinityspace42.de').rstrip('/')
+
+CORS_ORIGINS = [
+    'https://garten.infinityspace42.de',
+    'http://localhost:4321',
+    'http://localhost:5055'
+]
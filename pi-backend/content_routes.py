@@ -0,0 +1,144 @@
+"""Translations (i18n), impressum config and translation preload."""
+
+from flask import Blueprint, request, jsonify
+import os
+import json
+from datetime import datetime
+
+from db import get_db
+from extensions import limiter
+
+bp = Blueprint('content', __name__)
+
+
+# ==================== Translation / i18n ====================
+
+@bp.route('/api/translate', methods=['POST'])
+@limiter.limit("30/minute")
+def translate_texts():
+    """Translate texts using DeepL Free API with DB caching."""
+    data = request.json
+    if not data or not data.get('texts'):
+        return jsonify({'error': 'texts array required'}), 400
+
+    texts = data['texts']
+    target_lang = data.get('target_lang', 'en')
+
+    if not isinstance(texts, list) or len(texts) > 100:
+        return jsonify({'error': 'texts must be an array with max 100 items'}), 400
+
+    if target_lang not in ('en', 'de'):
+        return jsonify({'error': 'target_lang must be "en" or "de"'}), 400
+
+    # If target is German, return original texts (source language)
+    if target_lang == 'de':
+        return jsonify({'translations': {t: t for t in texts}})
+
+    conn = get_db()
+    result = {}
+    missing = []
+
+    # Check DB cache first
+    for text in texts:
+        cached = conn.execute(
+            'SELECT translated_text FROM translations WHERE source_text = ? AND target_lang = ?',
+            (text.strip(), target_lang)
+        ).fetchone()
+        if cached:
+            result[text] = cached['translated_text']
+        else:
+            missing.append(text)
+
+    # Call DeepL for cache misses
+    if missing:
+        deepl_key = os.environ.get('DEEPL_API_KEY')
+        if deepl_key:
+            try:
+                import urllib.request
+                import urllib.parse
+
+                # DeepL Free API
+                api_url = 'https://api-free.deepl.com/v2/translate'
+                post_data = urllib.parse.urlencode({
+                    'auth_key': deepl_key,
+                    'target_lang': target_lang.upper(),
+                    'source_lang': 'DE',
+                }, doseq=False)
+
+                # Add each text as separate 'text' parameter
+                for t in missing:
+                    post_data += '&' + urllib.parse.urlencode({'text': t.strip()})
+
+                req = urllib.request.Request(api_url, data=post_data.encode('utf-8'))
+                req.add_header('Content-Type', 'application/x-www-form-urlencoded')
+
+                with urllib.request.urlopen(req, timeout=10) as resp:
+                    deepl_result = json.loads(resp.read().decode('utf-8'))
+
+                for i, translation in enumerate(deepl_result.get('translations', [])):
+                    translated = translation['text']
+                    original = missing[i]
+                    result[original] = translated
+
+                    # Cache in DB
+                    conn.execute(
+                        'INSERT OR REPLACE INTO translations (source_text, target_lang, translated_text, updated_at) VALUES (?, ?, ?, ?)',
+                        (original.strip(), target_lang, translated, datetime.now().isoformat())
+                    )
+                conn.commit()
+
+            except Exception as e:
+                print(f"DeepL API error: {e}")
+                # Fallback: return originals for missing
+                for t in missing:
+                    if t not in result:
+                        result[t] = t
+        else:
+            # No API key: return originals
+            for t in missing:
+                result[t] = t
+
+    conn.close()
+    return jsonify({'translations': result})
+
+
+@bp.route('/api/site-config/impressum', methods=['GET'])
+def get_impressum_config():
+    """Public: Get current impressum mode + text blocks."""
+    conn = get_db()
+    row = conn.execute("SELECT value FROM site_config WHERE key = 'impressum_mode'").fetchone()
+    conn.close()
+    mode = row['value'] if row else 'pre_lease'
+    if mode == 'post_lease':
+        content = {
+            'mode': 'post_lease',
+            'operator_name': 'Infinity Space – Moritz Voigt',
+            'operator_note': 'Pächter des Grundstücks von Konny Voigt',
+            'email': 'garten@infinityspace42.de',
+            'notice': 'Betrieben durch Infinity Space auf Grundlage eines Pachtvertrags mit dem Grundstückseigentümer Konny Voigt.',
+        }
+    else:
+        content = {
+            'mode': 'pre_lease',
+            'operator_name': 'Konny Voigt (Standort-Eigentümer)',
+            'operator_note': 'Künftiger Betreiber/Pächter: Infinity Space – Moritz Voigt',
+            'email': 'garten@infinityspace42.de',
+            'notice': 'Hinweis: Der Pachtvertrag zwischen Konny Voigt (Eigentümer) und Infinity Space (künftiger Betreiber) ist in Vorbereitung. Der gewerbliche Launch als Refugium Naturgärten ist für den 01.05.2026 geplant.',
+        }
+    return jsonify(content)
+
+
+@bp.route('/api/translations/preload', methods=['GET'])
+def get_preloaded_translations():
+    """Get all cached translations for a target language."""
+    target_lang = request.args.get('lang', 'en')
+    conn = get_db()
+    rows = conn.execute(
+        'SELECT source_text, translated_text FROM translations WHERE target_lang = ?',
+        (target_lang,)
+    ).fetchall()
+    conn.close()
+    return jsonify({
+        'translations': {r['source_text']: r['translated_text'] for r in rows},
+        'lang': target_lang
+    })
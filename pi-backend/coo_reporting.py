@@ -1,16 +1,28 @@
 """
 COO Reporting — Generiert tägliche Reports für den COO.
 Wird vom CLI-Agent und dem /api/agent/daily-report Endpoint genutzt.
+
+Jede Sektion ist eine Range-Query auf indizierten Spalten (kein DATE()/
+julianday() auf Spalten). Tageszähler stehen in coo_daily_rollup und werden
+per Trigger fortgeschrieben (db.py Migration 007) — Verlauf und
+Wochenvergleich kosten damit nur einen Lookup. Der Report bleibt gecacht,
+solange sich weder das Datum noch data_versions['coo'] ändert.
 """
 
 import os
 import json
 import sqlite3
-from datetime import datetime, timedelta
+import threading
+from datetime import date, datetime, timedelta
 
 DATA_DIR = os.environ.get('DATA_DIR', '/app/data')
 DB_PATH = os.path.join(DATA_DIR, 'garten.db')
 
+ROLLUP_FIELDS = ('tasks_done', 'bookings_new', 'drafts_created', 'issues_opened', 'issues_closed')
+
+_cache_lock = threading.Lock()
+_cache = {'key': None, 'report': None}
+
 
 def get_db():
     conn = sqlite3.connect(DB_PATH)
@@ -18,20 +30,52 @@ def get_db():
     return conn
 
 
-def generate_daily_report() -> dict:
-    """Generate the daily COO report."""
+def _data_version(conn) -> int:
+    try:
+        row = conn.execute("SELECT version FROM data_versions WHERE scope = 'coo'").fetchone()
+    except sqlite3.OperationalError:
+        return -1
+    return row['version'] if row else -1
+
+
+def _day_range(day: str) -> tuple[str, str]:
+    """[day, next day) as strings — matches both 'YYYY-MM-DD HH:MM:SS' and ISO 'T' timestamps."""
+    nxt = (datetime.strptime(day, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+    return day, nxt
+
+
+def generate_daily_report(use_cache: bool = True) -> dict:
+    """Generate the daily COO report (cached until the day or the underlying data changes)."""
     conn = get_db()
     today = datetime.now().strftime('%Y-%m-%d')
+    version = _data_version(conn)
+    key = (today, version)
+
+    if use_cache and version >= 0:
+        with _cache_lock:
+            if _cache['key'] == key:
+                conn.close()
+                return _cache['report']
+        # Another worker / the cron job may already have built it
+        saved = _latest_saved_report(conn)
+        if saved and saved.get('date') == today and saved.get('data_version') == version:
+            conn.close()
+            with _cache_lock:
+                _cache.update(key=key, report=saved)
+            return saved
+
     week_ahead = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
 
     report = {
         'date': today,
         'generated_at': datetime.now().isoformat(),
+        'data_version': version,
         'summary': '',
         'tasks': _get_task_summary(conn, today, week_ahead),
         'bookings': _get_booking_summary(conn, today, week_ahead),
         'communications': _get_communication_summary(conn, today),
         'issues': _get_issue_summary(conn, today),
+        'trends': get_week_over_week(conn, today),
         'action_items_for_coo': [],
     }
 
@@ -79,81 +123,84 @@ def generate_daily_report() -> dict:
 
     # Save report
     _save_report(report)
+    with _cache_lock:
+        _cache.update(key=key, report=report)
 
     return report
 
 
 def _get_task_summary(conn, today, week_ahead):
-    """Get task summary for the report."""
-    # Overdue tasks
-    overdue = conn.execute('''
-        SELECT id, title, status, priority, category, due_date,
-            CAST(julianday(?) - julianday(due_date) AS INTEGER) as days_overdue
-        FROM projects
-        WHERE due_date < ? AND status IN ('offen', 'in_arbeit')
-        ORDER BY due_date ASC
-    ''', (today, today)).fetchall()
-
-    # Completed today
-    completed = conn.execute('''
-        SELECT id, title, category FROM projects
-        WHERE status = 'done' AND DATE(updated_at) = ?
-    ''', (today,)).fetchall()
-
-    # Due this week
-    due_week = conn.execute('''
+    """Get task summary for the report (one query, partitioned in Python)."""
+    day_start, day_end = _day_range(today)
+    rows = conn.execute('''
         SELECT id, title, status, priority, category, due_date
         FROM projects
-        WHERE due_date BETWEEN ? AND ? AND status IN ('offen', 'in_arbeit')
+        WHERE (status IN ('offen', 'in_arbeit') AND due_date <= ?)
+           OR (status = 'done' AND updated_at >= ? AND updated_at < ?)
         ORDER BY due_date ASC
-    ''', (today, week_ahead)).fetchall()
+    ''', (week_ahead, day_start, day_end)).fetchall()
+
+    today_ord = date.fromisoformat(today).toordinal()
+    overdue, completed, due_week = [], [], []
+    for r in rows:
+        if r['status'] == 'done':
+            completed.append({'id': r['id'], 'title': r['title'], 'category': r['category']})
+            continue
+        task = dict(r)
+        if task['due_date'] < today:
+            try:
+                task['days_overdue'] = today_ord - date.fromisoformat(task['due_date'][:10]).toordinal()
+            except ValueError:
+                task['days_overdue'] = 0
+            overdue.append(task)
+        else:
+            due_week.append(task)
 
     return {
-        'overdue': [dict(r) for r in overdue],
-        'completed_today': [dict(r) for r in completed],
-        'due_this_week': [dict(r) for r in due_week],
+        'overdue': overdue,
+        'completed_today': completed,
+        'due_this_week': due_week,
     }
 
 
 def _get_booking_summary(conn, today, week_ahead):
-    """Get booking summary."""
-    # Active bookings (currently staying)
-    active = conn.execute('''
-        SELECT id, guest_name, check_in, check_out, guests, status
-        FROM bookings WHERE check_in <= ? AND check_out >= ? AND status != 'cancelled'
-    ''', (today, today)).fetchall()
-
-    # Upcoming 7 days
-    upcoming = conn.execute('''
-        SELECT id, guest_name, check_in, check_out, guests, total_price, status
-        FROM bookings WHERE check_in BETWEEN ? AND ? AND status != 'cancelled'
-        ORDER BY check_in ASC
+    """Get booking summary (one query over check_out >= today, plus pending)."""
+    rows = conn.execute('''
+        SELECT id, guest_name, check_in, check_out, guests, total_price, status, created_at
+        FROM bookings
+        WHERE (check_out >= ? AND check_in <= ? AND status != 'cancelled')
+           OR status = 'pending'
     ''', (today, week_ahead)).fetchall()
 
-    # Pending payment
-    pending_payment = conn.execute('''
-        SELECT id, guest_name, check_in, total_price, created_at
-        FROM bookings WHERE status = 'pending'
-        ORDER BY created_at ASC
-    ''').fetchall()
-
+    active, upcoming, pending_payment = [], [], []
+    for r in rows:
+        if r['status'] != 'cancelled' and r['check_out'] >= today:
+            if r['check_in'] <= today:
+                active.append({k: r[k] for k in ('id', 'guest_name', 'check_in', 'check_out', 'guests', 'status')})
+            if today <= r['check_in'] <= week_ahead:
+                upcoming.append({k: r[k] for k in ('id', 'guest_name', 'check_in', 'check_out', 'guests',
+                                                    'total_price', 'status')})
+        if r['status'] == 'pending':
+            pending_payment.append({k: r[k] for k in ('id', 'guest_name', 'check_in', 'total_price', 'created_at')})
+
+    upcoming.sort(key=lambda b: b['check_in'])
+    pending_payment.sort(key=lambda b: b['created_at'] or '')
     return {
-        'active': [dict(r) for r in active],
-        'upcoming_7d': [dict(r) for r in upcoming],
-        'pending_payment': [dict(r) for r in pending_payment],
+        'active': active,
+        'upcoming_7d': upcoming,
+        'pending_payment': pending_payment,
     }
 
 
 def _get_communication_summary(conn, today):
     """Get communication summary."""
     try:
-        drafted = conn.execute(
-            "SELECT COUNT(*) as c FROM email_drafts WHERE DATE(created_at) = ?", (today,)
-        ).fetchone()['c']
-        awaiting = conn.execute(
-            "SELECT COUNT(*) as c FROM email_drafts WHERE status = 'pending'"
-        ).fetchone()['c']
-    except Exception:
+        row = conn.execute('''
+            SELECT (SELECT COUNT(*) FROM email_drafts WHERE status = 'pending') AS awaiting,
+                   COALESCE((SELECT drafts_created FROM coo_daily_rollup WHERE day = ?), 0) AS drafted
+        ''', (today,)).fetchone()
+        drafted, awaiting = row['drafted'], row['awaiting']
+    except sqlite3.Error:
         drafted = 0
         awaiting = 0
 
@@ -165,24 +212,53 @@ def _get_communication_summary(conn, today):
 
 def _get_issue_summary(conn, today):
     """Get issue summary."""
+    day_start, day_end = _day_range(today)
     try:
-        open_issues = conn.execute('''
-            SELECT id, title, report_type, category, created_at
-            FROM issue_reports WHERE status IN ('pending', 'open')
-            ORDER BY created_at DESC LIMIT 20
-        ''').fetchall()
-
-        resolved = conn.execute('''
-            SELECT id, title FROM issue_reports
-            WHERE status = 'resolved' AND DATE(updated_at) = ?
-        ''', (today,)).fetchall()
-    except Exception:
-        open_issues = []
-        resolved = []
+        rows = conn.execute('''
+            SELECT id, title, report_type, category, status, created_at
+            FROM issue_reports
+            WHERE status IN ('pending', 'open')
+               OR (updated_at >= ? AND updated_at < ? AND status = 'resolved')
+            ORDER BY created_at DESC
+        ''', (day_start, day_end)).fetchall()
+    except sqlite3.Error:
+        rows = []
+
+    open_issues = [{k: r[k] for k in ('id', 'title', 'report_type', 'category', 'created_at')}
+                   for r in rows if r['status'] in ('pending', 'open')][:20]
+    resolved = [{'id': r['id'], 'title': r['title']} for r in rows if r['status'] == 'resolved']
+    return {
+        'open': open_issues,
+        'resolved_today': resolved,
+    }
+
 
+def get_rollup(conn, start: str, end: str) -> list[dict]:
+    """Daily counters for start..end inclusive (days without activity are omitted)."""
+    try:
+        rows = conn.execute(
+            'SELECT * FROM coo_daily_rollup WHERE day >= ? AND day <= ? ORDER BY day', (start, end)
+        ).fetchall()
+    except sqlite3.Error:
+        return []
+    return [dict(r) for r in rows]
+
+
+def get_week_over_week(conn, today: str) -> dict:
+    """Last 7 days vs. the 7 days before, from the rollup table."""
+    today_date = datetime.strptime(today, '%Y-%m-%d')
+    this_start = (today_date - timedelta(days=6)).strftime('%Y-%m-%d')
+    prev_start = (today_date - timedelta(days=13)).strftime('%Y-%m-%d')
+    this_week = dict.fromkeys(ROLLUP_FIELDS, 0)
+    prev_week = dict.fromkeys(ROLLUP_FIELDS, 0)
+    for row in get_rollup(conn, prev_start, today):
+        bucket = this_week if row['day'] >= this_start else prev_week
+        for field in ROLLUP_FIELDS:
+            bucket[field] += row[field] or 0
     return {
-        'open': [dict(r) for r in open_issues],
-        'resolved_today': [dict(r) for r in resolved],
+        'this_week': this_week,
+        'previous_week': prev_week,
+        'delta': {f: this_week[f] - prev_week[f] for f in ROLLUP_FIELDS},
     }
 
 
@@ -204,18 +280,62 @@ def _save_report(report: dict):
         print(f"[coo_reporting] Save error: {e}")
 
 
-def get_latest_report() -> dict:
-    """Get the most recent daily report."""
-    try:
-        conn = get_db()
+def _latest_saved_report(conn, day: str | None = None) -> dict | None:
+    if day:
+        day_start, day_end = _day_range(day)
+        row = conn.execute('''
+            SELECT details FROM agent_actions_log
+            WHERE action_type = 'coo_report' AND created_at >= ? AND created_at < ?
+            ORDER BY created_at DESC LIMIT 1
+        ''', (day_start, day_end)).fetchone()
+    else:
         row = conn.execute('''
             SELECT details FROM agent_actions_log
             WHERE action_type = 'coo_report'
             ORDER BY created_at DESC LIMIT 1
         ''').fetchone()
-        conn.close()
-        if row:
-            return json.loads(row['details'])
+    if not row:
+        return None
+    try:
+        return json.loads(row['details'])
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def get_latest_report() -> dict:
+    """Get the most recent daily report."""
+    try:
+        conn = get_db()
+        try:
+            return _latest_saved_report(conn)
+        finally:
+            conn.close()
     except Exception:
         pass
     return None
+
+
+def get_report_for_date(day: str) -> dict | None:
+    """Saved report of a past day plus that day's rollup counters."""
+    conn = get_db()
+    try:
+        report = _latest_saved_report(conn, day)
+        rollup = get_rollup(conn, day, day)
+    finally:
+        conn.close()
+    if report is None and not rollup:
+        return None
+    return {'date': day, 'report': report, 'rollup': rollup[0] if rollup else dict.fromkeys(ROLLUP_FIELDS, 0)}
+
+
+def get_history(days: int = 28) -> dict:
+    """Rollup counters for the last `days` days plus week-over-week trend."""
+    today = datetime.now().strftime('%Y-%m-%d')
+    start = (datetime.now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    conn = get_db()
+    try:
+        return {'from': start, 'to': today,
+                'days': get_rollup(conn, start, today),
+                'trends': get_week_over_week(conn, today)}
+    finally:
+        conn.close()
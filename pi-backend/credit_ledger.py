@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Credit ledger: `credits` rows are the ledger, `credit_balances` the
+materialized per-guest totals.
+
+Triggers on credits (INSERT / UPDATE / DELETE) adjust the guest's balance row
+in the same transaction as the ledger write, so every writer — admin routes,
+generic_patch, task confirmation, telegram_agent — keeps it consistent
+without extra code. Balance lookups are a primary-key read instead of a
+SUM over the guest's history.
+
+`reconcile()` recomputes the totals from the ledger and repairs drift (REAL
+rounding, rows edited with triggers disabled); the agent scheduler runs it
+nightly (kind 'credit_reconcile').
+
+Usage:
+    python credit_ledger.py reconcile           # report and repair
+    python credit_ledger.py reconcile --check   # report only, exit 1 on drift
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DB_PATH  # noqa: E402
+
+RUN_HOUR = 3
+TOLERANCE = 0.005  # half a cent
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS credit_balances (
+        guest_email TEXT PRIMARY KEY,
+        total REAL NOT NULL DEFAULT 0,       -- SUM(amount), what invoices deduct
+        earned REAL NOT NULL DEFAULT 0,      -- type = 'earned'
+        redeemed REAL NOT NULL DEFAULT 0,    -- type = 'redeemed'
+        entries INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_credits_email_created ON credits(guest_email, created_at);
+
+    CREATE TRIGGER IF NOT EXISTS trg_credits_balance_ins AFTER INSERT ON credits BEGIN
+        INSERT INTO credit_balances (guest_email, total, earned, redeemed, entries, updated_at)
+        VALUES (NEW.guest_email, NEW.amount,
+                CASE WHEN NEW.type = 'earned' THEN NEW.amount ELSE 0 END,
+                CASE WHEN NEW.type = 'redeemed' THEN NEW.amount ELSE 0 END,
+                1, datetime('now', 'localtime'))
+        ON CONFLICT(guest_email) DO UPDATE SET
+            total = total + excluded.total,
+            earned = earned + excluded.earned,
+            redeemed = redeemed + excluded.redeemed,
+            entries = entries + 1,
+            updated_at = excluded.updated_at;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_credits_balance_del AFTER DELETE ON credits BEGIN
+        UPDATE credit_balances SET
+            total = total - OLD.amount,
+            earned = earned - CASE WHEN OLD.type = 'earned' THEN OLD.amount ELSE 0 END,
+            redeemed = redeemed - CASE WHEN OLD.type = 'redeemed' THEN OLD.amount ELSE 0 END,
+            entries = entries - 1,
+            updated_at = datetime('now', 'localtime')
+        WHERE guest_email = OLD.guest_email;
+        DELETE FROM credit_balances WHERE guest_email = OLD.guest_email AND entries <= 0;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_credits_balance_upd AFTER UPDATE OF guest_email, amount, type ON credits BEGIN
+        UPDATE credit_balances SET
+            total = total - OLD.amount,
+            earned = earned - CASE WHEN OLD.type = 'earned' THEN OLD.amount ELSE 0 END,
+            redeemed = redeemed - CASE WHEN OLD.type = 'redeemed' THEN OLD.amount ELSE 0 END,
+            entries = entries - 1
+        WHERE guest_email = OLD.guest_email;
+        DELETE FROM credit_balances WHERE guest_email = OLD.guest_email AND entries <= 0;
+        INSERT INTO credit_balances (guest_email, total, earned, redeemed, entries, updated_at)
+        VALUES (NEW.guest_email, NEW.amount,
+                CASE WHEN NEW.type = 'earned' THEN NEW.amount ELSE 0 END,
+                CASE WHEN NEW.type = 'redeemed' THEN NEW.amount ELSE 0 END,
+                1, datetime('now', 'localtime'))
+        ON CONFLICT(guest_email) DO UPDATE SET
+            total = total + excluded.total,
+            earned = earned + excluded.earned,
+            redeemed = redeemed + excluded.redeemed,
+            entries = entries + 1,
+            updated_at = excluded.updated_at;
+    END;
+'''
+
+_LEDGER_TOTALS = '''
+    SELECT guest_email,
+           COALESCE(SUM(amount), 0) AS total,
+           COALESCE(SUM(CASE WHEN type = 'earned' THEN amount ELSE 0 END), 0) AS earned,
+           COALESCE(SUM(CASE WHEN type = 'redeemed' THEN amount ELSE 0 END), 0) AS redeemed,
+           COUNT(*) AS entries
+    FROM credits GROUP BY guest_email
+'''
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    conn.executescript(schema)
+    if not conn.execute('SELECT 1 FROM credit_balances LIMIT 1').fetchone():
+        conn.execute(
+            'INSERT INTO credit_balances (guest_email, total, earned, redeemed, entries, updated_at) '
+            f"SELECT *, datetime('now', 'localtime') FROM ({_LEDGER_TOTALS})"
+        )
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def get_balance(conn: sqlite3.Connection, guest_email: str) -> dict:
+    """O(1) balance for one guest. total = SUM(amount) over all entries."""
+    row = conn.execute(
+        'SELECT total, earned, redeemed, entries FROM credit_balances WHERE guest_email = ?',
+        (guest_email,),
+    ).fetchone()
+    if not row:
+        return {'total': 0, 'earned': 0, 'redeemed': 0, 'entries': 0}
+    return {k: (round(row[k], 2) if k != 'entries' else row[k]) for k in row.keys()}
+
+
+def reconcile(conn: sqlite3.Connection, repair: bool = True) -> dict:
+    """Compare credit_balances with the ledger; optionally rewrite drifted rows."""
+    ledger = {r['guest_email']: r for r in conn.execute(_LEDGER_TOTALS)}
+    balances = {r['guest_email']: r for r in conn.execute('SELECT * FROM credit_balances')}
+
+    mismatches = []
+    for email in ledger.keys() | balances.keys():
+        want, have = ledger.get(email), balances.get(email)
+        if want and have and have['entries'] == want['entries'] and all(
+                abs(have[k] - want[k]) <= TOLERANCE for k in ('total', 'earned', 'redeemed')):
+            continue
+        mismatches.append({
+            'guest_email': email,
+            'ledger': {k: want[k] for k in ('total', 'earned', 'redeemed', 'entries')} if want else None,
+            'balance': {k: have[k] for k in ('total', 'earned', 'redeemed', 'entries')} if have else None,
+        })
+
+    if repair and mismatches:
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for m in mismatches:
+            if m['ledger'] is None:
+                conn.execute('DELETE FROM credit_balances WHERE guest_email = ?', (m['guest_email'],))
+            else:
+                want = m['ledger']
+                conn.execute(
+                    'INSERT OR REPLACE INTO credit_balances '
+                    '(guest_email, total, earned, redeemed, entries, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+                    (m['guest_email'], want['total'], want['earned'], want['redeemed'], want['entries'], now),
+                )
+        conn.commit()
+
+    return {'guests': len(ledger), 'mismatches': mismatches, 'repaired': repair and bool(mismatches)}
+
+
+def handle_reconcile(conn: sqlite3.Connection, item, now: datetime) -> dict:
+    """agent_scheduler handler: nightly reconciliation."""
+    from agent_scheduler import schedule, tomorrow_at
+    result = reconcile(conn)
+    if result['mismatches']:
+        print(f"[credit_ledger] repaired {len(result['mismatches'])} balances: "
+              f"{', '.join(m['guest_email'] for m in result['mismatches'][:10])}")
+    schedule(conn, 'credit_reconcile', 0, tomorrow_at(now, RUN_HOUR))
+    return {'action': 'reconciled', 'mismatches': len(result['mismatches'])}
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Credit ledger maintenance')
+    parser.add_argument('command', choices=['reconcile'])
+    parser.add_argument('--check', action='store_true', help='report only, do not repair')
+    args = parser.parse_args(argv)
+    conn = get_db()
+    try:
+        result = reconcile(conn, repair=not args.check)
+    finally:
+        conn.close()
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 1 if args.check and result['mismatches'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
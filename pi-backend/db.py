@@ -0,0 +1,1795 @@
+#!/usr/bin/env python3
+"""
+SQLite schema, migrations and seed data for the Voigt-Garten backend.
+
+Deliberately free of Flask and the media/PDF/email stacks so container start
+can prepare the database in one lightweight process:
+
+    python db.py migrate   # apply pending versioned migrations (see MIGRATIONS)
+    python db.py status    # applied / pending migrations
+    python db.py init      # legacy: create tables only
+    python db.py seed      # initial projects (only if empty)
+"""
+
+import argparse
+import fcntl
+import hashlib
+import importlib
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+from config import DB_PATH
+
+
+def get_db():
+    """Get database connection."""
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def init_db():
+    """Initialize the database."""
+    from werkzeug.security import generate_password_hash  # werkzeug import is ~80ms; only needed here
+    conn = get_db()
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS gallery_images (
+            id TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            original_name TEXT,
+            name TEXT,
+            description TEXT,
+            category TEXT DEFAULT 'sonstiges',
+            type TEXT DEFAULT 'image',
+            size INTEGER,
+            uploaded_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            uploaded_by TEXT,
+            thumbnail_path TEXT,
+            webp_path TEXT,
+            original_path TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guest_name TEXT NOT NULL,
+            guest_email TEXT NOT NULL,
+            guest_phone TEXT,
+            check_in DATE NOT NULL,
+            check_out DATE NOT NULL,
+            guests INTEGER DEFAULT 2,
+            has_pets BOOLEAN DEFAULT 0,
+            total_price REAL NOT NULL,
+            discount_code TEXT,
+            notes TEXT,
+            status TEXT DEFAULT 'pending',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS maintenance_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL,
+            completed_by TEXT NOT NULL,
+            completed_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            notes TEXT,
+            photo_filename TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS credits (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guest_email TEXT NOT NULL,
+            amount REAL NOT NULL,
+            reason TEXT NOT NULL,
+            type TEXT DEFAULT 'earned',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS service_providers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category TEXT NOT NULL,
+            name TEXT NOT NULL,
+            email TEXT,
+            phone TEXT,
+            rating INTEGER DEFAULT 0,
+            notes TEXT,
+            verified BOOLEAN DEFAULT 0
+        );
+
+        -- User management
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            name TEXT,
+            role TEXT DEFAULT 'user',
+            last_login DATETIME,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- Auth tokens for JWT validation
+        CREATE TABLE IF NOT EXISTS auth_tokens (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            token_hash TEXT NOT NULL,
+            expires_at DATETIME NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        );
+
+        -- Projects (dynamische Aufgaben / Kanban)
+        CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            category TEXT NOT NULL,
+            status TEXT DEFAULT 'offen',
+            priority TEXT DEFAULT 'mittel',
+            estimated_cost TEXT,
+            effort TEXT,
+            timeframe TEXT,
+            assigned_to TEXT,
+            completed_at DATETIME,
+            completed_by TEXT,
+            completion_photo TEXT,
+            completion_notes TEXT,
+            confirmed_at DATETIME,
+            confirmed_by TEXT,
+            credit_awarded REAL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            created_by TEXT
+        );
+
+        -- Wiederkehrende Aufgaben (aus wartung.astro migriert)
+        CREATE TABLE IF NOT EXISTS recurring_tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            category TEXT NOT NULL,
+            cycle_days INTEGER NOT NULL,
+            credit_value REAL DEFAULT 0,
+            effort TEXT,
+            next_due DATE,
+            last_completed_at DATETIME,
+            last_completed_by TEXT,
+            is_active BOOLEAN DEFAULT 1,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- Mängelmeldungen von Gästen
+        CREATE TABLE IF NOT EXISTS issue_reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            category TEXT,
+            photo_filename TEXT,
+            reported_by TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            admin_notes TEXT,
+            converted_to_project_id INTEGER,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+    ''')
+    conn.commit()
+
+    # Create main admin if not exists
+    cursor = conn.execute("SELECT id FROM users WHERE email = 'moritzvoigt42@gmail.com'")
+    if not cursor.fetchone():
+        admin_password = os.environ.get('ADMIN_PASSWORD_MORITZ')
+        if admin_password:
+            admin_password_hash = generate_password_hash(admin_password)
+            conn.execute('''
+                INSERT INTO users (email, username, password_hash, name, role)
+                VALUES (?, ?, ?, ?, ?)
+            ''', ('moritzvoigt42@gmail.com', 'MoritzVoigt42', admin_password_hash, 'Moritz Voigt', 'admin'))
+            conn.commit()
+            print("Main admin user created: moritzvoigt42@gmail.com")
+        else:
+            print("WARNING: ADMIN_PASSWORD_MORITZ not set, skipping admin user creation")
+
+    # Create Konny Voigt admin if not exists
+    cursor = conn.execute("SELECT id FROM users WHERE email = 'konny.voigt@web.de'")
+    if not cursor.fetchone():
+        konny_password = os.environ.get('ADMIN_PASSWORD_KONNY')
+        if konny_password:
+            konny_password_hash = generate_password_hash(konny_password)
+            conn.execute('''
+                INSERT INTO users (email, username, password_hash, name, role)
+                VALUES (?, ?, ?, ?, ?)
+            ''', ('konny.voigt@web.de', 'KonnyVoigt', konny_password_hash, 'Konny Voigt', 'admin'))
+            conn.commit()
+            print("Admin user created: konny.voigt@web.de")
+        else:
+            print("WARNING: ADMIN_PASSWORD_KONNY not set, skipping admin user creation")
+
+    # Seed recurring tasks if empty
+    cursor = conn.execute("SELECT COUNT(*) as count FROM recurring_tasks")
+    if cursor.fetchone()['count'] == 0:
+        seed_recurring_tasks(conn)
+
+    conn.close()
+    print("Database initialized")
+
+
+def migrate_db():
+    """Run database migrations."""
+    conn = get_db()
+
+    # Add status column to gallery_images
+    try:
+        conn.execute("ALTER TABLE gallery_images ADD COLUMN status TEXT DEFAULT 'approved'")
+        conn.commit()
+        print("Migration: Added status column to gallery_images")
+    except Exception:
+        pass  # Column already exists
+
+    # Background videos table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS background_videos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            page TEXT UNIQUE NOT NULL,
+            video_path TEXT NOT NULL,
+            thumbnail_path TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Livestream cameras table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS livestream_cameras (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            stream_url TEXT,
+            hls_url TEXT,
+            is_active BOOLEAN DEFAULT 0,
+            privacy_mode BOOLEAN DEFAULT 1,
+            placeholder_image TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Email verification tokens table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS email_verification_tokens (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL,
+            token TEXT UNIQUE NOT NULL,
+            expires_at DATETIME NOT NULL,
+            used BOOLEAN DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Inventory tables
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS inventory_buildings (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            icon TEXT DEFAULT '🏠',
+            has_floors BOOLEAN DEFAULT 0,
+            sort_order INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS inventory_floors (
+            id TEXT PRIMARY KEY,
+            building_id TEXT NOT NULL REFERENCES inventory_buildings(id),
+            name TEXT NOT NULL,
+            icon TEXT DEFAULT '🏢',
+            sort_order INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS inventory_rooms (
+            id TEXT PRIMARY KEY,
+            building_id TEXT NOT NULL REFERENCES inventory_buildings(id),
+            floor_id TEXT REFERENCES inventory_floors(id),
+            name TEXT NOT NULL,
+            icon TEXT DEFAULT '🚪',
+            sort_order INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS inventory_items (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            room_id TEXT REFERENCES inventory_rooms(id),
+            category TEXT,
+            notes TEXT,
+            quantity INTEGER DEFAULT 1,
+            photo_path TEXT,
+            ablageort TEXT,
+            position TEXT,
+            kauflink TEXT,
+            vorhanden BOOLEAN DEFAULT 1,
+            created_by TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS inventory_furniture_meta (
+            room_id TEXT,
+            ablageort TEXT,
+            icon TEXT DEFAULT '🪑',
+            PRIMARY KEY (room_id, ablageort)
+        )
+    ''')
+
+    conn.commit()
+
+    # -- Wartung Phase 0: New columns on projects --
+    for col_stmt in [
+        "ALTER TABLE projects ADD COLUMN parent_task_id INTEGER REFERENCES projects(id)",
+        "ALTER TABLE projects ADD COLUMN start_date DATE",
+        "ALTER TABLE projects ADD COLUMN due_date DATE",
+        "ALTER TABLE projects ADD COLUMN dependencies TEXT DEFAULT '[]'",
+        "ALTER TABLE projects ADD COLUMN assigned_to_list TEXT DEFAULT '[]'",
+    ]:
+        try:
+            conn.execute(col_stmt)
+            conn.commit()
+            print(f"Migration: {col_stmt}")
+        except Exception:
+            pass  # Column already exists
+
+    # Task comments table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS task_comments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL,
+            task_type TEXT NOT NULL,
+            user_email TEXT NOT NULL,
+            user_name TEXT,
+            comment TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+    # -- Garden Map: map_area columns --
+    for col_stmt in [
+        "ALTER TABLE projects ADD COLUMN map_area TEXT",
+        "ALTER TABLE recurring_tasks ADD COLUMN map_area TEXT",
+        "ALTER TABLE inventory_buildings ADD COLUMN map_area TEXT",
+    ]:
+        try:
+            conn.execute(col_stmt)
+            conn.commit()
+            print(f"Migration: {col_stmt}")
+        except Exception:
+            pass  # Column already exists
+
+    # -- Phase 2: Merge recurring_tasks into projects --
+    for col_stmt in [
+        "ALTER TABLE projects ADD COLUMN is_recurring BOOLEAN DEFAULT 0",
+        "ALTER TABLE projects ADD COLUMN cycle_days INTEGER",
+        "ALTER TABLE projects ADD COLUMN credit_value REAL DEFAULT 0",
+    ]:
+        try:
+            conn.execute(col_stmt)
+            conn.commit()
+            print(f"Migration: {col_stmt}")
+        except Exception:
+            pass  # Column already exists
+
+    # -- Worker G (2026-04-18): seasonal_months für Recurring-Saisonalität --
+    for col_stmt in [
+        "ALTER TABLE recurring_tasks ADD COLUMN seasonal_months TEXT DEFAULT '[]'",
+        "ALTER TABLE projects ADD COLUMN seasonal_months TEXT DEFAULT '[]'",
+    ]:
+        try:
+            conn.execute(col_stmt)
+            conn.commit()
+        except Exception:
+            pass  # Column already exists
+
+    # Sync seasonal_months von recurring_tasks auf projects.is_recurring Instanzen
+    try:
+        conn.execute('''
+            UPDATE projects
+               SET seasonal_months = COALESCE((
+                   SELECT seasonal_months FROM recurring_tasks rt
+                    WHERE rt.title = projects.title LIMIT 1
+               ), '[]')
+             WHERE is_recurring = 1
+               AND (seasonal_months IS NULL OR seasonal_months = '[]')
+        ''')
+        conn.commit()
+    except Exception as e:
+        print(f"Seasonal months sync: {e}")
+
+    # Migrate recurring_tasks data into projects (one-time)
+    try:
+        existing = conn.execute("SELECT COUNT(*) as c FROM projects WHERE is_recurring = 1").fetchone()['c']
+        if existing == 0:
+            recurring = conn.execute("SELECT * FROM recurring_tasks").fetchall()
+            for rt in recurring:
+                rt = dict(rt)
+                conn.execute('''
+                    INSERT INTO projects (title, description, category, status, priority, effort,
+                        is_recurring, cycle_days, credit_value, due_date, assigned_to, map_area, created_by)
+                    VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?, 'system-migration')
+                ''', (
+                    rt['title'], rt.get('description'), rt['category'],
+                    'offen' if rt.get('is_active', 1) else 'done',
+                    'mittel', rt.get('effort', 'mittel'),
+                    rt.get('cycle_days', 30), rt.get('credit_value', 0),
+                    rt.get('next_due'), rt.get('assigned_to'), rt.get('map_area')
+                ))
+            conn.commit()
+            if recurring:
+                print(f"Migration: Migrated {len(recurring)} recurring tasks to projects")
+    except Exception as e:
+        print(f"Migration recurring→projects: {e}")
+
+    # Add report_type column to issue_reports
+    try:
+        conn.execute("ALTER TABLE issue_reports ADD COLUMN report_type TEXT DEFAULT 'mangel'")
+        conn.commit()
+        print("Migration: Added report_type column to issue_reports")
+    except Exception:
+        pass  # Column already exists
+
+    # Add Google OAuth columns to users
+    for col_stmt in [
+        "ALTER TABLE users ADD COLUMN google_id TEXT",
+        "ALTER TABLE users ADD COLUMN profile_image_url TEXT",
+    ]:
+        try:
+            conn.execute(col_stmt)
+            conn.commit()
+            print(f"Migration: {col_stmt}")
+        except Exception:
+            pass  # Column already exists
+
+    # Seed inventory if empty
+    seed_inventory(conn)
+
+    # Seed Starlink project if not exists
+    existing = conn.execute("SELECT id FROM projects WHERE title = 'Starlink bestellen, anbringen & einrichten'").fetchone()
+    if not existing:
+        conn.execute('''
+            INSERT INTO projects (title, description, category, status, priority, estimated_cost, effort, timeframe, created_by)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            'Starlink bestellen, anbringen & einrichten',
+            'Komplettpaket Starlink-Internet für den Garten:\n'
+            '1. Starlink Standard Kit bestellen (200€ Setup + 49€/Monat)\n'
+            '2. Schüssel auf Dach/Mast montieren (Südausrichtung, freie Sicht)\n'
+            '3. Stromversorgung sicherstellen (Solar-Erweiterung oder Steckdose im Haus)\n'
+            '4. WLAN-Repeater aufstellen für Gartenabdeckung (z.B. TP-Link Outdoor)\n'
+            '5. Starlink-Schüssel ausrichten (App-gesteuert, automatische Justierung)\n'
+            '6. Überwachungskamera bestellen & anbringen (z.B. Reolink Solar-Cam)\n'
+            '7. Kamera mit WLAN verbinden & App-Setup (Reolink/Tapo App)\n'
+            '8. Fernsteuerung einrichten: Starlink-App + Kamera-App + ggf. Home Assistant\n\n'
+            'Geschätzte Gesamtkosten:\n'
+            '- Starlink Kit: 200€ Setup\n'
+            '- WLAN-Repeater Outdoor: ~50€\n'
+            '- Solar-Kamera: ~100€\n'
+            '- Montagematerial (Mast, Kabel, Kabelbinder): ~50€\n'
+            '- Gesamt: ~400€ einmalig + 49€/Monat',
+            'elektrik',
+            'offen',
+            'hoch',
+            '~400€ einmalig + 49€/Monat',
+            'schwer',
+            '1-2 Wochenenden',
+            'moritzvoigt42@gmail.com'
+        ))
+        conn.commit()
+        print("Seeded Starlink project")
+
+    # NOTE: All task seeds (brainstorming, legal, IT) already in production DB.
+    # Tasks are now managed via API — no more hardcoded seed data.
+
+    # Map area descriptions table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS map_area_descriptions (
+            area_id TEXT PRIMARY KEY,
+            description TEXT NOT NULL DEFAULT '',
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_by TEXT
+        )
+    ''')
+    conn.commit()
+
+    # Seed default area descriptions
+    default_areas = [
+        ('haus', 'Gartenhaus mit Wohnbereich, Küche und Bad'),
+        ('wintergarten', 'Verglaster Wintergarten am Haus'),
+        ('terrasse', 'Terrasse mit Sitzbereich'),
+        ('geraeteschuppen', 'Geräteschuppen mit Gartengeräten'),
+        ('offener-schuppen', 'Offener Schuppen'),
+        ('holzschuppen', 'Holzschuppen für Brennholzlagerung'),
+        ('baumhaus', 'Baumhaus im alten Baumbestand'),
+        ('klo', 'Außentoilette'),
+        ('werkstatt', 'Werkstatt mit Werkzeug und Maschinen'),
+        ('zufahrt', 'Zufahrt zum Grundstück'),
+        ('unterer-eingang', 'Unterer Eingang zum Grundstück'),
+        ('teich', 'Gartenteich'),
+        ('pool', 'Aufstellpool'),
+        ('brunnen', 'Brunnen (50m tief)'),
+        ('wasserbehaelter-mauer', 'Wasserbehälter an der Mauer'),
+        ('baum-wassertank', 'Wassertank am Baum'),
+        ('tonne-geraeteschuppen', 'Regentonne am Geräteschuppen'),
+        ('tonne-schuppen', 'Regentonne am offenen Schuppen'),
+        ('tonne-werkstatt', 'Regentonne an der Werkstatt'),
+        ('tonne-holzschuppen', 'Regentonne am Holzschuppen'),
+        ('unterirdischer-wasserbehaelter', 'Unterirdischer Wasserbehälter/Zisterne'),
+        ('solaranlage', 'Solaranlage 700W + 1,4kWh Akku'),
+        ('solaranlage-speicher', 'Neue Solaranlage mit Speicher'),
+        ('weinberg', 'Weinberg am Südhang'),
+        ('eiche-1', 'Große Eiche (Stammdurchmesser >1m)'),
+        ('eiche-2', 'Zweite große Eiche'),
+        ('terrassen-beet', 'Terrassenbeet'),
+        ('kompost', 'Kompostbereich'),
+        ('oberer-kompost', 'Oberer Kompostbereich'),
+        ('unterer-kompost', 'Unterer Kompostbereich'),
+        ('hecke-mittig', 'Hecke in der Mitte des Grundstücks'),
+        ('rechter-teil', 'Rechter Grundstücksteil'),
+        ('agrar-zukauf', 'Agrarfläche (Zukauf-Option)'),
+    ]
+    for area_id, desc in default_areas:
+        conn.execute(
+            'INSERT OR IGNORE INTO map_area_descriptions (area_id, description) VALUES (?, ?)',
+            (area_id, desc)
+        )
+    conn.commit()
+
+    # Add map_area column to gallery_images
+    try:
+        conn.execute("ALTER TABLE gallery_images ADD COLUMN map_area TEXT")
+        conn.commit()
+        print("Migration: Added map_area column to gallery_images")
+    except Exception:
+        pass  # Column already exists
+
+    # Add map_x, map_y columns to gallery_images for precise photo locations on SVG map
+    for col in ['map_x REAL', 'map_y REAL']:
+        try:
+            conn.execute(f"ALTER TABLE gallery_images ADD COLUMN {col}")
+            conn.commit()
+            print(f"Migration: Added {col.split()[0]} column to gallery_images")
+        except Exception:
+            pass  # Column already exists
+
+    # Garden costs table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS garden_costs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            amount REAL NOT NULL,
+            frequency TEXT DEFAULT 'einmalig',
+            category TEXT,
+            date TEXT,
+            end_date TEXT,
+            is_active BOOLEAN DEFAULT 1,
+            related_project_id INTEGER,
+            created_by TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+    # Seed costs if empty
+    costs_count = conn.execute("SELECT COUNT(*) as c FROM garden_costs").fetchone()['c']
+    if costs_count == 0:
+        conn.execute('''
+            INSERT INTO garden_costs (title, description, amount, frequency, category, is_active, created_by)
+            VALUES (?, ?, ?, ?, ?, 1, 'system')
+        ''', ('Starlink Internet', 'Monatliche Starlink-Gebühr', 49.0, 'monatlich', 'Internet'))
+        conn.execute('''
+            INSERT INTO garden_costs (title, description, amount, frequency, category, is_active, created_by)
+            VALUES (?, ?, ?, ?, ?, 1, 'system')
+        ''', ('Grundstückspacht', 'Jährliche Pacht an Opa', 100.0, 'jährlich', 'Pacht'))
+        conn.commit()
+        print("Seeded garden costs")
+
+
+    # -- Phase 2: New tables --
+
+    # invoices table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS invoices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            booking_id INTEGER REFERENCES bookings(id),
+            invoice_number TEXT UNIQUE NOT NULL,
+            status TEXT DEFAULT 'draft',
+            guest_name TEXT NOT NULL,
+            guest_email TEXT NOT NULL,
+            guest_address TEXT,
+            line_items TEXT,
+            subtotal REAL NOT NULL,
+            credits_applied REAL DEFAULT 0,
+            total REAL NOT NULL,
+            tax_note TEXT DEFAULT 'Gem\u00e4\u00df \u00a7 19 UStG wird keine Umsatzsteuer berechnet.',
+            pdf_path TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            sent_at TEXT,
+            due_date TEXT
+        )
+    ''')
+
+    # pricing_rules table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pricing_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            season_start_month INTEGER NOT NULL,
+            season_end_month INTEGER NOT NULL,
+            nightly_rate REAL NOT NULL,
+            weekend_surcharge REAL DEFAULT 5.0,
+            per_person_base REAL DEFAULT 0,
+            person_discount_factor REAL DEFAULT 0.85,
+            min_nights INTEGER DEFAULT 1,
+            is_active BOOLEAN DEFAULT 1,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # cancellations table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS cancellations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            booking_id INTEGER NOT NULL REFERENCES bookings(id),
+            cancelled_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            cancelled_by TEXT,
+            policy_applied TEXT,
+            refund_percent REAL,
+            refund_amount REAL,
+            reason TEXT
+        )
+    ''')
+
+    # feedback table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            booking_id INTEGER REFERENCES bookings(id),
+            guest_email TEXT NOT NULL,
+            rating INTEGER CHECK(rating BETWEEN 1 AND 5),
+            cleanliness INTEGER CHECK(cleanliness BETWEEN 1 AND 5),
+            communication INTEGER CHECK(communication BETWEEN 1 AND 5),
+            location INTEGER CHECK(location BETWEEN 1 AND 5),
+            accuracy INTEGER CHECK(accuracy BETWEEN 1 AND 5),
+            comment TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            google_review_sent BOOLEAN DEFAULT 0
+        )
+    ''')
+
+    # site_config table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS site_config (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # translations table (i18n cache)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS translations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_text TEXT NOT NULL,
+            target_lang TEXT NOT NULL DEFAULT 'en',
+            translated_text TEXT NOT NULL,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(source_text, target_lang)
+        )
+    ''')
+
+    conn.commit()
+
+    # -- Phase 2: ALTER TABLE migrations for bookings --
+    for col_stmt in [
+        "ALTER TABLE bookings ADD COLUMN terms_accepted BOOLEAN DEFAULT 0",
+        "ALTER TABLE bookings ADD COLUMN privacy_accepted BOOLEAN DEFAULT 0",
+        "ALTER TABLE bookings ADD COLUMN cancellation_policy TEXT",
+        "ALTER TABLE bookings ADD COLUMN invoice_id INTEGER",
+        "ALTER TABLE bookings ADD COLUMN season_rate REAL",
+        "ALTER TABLE bookings ADD COLUMN weekend_nights INTEGER DEFAULT 0",
+        "ALTER TABLE bookings ADD COLUMN person_price REAL",
+    ]:
+        try:
+            conn.execute(col_stmt)
+            conn.commit()
+        except Exception:
+            pass
+
+    # -- Phase 2: ALTER TABLE for map_area_descriptions --
+    try:
+        conn.execute("ALTER TABLE map_area_descriptions ADD COLUMN category TEXT DEFAULT 'natur'")
+        conn.commit()
+        print("Migration: Added category column to map_area_descriptions")
+    except Exception:
+        pass
+
+    # -- Phase 2: Indices --
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_checkin ON bookings(check_in)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_checkout ON bookings(check_out)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_email ON bookings(guest_email)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_inventory_items_room ON inventory_items(room_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_invoices_booking ON invoices(booking_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_invoices_status ON invoices(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_feedback_booking ON feedback(booking_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_lookup ON translations(source_text, target_lang)")
+    conn.commit()
+
+    # Seed pricing rules if empty
+    try:
+        count = conn.execute("SELECT COUNT(*) as c FROM pricing_rules").fetchone()['c']
+        if count == 0:
+            pricing_seeds = [
+                ('Hochsaison', 5, 9, 60.0, 5.0, 0, 0.85, 1),
+                ('Standardsaison Fr\u00fchling', 4, 4, 45.0, 5.0, 0, 0.85, 1),
+                ('Standardsaison Herbst', 10, 10, 45.0, 5.0, 0, 0.85, 1),
+                ('Nebensaison', 11, 3, 30.0, 5.0, 0, 0.85, 2),
+            ]
+            for name, start, end, rate, surcharge, person_base, discount, min_n in pricing_seeds:
+                conn.execute('''
+                    INSERT INTO pricing_rules (name, season_start_month, season_end_month,
+                        nightly_rate, weekend_surcharge, per_person_base, person_discount_factor, min_nights)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (name, start, end, rate, surcharge, person_base, discount, min_n))
+            conn.commit()
+            print("Seeded pricing rules")
+    except Exception as e:
+        print(f"Pricing rules seed: {e}")
+
+    # Seed site_config defaults
+    # WICHTIG: Diese Seeds greifen NUR bei einer frisch angelegten DB (count == 0).
+    # In einer bestehenden Produktions-DB werden existierende Werte NICHT überschrieben.
+    # Nach dem Rebranding zu "Refugium Naturgärten" müssen die Werte in Prod entweder
+    # manuell via SQL oder über das Admin-Settings-UI aktualisiert werden.
+    try:
+        count = conn.execute("SELECT COUNT(*) as c FROM site_config").fetchone()['c']
+        if count == 0:
+            defaults = [
+                # Dachmarke (Firmenname für Rechnungen, Impressum etc.)
+                ('company_name', 'Refugium Naturgärten'),
+                # Standort-Name für Website-Titel, Email-Header etc.
+                ('site_name', 'Refugium Heideland'),
+                ('site_title', 'Refugium Heideland – Refugium Naturgärten'),
+                ('footer_text', 'Refugium Naturgärten · betrieben über Infinity Space'),
+                # Bankverbindung: Platzhalter, müssen im Admin-UI befüllt werden.
+                # HINWEIS: Diese Werte dürfen NICHT falsch sein – lieber Platzhalter
+                # als falsche Kontoinhaber.
+                ('account_holder', '[PLACEHOLDER]'),
+                ('iban', '[PLACEHOLDER]'),
+                ('bic', '[PLACEHOLDER]'),
+                ('address', 'Heideland, Thüringen'),
+                ('tax_number', '[PLACEHOLDER]'),
+                ('email', 'garten@infinityspace42.de'),
+                ('support_email_display', 'Refugium Heideland <garten@infinityspace42.de>'),
+                ('phone', '01652593763'),
+                ('first_year_discount', '42'),
+                ('week_discount', '10'),
+                ('repeat_discount', '15'),
+                ('max_overnight_guests', '6'),
+                ('max_day_guests', '20'),
+                ('family_discount_code', 'REFUGIUM-FAMILY'),
+            ]
+            for key, value in defaults:
+                conn.execute('INSERT INTO site_config (key, value) VALUES (?, ?)', (key, value))
+            conn.commit()
+            print("Seeded site_config")
+    except Exception as e:
+        print(f"Site config seed: {e}")
+
+
+    # -- Categories tables (multi-category support) --
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            label TEXT NOT NULL,
+            emoji TEXT,
+            color TEXT,
+            sort_order INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS project_categories (
+            project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+            category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+            PRIMARY KEY (project_id, category_id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS recurring_task_categories (
+            recurring_task_id INTEGER NOT NULL REFERENCES recurring_tasks(id) ON DELETE CASCADE,
+            category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+            PRIMARY KEY (recurring_task_id, category_id)
+        )
+    ''')
+    conn.commit()
+
+    # Seed categories if empty
+    cat_count = conn.execute("SELECT COUNT(*) as c FROM categories").fetchone()['c']
+    if cat_count == 0:
+        category_seeds = [
+            ('rasen', 'Rasenpflege', '🌿', 'bg-green-100 text-green-800', 0),
+            ('beete', 'Beetarbeiten', '🌻', 'bg-yellow-100 text-yellow-800', 1),
+            ('baeume', 'Bäume & Hecken', '🌳', 'bg-emerald-100 text-emerald-800', 2),
+            ('brennholz', 'Brennholz', '🪵', 'bg-amber-100 text-amber-800', 3),
+            ('elektrik', 'Elektrik', '⚡', 'bg-blue-100 text-blue-800', 4),
+            ('putzen', 'Reinigung', '🧹', 'bg-purple-100 text-purple-800', 5),
+            ('wasser', 'Wasser', '💧', 'bg-cyan-100 text-cyan-800', 6),
+            ('haus', 'Haus', '🏠', 'bg-orange-100 text-orange-800', 7),
+            ('garten', 'Garten', '🌱', 'bg-lime-100 text-lime-800', 8),
+            ('rechtliches', 'Rechtliches', '⚖️', 'bg-rose-100 text-rose-800', 9),
+            ('it', 'IT & Bugs', '💻', 'bg-indigo-100 text-indigo-800', 10),
+            ('sonstiges', 'Sonstiges', '🔧', 'bg-gray-100 text-gray-800', 11),
+        ]
+        for name, label, emoji, color, sort_order in category_seeds:
+            conn.execute(
+                'INSERT INTO categories (name, label, emoji, color, sort_order) VALUES (?, ?, ?, ?, ?)',
+                (name, label, emoji, color, sort_order)
+            )
+        conn.commit()
+        print("Seeded 12 categories")
+
+    # Ensure marketing & infrastructure categories exist (idempotent)
+    conn.execute(
+        "INSERT OR IGNORE INTO categories (name, label, emoji, color, sort_order) VALUES (?, ?, ?, ?, ?)",
+        ('marketing', 'Marketing', '📣', 'bg-pink-100 text-pink-800', 12)
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO categories (name, label, emoji, color, sort_order) VALUES (?, ?, ?, ?, ?)",
+        ('infrastruktur', 'Infrastruktur', '🏗️', 'bg-slate-100 text-slate-800', 13)
+    )
+    conn.commit()
+
+    # Migrate existing TEXT category → junction tables (one-time)
+    try:
+        existing_pc = conn.execute("SELECT COUNT(*) as c FROM project_categories").fetchone()['c']
+        if existing_pc == 0:
+            conn.execute('''
+                INSERT OR IGNORE INTO project_categories (project_id, category_id)
+                SELECT p.id, c.id FROM projects p JOIN categories c ON p.category = c.name
+                WHERE p.category IS NOT NULL
+            ''')
+            conn.commit()
+            migrated = conn.execute("SELECT COUNT(*) as c FROM project_categories").fetchone()['c']
+            if migrated > 0:
+                print(f"Migration: Migrated {migrated} project→category mappings")
+    except Exception as e:
+        print(f"Migration project_categories: {e}")
+
+    try:
+        existing_rtc = conn.execute("SELECT COUNT(*) as c FROM recurring_task_categories").fetchone()['c']
+        if existing_rtc == 0:
+            conn.execute('''
+                INSERT OR IGNORE INTO recurring_task_categories (recurring_task_id, category_id)
+                SELECT rt.id, c.id FROM recurring_tasks rt JOIN categories c ON rt.category = c.name
+                WHERE rt.category IS NOT NULL
+            ''')
+            conn.commit()
+            migrated = conn.execute("SELECT COUNT(*) as c FROM recurring_task_categories").fetchone()['c']
+            if migrated > 0:
+                print(f"Migration: Migrated {migrated} recurring_task→category mappings")
+    except Exception as e:
+        print(f"Migration recurring_task_categories: {e}")
+
+    # Re-categorize "sonstiges" tasks that belong elsewhere
+    try:
+        recategorize_map = {
+            # project_id -> [new_categories]
+            35: ['garten'], 20: ['garten'],       # Werkzeug pflegen
+            36: ['garten'], 21: ['garten'],       # Zaun kontrollieren
+            37: ['garten', 'haus'], 22: ['garten', 'haus'],  # Winterfest machen
+            38: ['garten', 'haus'], 23: ['garten', 'haus'],  # Frühjahrs-Check
+            39: ['rechtliches'],                   # Pachtvertrag mit Opa
+            40: ['rechtliches', 'garten'],         # Oster-Planung
+            41: ['garten'],                        # Baumarkt-Besorgungen
+            43: ['it'],                            # Software-Features
+            44: ['rechtliches'],                   # Rechtliches Backend
+        }
+        for project_id, new_cats in recategorize_map.items():
+            # Check if project exists and is currently 'sonstiges'
+            row = conn.execute('SELECT category FROM projects WHERE id = ?', (project_id,)).fetchone()
+            if row and row['category'] == 'sonstiges':
+                # Update primary category
+                conn.execute('UPDATE projects SET category = ? WHERE id = ?', (new_cats[0], project_id))
+                # Update junction table
+                conn.execute('DELETE FROM project_categories WHERE project_id = ?', (project_id,))
+                for cat_name in new_cats:
+                    cat_row = conn.execute('SELECT id FROM categories WHERE name = ?', (cat_name,)).fetchone()
+                    if cat_row:
+                        conn.execute(
+                            'INSERT OR IGNORE INTO project_categories (project_id, category_id) VALUES (?, ?)',
+                            (project_id, cat_row['id'])
+                        )
+                print(f"Re-categorized project #{project_id} → {new_cats}")
+        conn.commit()
+    except Exception as e:
+        print(f"Re-categorize sonstiges: {e}")
+
+    # Indices for category junction tables
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_project_categories_pid ON project_categories(project_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_project_categories_cid ON project_categories(category_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_recurring_task_categories_rtid ON recurring_task_categories(recurring_task_id)")
+    conn.commit()
+
+    # Job applications table
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            phone TEXT,
+            position TEXT NOT NULL,
+            available_from TEXT,
+            hours_per_week INTEGER,
+            preferred_times TEXT,
+            motivation TEXT,
+            resume_path TEXT,
+            status TEXT DEFAULT 'pending',
+            admin_notes TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_job_applications_status ON job_applications(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_job_applications_created ON job_applications(created_at)")
+    conn.commit()
+
+    # -- Milestones (Roadmap) --
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS milestones (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            target_date DATE,
+            status TEXT DEFAULT 'active',
+            image_path TEXT,
+            sort_order INTEGER DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    try:
+        conn.execute("ALTER TABLE projects ADD COLUMN milestone_id INTEGER REFERENCES milestones(id)")
+        conn.commit()
+        print("Migration: Added milestone_id column to projects")
+    except Exception:
+        pass
+    conn.commit()
+
+    # Seed milestones if empty
+    try:
+        ms_count = conn.execute("SELECT COUNT(*) as c FROM milestones").fetchone()['c']
+        if ms_count == 0:
+            milestone_seeds = [
+                ('Launch 01.05.2026', 'Go-Live als gewerbliche Vermietung', '2026-05-01', 'active', 0),
+                ('Sommer-Saison 2026', 'Start der ersten vollen Saison', '2026-06-21', 'active', 1),
+                ('Pool unten', 'Naturpool im unteren Gartenbereich', None, 'idea', 2),
+                ('Unterirdischer Pool', 'Vision: unterirdischer Pool unter dem Haus', None, 'idea', 3),
+                ('3D-AI-Roadmap-Hintergrund', 'Visualisierte Meilensteine mit nanobanana/video-ai, Antigravity-Scroll-Logik als Roadmap-Hintergrund', None, 'idea', 4),
+            ]
+            for name, desc, target, status, order in milestone_seeds:
+                conn.execute(
+                    'INSERT INTO milestones (name, description, target_date, status, sort_order) VALUES (?, ?, ?, ?, ?)',
+                    (name, desc, target, status, order)
+                )
+            conn.commit()
+            print("Seeded 5 milestones")
+    except Exception as e:
+        print(f"Milestone seed: {e}")
+
+    # Seed 12 Launch-Offline-Tasks if not exists
+    try:
+        existing = conn.execute(
+            "SELECT id FROM projects WHERE title = ? AND category = ?",
+            ('Pachtvertrag unterschreiben', 'launch-offline')
+        ).fetchone()
+        if not existing:
+            launch_ms = conn.execute(
+                "SELECT id FROM milestones WHERE name = 'Launch 01.05.2026'"
+            ).fetchone()
+            launch_ms_id = launch_ms['id'] if launch_ms else None
+
+            offline_tasks = [
+                ('Pachtvertrag unterschreiben',
+                 'Gespräch mit Opa Konrad, formelles Dokument (auch selbst erstellt) unterschreiben. Ohne Pachtvertrag kein gewerblicher Launch und kein Impressum-Umschalten. #impressum-trigger',
+                 'hoch'),
+                ('Schornsteinfeger-Check',
+                 'Schornsteinfeger bestellen, Kaminofen abnehmen lassen. Pflicht für gewerbliche Vermietung.',
+                 'hoch'),
+                ('Versicherungsschutz klären',
+                 'Gewerbehaftpflicht, Gebäudeversicherung und Gästehaftpflicht recherchieren und abschließen.',
+                 'hoch'),
+                ('WC-Upgrade Trockentrenntoilette',
+                 'Plumpsklo durch ökologische Trockentrenntoilette upgraden – Natur pur ohne Kompromisse, Komfort für Gäste.',
+                 'hoch'),
+                ('Job-Anzeigen schalten',
+                 'Kleinanzeigen, MyHammer, Stellenwerk Jena – Minijob-Inserate für Garten-Hilfen & Studenten online stellen.',
+                 'hoch'),
+                ('Hardware-Einkauf (Starlink, Kameras, Elektro)',
+                 'Starlink Kit, Überwachungskameras, Elektro-Material, AUS-Schalter-Hardware bestellen und liefern lassen.',
+                 'hoch'),
+                ('Studenten-Onboarding (Minijob-Anmeldung)',
+                 'Minijob-Zentrale-Anmeldung vorbereiten, SV-Nummern einsammeln, Verträge vorbereiten.',
+                 'hoch'),
+                ('Oster-Familien-Meeting',
+                 'Familien-Meeting Ostern: Kooperationsmodell, Rollen, Nutzungskonzept final abstimmen.',
+                 'mittel'),
+                ('Elektro-Endabnahme (E-Check)',
+                 'Elektriker für professionelle Endabnahme (E-Check) beauftragen. Voraussetzung für gewerbliche Vermietung.',
+                 'mittel'),
+                ('Beschilderung Videoüberwachung + AUS-Schalter montieren',
+                 'DSGVO-konforme Schilder "Videoüberwachung" anbringen, physischen AUS-Schalter im Gartenhaus montieren.',
+                 'mittel'),
+                ('Foto-Shooting Lifestyle',
+                 'Professionelles Foto-Shooting (Deep Work am Starlink, Weinberg, Romantik, Familien) für Marketing und Website.',
+                 'mittel'),
+                ('Gäste-Ordner analog erstellen',
+                 'Physischer Ordner im Gartenhaus: Hausordnung, Notrufnummern, Anleitungen, WLAN-Daten, Karte.',
+                 'niedrig'),
+            ]
+            for title, desc, prio in offline_tasks:
+                conn.execute('''
+                    INSERT INTO projects (title, description, category, status, priority,
+                        created_by, milestone_id)
+                    VALUES (?, ?, 'launch-offline', 'offen', ?, 'system-seed', ?)
+                ''', (title, desc, prio, launch_ms_id))
+            conn.commit()
+            print(f"Seeded 12 launch-offline tasks")
+    except Exception as e:
+        print(f"Launch-offline seed: {e}")
+
+    # Seed impressum_mode if not set
+    try:
+        row = conn.execute("SELECT value FROM site_config WHERE key = 'impressum_mode'").fetchone()
+        if not row:
+            conn.execute(
+                "INSERT INTO site_config (key, value) VALUES (?, ?)",
+                ('impressum_mode', 'pre_lease')
+            )
+            conn.commit()
+    except Exception as e:
+        print(f"Impressum mode seed: {e}")
+
+    # ─── Garten-Agent Phase 1-3: Neue Tabellen ───
+
+    # Agent actions log (Audit-Logging für Chat + CLI-Agent)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS agent_actions_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            action_type TEXT NOT NULL,
+            source TEXT NOT NULL,
+            user_id INTEGER,
+            description TEXT,
+            details TEXT,
+            risk_score REAL DEFAULT 0,
+            success BOOLEAN DEFAULT 1,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Email drafts (Agent erstellt Entwürfe, Admin genehmigt)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS email_drafts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            provider_id INTEGER,
+            recipient_email TEXT NOT NULL,
+            recipient_name TEXT,
+            subject TEXT NOT NULL,
+            body_html TEXT NOT NULL,
+            body_plain TEXT,
+            status TEXT DEFAULT 'pending',
+            approved_by TEXT,
+            approved_at DATETIME,
+            sent_at DATETIME,
+            cc_emails TEXT,
+            telegram_message_id TEXT,
+            notes TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # COO-Anweisungen
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS coo_instructions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            instruction TEXT NOT NULL,
+            priority TEXT DEFAULT 'normal',
+            status TEXT DEFAULT 'pending',
+            result TEXT,
+            received_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            processed_at DATETIME
+        )
+    ''')
+
+    # Agent-Langzeitgedächtnis
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS agent_memory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT,
+            expires_at DATETIME,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(category, key)
+        )
+    ''')
+
+    # Chat-Konversationen (Server-Side History)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS agent_conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT UNIQUE NOT NULL,
+            user_id INTEGER,
+            ip_hash TEXT,
+            role TEXT DEFAULT 'anonymous',
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            last_message_at DATETIME
+        )
+    ''')
+
+    # Chat-Nachrichten
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS agent_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            conversation_id INTEGER NOT NULL REFERENCES agent_conversations(id),
+            role TEXT NOT NULL,
+            content TEXT,
+            tool_name TEXT,
+            tool_args TEXT,
+            tool_result TEXT,
+            tokens_used INTEGER,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Pending agent actions (F.3 Chat-Layer Approval-Gate)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS agent_pending_actions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tool_name TEXT NOT NULL,
+            params_json TEXT NOT NULL,
+            summary TEXT,
+            requested_by_slack_user TEXT,
+            channel_id TEXT,
+            thread_ts TEXT,
+            card_message_ts TEXT,
+            status TEXT DEFAULT 'pending',
+            decided_at TEXT,
+            decided_by TEXT,
+            result_json TEXT,
+            created_at TEXT DEFAULT (datetime('now', 'localtime'))
+        )
+    ''')
+
+    # F.5 Web-Chat Hilfe-Anfragen (Customer-Support-Eskalation)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS web_help_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            user_name TEXT,
+            user_phone TEXT,
+            topic TEXT,
+            urgency TEXT DEFAULT 'normal',
+            chat_context_json TEXT,
+            status TEXT DEFAULT 'pending',
+            email_draft_id INTEGER,
+            slack_card_channel TEXT,
+            slack_card_ts TEXT,
+            created_at TEXT DEFAULT (datetime('now', 'localtime')),
+            analyzed_at TEXT,
+            decided_at TEXT,
+            decided_by TEXT
+        )
+    ''')
+
+    # Indices für Agent-Tabellen
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_actions_type ON agent_actions_log(action_type)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_actions_source ON agent_actions_log(source)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_actions_created ON agent_actions_log(created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_email_drafts_status ON email_drafts(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_conversations_session ON agent_conversations(session_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_messages_conv ON agent_messages(conversation_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_pending_status ON agent_pending_actions(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_web_help_status ON web_help_requests(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_web_help_user_email ON web_help_requests(user_email)")
+    conn.commit()
+
+    # Service-Provider Erweiterungen
+    for col_stmt in [
+        "ALTER TABLE service_providers ADD COLUMN hourly_rate REAL",
+        "ALTER TABLE service_providers ADD COLUMN availability TEXT",
+        "ALTER TABLE service_providers ADD COLUMN specializations TEXT",
+        "ALTER TABLE service_providers ADD COLUMN last_contacted_at DATETIME",
+        "ALTER TABLE service_providers ADD COLUMN preferred_contact TEXT DEFAULT 'email'",
+        "ALTER TABLE service_providers ADD COLUMN contact_notes TEXT",
+    ]:
+        try:
+            conn.execute(col_stmt)
+            conn.commit()
+        except Exception:
+            pass  # Column already exists
+
+    conn.close()
+    print("Database migrations complete")
+
+
+def seed_recurring_tasks(conn):
+    """Seed initial recurring maintenance tasks."""
+    tasks = [
+        # Rasenpflege
+        ('Rasenmähen', 'Gesamter Rasen mähen und Schnittgut entsorgen', 'rasen', 14, 15, 'mittel'),
+        ('Rasenkanten schneiden', 'Kanten entlang der Beete und Wege', 'rasen', 30, 10, 'leicht'),
+        ('Vertikutieren', 'Rasen vertikutieren (Frühjahr/Herbst)', 'rasen', 180, 30, 'schwer'),
+        # Beetarbeiten
+        ('Unkraut jäten', 'Alle Beete von Unkraut befreien', 'beete', 14, 20, 'mittel'),
+        ('Beete mulchen', 'Rindenmulch aufbringen', 'beete', 365, 40, 'schwer'),
+        ('Blumen gießen', 'Bei Trockenheit gießen', 'beete', 3, 5, 'leicht'),
+        # Bäume & Hecken
+        ('Hecke schneiden', 'Hecken in Form schneiden', 'baeume', 90, 35, 'schwer'),
+        ('Obstbaumschnitt', 'Winterschnitt der Obstbäume', 'baeume', 365, 50, 'schwer'),
+        ('Laub harken', 'Laub zusammenharken (Herbst)', 'baeume', 7, 15, 'mittel'),
+        # Brennholz
+        ('Holz hacken', 'Holz für Feuerstelle hacken', 'brennholz', 180, 40, 'schwer'),
+        ('Holz stapeln', 'Gehacktes Holz ordentlich stapeln', 'brennholz', 180, 25, 'mittel'),
+        ('Holzvorrat prüfen', 'Bestand kontrollieren', 'brennholz', 30, 5, 'leicht'),
+        # Elektrik
+        ('Außenbeleuchtung prüfen', 'Alle Lampen testen, defekte austauschen', 'elektrik', 90, 10, 'leicht'),
+        ('Steckdosen prüfen', 'Außensteckdosen auf Funktion prüfen', 'elektrik', 180, 15, 'leicht'),
+        ('E-Check (Elektriker)', 'Professionelle Prüfung - Dienstleister beauftragen', 'elektrik', 730, 0, 'schwer'),
+        # Reinigung
+        ('Gartenhaus putzen', 'Innenreinigung des Gartenhauses', 'putzen', 30, 25, 'mittel'),
+        ('Terrasse reinigen', 'Terrassenplatten abkehren/schrubben', 'putzen', 60, 20, 'mittel'),
+        ('Regenrinnen reinigen', 'Laub aus Regenrinnen entfernen', 'putzen', 180, 20, 'mittel'),
+        ('Fenster putzen', 'Fenster des Gartenhauses reinigen', 'putzen', 90, 15, 'leicht'),
+        # Sonstiges
+        ('Werkzeug pflegen', 'Werkzeuge reinigen und ölen', 'sonstiges', 180, 15, 'leicht'),
+        ('Zaun kontrollieren', 'Zaunpfähle und Latten prüfen', 'sonstiges', 90, 10, 'leicht'),
+        ('Winterfest machen', 'Wasserhahn abstellen, Möbel einräumen (Herbst)', 'sonstiges', 365, 50, 'schwer'),
+        ('Frühjahrs-Check', 'Alles nach dem Winter überprüfen (Frühjahr)', 'sonstiges', 365, 50, 'mittel'),
+    ]
+
+    for title, description, category, cycle_days, credit_value, effort in tasks:
+        # Calculate next_due based on cycle_days from today
+        next_due = (datetime.now() + timedelta(days=cycle_days // 4)).strftime('%Y-%m-%d')
+        conn.execute('''
+            INSERT INTO recurring_tasks (title, description, category, cycle_days, credit_value, effort, next_due)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (title, description, category, cycle_days, credit_value, effort, next_due))
+
+    conn.commit()
+    print(f"Seeded {len(tasks)} recurring tasks")
+
+
+def seed_inventory(conn):
+    """Seed inventory buildings, floors and rooms if empty."""
+    cursor = conn.execute("SELECT COUNT(*) as count FROM inventory_buildings")
+    if cursor.fetchone()['count'] > 0:
+        return
+
+    BUILDINGS = [
+        ('haus', 'Haus', '🏠', True, 0),
+        ('gartenhaus', 'Gartenhäuschen', '🏡', False, 1),
+        ('schuppen1', 'Schuppen 1', '🏚️', False, 2),
+        ('schuppen2', 'Schuppen 2', '🏚️', False, 3),
+        ('werkstatt', 'Werkstatt', '🔧', False, 4),
+        ('carport', 'Carport', '🚗', False, 5),
+    ]
+
+    FLOORS = [
+        ('keller', 'haus', 'Keller', '⬇️', 0),
+        ('erdgeschoss', 'haus', 'Erdgeschoss', '🏠', 1),
+    ]
+
+    ROOMS = [
+        ('schlafzimmer', 'haus', 'erdgeschoss', 'Schlafzimmer', '🛏️', 0),
+        ('flur_eg', 'haus', 'erdgeschoss', 'Flur', '🚶', 1),
+        ('wohnzimmer', 'haus', 'erdgeschoss', 'Wohnzimmer', '🛋️', 2),
+        ('bad', 'haus', 'keller', 'Bad', '🚿', 0),
+        ('flur_keller', 'haus', 'keller', 'Flur', '🚶', 1),
+        ('weinkeller', 'haus', 'keller', 'Weinkeller', '🍷', 2),
+        ('schuppen1_raum', 'schuppen1', None, 'Lagerraum', '📦', 0),
+        ('schuppen2_raum', 'schuppen2', None, 'Lagerraum', '📦', 0),
+        ('werkstatt_raum', 'werkstatt', None, 'Werkstatt', '🔧', 0),
+        ('gartenhaus_raum', 'gartenhaus', None, 'Hauptraum', '🏡', 0),
+        ('carport_raum', 'carport', None, 'Stellplatz', '🚗', 0),
+    ]
+
+    for id, name, icon, has_floors, sort_order in BUILDINGS:
+        conn.execute(
+            'INSERT INTO inventory_buildings (id, name, icon, has_floors, sort_order) VALUES (?, ?, ?, ?, ?)',
+            (id, name, icon, has_floors, sort_order)
+        )
+
+    for id, building_id, name, icon, sort_order in FLOORS:
+        conn.execute(
+            'INSERT INTO inventory_floors (id, building_id, name, icon, sort_order) VALUES (?, ?, ?, ?, ?)',
+            (id, building_id, name, icon, sort_order)
+        )
+
+    for id, building_id, floor_id, name, icon, sort_order in ROOMS:
+        conn.execute(
+            'INSERT INTO inventory_rooms (id, building_id, floor_id, name, icon, sort_order) VALUES (?, ?, ?, ?, ?, ?)',
+            (id, building_id, floor_id, name, icon, sort_order)
+        )
+
+    conn.commit()
+    print("Seeded inventory buildings, floors and rooms")
+
+
+def seed():
+    """Insert the initial infrastructure projects (no-op if projects exist)."""
+    from seed_projects import seed_projects
+    seed_projects()
+
+
+# ============ Versioned Migrations ============
+#
+# Each step runs once, in order, and is recorded in schema_version. Steps must
+# stay idempotent (a crash between the step and its version row re-runs it).
+# New schema changes get a new `_mNNN_*` function appended to MIGRATIONS —
+# never edit a step that has already shipped.
+#
+# Steps that create a helper module's tables run that module's SCHEMA, pinned
+# by checksum to the text the step shipped with (_module_schema). When a
+# module's schema changes, keep the shipped text as SCHEMA_V1 (V2, …) in the
+# module and add a new step for the next version; an edited shipped schema
+# makes the migration fail instead of silently changing what old steps do.
+
+
+def _module_schema(conn, module: str, checksum: str, version: int = 1) -> None:
+    mod = importlib.import_module(module)
+    schema = getattr(mod, f'SCHEMA_V{version}', mod.SCHEMA)
+    if hashlib.sha256(schema.encode()).hexdigest()[:16] != checksum:
+        raise RuntimeError(f'{module} schema differs from the one its migration shipped with — '
+                           f'keep the shipped text as {module}.SCHEMA_V{version} and add a new migration')
+    mod.init_schema(conn, schema)
+
+
+def _m001_initial_schema(conn):
+    init_db()
+
+
+def _m002_legacy_migrations(conn):
+    migrate_db()
+
+
+def _m003_seed_projects(conn):
+    seed()
+
+
+def _m004_shared_counters(conn):
+    _module_schema(conn, 'shared_state', 'daeb0b9a9f64184d')
+
+
+def _add_columns(conn, statements):
+    for col_stmt in statements:
+        try:
+            conn.execute(col_stmt)
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
+
+def _m005_agent_escalation(conn):
+    """Garten-Agent schema (docs/AGENT_CONCEPT.md §5), referenced by agent_escalation/agent_worker."""
+    _add_columns(conn, [
+        "ALTER TABLE service_providers ADD COLUMN default_for_categories TEXT DEFAULT '[]'",
+        "ALTER TABLE service_providers ADD COLUMN agent_disabled BOOLEAN DEFAULT 0",
+        "ALTER TABLE service_providers ADD COLUMN last_agent_action_at DATETIME",
+        "ALTER TABLE projects ADD COLUMN escalation_state TEXT",
+        "ALTER TABLE projects ADD COLUMN last_escalation_at TIMESTAMP",
+    ])
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS agent_escalation_state (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL UNIQUE,
+            current_stage INTEGER,
+            last_action_at TIMESTAMP,
+            next_action_at TIMESTAMP,
+            cancelled BOOLEAN DEFAULT 0,
+            cancel_reason TEXT,
+            created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+            updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+            FOREIGN KEY (task_id) REFERENCES projects(id)
+        )
+    ''')
+    # Tables created by hand from the concept doc may lack the UNIQUE constraint
+    # that the worker's batched ON CONFLICT(task_id) upsert relies on.
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_escalation_task ON agent_escalation_state(task_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalation_next_action ON agent_escalation_state(next_action_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_escalation_cancelled ON agent_escalation_state(cancelled)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_projects_status_due ON projects(status, due_date)")
+
+
+def _m006_agent_schedule(conn):
+    """Event queue for agent_scheduler.py.
+
+    Triggers are the change hook: any write that can move a due time (from the
+    routes, telegram_agent, agent_tools or the shell) re-queues the item as due
+    now; the scheduler then re-evaluates it and stores the real next due time.
+    """
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS agent_schedule (
+            kind TEXT NOT NULL,
+            ref_id INTEGER NOT NULL,
+            due_at TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, ref_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_agent_schedule_due ON agent_schedule(due_at);
+
+        CREATE TRIGGER IF NOT EXISTS trg_schedule_project_ins AFTER INSERT ON projects
+        WHEN NEW.due_date IS NOT NULL BEGIN
+            INSERT OR REPLACE INTO agent_schedule (kind, ref_id, due_at)
+            VALUES ('escalation', NEW.id, datetime('now', 'localtime'));
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_schedule_project_upd
+        AFTER UPDATE OF status, due_date, category ON projects BEGIN
+            INSERT OR REPLACE INTO agent_schedule (kind, ref_id, due_at)
+            VALUES ('escalation', NEW.id, datetime('now', 'localtime'));
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_schedule_project_del AFTER DELETE ON projects BEGIN
+            DELETE FROM agent_schedule WHERE kind = 'escalation' AND ref_id = OLD.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_schedule_recurring_ins AFTER INSERT ON recurring_tasks BEGIN
+            INSERT OR REPLACE INTO agent_schedule (kind, ref_id, due_at)
+            VALUES ('recurring', NEW.id, datetime('now', 'localtime'));
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_schedule_recurring_upd
+        AFTER UPDATE OF next_due, is_active ON recurring_tasks BEGIN
+            INSERT OR REPLACE INTO agent_schedule (kind, ref_id, due_at)
+            VALUES ('recurring', NEW.id, datetime('now', 'localtime'));
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_schedule_recurring_del AFTER DELETE ON recurring_tasks BEGIN
+            DELETE FROM agent_schedule WHERE kind = 'recurring' AND ref_id = OLD.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_schedule_invoice_ins AFTER INSERT ON invoices BEGIN
+            INSERT OR REPLACE INTO agent_schedule (kind, ref_id, due_at)
+            VALUES ('payment', NEW.id, datetime('now', 'localtime'));
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_schedule_invoice_upd
+        AFTER UPDATE OF status, due_date ON invoices BEGIN
+            INSERT OR REPLACE INTO agent_schedule (kind, ref_id, due_at)
+            VALUES ('payment', NEW.id, datetime('now', 'localtime'));
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_schedule_invoice_del AFTER DELETE ON invoices BEGIN
+            DELETE FROM agent_schedule WHERE kind = 'payment' AND ref_id = OLD.id;
+        END;
+    ''')
+    # Seed the queue with everything that may need action; the scheduler
+    # computes the real due times on its first pass.
+    conn.executescript('''
+        INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at)
+            SELECT 'escalation', id, datetime('now', 'localtime') FROM projects
+            WHERE COALESCE(status, 'offen') = 'offen' AND due_date IS NOT NULL;
+        INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at)
+            SELECT 'recurring', id, datetime('now', 'localtime') FROM recurring_tasks
+            WHERE is_active = 1 AND next_due IS NOT NULL;
+        INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at)
+            SELECT 'payment', id, datetime('now', 'localtime') FROM invoices WHERE status = 'sent';
+    ''')
+
+
+def _m007_coo_rollup(conn):
+    """Daily rollup + change counter for coo_reporting, and indexes for its range queries."""
+    _add_columns(conn, ["ALTER TABLE issue_reports ADD COLUMN updated_at DATETIME"])
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS coo_daily_rollup (
+            day TEXT PRIMARY KEY,
+            tasks_done INTEGER NOT NULL DEFAULT 0,
+            bookings_new INTEGER NOT NULL DEFAULT 0,
+            drafts_created INTEGER NOT NULL DEFAULT 0,
+            issues_opened INTEGER NOT NULL DEFAULT 0,
+            issues_closed INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+
+        -- Bumped by triggers; caches compare it instead of re-reading the tables
+        CREATE TABLE IF NOT EXISTS data_versions (
+            scope TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+        INSERT OR IGNORE INTO data_versions (scope, version) VALUES ('coo', 0);
+
+        CREATE INDEX IF NOT EXISTS idx_projects_status_updated ON projects(status, updated_at);
+        CREATE INDEX IF NOT EXISTS idx_bookings_status ON bookings(status);
+        CREATE INDEX IF NOT EXISTS idx_issue_reports_status ON issue_reports(status, created_at);
+        CREATE INDEX IF NOT EXISTS idx_issue_reports_updated ON issue_reports(updated_at);
+        CREATE INDEX IF NOT EXISTS idx_agent_actions_type_created ON agent_actions_log(action_type, created_at);
+
+        CREATE TRIGGER IF NOT EXISTS trg_issue_reports_touch AFTER UPDATE OF status ON issue_reports BEGIN
+            UPDATE issue_reports SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_task_done AFTER UPDATE OF status ON projects
+        WHEN NEW.status = 'done' AND OLD.status IS NOT 'done' BEGIN
+            INSERT INTO coo_daily_rollup (day, tasks_done) VALUES (date('now', 'localtime'), 1)
+            ON CONFLICT(day) DO UPDATE SET tasks_done = tasks_done + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_booking AFTER INSERT ON bookings BEGIN
+            INSERT INTO coo_daily_rollup (day, bookings_new) VALUES (date('now', 'localtime'), 1)
+            ON CONFLICT(day) DO UPDATE SET bookings_new = bookings_new + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_draft AFTER INSERT ON email_drafts BEGIN
+            INSERT INTO coo_daily_rollup (day, drafts_created) VALUES (date('now', 'localtime'), 1)
+            ON CONFLICT(day) DO UPDATE SET drafts_created = drafts_created + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_issue_new AFTER INSERT ON issue_reports BEGIN
+            INSERT INTO coo_daily_rollup (day, issues_opened) VALUES (date('now', 'localtime'), 1)
+            ON CONFLICT(day) DO UPDATE SET issues_opened = issues_opened + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_issue_closed AFTER UPDATE OF status ON issue_reports
+        WHEN NEW.status IN ('resolved', 'approved', 'rejected') AND OLD.status IN ('pending', 'open') BEGIN
+            INSERT INTO coo_daily_rollup (day, issues_closed) VALUES (date('now', 'localtime'), 1)
+            ON CONFLICT(day) DO UPDATE SET issues_closed = issues_closed + 1;
+        END;
+    ''')
+    for table in ('projects', 'bookings', 'email_drafts', 'issue_reports'):
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_coo_version_{table}_{event.lower()} AFTER {event} ON {table} BEGIN
+                    UPDATE data_versions SET version = version + 1 WHERE scope = 'coo';
+                END
+            ''')
+
+    # Backfill history from what the tables still know
+    conn.executescript('''
+        INSERT OR IGNORE INTO coo_daily_rollup (day) SELECT DISTINCT substr(updated_at, 1, 10) FROM projects
+            WHERE status = 'done' AND updated_at IS NOT NULL;
+        INSERT OR IGNORE INTO coo_daily_rollup (day) SELECT DISTINCT substr(created_at, 1, 10) FROM bookings
+            WHERE created_at IS NOT NULL;
+        INSERT OR IGNORE INTO coo_daily_rollup (day) SELECT DISTINCT substr(created_at, 1, 10) FROM email_drafts
+            WHERE created_at IS NOT NULL;
+        INSERT OR IGNORE INTO coo_daily_rollup (day) SELECT DISTINCT substr(created_at, 1, 10) FROM issue_reports
+            WHERE created_at IS NOT NULL;
+        UPDATE coo_daily_rollup SET
+            tasks_done = (SELECT COUNT(*) FROM projects WHERE status = 'done'
+                          AND updated_at >= coo_daily_rollup.day AND updated_at < date(coo_daily_rollup.day, '+1 day')),
+            bookings_new = (SELECT COUNT(*) FROM bookings
+                            WHERE created_at >= coo_daily_rollup.day AND created_at < date(coo_daily_rollup.day, '+1 day')),
+            drafts_created = (SELECT COUNT(*) FROM email_drafts
+                              WHERE created_at >= coo_daily_rollup.day AND created_at < date(coo_daily_rollup.day, '+1 day')),
+            issues_opened = (SELECT COUNT(*) FROM issue_reports
+                             WHERE created_at >= coo_daily_rollup.day AND created_at < date(coo_daily_rollup.day, '+1 day'));
+    ''')
+
+
+def _m008_action_log_rollup(conn):
+    _module_schema(conn, 'action_log', '47a9509b3fe8be3f')
+    # Daily retention run through the agent scheduler (kind 'retention', see action_log.py)
+    conn.execute(
+        "INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at) VALUES ('retention', 0, datetime('now', 'localtime'))"
+    )
+
+
+def _m009_credit_balances(conn):
+    _module_schema(conn, 'credit_ledger', '53859c26706f3f88')
+    conn.execute(
+        "INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at) "
+        "VALUES ('credit_reconcile', 0, datetime('now', 'localtime'))"
+    )
+
+
+def _m010_search_index(conn):
+    _module_schema(conn, 'search_index', '8e1f0e858baebff7')
+
+
+def _m011_inventory_version(conn):
+    _module_schema(conn, 'inventory_tree', '6187787a547f893c')
+
+
+def _m012_map_index(conn):
+    _module_schema(conn, 'map_index', '99a70cedb045d598')
+
+
+def _m013_map_area_stats(conn):
+    # 012's per-request cache of /api/map/areas is replaced by the materialized table
+    for table in ('projects', 'recurring_tasks', 'inventory_buildings', 'inventory_rooms',
+                  'inventory_items', 'gallery_images', 'map_area_descriptions'):
+        for event in ('insert', 'update', 'delete'):
+            conn.execute(f'DROP TRIGGER IF EXISTS trg_map_areas_version_{table}_{event}')
+    conn.execute("DELETE FROM data_versions WHERE scope = 'map_areas'")
+    _module_schema(conn, 'map_area_stats', 'f9b9b131d5c6132c')
+    conn.execute(
+        "INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at) "
+        "VALUES ('map_area_status', 0, datetime('now', 'localtime'))"
+    )
+
+
+def _m014_change_feed(conn):
+    _module_schema(conn, 'change_feed', '684081e87ed26a6a')
+    conn.execute(
+        "INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at) "
+        "VALUES ('change_log', 0, datetime('now', 'localtime'))"
+    )
+
+
+def _m015_panorama_tiles(conn):
+    # JSON multiRes config from panorama_tiles.py (NULL = not generated yet)
+    _add_columns(conn, ['ALTER TABLE gallery_images ADD COLUMN multires TEXT'])
+
+
+def _m016_blob_store(conn):
+    _module_schema(conn, 'storage', '273bf6acd1155fce')
+
+
+def _m017_image_hash(conn):
+    # 64-bit dHash (signed) + nearest match at upload time
+    _add_columns(conn, [
+        'ALTER TABLE gallery_images ADD COLUMN phash INTEGER',
+        'ALTER TABLE gallery_images ADD COLUMN near_duplicate_of TEXT',
+    ])
+    _module_schema(conn, 'image_hash', 'df3797298d9e6717')
+
+
+def _m018_upload_sessions(conn):
+    _module_schema(conn, 'upload_sessions', '3332d1e87bf3a77e')
+    conn.execute(
+        "INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at) "
+        "VALUES ('upload_sessions', 0, datetime('now', 'localtime'))"
+    )
+
+
+def _m019_image_meta(conn):
+    # Capture metadata from EXIF/ffprobe (image_meta.py)
+    _add_columns(conn, [f'ALTER TABLE gallery_images ADD COLUMN {col}' for col in (
+        'taken_at TEXT', 'width INTEGER', 'height INTEGER', 'orientation INTEGER',
+        'camera TEXT', 'gps_lat REAL', 'gps_lon REAL')])
+    _module_schema(conn, 'image_meta', '42f0517c5e36ef2b')
+
+
+def _m020_gallery_import(conn):
+    _module_schema(conn, 'gallery_import', '477d351b6c3dacae')
+
+
+def _m021_storage_audit(conn):
+    conn.execute(
+        "INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at) "
+        "VALUES ('storage_audit', 0, datetime('now', 'localtime'))"
+    )
+
+
+def _m022_media_backfill(conn):
+    _module_schema(conn, 'media_backfill', '41cb133df2ae9ad1')
+    # Backfills start.sh ran on every boot: now once, through the scheduler
+    conn.execute(
+        "INSERT OR IGNORE INTO agent_schedule (kind, ref_id, due_at) "
+        "VALUES ('media_backfill', 0, datetime('now', 'localtime'))"
+    )
+
+
+def _m023_search_trigram(conn):
+    # Substring search ("kiste" → "Schlüsselkiste") for the list endpoints
+    _module_schema(conn, 'search_index', '1ba81e0e9d2956a6', version=2)
+
+
+MIGRATIONS = [
+    (1, 'initial_schema', _m001_initial_schema),
+    (2, 'legacy_migrations', _m002_legacy_migrations),
+    (3, 'seed_projects', _m003_seed_projects),
+    (4, 'shared_counters', _m004_shared_counters),
+    (5, 'agent_escalation', _m005_agent_escalation),
+    (6, 'agent_schedule', _m006_agent_schedule),
+    (7, 'coo_rollup', _m007_coo_rollup),
+    (8, 'action_log_rollup', _m008_action_log_rollup),
+    (9, 'credit_balances', _m009_credit_balances),
+    (10, 'search_index', _m010_search_index),
+    (11, 'inventory_version', _m011_inventory_version),
+    (12, 'map_index', _m012_map_index),
+    (13, 'map_area_stats', _m013_map_area_stats),
+    (14, 'change_feed', _m014_change_feed),
+    (15, 'panorama_tiles', _m015_panorama_tiles),
+    (16, 'blob_store', _m016_blob_store),
+    (17, 'image_hash', _m017_image_hash),
+    (18, 'upload_sessions', _m018_upload_sessions),
+    (19, 'image_meta', _m019_image_meta),
+    (20, 'gallery_import', _m020_gallery_import),
+    (21, 'storage_audit', _m021_storage_audit),
+    (22, 'media_backfill', _m022_media_backfill),
+    (23, 'search_trigram', _m023_search_trigram),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn) -> int:
+    """Highest applied migration, 0 for a fresh or pre-versioning database."""
+    try:
+        row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] or 0
+
+
+def upgrade() -> int:
+    """Apply pending migrations. A fully migrated DB costs one SELECT."""
+    conn = get_db()
+    try:
+        if current_version(conn) >= LATEST_VERSION:
+            return 0
+    finally:
+        conn.close()
+
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    # Serialise concurrent upgrades (start.sh + both gunicorn workers)
+    with open(DB_PATH + '.migrate.lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        conn = get_db()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TEXT NOT NULL,
+                    duration_ms REAL
+                )
+            ''')
+            conn.commit()
+            version = current_version(conn)
+            applied = 0
+            for step_version, name, step in MIGRATIONS:
+                if step_version <= version:
+                    continue
+                started = time.perf_counter()
+                step(conn)
+                conn.commit()
+                duration_ms = (time.perf_counter() - started) * 1000
+                conn.execute(
+                    'INSERT INTO schema_version (version, name, applied_at, duration_ms) VALUES (?, ?, ?, ?)',
+                    (step_version, name, datetime.now().isoformat(), round(duration_ms, 1))
+                )
+                conn.commit()
+                applied += 1
+                print(f"[db] migration {step_version:03d} {name} applied in {duration_ms:.0f}ms")
+            return applied
+        finally:
+            conn.close()
+
+
+def status():
+    conn = get_db()
+    try:
+        version = current_version(conn)
+        rows = conn.execute('SELECT * FROM schema_version ORDER BY version').fetchall() if version else []
+    finally:
+        conn.close()
+    for row in rows:
+        print(f"{row['version']:03d} {row['name']:<24} {row['applied_at']}  {row['duration_ms']}ms")
+    pending = [f"{v:03d} {n}" for v, n, _ in MIGRATIONS if v > version]
+    print(f"schema version {version}/{LATEST_VERSION}" + (f", pending: {', '.join(pending)}" if pending else ''))
+
+
+COMMANDS = {
+    'init': init_db,
+    'migrate': upgrade,
+    'seed': seed,
+    'status': status,
+    'all': upgrade,  # kept for older start scripts; seeding is migration 003
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Voigt-Garten database setup')
+    parser.add_argument('command', choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    COMMANDS[args.command]()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
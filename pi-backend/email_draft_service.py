@@ -93,8 +93,7 @@ def approve_draft(draft_id: int, approved_by: str = 'admin') -> dict:
 
     # Send email via Resend
     try:
-        from email_service import FROM_EMAIL
-        import resend
+        from email_service import FROM_EMAIL, resend_client
 
         cc_list = json.loads(draft['cc_emails']) if draft['cc_emails'] else []
 
@@ -109,7 +108,7 @@ def approve_draft(draft_id: int, approved_by: str = 'admin') -> dict:
         if draft['body_plain']:
             params['text'] = draft['body_plain']
 
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
 
         now = datetime.now().isoformat()
         conn.execute('''
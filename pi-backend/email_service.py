@@ -5,11 +5,10 @@ Uses Resend API for transactional emails.
 
 import os
 import sqlite3
-import resend
 from datetime import datetime
 
 # Resend API Key from environment
-resend.api_key = os.environ.get('RESEND_API_KEY', '')
+RESEND_API_KEY = os.environ.get('RESEND_API_KEY', '')
 
 # Sender & Admin
 FROM_EMAIL = "Refugium Heideland <garten@infinityspace42.de>"
@@ -19,11 +18,18 @@ DATA_DIR = os.environ.get('DATA_DIR', os.path.join(os.path.dirname(__file__)))
 DB_PATH = os.path.join(DATA_DIR, 'garten.db')
 
 
+def resend_client():
+    """Import the Resend SDK on first send (it pulls in requests) and configure the key."""
+    import resend
+    resend.api_key = RESEND_API_KEY
+    return resend
+
+
 def send_email_via_resend(to: str, subject: str, html: str,
                           text: str | None = None,
                           reply_to: str | None = None) -> bool:
     """Generic Resend wrapper used by web_help_service (F.5)."""
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured")
         return False
     try:
@@ -36,7 +42,7 @@ def send_email_via_resend(to: str, subject: str, html: str,
         }
         if text:
             params["text"] = text
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         return True
     except Exception as e:
         print(f"send_email_via_resend error: {e}")
@@ -80,7 +86,7 @@ def _email_footer() -> str:
 
 def send_booking_confirmation(booking_data: dict) -> bool:
     """Send booking confirmation to guest with payment info and cancellation policy."""
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured")
         return False
 
@@ -154,7 +160,7 @@ def send_booking_confirmation(booking_data: dict) -> bool:
             "reply_to": ADMIN_EMAIL
         }
 
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         print(f"Booking confirmation sent to {booking_data['email']}")
         return True
     except Exception as e:
@@ -171,7 +177,7 @@ def send_infiniloop_magic_link(
     erreichen. Die App verschickt die Mail mit dem Magic-Link, damit der Reporter
     Rueckfragen beantworten kann, ohne einen Slack-Account zu brauchen.
     """
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured – infiniloop magic link nicht verschickt")
         return False
 
@@ -218,7 +224,7 @@ def send_infiniloop_magic_link(
             {_email_footer()}""",
             "reply_to": ADMIN_EMAIL,
         }
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         print(f"InfiniLoop magic link sent to {email}")
         return True
     except Exception as e:
@@ -228,7 +234,7 @@ def send_infiniloop_magic_link(
 
 def send_booking_notification_to_admin(booking_data: dict) -> bool:
     """Notify admin about new booking."""
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured")
         return False
 
@@ -263,7 +269,7 @@ def send_booking_notification_to_admin(booking_data: dict) -> bool:
             """
         }
 
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         print("Admin notification sent")
         return True
     except Exception as e:
@@ -273,7 +279,7 @@ def send_booking_notification_to_admin(booking_data: dict) -> bool:
 
 def send_activity_notification(activity_type: str, details: dict) -> bool:
     """Send notification to admin about user activity on the site."""
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured")
         return False
 
@@ -313,7 +319,7 @@ def send_activity_notification(activity_type: str, details: dict) -> bool:
             """
         }
 
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         print(f"Activity notification sent: {activity_type}")
         return True
     except Exception as e:
@@ -323,7 +329,7 @@ def send_activity_notification(activity_type: str, details: dict) -> bool:
 
 def send_maintenance_reminder(task_title: str, days_overdue: int) -> bool:
     """Send maintenance reminder to admin."""
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured")
         return False
 
@@ -352,7 +358,7 @@ def send_maintenance_reminder(task_title: str, days_overdue: int) -> bool:
             """
         }
 
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         return True
     except Exception as e:
         print(f"Email error: {e}")
@@ -361,7 +367,7 @@ def send_maintenance_reminder(task_title: str, days_overdue: int) -> bool:
 
 def send_magic_link_email(email: str, token: str, name: str = None) -> bool:
     """Send magic link email for registration/login."""
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured")
         return False
 
@@ -406,7 +412,7 @@ def send_magic_link_email(email: str, token: str, name: str = None) -> bool:
             "reply_to": ADMIN_EMAIL
         }
 
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         print(f"Magic link email sent to {email}")
         return True
     except Exception as e:
@@ -416,7 +422,7 @@ def send_magic_link_email(email: str, token: str, name: str = None) -> bool:
 
 def send_welcome_email(email: str, name: str) -> bool:
     """Send welcome email after successful registration."""
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured")
         return False
 
@@ -468,7 +474,7 @@ def send_welcome_email(email: str, name: str) -> bool:
             "reply_to": ADMIN_EMAIL
         }
 
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         print(f"Welcome email sent to {email}")
         return True
     except Exception as e:
@@ -478,7 +484,7 @@ def send_welcome_email(email: str, name: str) -> bool:
 
 def send_feedback_request(email: str, name: str, booking_id: int) -> bool:
     """Send feedback request email 1 day after check-out."""
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured")
         return False
 
@@ -512,7 +518,7 @@ def send_feedback_request(email: str, name: str, booking_id: int) -> bool:
             "reply_to": ADMIN_EMAIL
         }
 
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         print(f"Feedback request sent to {email}")
         return True
     except Exception as e:
@@ -522,7 +528,7 @@ def send_feedback_request(email: str, name: str, booking_id: int) -> bool:
 
 def send_google_review_followup(email: str, name: str) -> bool:
     """Send Google review request to guests who gave 4-5 star feedback."""
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured")
         return False
 
@@ -559,7 +565,7 @@ def send_google_review_followup(email: str, name: str) -> bool:
             "reply_to": ADMIN_EMAIL
         }
 
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         print(f"Google review followup sent to {email}")
         return True
     except Exception as e:
@@ -580,7 +586,7 @@ RECLAIM_BOOKING_URL = "https://app.reclaim.ai/m/moritz-voigt/flexible-quick-meet
 
 def send_application_confirmation(app_data: dict) -> bool:
     """Send application confirmation to applicant with Reclaim booking link."""
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured")
         return False
 
@@ -638,7 +644,7 @@ def send_application_confirmation(app_data: dict) -> bool:
             "reply_to": ADMIN_EMAIL
         }
 
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         print(f"Application confirmation sent to {app_data['email']}")
         return True
     except Exception as e:
@@ -648,7 +654,7 @@ def send_application_confirmation(app_data: dict) -> bool:
 
 def send_application_notification_admin(app_data: dict) -> bool:
     """Notify admin about new job application."""
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured")
         return False
 
@@ -708,7 +714,7 @@ def send_application_notification_admin(app_data: dict) -> bool:
             "reply_to": email if email != '-' else ADMIN_EMAIL
         }
 
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         print(f"Admin application notification sent for {name}")
         return True
     except Exception as e:
@@ -727,7 +733,7 @@ def _email_footer_refugium() -> str:
 
 def send_payment_reminder(booking_data: dict, days_since: int = 7) -> bool:
     """Send payment reminder to guest."""
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured")
         return False
 
@@ -770,7 +776,7 @@ def send_payment_reminder(booking_data: dict, days_since: int = 7) -> bool:
             "reply_to": ADMIN_EMAIL
         }
 
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         print(f"Payment reminder sent to {booking_data['email']}")
         return True
     except Exception as e:
@@ -784,7 +790,7 @@ def send_provider_reminder(provider: dict, task: dict, days_overdue: int) -> boo
     Template-based (no LLM content) to avoid prompt-injection risk.
     Contact info (Konny's phone) is included for questions.
     """
-    if not resend.api_key:
+    if not RESEND_API_KEY:
         print("RESEND_API_KEY not configured — skipping provider reminder")
         return False
 
@@ -855,7 +861,7 @@ def send_provider_reminder(provider: dict, task: dict, days_overdue: int) -> boo
             {_email_footer()}"""
         }
 
-        resend.Emails.send(params)
+        resend_client().Emails.send(params)
         print(f"Provider reminder sent to {provider['email']} for task {task.get('id')}")
         return True
     except Exception as e:
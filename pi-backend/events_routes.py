@@ -0,0 +1,136 @@
+"""Live board updates as Server-Sent Events (change feed, see change_feed.py)."""
+
+import json
+import os
+import threading
+import time
+
+from flask import Blueprint, Response, request, jsonify
+
+from db import get_db
+from extensions import limiter
+from auth import get_current_user, require_auth, create_scoped_token, verify_scoped_token
+import change_feed
+
+bp = Blueprint('events', __name__)
+
+# Streams end after this long; EventSource reconnects with Last-Event-ID,
+# which keeps gthread workers from being held by stale tabs forever.
+STREAM_SECONDS = int(os.environ.get('CHANGE_FEED_STREAM_SECONDS', 300))
+KEEPALIVE_SECONDS = 15
+RETRY_MS = 3000
+# Every open stream holds a gthread thread: cap them per worker so the
+# regular API keeps threads to serve (start.sh: GUNICORN_THREADS per worker)
+MAX_STREAMS = int(os.environ.get('CHANGE_FEED_MAX_STREAMS', 4))
+# ?token= lands in access logs, so it only takes a short-lived stream token
+STREAM_TOKEN_SECONDS = 60
+STREAM_TOKEN_SCOPE = 'events'
+BUSY_RETRY_SECONDS = 30
+
+_streams = threading.BoundedSemaphore(MAX_STREAMS)
+
+
+def _user():
+    # EventSource cannot send an Authorization header -> ?token= as fallback
+    user = get_current_user()
+    if not user and request.args.get('token'):
+        user = verify_scoped_token(request.args['token'], STREAM_TOKEN_SCOPE)
+    return user
+
+
+def _visible(event: dict, is_admin: bool) -> bool:
+    if is_admin:
+        return True
+    if event['topic'] in change_feed.ADMIN_TOPICS:
+        return False
+    if event['topic'] == 'gallery':
+        # Pending uploads are admin-only; a delete of a pending image too
+        return (event['data'] or {}).get('status') == 'approved'
+    return True
+
+
+def _format(event: dict) -> str:
+    payload = json.dumps({k: event[k] for k in ('entity', 'entity_id', 'action', 'data', 'at')},
+                         ensure_ascii=False, separators=(',', ':'))
+    return f"id: {event['id']}\nevent: {event['topic']}\ndata: {payload}\n\n"
+
+
+@bp.route('/api/events/token', methods=['POST'])
+@require_auth
+def event_stream_token(user):
+    """Stream token for ?token= on /api/events (valid STREAM_TOKEN_SECONDS to connect)."""
+    return jsonify({
+        'token': create_scoped_token(user, STREAM_TOKEN_SCOPE, STREAM_TOKEN_SECONDS),
+        'expires_in': STREAM_TOKEN_SECONDS,
+    })
+
+
+@bp.route('/api/events', methods=['GET'])
+@limiter.limit("30 per minute")  # one reconnect per STREAM_SECONDS and tab, plus error retries
+def event_stream():
+    """SSE stream of changes.
+
+    ?topics=         comma-separated subset of tasks,gallery,bookings (default: all visible)
+    ?token=          stream token from POST /api/events/token, since EventSource can't set headers
+    Last-Event-ID    resume after this id (header, or ?last_event_id=)
+
+    503 with Retry-After once this worker has MAX_STREAMS streams open.
+    """
+    user = _user()
+    is_admin = bool(user and user.get('role') == 'admin')
+    topics = [t for t in (request.args.get('topics') or '').split(',') if t]
+    unknown = [t for t in topics if t not in change_feed.TOPICS]
+    if unknown:
+        return jsonify({'error': f"Unbekannte topics: {', '.join(unknown)}"}), 400
+    if not topics:
+        topics = [t for t in change_feed.TOPICS if is_admin or t not in change_feed.ADMIN_TOPICS]
+    if not is_admin and any(t in change_feed.ADMIN_TOPICS for t in topics):
+        return jsonify({'error': 'Admin-Berechtigung erforderlich'}), 403
+    wanted = set(topics)
+
+    conn = get_db()
+    try:
+        oldest, newest = change_feed.bounds(conn)
+    finally:
+        conn.close()
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_id = int(last_id) if last_id is not None else None
+    except ValueError:
+        last_id = None
+
+    if not _streams.acquire(blocking=False):
+        response = jsonify({'error': 'Zu viele Live-Verbindungen, bitte später erneut versuchen'})
+        response.headers['Retry-After'] = str(BUSY_RETRY_SECONDS)
+        return response, 503
+
+    def generate():
+        cursor = last_id
+        yield f"retry: {RETRY_MS}\n\n"
+        if cursor is None or cursor > newest:
+            cursor = newest
+        elif cursor < oldest - 1:
+            # Missed events were pruned: the client has to refetch everything
+            yield f"id: {newest}\nevent: reset\ndata: {{}}\n\n"
+            cursor = newest
+        deadline = time.monotonic() + STREAM_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            events = change_feed.feed.wait(cursor, min(KEEPALIVE_SECONDS, remaining))
+            if not events:
+                yield ": ping\n\n"
+                continue
+            for event in events:
+                cursor = event['id']
+                if event['topic'] in wanted and _visible(event, is_admin):
+                    yield _format(event)
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+    # Also runs if the client is gone before the generator started
+    response.call_on_close(_streams.release)
+    return response
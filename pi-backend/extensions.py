@@ -0,0 +1,28 @@
+"""
+Flask extension instances shared by the blueprints.
+
+Created unbound here and attached to the app in `app.create_app()`, so route
+modules can use `@limiter.limit(...)` without importing the app itself.
+"""
+
+import os
+
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+
+import shared_state  # noqa: F401  (registers the sqlite:// limiter storage)
+from config import GALLERY_DIR
+from storage import LocalStorage
+
+# Rate limiting — counters live in SQLite so both gunicorn workers share them.
+# A locked/broken store must never turn into 500s, hence swallow_errors.
+limiter = Limiter(
+    get_remote_address,
+    default_limits=["200 per hour"],
+    storage_uri=os.environ.get('RATELIMIT_STORAGE_URI', 'sqlite://'),
+    strategy='fixed-window',
+    swallow_errors=True,
+)
+
+# Storage backend
+storage = LocalStorage(GALLERY_DIR)
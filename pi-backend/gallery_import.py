@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Bulk import of a directory (SD card, drone footage) into the gallery.
+
+Files are processed in a process pool with the same steps as an upload:
+hash into the blob store, WebP + thumbnail (media.convert_image_to_webp /
+create_thumbnail) or ffmpeg transcode + thumbnail (optimize_video /
+create_video_thumbnail), perceptual hash and capture metadata. Workers only
+touch files; the parent assigns slug names up front and inserts the rows
+in batched transactions, BATCH_SIZE files per commit.
+
+Every source file is journaled in `gallery_import_log` (path, size, mtime)
+with the same commit as its gallery row, so an interrupted import simply
+runs again: imported files and duplicates are skipped without rehashing,
+failed ones are retried. Content already in the gallery (same SHA-256, also
+across different paths) is never imported twice.
+
+Usage:
+    python gallery_import.py import /media/sd/DCIM --category luftaufnahmen [--workers 3]
+    python gallery_import.py status /media/sd/DCIM
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import ALLOWED_CATEGORIES, DB_PATH, GALLERY_DIR  # noqa: E402
+from media import allowed_file, get_file_type, get_unique_base_name, slugify  # noqa: E402
+
+BATCH_SIZE = 50
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS gallery_import_log (
+        source TEXT PRIMARY KEY,            -- absolute path of the imported file
+        size INTEGER NOT NULL,
+        mtime INTEGER NOT NULL,
+        status TEXT NOT NULL,               -- imported | duplicate | failed
+        gallery_id TEXT,
+        error TEXT,
+        imported_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+    );
+'''
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    conn.executescript(schema)
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def scan(directory: str) -> list[tuple[str, int, int]]:
+    """(path, size, mtime) of every importable file below directory, sorted."""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(files):
+            if name.startswith('.') or not allowed_file(name):
+                continue  # ._DSC0001.JPG (macOS resource forks), .thumbnails
+            path = os.path.abspath(os.path.join(root, name))
+            st = os.stat(path)
+            found.append((path, st.st_size, int(st.st_mtime)))
+    return found
+
+
+def pending(conn, files: list) -> list:
+    """Files not yet imported or recognised as duplicate (failed ones are retried)."""
+    done = {(r['source'], r['size'], r['mtime']) for r in conn.execute(
+        "SELECT source, size, mtime FROM gallery_import_log WHERE status IN ('imported', 'duplicate')"
+    )}
+    return [f for f in files if f not in done]
+
+
+# ============ Worker (separate process: files only, read-only DB) ============
+
+def process_file(task: dict) -> dict:
+    """Stage, deduplicate and convert one file. Runs in a pool worker."""
+    from image_hash import dhash
+    from image_meta import extract
+    from media import convert_image_to_webp, create_thumbnail, create_video_thumbnail, optimize_video
+    from storage import LocalStorage
+
+    store = LocalStorage(GALLERY_DIR)
+    with open(task['source'], 'rb') as f:
+        staged = store.stage(f, task['ext'])
+
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    duplicate = conn.execute(
+        'SELECT g.id FROM blobs b JOIN gallery_images g ON g.original_path = b.path OR g.filename = b.path '
+        'WHERE b.sha256 = ? LIMIT 1', (staged.sha256,)
+    ).fetchone()
+    conn.close()
+    if duplicate:
+        store.discard(staged)
+        return {**task, 'status': 'duplicate', 'gallery_id': duplicate[0]}
+
+    category, base_name = task['category'], task['base_name']
+    result = {**task, 'status': 'imported', 'staged': staged, 'webp_path': None, 'thumbnail_path': None}
+    thumb_filename = f"{category}/{base_name}_thumb.webp"
+    if task['file_type'] == 'image':
+        webp_filename = f"{category}/{base_name}.webp"
+        if not convert_image_to_webp(staged.tmp_path, os.path.join(GALLERY_DIR, webp_filename)):
+            # Unlike an upload, nobody is waiting for a fallback: log it as failed
+            store.discard(staged)
+            raise ValueError('Bild nicht lesbar')
+        result['webp_path'] = webp_filename
+        if create_thumbnail(staged.tmp_path, os.path.join(GALLERY_DIR, thumb_filename)):
+            result['thumbnail_path'] = thumb_filename
+        result['phash'] = dhash(staged.tmp_path)
+    else:
+        video_filename = f"{category}/{base_name}.mp4"
+        if optimize_video(staged.tmp_path, os.path.join(GALLERY_DIR, video_filename)):
+            result['webp_path'] = video_filename  # like uploads: webp_path holds the optimized video
+        if create_video_thumbnail(staged.tmp_path, os.path.join(GALLERY_DIR, thumb_filename)):
+            result['thumbnail_path'] = thumb_filename
+        result['phash'] = None
+    result['meta'] = extract(staged.tmp_path, task['file_type'])
+    return result
+
+
+# ============ Parent: names, batched inserts, progress ============
+
+class Importer:
+    def __init__(self, conn, category: str, uploaded_by: str, status: str):
+        from image_hash import get_tree
+        from storage import LocalStorage
+        self.conn = conn
+        self.category = category
+        self.uploaded_by = uploaded_by
+        self.status = status
+        self.store = LocalStorage(GALLERY_DIR)
+        self.tree = get_tree(conn)  # extended locally as rows are added
+        self.reserved = set()
+        self.seen_sha = {}
+        self.batch = []
+        self.counts = {'imported': 0, 'duplicate': 0, 'failed': 0}
+
+    def task(self, path: str, size: int, mtime: int) -> dict:
+        name = os.path.basename(path)
+        ext = name.rsplit('.', 1)[1].lower()
+        file_type = get_file_type(name)
+        target_ext = 'mp4' if file_type == 'video' else 'webp'
+        slug = slugify(os.path.splitext(name)[0]) or hashlib.md5(path.encode()).hexdigest()[:12]
+        base_name = get_unique_base_name(self.conn, self.category, slug, target_ext)
+        n = 2
+        while self._taken(base_name, target_ext):
+            base_name = f"{slug}-{n}"
+            n += 1
+        self.reserved.add(f"{self.category}/{base_name}.{target_ext}")
+        return {'source': path, 'size': size, 'mtime': mtime, 'name': name, 'ext': ext,
+                'file_type': file_type, 'category': self.category, 'base_name': base_name}
+
+    def _taken(self, base_name: str, ext: str) -> bool:
+        """Name handed to a worker in this run (not inserted yet), in the gallery or on disk."""
+        rel = f"{self.category}/{base_name}.{ext}"
+        return (rel in self.reserved
+                or self.conn.execute('SELECT 1 FROM gallery_images WHERE filename = ?', (rel,)).fetchone() is not None
+                or os.path.exists(os.path.join(GALLERY_DIR, rel)))
+
+    def add(self, result: dict) -> None:
+        self.batch.append(result)
+        if len(self.batch) >= BATCH_SIZE:
+            self.flush()
+
+    def _drop_outputs(self, result: dict) -> None:
+        for path in (result.get('webp_path'), result.get('thumbnail_path')):
+            if path:
+                self.store.delete(path)
+
+    def flush(self) -> None:
+        """Insert the batch: blobs, gallery rows and journal in one transaction."""
+        from image_hash import MAX_DISTANCE
+        from image_meta import placement
+        conn = self.conn
+        for r in self.batch:
+            status, gallery_id, error = r['status'], r.get('gallery_id'), r.get('error')
+            staged = r.get('staged')
+            if status == 'imported' and staged.sha256 in self.seen_sha:
+                # Same content twice in this run (copied folder, second card)
+                self.store.discard(staged)
+                self._drop_outputs(r)
+                status, gallery_id = 'duplicate', self.seen_sha[staged.sha256]
+            elif status == 'imported':
+                gallery_id = hashlib.md5(f"{datetime.now().isoformat()}{r['source']}".encode()).hexdigest()[:12]
+                original = self.store.commit_blob(conn, staged)
+                meta = r['meta']
+                map_x, map_y = placement(meta)
+                near = self.tree.search(r['phash'], MAX_DISTANCE) if r['phash'] is not None else []
+                conn.execute('''
+                    INSERT INTO gallery_images (id, filename, original_name, name, category, type, size, uploaded_by, thumbnail_path, webp_path, original_path, status, phash, near_duplicate_of,
+                                                taken_at, width, height, orientation, camera, gps_lat, gps_lon, map_x, map_y)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (gallery_id, r['webp_path'] or original, r['name'], None, r['category'], r['file_type'], staged.size,
+                      self.uploaded_by, r['thumbnail_path'], r['webp_path'], original, self.status,
+                      r['phash'], near[0][1] if near else None,
+                      meta.get('taken_at'), meta.get('width'), meta.get('height'), meta.get('orientation'), meta.get('camera'),
+                      meta.get('gps_lat'), meta.get('gps_lon'), map_x, map_y))
+                if r['phash'] is not None:
+                    self.tree.add(r['phash'], gallery_id)
+                self.seen_sha[staged.sha256] = gallery_id
+            conn.execute(
+                'INSERT OR REPLACE INTO gallery_import_log (source, size, mtime, status, gallery_id, error) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (r['source'], r['size'], r['mtime'], status, gallery_id, error),
+            )
+            self.counts[status] += 1
+        conn.commit()
+        self.batch = []
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m" if seconds >= 3600 else f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+def run_import(directory: str, category: str, workers: int, uploaded_by: str, status: str) -> dict:
+    os.makedirs(os.path.join(GALLERY_DIR, category), exist_ok=True)
+    conn = get_db()
+    files = scan(directory)
+    todo = pending(conn, files)
+    print(f"{len(files)} Dateien gefunden, {len(files) - len(todo)} bereits importiert, {len(todo)} zu verarbeiten "
+          f"({workers} Prozesse)", flush=True)
+    importer = Importer(conn, category, uploaded_by, status)
+    tty = sys.stdout.isatty()
+    started = time.monotonic()
+    done = 0
+    # forkserver: workers don't inherit the parent's open SQLite connection
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('forkserver'))
+    try:
+        futures = {executor.submit(process_file, importer.task(*f)): f for f in todo}
+        for future in as_completed(futures):
+            path, size, mtime = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'source': path, 'size': size, 'mtime': mtime, 'status': 'failed', 'error': str(e)[:500]}
+            importer.add(result)
+            done += 1
+            elapsed = time.monotonic() - started
+            eta = _format_duration(elapsed / done * (len(todo) - done))
+            line = (f"[{done}/{len(todo)}] {done / elapsed:.1f}/s ETA {eta}  "
+                    f"{result['status']:9} {os.path.relpath(path, directory)}")
+            print(f"\r\033[K{line}" if tty else line, end='' if tty else '\n', flush=True)
+    except KeyboardInterrupt:
+        print("\nAbgebrochen – bereits verarbeitete Dateien werden gespeichert, erneuter Aufruf setzt fort.")
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        importer.flush()
+        executor.shutdown(wait=True, cancel_futures=True)
+        conn.close()
+    if tty:
+        print()
+    return {**importer.counts, 'skipped': len(files) - len(todo), 'seconds': round(time.monotonic() - started, 1)}
+
+
+def import_status(directory: str) -> dict:
+    conn = get_db()
+    try:
+        files = scan(directory)
+        prefix = os.path.abspath(directory).rstrip('/') + '/'
+        counts = dict(conn.execute(
+            'SELECT status, COUNT(*) FROM gallery_import_log WHERE source >= ? AND source < ? GROUP BY status',
+            (prefix, prefix + '\uffff'),
+        ).fetchall())
+        return {'files': len(files), 'pending': len(pending(conn, files)), **counts}
+    finally:
+        conn.close()
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Bulk gallery import')
+    sub = parser.add_subparsers(dest='command', required=True)
+    imp = sub.add_parser('import')
+    imp.add_argument('directory')
+    imp.add_argument('--category', default='sonstiges', choices=sorted(ALLOWED_CATEGORIES))
+    imp.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    imp.add_argument('--uploaded-by', default='import')
+    imp.add_argument('--status', default='approved', choices=['approved', 'pending'])
+    st = sub.add_parser('status')
+    st.add_argument('directory')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f'kein Verzeichnis: {args.directory}')
+    if args.command == 'status':
+        print(json.dumps(import_status(args.directory)))
+        return 0
+    try:
+        summary = run_import(args.directory, args.category, max(1, args.workers), args.uploaded_by, args.status)
+    except KeyboardInterrupt:
+        return 130
+    print(json.dumps(summary))
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,864 @@
+"""Gallery routes: listing, uploads, moderation, panoramas, background video, livestream cameras."""
+
+from flask import Blueprint, Response, request, jsonify
+import os
+import json
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+from werkzeug.utils import secure_filename
+
+from email_service import send_activity_notification
+from notifications import send_moderation_request
+from config import ALLOWED_CATEGORIES, GALLERY_DIR, GALLERY_MAX_UPLOAD_MB
+from db import get_db
+from extensions import limiter, storage
+from api_helpers import generic_patch
+from auth import get_current_user, require_admin, require_auth
+from panorama_tiles import build_in_background, multires_config, tiles_dir_for
+import asset_manifest
+import image_hash
+import upload_sessions
+from image_hash import MAX_DISTANCE, dhash, find_similar
+from image_meta import extract as extract_meta, placement
+from media import PILLOW_AVAILABLE, allowed_file, convert_image_to_webp, create_thumbnail, create_video_thumbnail, get_file_type, get_unique_base_name, optimize_video, slugify
+
+bp = Blueprint('gallery', __name__)
+
+
+@bp.route('/api/gallery', methods=['GET'])
+def get_gallery():
+    """Get all gallery images with proper URLs.
+
+    ?sort=taken orders by shot date (EXIF/video metadata, upload date as fallback).
+    """
+    category = request.args.get('category')
+    include_pending = request.args.get('include_pending', 'false') == 'true'
+    map_area_filter = request.args.get('map_area')
+    order = 'COALESCE(taken_at, uploaded_at) DESC' if request.args.get('sort') == 'taken' else 'uploaded_at DESC'
+    # Check if current user is admin for pending access
+    user = get_current_user()
+    is_admin = user and user.get('role') == 'admin'
+
+    conn = get_db()
+    if category and category != 'all':
+        if is_admin and include_pending:
+            items = conn.execute(
+                f'SELECT * FROM gallery_images WHERE category = ? ORDER BY {order}',
+                (category,)
+            ).fetchall()
+        else:
+            items = conn.execute(
+                f"SELECT * FROM gallery_images WHERE category = ? AND status = 'approved' ORDER BY {order}",
+                (category,)
+            ).fetchall()
+    else:
+        if is_admin and include_pending:
+            items = conn.execute(
+                f'SELECT * FROM gallery_images ORDER BY {order}'
+            ).fetchall()
+        else:
+            items = conn.execute(
+                f"SELECT * FROM gallery_images WHERE status = 'approved' ORDER BY {order}"
+            ).fetchall()
+    conn.close()
+
+    # Format items with proper URLs
+    formatted_items = []
+    for row in items:
+        item = dict(row)
+        cat = item.get('category', 'sonstiges')
+        filename = item['filename']
+
+        # Build gallery URL - handle both layouts:
+        # 1. Category-prefixed: "sonstiges/test.webp" -> /images/gallery/sonstiges/test.webp
+        # 2. Flat (legacy): "abc123.webp" -> /images/gallery/abc123.webp (no category prefix!)
+        if '/' in filename:
+            # Already has a path prefix (category or other)
+            item['url'] = f"/images/gallery/{filename}"
+        else:
+            # Flat filename - file lives directly in gallery root
+            item['url'] = f"/images/gallery/{filename}"
+
+        # Thumbnail URL - same logic
+        if item.get('thumbnail_path'):
+            thumb = item['thumbnail_path']
+            if thumb.startswith('/'):
+                item['thumbnailUrl'] = thumb
+            elif '/' in thumb:
+                # Has path prefix (e.g. "thumbnails/abc_thumb.webp" or "sonstiges/abc_thumb.webp")
+                item['thumbnailUrl'] = f"/images/gallery/{thumb}"
+            else:
+                item['thumbnailUrl'] = f"/images/gallery/{thumb}"
+        else:
+            item['thumbnailUrl'] = item['url']  # Fallback to main image
+
+        # Original URL (for download/fallback)
+        if item.get('original_path'):
+            orig_path = item['original_path']
+            if orig_path.startswith('/images/gallery/'):
+                item['originalUrl'] = orig_path
+            else:
+                item['originalUrl'] = f"/images/gallery/{orig_path}"
+
+        # 64-bit hash doesn't survive JSON → JS number
+        item.pop('phash', None)
+        # Raw GPS only for admins (uploads from outside the garden); the map position is public
+        if not is_admin:
+            item.pop('gps_lat', None)
+            item.pop('gps_lon', None)
+
+        # Panoramas: Pannellum multires tile config once panorama_tiles.py has run
+        multires = multires_config(item.pop('multires', None))
+        if multires:
+            item['multiRes'] = multires
+        formatted_items.append(item)
+
+    # Filter by map_area if specified
+    if map_area_filter:
+        formatted_items = [i for i in formatted_items if i.get('map_area') == map_area_filter]
+
+    return jsonify({
+        'items': formatted_items,
+        'total': len(formatted_items)
+    })
+
+
+@bp.route('/api/gallery/upload', methods=['POST'])
+@limiter.limit("10 per minute")
+@require_auth
+def upload_file(user):
+    """Handle file upload with automatic WebP conversion and thumbnail generation.
+
+    Single multipart request up to GALLERY_MAX_UPLOAD_MB; large videos go
+    through the resumable /api/gallery/uploads endpoints instead.
+    """
+    # Reject oversized bodies before Werkzeug parses (and spools) them
+    max_bytes = GALLERY_MAX_UPLOAD_MB * 1024 * 1024
+    if request.content_length and request.content_length > max_bytes + 1024 * 1024:
+        return jsonify({'error': f'Datei zu groß (max. {GALLERY_MAX_UPLOAD_MB}MB)'}), 413
+
+    if 'file' not in request.files:
+        return jsonify({'error': 'Keine Datei'}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'Keine Datei ausgewahlt'}), 400
+
+    if not allowed_file(file.filename):
+        return jsonify({'error': 'Dateityp nicht erlaubt'}), 400
+
+    # Check file size
+    file.seek(0, 2)
+    file_size = file.tell()
+    file.seek(0)
+    if file_size > max_bytes:
+        return jsonify({'error': f'Datei zu groß (max. {GALLERY_MAX_UPLOAD_MB}MB)'}), 400
+
+    # Get metadata
+    category = request.form.get('category', 'sonstiges')
+    if category not in ALLOWED_CATEGORIES:
+        category = 'sonstiges'
+    name = request.form.get('name', '')
+    description = request.form.get('description', '')
+
+    original_name = secure_filename(file.filename)
+    ext = original_name.rsplit('.', 1)[1].lower()
+
+    # Save original as content-addressed blob; the SHA-256 is computed while
+    # streaming, so exact duplicates are rejected before anything is decoded
+    staged = storage.stage(file.stream, ext)
+    return jsonify(_process_upload(user, staged, original_name, category, name, description))
+
+
+def _uploader(user: dict) -> str:
+    return user.get('name') or user.get('email', 'anonymous')
+
+
+def _visible_to(user: dict, row) -> bool:
+    """Gallery rows a user may see details of: approved ones and their own; everything for admins."""
+    return user.get('role') == 'admin' or row['status'] == 'approved' or row['uploaded_by'] == _uploader(user)
+
+
+def _process_upload(user: dict, staged, original_name: str, category: str, name: str, description: str,
+                    on_progress=None) -> dict:
+    """Dedup, convert and register a staged upload; returns the API response.
+
+    Shared by the multipart upload and finalized resumable uploads (which
+    run this in a background thread, so no request context here).
+    on_progress(fraction) receives the video transcode progress.
+    """
+    # Get uploader from authenticated user
+    uploaded_by = _uploader(user)
+
+    # Generate unique filename (use custom name if provided)
+    file_id = hashlib.md5(f"{datetime.now().isoformat()}{original_name}".encode()).hexdigest()[:12]
+
+    # Use slugified name if provided, otherwise use file_id
+    base_name_raw = slugify(name) if name else file_id
+    file_type = get_file_type(original_name)
+
+    # Ensure category directory exists
+    category_dir = os.path.join(GALLERY_DIR, category)
+    os.makedirs(category_dir, exist_ok=True)
+
+    original_path = staged.tmp_path
+    file_size = staged.size
+
+    conn = get_db()
+    existing_blob = storage.find_blob(conn, staged.sha256)
+    duplicate = existing_blob and conn.execute(
+        'SELECT * FROM gallery_images WHERE original_path = ? OR filename = ?', (existing_blob, existing_blob)
+    ).fetchone()
+    if duplicate:
+        conn.close()
+        storage.discard(staged)
+        if not _visible_to(user, duplicate):
+            # Someone else's pending/rejected upload: don't reveal it
+            return {'success': True, 'duplicate': True, 'message': 'Diese Datei wurde bereits hochgeladen'}
+        return {
+            'success': True,
+            'duplicate': True,
+            'id': duplicate['id'],
+            'filename': duplicate['filename'],
+            'url': f"/images/gallery/{duplicate['filename']}",
+            'thumbnailUrl': f"/images/gallery/{duplicate['thumbnail_path']}" if duplicate['thumbnail_path'] else None,
+            'status': duplicate['status'],
+            'message': 'Diese Datei ist bereits in der Galerie'
+        }
+
+    # Get unique base name (handles duplicates: name -> name-2 -> name-3)
+    target_ext = 'mp4' if file_type == 'video' else 'webp'
+    base_name = get_unique_base_name(conn, category, base_name_raw, target_ext)
+    conn.close()
+
+    # Initialize paths
+    webp_path = None
+    thumbnail_path = None
+    display_filename = None  # None: fall back to the original blob
+
+    if file_type == 'image':
+        # Convert to WebP
+        webp_filename = f"{category}/{base_name}.webp"
+        webp_full_path = os.path.join(GALLERY_DIR, webp_filename)
+
+        if convert_image_to_webp(original_path, webp_full_path):
+            webp_path = webp_filename
+            display_filename = webp_filename
+            print(f"Converted to WebP: {webp_filename}")
+        else:
+            # Fallback: use original
+            print(f"WebP conversion failed, using original: {staged.path}")
+
+        # Create thumbnail
+        thumb_filename = f"{category}/{base_name}_thumb.webp"
+        thumb_full_path = os.path.join(GALLERY_DIR, thumb_filename)
+
+        if create_thumbnail(original_path, thumb_full_path):
+            thumbnail_path = thumb_filename
+            print(f"Created thumbnail: {thumb_filename}")
+
+    elif file_type == 'video':
+        # Optimize video
+        optimized_filename = f"{category}/{base_name}.mp4"
+        optimized_full_path = os.path.join(GALLERY_DIR, optimized_filename)
+
+        if optimize_video(original_path, optimized_full_path, on_progress):
+            webp_path = optimized_filename  # Using webp_path for optimized video
+            display_filename = optimized_filename
+            print(f"Optimized video: {optimized_filename}")
+        else:
+            # Fallback: use original
+            print(f"Video optimization failed, using original: {staged.path}")
+
+        # Create video thumbnail
+        thumb_filename = f"{category}/{base_name}_thumb.webp"
+        thumb_full_path = os.path.join(GALLERY_DIR, thumb_filename)
+
+        if create_video_thumbnail(original_path, thumb_full_path):
+            thumbnail_path = thumb_filename
+            print(f"Created video thumbnail: {thumb_filename}")
+
+    # Perceptual hash: flag re-encodes/resizes of photos already in the gallery
+    phash = dhash(original_path) if file_type == 'image' else None
+
+    # Capture metadata: shot date for sorting, GPS → position on the garden map
+    meta = extract_meta(original_path, file_type)
+    map_x, map_y = placement(meta)
+
+    # Determine upload status based on user role
+    is_admin = user.get('role') == 'admin'
+    upload_status = 'approved' if is_admin else 'pending'
+
+    # Save to database
+    conn = get_db()
+    near_duplicates = _near_duplicates(conn, phash)
+    original_filename = storage.commit_blob(conn, staged)
+    display_filename = display_filename or original_filename
+    conn.execute('''
+        INSERT INTO gallery_images (id, filename, original_name, name, description, category, type, size, uploaded_by, thumbnail_path, webp_path, original_path, status, phash, near_duplicate_of,
+                                    taken_at, width, height, orientation, camera, gps_lat, gps_lon, map_x, map_y)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (file_id, display_filename, original_name, name or None, description or None, category, file_type, file_size, uploaded_by, thumbnail_path, webp_path, original_filename, upload_status,
+          phash, near_duplicates[0]['id'] if near_duplicates else None,
+          meta.get('taken_at'), meta.get('width'), meta.get('height'), meta.get('orientation'), meta.get('camera'),
+          meta.get('gps_lat'), meta.get('gps_lon'), map_x, map_y))
+    conn.commit()
+    conn.close()
+
+    print(f"Uploaded: {display_filename} ({file_size} bytes) [status: {upload_status}]")
+
+    # Send Telegram moderation request if pending
+    if upload_status == 'pending':
+        thumb_full = os.path.join(GALLERY_DIR, thumbnail_path) if thumbnail_path else None
+        send_moderation_request(file_id, thumb_full, uploaded_by, name, category)
+
+    # Send notification to admin
+    details = {
+        'Von': uploaded_by,
+        'Datei': original_name,
+        'Kategorie': category,
+        'Größe': f"{file_size / 1024 / 1024:.2f} MB"
+    }
+    if near_duplicates:
+        details['Ähnlich wie'] = ', '.join(d['name'] for d in near_duplicates[:3])
+    send_activity_notification('gallery_upload', details)
+
+    return {
+        'success': True,
+        'id': file_id,
+        'filename': display_filename,
+        'url': f'/images/gallery/{display_filename}',
+        'thumbnailUrl': f'/images/gallery/{thumbnail_path}' if thumbnail_path else None,
+        'status': upload_status,
+        'taken_at': meta.get('taken_at'),
+        'map_x': map_x,
+        'map_y': map_y,
+        'near_duplicates': _visible_near_duplicates(user, near_duplicates),
+        'message': 'Datei erfolgreich hochgeladen!'
+    }
+
+
+def _near_duplicates(conn, phash: int | None, exclude_id: str | None = None) -> list:
+    """Gallery items whose perceptual hash is within MAX_DISTANCE bits, nearest first.
+
+    The full list is for near_duplicate_of and the admin notification; the
+    upload response goes through _visible_near_duplicates.
+    """
+    if phash is None:
+        return []
+    matches = find_similar(conn, phash, exclude_id=exclude_id)[:5]
+    if not matches:
+        return []
+    placeholders = ', '.join('?' * len(matches))
+    rows = {r['id']: r for r in conn.execute(
+        f'SELECT id, name, original_name, filename, thumbnail_path, status, uploaded_by FROM gallery_images '
+        f'WHERE id IN ({placeholders})',
+        [m['id'] for m in matches]
+    )}
+    return [{
+        'id': m['id'],
+        'distance': m['distance'],
+        'name': rows[m['id']]['name'] or rows[m['id']]['original_name'],
+        'status': rows[m['id']]['status'],
+        'uploaded_by': rows[m['id']]['uploaded_by'],
+        'thumbnailUrl': f"/images/gallery/{rows[m['id']]['thumbnail_path'] or rows[m['id']]['filename']}",
+    } for m in matches if m['id'] in rows]
+
+
+def _visible_near_duplicates(user: dict, near_duplicates: list) -> list:
+    """Matches the uploader may see (see _visible_to), without the uploader field."""
+    return [{k: v for k, v in d.items() if k != 'uploaded_by'}
+            for d in near_duplicates if _visible_to(user, d)]
+
+
+# ============ Resumable uploads (tus 1.0 subset, see upload_sessions.py) ============
+
+def _tus_headers(response, **headers):
+    response.headers['Tus-Resumable'] = upload_sessions.TUS_VERSION
+    for key, value in headers.items():
+        response.headers[key.replace('_', '-')] = str(value)
+    return response
+
+
+def _upload_status(row) -> dict:
+    return {
+        'id': row['id'],
+        'filename': row['filename'],
+        'length': row['length'],
+        'offset': upload_sessions.current_offset(row),
+        'status': row['status'],
+        'result': json.loads(row['result']) if row['result'] else None,
+        'expires_at': upload_sessions.expires_at(row),
+    }
+
+
+@bp.route('/api/gallery/uploads', methods=['POST'])
+@limiter.limit("10 per minute")
+@require_auth
+def create_resumable_upload(user):
+    """Reserve an upload of Upload-Length bytes; metadata: filename, category, name, description."""
+    try:
+        length = int(request.headers.get('Upload-Length', ''))
+        metadata = upload_sessions.parse_metadata(request.headers.get('Upload-Metadata'))
+    except ValueError:
+        return jsonify({'error': 'Upload-Length und Upload-Metadata erforderlich'}), 400
+    if length <= 0:
+        return jsonify({'error': 'Leere Datei'}), 400
+
+    max_bytes = upload_sessions.max_upload_bytes(user)
+    if length > max_bytes:
+        return _tus_headers(jsonify({'error': f'Datei zu groß (max. {max_bytes // 1024 // 1024}MB)'}),
+                            Tus_Max_Size=max_bytes), 413
+
+    filename = secure_filename(metadata.get('filename', ''))
+    if not filename or not allowed_file(filename):
+        return jsonify({'error': 'Dateityp nicht erlaubt'}), 400
+
+    # Original + converted copy must fit; don't let a drone video fill the SD card
+    if shutil.disk_usage(GALLERY_DIR).free < 2 * length:
+        return jsonify({'error': 'Nicht genug Speicherplatz'}), 507
+
+    category = metadata.get('category', 'sonstiges')
+    if category not in ALLOWED_CATEGORIES:
+        category = 'sonstiges'
+
+    conn = get_db()
+    upload_id = upload_sessions.create(conn, user, filename, length, {
+        'category': category,
+        'name': metadata.get('name', ''),
+        'description': metadata.get('description', ''),
+    })
+    conn.close()
+
+    location = f'/api/gallery/uploads/{upload_id}'
+    return _tus_headers(jsonify({'id': upload_id, 'location': location}), Location=location), 201
+
+
+@bp.route('/api/gallery/uploads/<upload_id>', methods=['GET'])
+@limiter.limit("120 per minute")
+@require_auth
+def get_resumable_upload(upload_id, user):
+    """Resume point (HEAD: Upload-Offset) and processing result after finalize."""
+    conn = get_db()
+    row = upload_sessions.get(conn, upload_id, user)
+    conn.close()
+    if not row:
+        return jsonify({'error': 'Upload nicht gefunden'}), 404
+
+    status = _upload_status(row)
+    return _tus_headers(jsonify(status), Upload_Offset=status['offset'], Upload_Length=row['length'],
+                        Cache_Control='no-store')
+
+
+@bp.route('/api/gallery/uploads/<upload_id>', methods=['PATCH'])
+@limiter.limit("120 per minute")
+@require_auth
+def patch_resumable_upload(upload_id, user):
+    """Append the request body at Upload-Offset, streamed to disk."""
+    if request.mimetype != 'application/offset+octet-stream':
+        return jsonify({'error': 'Content-Type application/offset+octet-stream erforderlich'}), 415
+    try:
+        offset = int(request.headers['Upload-Offset'])
+    except (KeyError, ValueError):
+        return jsonify({'error': 'Upload-Offset erforderlich'}), 400
+    if request.content_length is None:
+        return jsonify({'error': 'Content-Length erforderlich'}), 411
+
+    conn = get_db()
+    row = upload_sessions.get(conn, upload_id, user)
+    if not row:
+        conn.close()
+        return jsonify({'error': 'Upload nicht gefunden'}), 404
+    if row['status'] != 'uploading':
+        conn.close()
+        return jsonify({'error': 'Upload bereits abgeschlossen'}), 409
+    if offset + request.content_length > row['length']:
+        conn.close()
+        return jsonify({'error': 'Mehr Daten als Upload-Length'}), 413
+
+    try:
+        new_offset, complete = upload_sessions.append(conn, row, offset, request.stream, request.content_length)
+    except upload_sessions.OffsetMismatch as e:
+        return _tus_headers(jsonify({'error': 'Falscher Upload-Offset', 'offset': e.current}),
+                            Upload_Offset=e.current), 409
+    except upload_sessions.UploadLocked:
+        return jsonify({'error': 'Upload wird gerade geschrieben'}), 423
+    finally:
+        conn.close()
+
+    return _tus_headers(Response(status=204), Upload_Offset=new_offset)
+
+
+@bp.route('/api/gallery/uploads/<upload_id>', methods=['DELETE'])
+@require_auth
+def delete_resumable_upload(upload_id, user):
+    """Abort an upload and remove its partial file."""
+    conn = get_db()
+    row = upload_sessions.get(conn, upload_id, user)
+    if not row or row['status'] == 'processing':
+        conn.close()
+        return jsonify({'error': 'Upload nicht gefunden'}), 404
+    upload_sessions.delete(conn, upload_id)
+    conn.close()
+    return _tus_headers(Response(status=204))
+
+
+@bp.route('/api/gallery/uploads/<upload_id>/finalize', methods=['POST'])
+@limiter.limit("10 per minute")
+@require_auth
+def finalize_resumable_upload(upload_id, user):
+    """Hand a complete upload to gallery processing; poll GET for the result."""
+    conn = get_db()
+    row = upload_sessions.get(conn, upload_id, user)
+    if not row:
+        conn.close()
+        return jsonify({'error': 'Upload nicht gefunden'}), 404
+    if row['status'] != 'uploading':
+        # Repeated finalize (e.g. after a timeout on the client): report state
+        conn.close()
+        return jsonify(_upload_status(row))
+    if not upload_sessions.start_processing(conn, row):
+        conn.close()
+        return jsonify({'error': 'Upload unvollständig', 'offset': upload_sessions.current_offset(row)}), 409
+    conn.close()
+
+    # ffmpeg on a large video takes minutes — not inside the request
+    threading.Thread(target=_finish_resumable_upload, args=(dict(row), user),
+                     name=f'upload-{upload_id}', daemon=True).start()
+    return jsonify({'id': upload_id, 'status': 'processing'}), 202
+
+
+def _finish_resumable_upload(row: dict, user: dict) -> None:
+    metadata = json.loads(row['metadata'] or '{}')
+    ext = row['filename'].rsplit('.', 1)[1].lower()
+    try:
+        staged = storage.stage_file(upload_sessions.tmp_path(row['id']), ext)
+
+        def on_progress(fraction):
+            progress_conn = get_db()
+            upload_sessions.set_progress(progress_conn, row['id'], fraction)
+            progress_conn.close()
+
+        result, ok = _process_upload(user, staged, row['filename'], metadata.get('category', 'sonstiges'),
+                                     metadata.get('name', ''), metadata.get('description', ''),
+                                     on_progress), True
+    except Exception as e:
+        print(f"[upload] {row['id']}: processing failed: {e}")
+        result, ok = {'error': 'Verarbeitung fehlgeschlagen'}, False
+    conn = get_db()
+    upload_sessions.finish(conn, row['id'], result, ok)
+    conn.close()
+
+
+@bp.route('/api/gallery/<item_id>', methods=['DELETE'])
+@require_admin
+def delete_image(item_id, user):
+    """Delete a gallery image and all associated files (admin only)."""
+    conn = get_db()
+    deleted = _delete_item(conn, item_id)
+    conn.close()
+    if not deleted:
+        return jsonify({'error': 'Bild nicht gefunden'}), 404
+
+    return jsonify({'success': True, 'message': 'Bild geloscht'})
+
+
+def _delete_item(conn, item_id: str) -> bool:
+    """Delete a gallery row and release its files. False if it doesn't exist."""
+    row = conn.execute('SELECT * FROM gallery_images WHERE id = ?', (item_id,)).fetchone()
+    if not row:
+        return False
+
+    # Convert Row to dict for easier access
+    item = dict(row)
+
+    # Delete all associated files
+    files_to_delete = [
+        item.get('filename'),
+        item.get('thumbnail_path'),
+        item.get('webp_path'),
+        item.get('original_path')
+    ]
+
+    # Delete from database first: the blob refcounts drop with the row
+    conn.execute('DELETE FROM gallery_images WHERE id = ?', (item_id,))
+    conn.commit()
+
+    # Blobs still referenced elsewhere (same photo in inventory etc.) are kept
+    for file_path in dict.fromkeys(p for p in files_to_delete if p):
+        if storage.release(conn, file_path):
+            print(f"Deleted: {file_path}")
+
+    if item.get('type') == 'panorama' and item.get('filename'):
+        shutil.rmtree(os.path.join(GALLERY_DIR, tiles_dir_for(item['filename'])), ignore_errors=True)
+    return True
+
+
+@bp.route('/api/admin/gallery/duplicates', methods=['GET'])
+@require_admin
+def get_duplicate_clusters(user):
+    """Clusters of near-identical images (perceptual hash), largest first."""
+    try:
+        distance = min(max(int(request.args.get('distance', MAX_DISTANCE)), 0), 20)
+    except ValueError:
+        return jsonify({'error': 'Ungültige Distanz'}), 400
+
+    conn = get_db()
+    groups = image_hash.clusters(conn, distance)
+    ids = [i for g in groups for i in g]
+    rows = {}
+    # chunked: SQLite variable limit
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        for r in conn.execute(
+            f"SELECT id, name, original_name, filename, thumbnail_path, category, type, size, status, uploaded_by, uploaded_at "
+            f"FROM gallery_images WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+        ):
+            rows[r['id']] = r
+    conn.close()
+
+    clusters = []
+    for group in groups:
+        # oldest first: usually the one to keep
+        items = sorted((rows[i] for i in group if i in rows), key=lambda r: r['uploaded_at'] or '')
+        clusters.append([{
+            'id': r['id'],
+            'name': r['name'] or r['original_name'],
+            'category': r['category'],
+            'type': r['type'],
+            'size': r['size'],
+            'status': r['status'],
+            'uploaded_by': r['uploaded_by'],
+            'uploaded_at': r['uploaded_at'],
+            'url': f"/images/gallery/{r['filename']}",
+            'thumbnailUrl': f"/images/gallery/{r['thumbnail_path'] or r['filename']}",
+        } for r in items])
+
+    return jsonify({
+        'distance': distance,
+        'clusters': clusters,
+        'total': len(clusters),
+        'images': sum(len(c) for c in clusters)
+    })
+
+
+@bp.route('/api/admin/gallery/bulk-delete', methods=['POST'])
+@require_admin
+def bulk_delete_images(user):
+    """Delete several gallery items at once (duplicate cleanup)."""
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, str) for i in ids):
+        return jsonify({'error': 'ids muss eine Liste von IDs sein'}), 400
+    if len(ids) > 500:
+        return jsonify({'error': 'Maximal 500 IDs pro Anfrage'}), 400
+
+    conn = get_db()
+    deleted = [i for i in dict.fromkeys(ids) if _delete_item(conn, i)]
+    conn.close()
+
+    return jsonify({
+        'success': True,
+        'deleted': deleted,
+        'not_found': [i for i in dict.fromkeys(ids) if i not in deleted]
+    })
+
+
+@bp.route('/api/admin/gallery/panorama', methods=['POST'])
+@require_admin
+def upload_panorama(user):
+    """Upload panorama image without WebP conversion (equirectangular must stay original)."""
+    if 'file' not in request.files:
+        return jsonify({'error': 'Keine Datei'}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'Keine Datei ausgewählt'}), 400
+
+    name = request.form.get('name', '')
+    description = request.form.get('description', '')
+    category = request.form.get('category', 'luftaufnahmen')
+    if category not in ALLOWED_CATEGORIES:
+        category = 'sonstiges'
+    uploaded_by = user.get('name') or user.get('email', 'admin')
+
+    original_name = secure_filename(file.filename)
+    ext = original_name.rsplit('.', 1)[1].lower() if '.' in original_name else 'jpg'
+    file_id = hashlib.md5(f"{datetime.now().isoformat()}{original_name}".encode()).hexdigest()[:12]
+
+    base_name = slugify(name) if name else file_id
+
+    category_dir = os.path.join(GALLERY_DIR, category)
+    os.makedirs(category_dir, exist_ok=True)
+
+    # Save original as blob (no WebP conversion for panoramas); same file twice → existing panorama
+    staged = storage.stage(file.stream, ext)
+    conn = get_db()
+    existing_blob = storage.find_blob(conn, staged.sha256)
+    duplicate = existing_blob and conn.execute(
+        "SELECT id, filename FROM gallery_images WHERE filename = ? AND type = 'panorama'", (existing_blob,)
+    ).fetchone()
+    if duplicate:
+        conn.close()
+        storage.discard(staged)
+        return jsonify({
+            'success': True,
+            'duplicate': True,
+            'id': duplicate['id'],
+            'url': f"/images/gallery/{duplicate['filename']}",
+            'type': 'panorama'
+        })
+    file_size = staged.size
+
+    # Create thumbnail for grid view
+    thumbnail_path = None
+    if PILLOW_AVAILABLE:
+        thumb_filename = f"{category}/{base_name}-{staged.sha256[:8]}_thumb.webp"
+        thumb_full_path = os.path.join(GALLERY_DIR, thumb_filename)
+        if create_thumbnail(staged.tmp_path, thumb_full_path):
+            thumbnail_path = thumb_filename
+
+    phash = dhash(staged.tmp_path)
+    near_duplicates = _near_duplicates(conn, phash)
+    meta = extract_meta(staged.tmp_path, 'image')
+    map_x, map_y = placement(meta)
+    filename = storage.commit_blob(conn, staged)
+    conn.execute('''
+        INSERT INTO gallery_images (id, filename, original_name, name, description, category, type, size, uploaded_by, thumbnail_path, status, phash, near_duplicate_of,
+                                    taken_at, width, height, orientation, camera, gps_lat, gps_lon, map_x, map_y)
+        VALUES (?, ?, ?, ?, ?, ?, 'panorama', ?, ?, ?, 'approved', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (file_id, filename, original_name, name or None, description or None, category, file_size, uploaded_by, thumbnail_path,
+          phash, near_duplicates[0]['id'] if near_duplicates else None,
+          meta.get('taken_at'), meta.get('width'), meta.get('height'), meta.get('orientation'), meta.get('camera'),
+          meta.get('gps_lat'), meta.get('gps_lon'), map_x, map_y))
+    conn.commit()
+    conn.close()
+
+    # Multires tile pyramid for the viewer, generated off-request
+    build_in_background(file_id)
+
+    return jsonify({
+        'success': True,
+        'id': file_id,
+        'url': f'/images/gallery/{filename}',
+        'type': 'panorama',
+        'tiles': 'pending',
+        'near_duplicates': _visible_near_duplicates(user, near_duplicates)
+    })
+
+
+@bp.route('/api/background-video', methods=['GET'])
+def get_background_video():
+    """Background video manifest for a page (poster, teaser, video; see asset_manifest.py)."""
+    page = request.args.get('page')
+    if not page:
+        return jsonify({'error': 'page parameter required'}), 400
+
+    manifest = asset_manifest.load(page)
+    if manifest:
+        response = jsonify(asset_manifest.api_response(manifest))
+        response.set_etag(manifest['version'])
+        # Same for every visitor → CDN-cacheable; short TTL so a new video shows up soon
+        response.headers['Cache-Control'] = 'public, max-age=60, s-maxage=300, stale-while-revalidate=600'
+        return response.make_conditional(request)
+
+    # No manifest (yet): build pending after set_background_video, or no video at all
+    conn = get_db()
+    row = conn.execute('SELECT * FROM background_videos WHERE page = ?', (page,)).fetchone()
+    conn.close()
+
+    if row:
+        return jsonify({
+            'video_url': f'/images/gallery/{row["video_path"]}',
+            'thumbnail_url': f'/images/gallery/{row["thumbnail_path"]}' if row['thumbnail_path'] else None,
+            'page': row['page']
+        })
+
+    response = jsonify({'video_url': None, 'page': page})
+    response.headers['Cache-Control'] = 'public, max-age=60, s-maxage=300'
+    return response
+
+
+@bp.route('/api/admin/background-video', methods=['POST'])
+@require_admin
+def set_background_video(user):
+    """Assign a video to a page background."""
+    data = request.json or {}
+    page = data.get('page')
+    video_path = data.get('video_path')
+    thumbnail_path = data.get('thumbnail_path')
+
+    if not page or not video_path:
+        return jsonify({'error': 'page and video_path required'}), 400
+    if not asset_manifest.PAGE_PATTERN.match(page):
+        return jsonify({'error': 'invalid page'}), 400
+
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO background_videos (page, video_path, thumbnail_path)
+        VALUES (?, ?, ?)
+        ON CONFLICT(page) DO UPDATE SET video_path = ?, thumbnail_path = ?, created_at = CURRENT_TIMESTAMP
+    ''', (page, video_path, thumbnail_path, video_path, thumbnail_path))
+    conn.commit()
+    conn.close()
+
+    # Poster/teaser need ffmpeg, hashing a large video takes a while: rebuild the
+    # manifest in the background; until then the endpoint answers from the DB
+    if os.path.exists(asset_manifest.manifest_path(page)):
+        os.remove(asset_manifest.manifest_path(page))
+    threading.Thread(target=asset_manifest.refresh, args=(page,), name=f'asset-manifest-{page}', daemon=True).start()
+
+    return jsonify({'success': True, 'page': page})
+
+
+@bp.route('/api/livestream/cameras', methods=['GET'])
+def get_livestream_cameras():
+    """Get livestream cameras (preparation endpoint)."""
+    conn = get_db()
+    cameras = conn.execute('SELECT * FROM livestream_cameras WHERE is_active = 1').fetchall()
+    conn.close()
+
+    return jsonify({
+        'cameras': [dict(c) for c in cameras],
+        'available': len(cameras) > 0
+    })
+
+
+@bp.route('/api/admin/gallery/<item_id>/map-area', methods=['PATCH'])
+@require_admin
+def update_gallery_map_area(item_id, user):
+    """Admin: Assign a gallery item to a map area and/or precise location."""
+    data = request.get_json()
+    map_area = data.get('map_area')  # None or '' to remove
+    map_x = data.get('map_x')
+    map_y = data.get('map_y')
+
+    # Validate: both or neither
+    if (map_x is not None) != (map_y is not None):
+        return jsonify({'error': 'map_x und map_y müssen zusammen gesetzt werden'}), 400
+
+    conn = get_db()
+    item = conn.execute('SELECT id FROM gallery_images WHERE id = ?', (item_id,)).fetchone()
+    if not item:
+        conn.close()
+        return jsonify({'error': 'Bild nicht gefunden'}), 404
+
+    conn.execute(
+        'UPDATE gallery_images SET map_area = ?, map_x = ?, map_y = ? WHERE id = ?',
+        (map_area if map_area else None, map_x, map_y, item_id)
+    )
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True})
+
+
+@bp.route('/api/admin/gallery/<item_id>', methods=['PATCH'])
+@require_admin
+def update_gallery_item(item_id, user):
+    """Admin: Update gallery item metadata."""
+    data = request.json
+    return generic_patch('gallery_images', item_id, data,
+        ['name', 'description', 'category', 'status'],
+        timestamp_field=None)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Perceptual hashes for near-duplicate detection in the gallery.
+
+Every image/panorama upload gets a 64-bit dHash (gallery_images.phash,
+stored as signed INTEGER): the EXIF-rotated image is shrunk to 9×8
+grayscale and each bit says whether a pixel is brighter than its right
+neighbour. Re-encodes, resizes and the same scene shot from another phone
+land within a few bits of each other; exact byte duplicates are already
+caught by the blob store (storage.py).
+
+Lookups go through a BK-tree over all hashes, built once per
+data_versions['gallery_hashes'] per worker (bumped by triggers when a
+hash is added, changed or deleted). A query with radius d only descends
+into subtrees whose edge distance lies within [dist - d, dist + d].
+
+Upload flags the nearest match in gallery_images.near_duplicate_of;
+/api/admin/gallery/duplicates lists connected clusters for cleanup.
+
+Usage:
+    python image_hash.py backfill      # hash images uploaded before this existed
+    python image_hash.py clusters [--distance 8]
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DB_PATH, GALLERY_DIR  # noqa: E402
+from media_backfill import not_failed, record_failure  # noqa: E402
+
+SCOPE = 'gallery_hashes'
+MAX_DISTANCE = int(os.environ.get('GALLERY_DUPLICATE_DISTANCE', 8))
+HASHED_TYPES = ('image', 'panorama')
+
+SCHEMA = f'''
+    INSERT OR IGNORE INTO data_versions (scope, version) VALUES ('{SCOPE}', 0);
+    CREATE TRIGGER IF NOT EXISTS trg_gallery_hashes_version_insert AFTER INSERT ON gallery_images
+    WHEN NEW.phash IS NOT NULL BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE scope = '{SCOPE}';
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_gallery_hashes_version_update AFTER UPDATE OF phash ON gallery_images
+    WHEN OLD.phash IS NOT NEW.phash BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE scope = '{SCOPE}';
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_gallery_hashes_version_delete AFTER DELETE ON gallery_images
+    WHEN OLD.phash IS NOT NULL BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE scope = '{SCOPE}';
+    END;
+'''
+
+_cache_lock = threading.Lock()
+_cache = {'version': None, 'tree': None}
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    conn.executescript(schema)
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+# ============ Hashing ============
+
+def dhash(path: str) -> int | None:
+    """64-bit difference hash as a signed int (SQLite INTEGER); None if undecodable."""
+    from PIL import Image, ImageOps
+    try:
+        with Image.open(path) as img:
+            # JPEG: decode at 1/8 scale — 9×8 pixels don't need more
+            img.draft('L', (64, 64))
+            img = ImageOps.exif_transpose(img).convert('L').resize((9, 8), Image.Resampling.LANCZOS)
+    except Exception as e:
+        print(f"dHash failed for {path}: {e}")
+        return None
+    px = img.load()
+    value = 0
+    for y in range(8):
+        for x in range(8):
+            value = (value << 1) | (px[x, y] > px[x + 1, y])
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def hamming(a: int, b: int) -> int:
+    return ((a ^ b) & 0xFFFFFFFFFFFFFFFF).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree over (hash, id) under the Hamming metric."""
+
+    def __init__(self):
+        self.root = None  # [hash, [ids], {distance: child}]
+        self.size = 0
+
+    def add(self, value: int, item_id: str) -> None:
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item_id], {}]
+            return
+        node = self.root
+        while True:
+            d = hamming(value, node[0])
+            if d == 0:
+                node[1].append(item_id)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [value, [item_id], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> list[tuple[int, str]]:
+        """(distance, id) of every entry within radius, nearest first."""
+        if self.root is None:
+            return []
+        found, stack = [], [self.root]
+        while stack:
+            node = stack.pop()
+            d = hamming(value, node[0])
+            if d <= radius:
+                found.extend((d, item_id) for item_id in node[1])
+            for edge, child in node[2].items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        return sorted(found)
+
+
+def data_version(conn) -> int:
+    try:
+        row = conn.execute('SELECT version FROM data_versions WHERE scope = ?', (SCOPE,)).fetchone()
+    except sqlite3.OperationalError:
+        return -1
+    return row[0] if row else -1
+
+
+def get_tree(conn) -> BKTree:
+    version = data_version(conn)
+    with _cache_lock:
+        if version >= 0 and _cache['version'] == version:
+            return _cache['tree']
+    tree = BKTree()
+    for row in conn.execute('SELECT id, phash FROM gallery_images WHERE phash IS NOT NULL'):
+        tree.add(row[1], row[0])
+    if version >= 0:
+        with _cache_lock:
+            _cache.update(version=version, tree=tree)
+    return tree
+
+
+def find_similar(conn, value: int, max_distance: int = MAX_DISTANCE, exclude_id: str | None = None) -> list[dict]:
+    return [{'id': item_id, 'distance': d}
+            for d, item_id in get_tree(conn).search(value, max_distance) if item_id != exclude_id]
+
+
+def clusters(conn, max_distance: int = MAX_DISTANCE) -> list[list[str]]:
+    """Groups of ids connected by pairs within max_distance (single linkage), largest first."""
+    tree = get_tree(conn)
+    parent = {}
+
+    def find(x):
+        while parent.setdefault(x, x) != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for item_id, value in conn.execute('SELECT id, phash FROM gallery_images WHERE phash IS NOT NULL'):
+        for _, other in tree.search(value, max_distance):
+            if other != item_id:
+                parent[find(other)] = find(item_id)
+    groups = {}
+    for item_id in parent:
+        groups.setdefault(find(item_id), []).append(item_id)
+    return sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True)
+
+
+def backfill(conn, limit: int | None = None) -> dict:
+    """Hash images without phash (original if present, else the display file).
+
+    Failures are recorded (media_backfill) and not retried.
+    """
+    placeholders = ', '.join('?' * len(HASHED_TYPES))
+    rows = conn.execute(
+        f'SELECT id, filename, original_path FROM gallery_images WHERE phash IS NULL AND type IN ({placeholders}) '
+        f"AND {not_failed('image_hash')} ORDER BY uploaded_at" + (f' LIMIT {int(limit)}' if limit else ''), HASHED_TYPES
+    ).fetchall()
+    stats = {'hashed': 0, 'failed': 0}
+    for row in rows:
+        path = next((os.path.join(GALLERY_DIR, p) for p in (row['original_path'], row['filename'])
+                     if p and os.path.isfile(os.path.join(GALLERY_DIR, p))), None)
+        value = dhash(path) if path else None
+        if value is None:
+            record_failure(conn, 'image_hash', row['id'], 'not decodable' if path else 'file missing')
+            stats['failed'] += 1
+            continue
+        conn.execute('UPDATE gallery_images SET phash = ? WHERE id = ?', (value, row['id']))
+        stats['hashed'] += 1
+        if stats['hashed'] % 200 == 0:
+            conn.commit()
+    conn.commit()
+    return stats
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Perceptual hashes / near-duplicates')
+    parser.add_argument('command', choices=['backfill', 'clusters'])
+    parser.add_argument('--distance', type=int, default=MAX_DISTANCE)
+    parser.add_argument('--limit', type=int)
+    args = parser.parse_args(argv)
+    conn = get_db()
+    try:
+        if args.command == 'backfill':
+            print(json.dumps(backfill(conn, args.limit)))
+        else:
+            groups = clusters(conn, args.distance)
+            print(json.dumps({'clusters': len(groups), 'images': sum(map(len, groups)), 'groups': groups[:20]}))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Capture metadata for gallery uploads: shot time, GPS, orientation, camera
+and dimensions, read once from the original during processing.
+
+Images: EXIF via Pillow (header only, no pixel decode). Videos: ffprobe
+format tags (creation_time, ISO 6709 location of phone videos) and the
+first video stream. Stored in gallery_images.taken_at / width / height /
+orientation / camera / gps_lat / gps_lon; the gallery sorts by
+COALESCE(taken_at, uploaded_at) (`/api/gallery?sort=taken`, indexed).
+
+GPS positions are projected onto the garden map (SVG units of map_index)
+with an affine transform fitted to GARDEN_GEO_CONTROL_POINTS,
+"lat,lon,x,y;lat,lon,x,y;lat,lon,x,y" (three or more reference points,
+e.g. corners of the plot read off a satellite map). Photos shot inside the
+map bounds get map_x/map_y pre-filled; admins can still move them.
+
+Usage:
+    python image_meta.py show <file>
+    python image_meta.py geo <lat> <lon>   # check the transform
+    python image_meta.py backfill [--limit N]
+"""
+
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DB_PATH, GALLERY_DIR, GARDEN_GEO_CONTROL_POINTS  # noqa: E402
+from map_index import MAP_BOUNDS  # noqa: E402
+from media_backfill import not_failed, record_failure  # noqa: E402
+from video_transcode import probe  # noqa: E402
+
+COLUMNS = ('taken_at', 'width', 'height', 'orientation', 'camera', 'gps_lat', 'gps_lon')
+
+SCHEMA = '''
+    -- /api/gallery?sort=taken: shot date, upload date for files without one
+    CREATE INDEX IF NOT EXISTS idx_gallery_shot_at ON gallery_images(COALESCE(taken_at, uploaded_at));
+    CREATE INDEX IF NOT EXISTS idx_gallery_category_shot_at ON gallery_images(category, COALESCE(taken_at, uploaded_at));
+'''
+
+# EXIF tags
+ORIENTATION, MAKE, MODEL, DATETIME = 0x0112, 0x010F, 0x0110, 0x0132
+EXIF_IFD, GPS_IFD = 0x8769, 0x8825
+DATETIME_ORIGINAL, DATETIME_DIGITIZED = 0x9003, 0x9004
+
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+ISO6709 = re.compile(r'([+-]\d+(?:\.\d+)?)([+-]\d+(?:\.\d+)?)')
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    conn.executescript(schema)
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+# ============ Extraction ============
+
+def _exif_time(value) -> str | None:
+    try:
+        return datetime.strptime(str(value).strip('\x00 ')[:19], '%Y:%m:%d %H:%M:%S').strftime(TS_FORMAT)
+    except ValueError:
+        return None
+
+
+def _gps_degrees(dms, ref) -> float | None:
+    try:
+        degrees = float(dms[0]) + float(dms[1]) / 60 + float(dms[2]) / 3600
+    except (TypeError, ValueError, IndexError, ZeroDivisionError):
+        return None
+    return -degrees if ref in ('S', 'W') else degrees
+
+
+def _camera(make, model) -> str | None:
+    make = str(make or '').strip('\x00 ')
+    model = str(model or '').strip('\x00 ')
+    if make and model.lower().startswith(make.lower()):
+        make = ''  # "Apple iPhone" vs. "Canon Canon EOS R6"
+    return ' '.join(p for p in (make, model) if p) or None
+
+
+def image_meta(path: str) -> dict:
+    """EXIF metadata of an image; {} if Pillow can't open it."""
+    from PIL import Image
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            exif = img.getexif()
+            sub = exif.get_ifd(EXIF_IFD)
+            gps = exif.get_ifd(GPS_IFD)
+    except Exception as e:
+        print(f"EXIF read failed for {path}: {e}")
+        return {}
+
+    orientation = exif.get(ORIENTATION)
+    if orientation in (5, 6, 7, 8):
+        width, height = height, width  # stored sideways, displayed upright
+    meta = {
+        'taken_at': _exif_time(sub.get(DATETIME_ORIGINAL) or sub.get(DATETIME_DIGITIZED) or exif.get(DATETIME) or ''),
+        'width': width,
+        'height': height,
+        'orientation': orientation if isinstance(orientation, int) else None,
+        'camera': _camera(exif.get(MAKE), exif.get(MODEL)),
+        'gps_lat': None,
+        'gps_lon': None,
+    }
+    if gps.get(2) and gps.get(4):
+        lat, lon = _gps_degrees(gps[2], gps.get(1)), _gps_degrees(gps[4], gps.get(3))
+        if lat is not None and lon is not None and (lat, lon) != (0.0, 0.0):
+            meta['gps_lat'], meta['gps_lon'] = round(lat, 7), round(lon, 7)
+    return meta
+
+
+def video_meta(path: str) -> dict:
+    """ffprobe metadata of a video; {} if ffprobe is missing or fails."""
+    info = probe(path)
+    if not info:
+        return {}
+
+    tags = {k.lower(): v for k, v in (info.get('format', {}).get('tags') or {}).items()}
+    stream = next((s for s in info.get('streams', []) if s.get('codec_type') == 'video'), {})
+    meta = dict.fromkeys(COLUMNS)
+    meta['width'], meta['height'] = stream.get('width'), stream.get('height')
+    rotation = (stream.get('tags') or {}).get('rotate') or next(
+        (sd.get('rotation') for sd in stream.get('side_data_list', []) if 'rotation' in sd), 0)
+    if abs(int(float(rotation or 0))) % 180 == 90 and meta['width']:
+        meta['width'], meta['height'] = meta['height'], meta['width']
+
+    created = tags.get('com.apple.quicktime.creationdate') or tags.get('creation_time')
+    if created:
+        try:
+            # UTC ("…Z") or with offset → local time like uploaded_at
+            meta['taken_at'] = datetime.fromisoformat(created.replace('Z', '+00:00')).astimezone().strftime(TS_FORMAT)
+        except ValueError:
+            pass
+    location = ISO6709.match(tags.get('com.apple.quicktime.location.iso6709') or tags.get('location') or '')
+    if location:
+        meta['gps_lat'], meta['gps_lon'] = float(location.group(1)), float(location.group(2))
+    meta['camera'] = _camera(tags.get('com.apple.quicktime.make'), tags.get('com.apple.quicktime.model'))
+    return meta
+
+
+def extract(path: str, file_type: str) -> dict:
+    return video_meta(path) if file_type == 'video' else image_meta(path)
+
+
+# ============ Garden geo-transform ============
+
+def _parse_control_points(spec: str) -> list[tuple[float, float, float, float]]:
+    points = []
+    for part in filter(None, (p.strip() for p in spec.split(';'))):
+        values = [float(v) for v in part.split(',')]
+        if len(values) != 4:
+            raise ValueError(f'control point needs lat,lon,x,y: {part!r}')
+        points.append(tuple(values))
+    return points
+
+
+def _solve3(m, v):
+    """Solve a 3x3 linear system (Cramer's rule); None if singular."""
+    def det(a):
+        return (a[0][0] * (a[1][1] * a[2][2] - a[1][2] * a[2][1])
+                - a[0][1] * (a[1][0] * a[2][2] - a[1][2] * a[2][0])
+                + a[0][2] * (a[1][0] * a[2][1] - a[1][1] * a[2][0]))
+    d = det(m)
+    if abs(d) < 1e-6:
+        return None
+    return [det([[v[r] if c == i else m[r][c] for c in range(3)] for r in range(3)]) / d for i in range(3)]
+
+
+def _local_metres(lat: float, lon: float, lat0: float, lon0: float) -> tuple[float, float]:
+    """Equirectangular offset in metres — exact enough across a garden, and
+    keeps the normal equations well-conditioned (degrees differ by 1e-4)."""
+    return (lon - lon0) * 111320.0 * math.cos(math.radians(lat0)), (lat - lat0) * 110540.0
+
+
+def fit_transform(points):
+    """Least-squares affine fit (lat, lon) → map (x, y); None if under-determined."""
+    if len(points) < 3:
+        return None
+    lat0 = sum(p[0] for p in points) / len(points)
+    lon0 = sum(p[1] for p in points) / len(points)
+    rows = [(*_local_metres(p[0], p[1], lat0, lon0), 1.0) for p in points]
+    ata = [[sum(r[i] * r[j] for r in rows) for j in range(3)] for i in range(3)]
+    coeffs = []
+    for target in (2, 3):
+        atb = [sum(r[i] * p[target] for r, p in zip(rows, points)) for i in range(3)]
+        solved = _solve3(ata, atb)
+        if solved is None:
+            return None  # collinear points
+        coeffs.append(solved)
+    return lat0, lon0, coeffs[0], coeffs[1]
+
+
+try:
+    _TRANSFORM = fit_transform(_parse_control_points(GARDEN_GEO_CONTROL_POINTS))
+except ValueError as e:
+    print(f"Warning: GARDEN_GEO_CONTROL_POINTS ignored: {e}")
+    _TRANSFORM = None
+
+
+def geo_to_map(lat: float, lon: float) -> tuple[float, float] | None:
+    """Map position of a GPS fix, None without transform or outside the map."""
+    if _TRANSFORM is None or lat is None or lon is None:
+        return None
+    lat0, lon0, cx, cy = _TRANSFORM
+    east, north = _local_metres(lat, lon, lat0, lon0)
+    x = cx[0] * east + cx[1] * north + cx[2]
+    y = cy[0] * east + cy[1] * north + cy[2]
+    x0, y0, x1, y1 = MAP_BOUNDS
+    if not (x0 <= x <= x1 and y0 <= y <= y1):
+        return None
+    return round(x, 1), round(y, 1)
+
+
+def placement(meta: dict) -> tuple[float | None, float | None]:
+    return geo_to_map(meta.get('gps_lat'), meta.get('gps_lon')) or (None, None)
+
+
+# ============ Backfill ============
+
+def backfill(conn, limit: int | None = None) -> dict:
+    """Extract metadata for rows without dimensions; map_x/map_y only where unset.
+
+    Failures are recorded (media_backfill) and not retried.
+    """
+    rows = conn.execute(
+        "SELECT id, type, filename, original_path, map_x FROM gallery_images WHERE width IS NULL "
+        f"AND {not_failed('image_meta')} ORDER BY uploaded_at" + (f' LIMIT {int(limit)}' if limit else '')
+    ).fetchall()
+    stats = {'updated': 0, 'placed': 0, 'failed': 0}
+    for row in rows:
+        path = next((os.path.join(GALLERY_DIR, p) for p in (row['original_path'], row['filename'])
+                     if p and os.path.isfile(os.path.join(GALLERY_DIR, p))), None)
+        meta = extract(path, row['type']) if path else {}
+        if not meta.get('width'):
+            record_failure(conn, 'image_meta', row['id'], 'no dimensions' if path else 'file missing')
+            stats['failed'] += 1
+            continue
+        conn.execute(f"UPDATE gallery_images SET {', '.join(f'{c} = ?' for c in COLUMNS)} WHERE id = ?",
+                     [meta.get(c) for c in COLUMNS] + [row['id']])
+        map_x, map_y = placement(meta)
+        if map_x is not None and row['map_x'] is None:
+            conn.execute('UPDATE gallery_images SET map_x = ?, map_y = ? WHERE id = ?', (map_x, map_y, row['id']))
+            stats['placed'] += 1
+        stats['updated'] += 1
+        if stats['updated'] % 200 == 0:
+            conn.commit()
+    conn.commit()
+    return stats
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Gallery capture metadata')
+    sub = parser.add_subparsers(dest='command', required=True)
+    show = sub.add_parser('show')
+    show.add_argument('path')
+    geo = sub.add_parser('geo')
+    geo.add_argument('lat', type=float)
+    geo.add_argument('lon', type=float)
+    fill = sub.add_parser('backfill')
+    fill.add_argument('--limit', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == 'show':
+        from media import get_file_type
+        meta = extract(args.path, get_file_type(args.path))
+        print(json.dumps({**meta, 'map': placement(meta)}))
+    elif args.command == 'geo':
+        print(json.dumps({'configured': _TRANSFORM is not None, 'map': geo_to_map(args.lat, args.lon)}))
+    else:
+        conn = get_db()
+        try:
+            print(json.dumps(backfill(conn, args.limit)))
+        finally:
+            conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
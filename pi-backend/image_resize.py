@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+On-demand image variants for /images/resize/<w>x<h>/<path>.
+
+The upload pipeline only produces a WebP and a 200px square thumbnail, but
+the map, Slack previews, OG images and completion/issue/inventory photos
+(full-size phone JPEGs in the blob store) want other sizes. A variant is
+generated on first request and cached on disk:
+
+    <w>x<h>    fit inside the box (aspect kept, never upscaled)
+    <w>x<h>c   cover-crop to exactly w×h
+
+Only sizes listed in IMAGE_RESIZE_SIZES are served, so the number of
+variants per source is bounded. Cache files live under
+IMAGE_RESIZE_CACHE_DIR/<key[:2]>/<key>.webp, keyed by size, canonical path
+(relative to the resolved GALLERY_DIR; the route redirects other spellings)
+and the source's mtime/size (a replaced source gets a new key). Only renders
+count against the route's rate limit, cache hits are exempt. The cache is an
+LRU on file mtime: hits touch the file (at most once per TOUCH_SECONDS),
+and when the estimated total exceeds IMAGE_RESIZE_CACHE_MB the oldest
+files are evicted down to 90%. Concurrent requests for the same variant,
+across threads and gunicorn workers, wait on one of LOCK_STRIPES flock
+files instead of decoding the same source twice.
+
+Usage:
+    python image_resize.py stats
+    python image_resize.py evict
+    python image_resize.py clear
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DATA_DIR, GALLERY_DIR  # noqa: E402
+
+CACHE_DIR = os.environ.get('IMAGE_RESIZE_CACHE_DIR', os.path.join(DATA_DIR, 'cache', 'resize'))
+CACHE_BYTES = int(float(os.environ.get('IMAGE_RESIZE_CACHE_MB', 512)) * 1024 * 1024)
+SIZES = frozenset(s.strip() for s in os.environ.get(
+    'IMAGE_RESIZE_SIZES', '64x64c,200x200c,320x240,640x480,800x600,1200x630c,1600x1200'
+).split(',') if s.strip())
+SOURCE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp', 'heic', 'heif'}
+QUALITY = 82
+LOCK_STRIPES = 64
+TOUCH_SECONDS = 3600
+
+SIZE_PATTERN = re.compile(r'^(\d{1,4})x(\d{1,4})(c?)$')
+
+# Estimated cache size of this process; None until the first scan
+_cache_bytes = None
+_cache_lock = threading.Lock()
+
+
+class NotAllowed(Exception):
+    """Size not whitelisted or path outside the gallery / not an image."""
+
+
+def parse_size(size: str) -> tuple[int, int, bool]:
+    m = SIZE_PATTERN.match(size)
+    if size not in SIZES or not m:
+        raise NotAllowed(f'size {size} not allowed')
+    return int(m.group(1)), int(m.group(2)), bool(m.group(3))
+
+
+def source_path(relative_path: str) -> str:
+    """Absolute source path inside GALLERY_DIR (path-traversal safe, symlinks resolved)."""
+    base = os.path.realpath(GALLERY_DIR)
+    full = os.path.realpath(os.path.join(base, relative_path))
+    ext = full.rsplit('.', 1)[-1].lower() if '.' in full else ''
+    if not full.startswith(base + os.sep) or ext not in SOURCE_EXTENSIONS:
+        raise NotAllowed(relative_path)
+    if not os.path.isfile(full):
+        raise FileNotFoundError(relative_path)
+    return full
+
+
+def canonical_path(src: str) -> str:
+    """Gallery-relative path of a resolved source: `a/./x.jpg`, `a//x.jpg`, `b/../a/x.jpg` → `a/x.jpg`."""
+    return os.path.relpath(src, os.path.realpath(GALLERY_DIR)).replace(os.sep, '/')
+
+
+def cache_key(size: str, relative_path: str, st: os.stat_result) -> str:
+    """Key of a variant; relative_path must be canonical, or spellings of one file multiply it."""
+    return hashlib.sha1(f'{size}\0{relative_path}\0{st.st_mtime_ns}\0{st.st_size}'.encode()).hexdigest()
+
+
+def cache_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, key[:2], f'{key}.webp')
+
+
+def render(src: str, dest: str, width: int, height: int, crop: bool) -> None:
+    """Decode, orient, resize and write WebP atomically (tmp + rename)."""
+    from PIL import Image, ImageOps
+    with Image.open(src) as img:
+        # JPEG: decode at 1/2…1/8 scale when that still covers the target
+        img.draft('RGB', (width * 2, height * 2))
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'A' in img.getbands() or img.mode == 'P' else 'RGB')
+        if crop:
+            img = ImageOps.fit(img, (width, height), Image.Resampling.LANCZOS)
+        else:
+            img.thumbnail((width, height), Image.Resampling.LANCZOS)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f'{dest}.tmp-{os.getpid()}-{threading.get_ident()}'
+        img.save(tmp, 'WEBP', quality=QUALITY, method=4)
+    os.replace(tmp, dest)
+
+
+def _touch(path: str, st: os.stat_result) -> None:
+    if time.time() - st.st_mtime > TOUCH_SECONDS:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+
+def _locate(size: str, relative_path: str) -> tuple[str, str, str]:
+    """(source, cache key, cache path) for a request path."""
+    parse_size(size)
+    src = source_path(relative_path)
+    key = cache_key(size, canonical_path(src), os.stat(src))
+    return src, key, cache_path(key)
+
+
+def is_cached(size: str, relative_path: str) -> bool:
+    """Variant already on disk (cheap: two stats) — such requests skip the rate limit."""
+    try:
+        return os.path.exists(_locate(size, relative_path)[2])
+    except Exception:
+        return False
+
+
+def get_variant(size: str, relative_path: str) -> tuple[str, str]:
+    """Path of the cached variant (generated if needed) and its key (ETag)."""
+    width, height, crop = parse_size(size)
+    src, key, dest = _locate(size, relative_path)
+    try:
+        _touch(dest, os.stat(dest))
+        return dest, key
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(os.path.join(CACHE_DIR, 'locks'), exist_ok=True)
+    stripe = os.path.join(CACHE_DIR, 'locks', f'{int(key[:8], 16) % LOCK_STRIPES}.lock')
+    with open(stripe, 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        # Another thread/worker may have rendered it while we waited
+        if not os.path.exists(dest):
+            render(src, dest, width, height, crop)
+            _account(os.path.getsize(dest))
+    return dest, key
+
+
+def _entries():
+    """(path, size, mtime) of every cached variant."""
+    try:
+        shards = list(os.scandir(CACHE_DIR))
+    except FileNotFoundError:
+        return
+    for shard in shards:
+        if not shard.is_dir() or shard.name == 'locks':
+            continue
+        for entry in os.scandir(shard.path):
+            if entry.name.endswith('.webp'):
+                st = entry.stat()
+                yield entry.path, st.st_size, st.st_mtime
+
+
+def _account(added: int) -> None:
+    global _cache_bytes
+    with _cache_lock:
+        if _cache_bytes is None:
+            _cache_bytes = sum(size for _, size, _ in _entries())
+        else:
+            _cache_bytes += added
+        over = _cache_bytes > CACHE_BYTES
+    if over:
+        evict()
+
+
+def evict(target: float = 0.9) -> dict:
+    """Delete least recently used variants until the cache is below target × cap.
+
+    Rescans the directory, so estimates of other workers don't matter; one
+    evicting process at a time (non-blocking flock, others just skip).
+    """
+    global _cache_bytes
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(os.path.join(CACHE_DIR, 'evict.lock'), 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return {'skipped': True}
+        entries = sorted(_entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        removed = freed = 0
+        for path, size, _ in entries:
+            if total <= CACHE_BYTES * target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            freed += size
+            removed += 1
+    with _cache_lock:
+        _cache_bytes = total
+    return {'removed': removed, 'freed_bytes': freed, 'bytes': total}
+
+
+def stats() -> dict:
+    entries = list(_entries())
+    return {'dir': CACHE_DIR, 'variants': len(entries), 'bytes': sum(e[1] for e in entries),
+            'cap_bytes': CACHE_BYTES, 'sizes': sorted(SIZES)}
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Resized image cache')
+    parser.add_argument('command', choices=['stats', 'evict', 'clear'])
+    args = parser.parse_args(argv)
+    if args.command == 'stats':
+        print(json.dumps(stats()))
+    elif args.command == 'evict':
+        print(json.dumps(evict()))
+    else:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        print(json.dumps({'cleared': CACHE_DIR}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""External integrations: Telegram webhook, InfiniLoop IT-task API and the bug report endpoint."""
+
+from flask import Blueprint, request, jsonify, send_file, current_app
+import os
+import functools
+import uuid
+from datetime import datetime
+
+from telegram_service import answer_callback_query
+from config import DATA_DIR, DB_PATH, INFINILOOP_API_KEY
+from db import get_db
+from extensions import limiter
+from auth import require_admin
+
+bp = Blueprint('integrations', __name__)
+
+
+@bp.route('/api/telegram/webhook', methods=['POST'])
+def telegram_webhook():
+    """Handle Telegram bot callbacks and messages."""
+    data = request.json or {}
+
+    # Import agent
+    try:
+        from telegram_agent import GartenAgent
+        agent = GartenAgent(DB_PATH)
+    except ImportError:
+        agent = None
+
+    # Callback queries (gallery moderation + agent confirmations)
+    if 'callback_query' in data:
+        callback_query = data['callback_query']
+        callback_data = callback_query.get('data', '')
+        callback_id = callback_query.get('id', '')
+
+        # Let agent handle non-gallery callbacks
+        if agent and not callback_data.startswith(('approve:', 'reject:')):
+            agent.handle_callback(callback_query)
+            return jsonify({'ok': True})
+
+        # Gallery moderation (existing logic)
+        if ':' not in callback_data:
+            return jsonify({'ok': True})
+
+        action, image_id = callback_data.split(':', 1)
+        if action not in ('approve', 'reject'):
+            return jsonify({'ok': True})
+
+        conn = get_db()
+        row = conn.execute('SELECT * FROM gallery_images WHERE id = ?', (image_id,)).fetchone()
+
+        if not row:
+            answer_callback_query(callback_id, "Bild nicht gefunden")
+            conn.close()
+            return jsonify({'ok': True})
+
+        if action == 'approve':
+            conn.execute("UPDATE gallery_images SET status = 'approved' WHERE id = ?", (image_id,))
+            conn.commit()
+            answer_callback_query(callback_id, "Freigegeben!")
+        elif action == 'reject':
+            conn.execute("UPDATE gallery_images SET status = 'rejected' WHERE id = ?", (image_id,))
+            conn.commit()
+            answer_callback_query(callback_id, "Abgelehnt!")
+
+        conn.close()
+
+    # Text messages → Agent
+    elif 'message' in data and 'text' in data['message']:
+        if agent:
+            agent.process_message(
+                chat_id=data['message']['chat']['id'],
+                text=data['message']['text'],
+                user_info=data['message'].get('from', {})
+            )
+
+    return jsonify({'ok': True})
+
+
+# ─── InfiniLoop API (IT-Task Automation) ─────────────────────
+
+# Status mapping: Garten (deutsch) ↔ InfiniLoop (englisch)
+INFINILOOP_STATUS_TO_GARTEN = {
+    'in_progress': 'in_arbeit',
+    'resolved': 'erledigt',
+    'closed': 'cancelled',
+    'open': 'offen',
+}
+GARTEN_STATUS_TO_INFINILOOP = {
+    'offen': 'open',
+    'in_arbeit': 'in_progress',
+    'erledigt': 'resolved',
+    'done': 'resolved',
+    'cancelled': 'closed',
+}
+
+
+def require_infiniloop_key(f):
+    """Decorator to require InfiniLoop API key."""
+    @functools.wraps(f)
+    def decorated(*args, **kwargs):
+        key = request.headers.get('X-API-Key', '')
+        if not INFINILOOP_API_KEY or key != INFINILOOP_API_KEY:
+            return jsonify({'error': 'Unauthorized'}), 401
+        return f(*args, **kwargs)
+    return decorated
+
+
+@bp.route('/api/infiniloop/tasks', methods=['GET'])
+@require_infiniloop_key
+def infiniloop_list_tasks():
+    """List open IT tasks for InfiniLoop agent."""
+    conn = get_db()
+    rows = conn.execute('''
+        SELECT id, title, description, category, priority, status, created_at, due_date
+        FROM projects
+        WHERE category = 'it' AND status = 'offen'
+        ORDER BY
+            CASE priority WHEN 'kritisch' THEN 0 WHEN 'hoch' THEN 1 WHEN 'mittel' THEN 2 ELSE 3 END,
+            created_at ASC
+    ''').fetchall()
+    conn.close()
+
+    tasks = []
+    for row in rows:
+        r = dict(row)
+        tasks.append({
+            'id': str(r['id']),
+            'title': r['title'],
+            'description': r.get('description', ''),
+            'category': 'it',
+            'priority': r.get('priority', 'normal'),
+            'status': GARTEN_STATUS_TO_INFINILOOP.get(r['status'], 'open'),
+            'created_at': r.get('created_at', ''),
+            'due_date': r.get('due_date', ''),
+        })
+
+    return jsonify({'data': tasks})
+
+
+@bp.route('/api/infiniloop/tasks/<int:task_id>', methods=['GET'])
+@require_infiniloop_key
+def infiniloop_get_task(task_id):
+    """Get single IT task for InfiniLoop agent."""
+    conn = get_db()
+    row = conn.execute('''
+        SELECT id, title, description, category, priority, status, created_at, due_date
+        FROM projects WHERE id = ? AND category = 'it'
+    ''', (task_id,)).fetchone()
+    conn.close()
+
+    if not row:
+        return jsonify({'error': 'Task nicht gefunden'}), 404
+
+    r = dict(row)
+    return jsonify({
+        'id': str(r['id']),
+        'title': r['title'],
+        'description': r.get('description', ''),
+        'category': 'it',
+        'priority': r.get('priority', 'normal'),
+        'status': GARTEN_STATUS_TO_INFINILOOP.get(r['status'], 'open'),
+        'created_at': r.get('created_at', ''),
+        'due_date': r.get('due_date', ''),
+    })
+
+
+@bp.route('/api/infiniloop/tasks/<int:task_id>/status', methods=['PATCH'])
+@require_infiniloop_key
+def infiniloop_update_task_status(task_id):
+    """Update IT task status from InfiniLoop agent."""
+    data = request.get_json()
+    if not data or 'status' not in data:
+        return jsonify({'error': 'Status fehlt'}), 400
+
+    new_status_en = data['status']
+    new_status_de = INFINILOOP_STATUS_TO_GARTEN.get(new_status_en)
+    if not new_status_de:
+        return jsonify({'error': f'Ungültiger Status: {new_status_en}'}), 400
+
+    conn = get_db()
+    # Verify task exists and is an IT task
+    row = conn.execute('SELECT id, status FROM projects WHERE id = ? AND category = ?', (task_id, 'it')).fetchone()
+    if not row:
+        conn.close()
+        return jsonify({'error': 'IT-Task nicht gefunden'}), 404
+
+    conn.execute(
+        'UPDATE projects SET status = ?, updated_at = ? WHERE id = ?',
+        (new_status_de, datetime.now().isoformat(), task_id)
+    )
+    conn.commit()
+    conn.close()
+
+    return jsonify({'success': True, 'status': new_status_en})
+
+
+@bp.route('/api/infiniloop/notify_reporter', methods=['POST'])
+@require_infiniloop_key
+def infiniloop_notify_reporter():
+    """Phase 13: Magic-Link-Mail an Reporter, der nicht im Slack-Channel ist.
+
+    InfiniLoop ruft diesen Endpoint, sobald eine Task fuer einen nicht im
+    Channel anwesenden Reporter angelegt wird. Wir verschicken die Mail mit
+    dem Rueckfrage-Link ueber unser eigenes Resend-Setup (eigenes Branding).
+    """
+    data = request.get_json(silent=True) or {}
+    email = (data.get('email') or '').strip()
+    token_url = (data.get('token_url') or '').strip()
+    task_title = (data.get('task_title') or '').strip()
+    task_description = (data.get('task_description') or '').strip()
+
+    if not email or '@' not in email:
+        return jsonify({'error': 'email fehlt/ungueltig'}), 400
+    if not token_url or not token_url.startswith(('http://', 'https://')):
+        return jsonify({'error': 'token_url fehlt/ungueltig'}), 400
+
+    try:
+        from email_service import send_infiniloop_magic_link
+        sent = send_infiniloop_magic_link(email, token_url, task_title, task_description)
+    except Exception as e:
+        current_app.logger.exception('infiniloop_notify_reporter failed: %s', e)
+        return jsonify({'ok': False, 'error': 'send_failed'}), 500
+
+    return jsonify({'ok': True, 'sent': sent})
+
+
+# ─── Bug Report API (Auto-Error-Reporter → IT-Task) ──────────
+
+BUGREPORTS_DIR = os.path.join(DATA_DIR, 'bugreports')
+
+
+@bp.route('/api/bugreport', methods=['POST'])
+@limiter.limit("5 per 5 minutes")
+def create_bugreport():
+    """Auto-Error-Reporter Endpoint.
+
+    Legt einen Task in projects (category='it') an, den der InfiniLoop-Agent
+    automatisch abarbeitet. Kein Auth — Gäste/Nicht-eingeloggte User sollen
+    melden können. Schutz: Rate-Limit (5/5min via flask-limiter) + Honeypot
+    + Payload-Limits + Content-Type-Whitelist für Screenshot.
+    """
+    # Payload-Limit: 5 MB bei Multipart, 100 KB bei JSON
+    if request.content_length:
+        is_multipart = (request.content_type or '').startswith('multipart/')
+        max_bytes = 5 * 1024 * 1024 if is_multipart else 100 * 1024
+        if request.content_length > max_bytes:
+            return jsonify({'error': 'Payload zu gross'}), 413
+
+    # Accept both FormData (mit Screenshot) und JSON
+    data = request.form if request.form else (request.get_json(silent=True) or {})
+
+    # Honeypot — Bots füllen versteckte Felder aus
+    if data.get('website'):
+        return jsonify({'error': 'Invalid'}), 400
+
+    title_suffix = (data.get('title') or 'Unbekannter Fehler').strip()[:120]
+    description = (data.get('description') or '').strip()[:8000]
+    page_url = (data.get('page_url') or '').strip()[:500]
+    user_agent = (data.get('user_agent') or request.headers.get('User-Agent', ''))[:500]
+
+    if len(description) < 10:
+        return jsonify({'error': 'Beschreibung zu kurz'}), 400
+
+    ip = request.headers.get('X-Forwarded-For', request.remote_addr or '0.0.0.0').split(',')[0].strip()
+
+    # Optional: Screenshot-Upload
+    screenshot_relpath = None
+    screenshot = request.files.get('screenshot') if request.files else None
+    if screenshot and screenshot.filename:
+        if not (screenshot.mimetype or '').startswith('image/'):
+            return jsonify({'error': 'Screenshot muss Bild sein'}), 400
+        os.makedirs(BUGREPORTS_DIR, exist_ok=True)
+        ext = (screenshot.mimetype or 'image/png').split('/')[-1].replace('jpeg', 'jpg')
+        if ext not in ('png', 'jpg', 'gif', 'webp'):
+            ext = 'png'
+        fname = f"{uuid.uuid4()}.{ext}"
+        screenshot.save(os.path.join(BUGREPORTS_DIR, fname))
+        screenshot_relpath = f"/uploads/bugreports/{fname}"
+
+    full_description = (
+        f"**Gemeldet via Auto-Error-Reporter**\n\n"
+        f"**URL:** {page_url}\n"
+        f"**User-Agent:** {user_agent}\n"
+        f"**IP:** {ip}\n\n"
+        f"---\n\n"
+        f"{description}"
+    )
+    if screenshot_relpath:
+        full_description += f"\n\n**Screenshot:** {screenshot_relpath}"
+
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO projects (title, description, category, status, priority, created_by)
+        VALUES (?, ?, 'it', 'offen', 'mittel', 'auto-error-reporter')
+    ''', (f"Bug Meldung: {title_suffix}", full_description))
+    project_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+
+    # Junction-Table für category (konsistent mit create_project)
+    cat_row = conn.execute("SELECT id FROM categories WHERE name = 'it'").fetchone()
+    if cat_row:
+        conn.execute(
+            'INSERT OR IGNORE INTO project_categories (project_id, category_id) VALUES (?, ?)',
+            (project_id, cat_row['id'])
+        )
+    conn.commit()
+    conn.close()
+
+    return jsonify({'success': True, 'projectId': project_id}), 201
+
+
+@bp.route('/uploads/bugreports/<path:filename>', methods=['GET'])
+@require_admin
+def serve_bugreport_screenshot(filename, user=None):
+    """Serve bug report screenshots (admin only, path-traversal safe)."""
+    target_path = os.path.join(BUGREPORTS_DIR, filename)
+    real_target = os.path.realpath(target_path)
+    real_base = os.path.realpath(BUGREPORTS_DIR)
+    if not (real_target == real_base or real_target.startswith(real_base + os.sep)):
+        return jsonify({'error': 'Ungültiger Dateipfad'}), 400
+    if not os.path.isfile(real_target):
+        return jsonify({'error': 'Datei nicht gefunden'}), 404
+    return send_file(real_target)
@@ -0,0 +1,364 @@
+"""Inventory: buildings, floors, rooms, items and furniture metadata."""
+
+from flask import Blueprint, current_app, request, jsonify
+import sqlite3
+import hashlib
+import secrets
+from datetime import datetime
+
+from db import get_db
+from extensions import storage
+from api_helpers import generic_patch
+from auth import require_admin, require_auth
+from media import allowed_file, slugify
+from inventory_tree import get_tree_json
+from search_index import match_refs
+
+bp = Blueprint('inventory', __name__)
+
+
+# ============ Inventory Endpoints ============
+
+@bp.route('/api/inventory/buildings', methods=['GET'])
+def get_inventory_buildings():
+    """Get all buildings with nested floors and rooms, including item counts.
+
+    Served from the per-worker tree cache (inventory_tree.py); clients that
+    send the last ETag get a 304 until the inventory changes.
+    """
+    conn = get_db()
+    try:
+        body, etag = get_tree_json(conn)
+    finally:
+        conn.close()
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+@bp.route('/api/inventory/buildings', methods=['POST'])
+@require_admin
+def create_inventory_building(user):
+    """Admin: Create a new building."""
+    data = request.get_json()
+    if not data or not data.get('name'):
+        return jsonify({'error': 'Name ist erforderlich'}), 400
+
+    bid = slugify(data['name']) or hashlib.md5(data['name'].encode()).hexdigest()[:12]
+    conn = get_db()
+    try:
+        conn.execute(
+            'INSERT INTO inventory_buildings (id, name, icon, has_floors, sort_order) VALUES (?, ?, ?, ?, ?)',
+            (bid, data['name'], data.get('icon', '🏠'), data.get('has_floors', False),
+             data.get('sort_order', 0))
+        )
+        conn.commit()
+    except sqlite3.IntegrityError:
+        conn.close()
+        return jsonify({'error': 'Gebäude existiert bereits'}), 409
+    conn.close()
+    return jsonify({'success': True, 'id': bid}), 201
+
+
+@bp.route('/api/inventory/buildings/<building_id>', methods=['PATCH'])
+@require_admin
+def update_inventory_building(building_id, user):
+    """Admin: Update a building."""
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Keine Daten'}), 400
+
+    conn = get_db()
+    building = conn.execute('SELECT * FROM inventory_buildings WHERE id = ?', (building_id,)).fetchone()
+    if not building:
+        conn.close()
+        return jsonify({'error': 'Gebäude nicht gefunden'}), 404
+
+    updates = []
+    params = []
+    for field in ['name', 'icon', 'has_floors', 'sort_order', 'map_area']:
+        if field in data:
+            updates.append(f'{field} = ?')
+            params.append(data[field])
+
+    if updates:
+        params.append(building_id)
+        conn.execute(f'UPDATE inventory_buildings SET {", ".join(updates)} WHERE id = ?', params)
+        conn.commit()
+
+    conn.close()
+    return jsonify({'success': True})
+
+
+@bp.route('/api/inventory/rooms', methods=['GET'])
+def get_inventory_rooms():
+    """Get all rooms, optionally filtered by building."""
+    building_id = request.args.get('building')
+    conn = get_db()
+
+    if building_id:
+        rooms = conn.execute('''
+            SELECT r.*, b.name as building_name, f.name as floor_name
+            FROM inventory_rooms r
+            JOIN inventory_buildings b ON r.building_id = b.id
+            LEFT JOIN inventory_floors f ON r.floor_id = f.id
+            WHERE r.building_id = ?
+            ORDER BY r.sort_order
+        ''', (building_id,)).fetchall()
+    else:
+        rooms = conn.execute('''
+            SELECT r.*, b.name as building_name, f.name as floor_name
+            FROM inventory_rooms r
+            JOIN inventory_buildings b ON r.building_id = b.id
+            LEFT JOIN inventory_floors f ON r.floor_id = f.id
+            ORDER BY b.sort_order, f.sort_order, r.sort_order
+        ''').fetchall()
+
+    conn.close()
+    return jsonify({'rooms': [dict(r) for r in rooms]})
+
+
+@bp.route('/api/inventory/rooms', methods=['POST'])
+@require_admin
+def create_inventory_room(user):
+    """Admin: Create a new room."""
+    data = request.get_json()
+    if not data or not data.get('name') or not data.get('building_id'):
+        return jsonify({'error': 'Name und building_id sind erforderlich'}), 400
+
+    rid = slugify(data['name']) or hashlib.md5(data['name'].encode()).hexdigest()[:12]
+    # Make ID unique by prepending building
+    rid = f"{data['building_id']}_{rid}"
+
+    conn = get_db()
+    try:
+        conn.execute(
+            'INSERT INTO inventory_rooms (id, building_id, floor_id, name, icon, sort_order) VALUES (?, ?, ?, ?, ?, ?)',
+            (rid, data['building_id'], data.get('floor_id'), data['name'],
+             data.get('icon', '🚪'), data.get('sort_order', 0))
+        )
+        conn.commit()
+    except sqlite3.IntegrityError:
+        conn.close()
+        return jsonify({'error': 'Raum existiert bereits'}), 409
+    conn.close()
+    return jsonify({'success': True, 'id': rid}), 201
+
+
+@bp.route('/api/inventory/floors/<floor_id>', methods=['PATCH'])
+@require_auth
+def update_floor(floor_id, user):
+    """Update a floor."""
+    return generic_patch('inventory_floors', floor_id, request.json,
+        ['name', 'icon', 'sort_order'], timestamp_field=None)
+
+
+@bp.route('/api/inventory/rooms/<room_id>', methods=['DELETE'])
+@require_admin
+def delete_room(room_id, user):
+    """Admin: Delete a room (only if empty)."""
+    conn = get_db()
+    items = conn.execute('SELECT COUNT(*) as c FROM inventory_items WHERE room_id = ?', (room_id,)).fetchone()['c']
+    if items > 0:
+        conn.close()
+        return jsonify({'error': f'Raum enthält noch {items} Gegenstände'}), 400
+    conn.execute('DELETE FROM inventory_rooms WHERE id = ?', (room_id,))
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True})
+
+
+@bp.route('/api/inventory/buildings/<building_id>', methods=['DELETE'])
+@require_admin
+def delete_building(building_id, user):
+    """Admin: Delete a building (only if no rooms)."""
+    conn = get_db()
+    rooms = conn.execute('SELECT COUNT(*) as c FROM inventory_rooms WHERE building_id = ?', (building_id,)).fetchone()['c']
+    if rooms > 0:
+        conn.close()
+        return jsonify({'error': f'Gebäude enthält noch {rooms} Räume'}), 400
+    conn.execute('DELETE FROM inventory_floors WHERE building_id = ?', (building_id,))
+    conn.execute('DELETE FROM inventory_buildings WHERE id = ?', (building_id,))
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True})
+
+
+@bp.route('/api/inventory/items', methods=['GET'])
+def get_inventory_items():
+    """Get inventory items with optional filters."""
+    room_id = request.args.get('room')
+    search = request.args.get('search')
+    vorhanden = request.args.get('vorhanden')
+
+    conn = get_db()
+    query = '''
+        SELECT i.*, r.name as room_name, r.building_id, b.name as building_name
+        FROM inventory_items i
+        LEFT JOIN inventory_rooms r ON i.room_id = r.id
+        LEFT JOIN inventory_buildings b ON r.building_id = b.id
+        WHERE 1=1
+    '''
+    params = []
+
+    if room_id:
+        query += ' AND i.room_id = ?'
+        params.append(room_id)
+
+    if search:
+        refs, refs_params = match_refs(search, 'inventory')
+        query += f' AND i.id IN ({refs})'
+        params.extend(refs_params)
+
+    if vorhanden is not None:
+        query += ' AND i.vorhanden = ?'
+        params.append(1 if vorhanden.lower() in ('true', '1') else 0)
+
+    query += ' ORDER BY i.room_id, i.ablageort, i.position, i.name'
+    items = conn.execute(query, params).fetchall()
+    conn.close()
+
+    return jsonify({'items': [dict(item) for item in items], 'total': len(items)})
+
+
+@bp.route('/api/inventory/items', methods=['POST'])
+@require_auth
+def create_inventory_item(user):
+    """Create a new inventory item."""
+    data = request.get_json()
+    if not data or not data.get('name'):
+        return jsonify({'error': 'Name ist erforderlich'}), 400
+
+    item_id = hashlib.md5(f"{data['name']}-{datetime.now().isoformat()}-{secrets.token_hex(4)}".encode()).hexdigest()[:16]
+    now = datetime.now().isoformat()
+
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO inventory_items (id, name, room_id, category, notes, quantity, ablageort, position, kauflink, vorhanden, created_by, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        item_id, data['name'], data.get('room_id'), data.get('category'),
+        data.get('notes'), data.get('quantity', 1), data.get('ablageort'),
+        data.get('position'), data.get('kauflink'),
+        data.get('vorhanden', True), user.get('email'), now, now
+    ))
+    conn.commit()
+    conn.close()
+
+    return jsonify({'success': True, 'id': item_id}), 201
+
+
+@bp.route('/api/inventory/items/<item_id>', methods=['PATCH'])
+@require_auth
+def update_inventory_item(item_id, user):
+    """Update an inventory item."""
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Keine Daten'}), 400
+
+    conn = get_db()
+    item = conn.execute('SELECT * FROM inventory_items WHERE id = ?', (item_id,)).fetchone()
+    if not item:
+        conn.close()
+        return jsonify({'error': 'Item nicht gefunden'}), 404
+
+    allowed_fields = ['name', 'room_id', 'category', 'notes', 'quantity', 'ablageort', 'position', 'kauflink', 'vorhanden']
+    updates = []
+    params = []
+    for field in allowed_fields:
+        if field in data:
+            updates.append(f'{field} = ?')
+            params.append(data[field])
+
+    if updates:
+        updates.append('updated_at = ?')
+        params.append(datetime.now().isoformat())
+        params.append(item_id)
+        conn.execute(f'UPDATE inventory_items SET {", ".join(updates)} WHERE id = ?', params)
+        conn.commit()
+
+    conn.close()
+    return jsonify({'success': True})
+
+
+@bp.route('/api/inventory/items/<item_id>', methods=['DELETE'])
+@require_admin
+def delete_inventory_item(item_id, user):
+    """Admin: Delete an inventory item."""
+    conn = get_db()
+    item = conn.execute('SELECT * FROM inventory_items WHERE id = ?', (item_id,)).fetchone()
+    if not item:
+        conn.close()
+        return jsonify({'error': 'Item nicht gefunden'}), 404
+
+    conn.execute('DELETE FROM inventory_items WHERE id = ?', (item_id,))
+    conn.commit()
+
+    # Delete photo if exists (blob: only once nothing else references it)
+    storage.release(conn, item['photo_path'])
+    conn.close()
+    return jsonify({'success': True})
+
+
+@bp.route('/api/inventory/items/<item_id>/photo', methods=['POST'])
+@require_auth
+def upload_inventory_photo(item_id, user):
+    """Upload a photo for an inventory item."""
+    conn = get_db()
+    item = conn.execute('SELECT * FROM inventory_items WHERE id = ?', (item_id,)).fetchone()
+    if not item:
+        conn.close()
+        return jsonify({'error': 'Item nicht gefunden'}), 404
+
+    if 'file' not in request.files:
+        conn.close()
+        return jsonify({'error': 'Keine Datei'}), 400
+
+    file = request.files['file']
+    if not file.filename or not allowed_file(file.filename):
+        conn.close()
+        return jsonify({'error': 'Ungültiger Dateityp'}), 400
+
+    # Content-addressed: the same photo for several items is stored once
+    ext = file.filename.rsplit('.', 1)[1].lower()
+    staged = storage.stage(file.stream, ext)
+    photo_path = storage.commit_blob(conn, staged)
+    conn.execute('UPDATE inventory_items SET photo_path = ?, updated_at = ? WHERE id = ?',
+                 (photo_path, datetime.now().isoformat(), item_id))
+    conn.commit()
+
+    # Replaced photo
+    if item['photo_path'] and item['photo_path'] != photo_path:
+        storage.release(conn, item['photo_path'])
+    conn.close()
+
+    return jsonify({'success': True, 'photo_path': photo_path})
+
+
+@bp.route('/api/inventory/furniture-meta', methods=['GET'])
+def get_furniture_meta():
+    """Get furniture/ablageort icons."""
+    conn = get_db()
+    meta = conn.execute('SELECT * FROM inventory_furniture_meta').fetchall()
+    conn.close()
+    return jsonify({'meta': [dict(m) for m in meta]})
+
+
+@bp.route('/api/inventory/furniture-meta', methods=['PATCH'])
+@require_auth
+def update_furniture_meta(user):
+    """Set icon for a furniture/ablageort."""
+    data = request.get_json()
+    if not data or not data.get('room_id') or not data.get('ablageort'):
+        return jsonify({'error': 'room_id und ablageort sind erforderlich'}), 400
+
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO inventory_furniture_meta (room_id, ablageort, icon) VALUES (?, ?, ?)
+        ON CONFLICT(room_id, ablageort) DO UPDATE SET icon = excluded.icon
+    ''', (data['room_id'], data['ablageort'], data.get('icon', '🪑')))
+    conn.commit()
+    conn.close()
+
+    return jsonify({'success': True})
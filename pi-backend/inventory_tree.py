@@ -0,0 +1,150 @@
+"""
+Nested inventory tree (buildings → floors → rooms with item counts), cached
+per worker.
+
+Triggers on inventory_buildings / _floors / _rooms / _items bump
+data_versions['inventory'] on every write (routes, generic_patch,
+agent_tools.manage_inventory, telegram_agent), so a request only costs one
+primary-key read while nothing changed. The tree is rebuilt once per
+version per process; the JSON body and its ETag are cached with it.
+
+Used by GET /api/inventory/buildings, the Telegram `inventar` commands and
+the assistant's get_inventory_overview tool.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+
+from config import DB_PATH
+
+SCOPE = 'inventory'
+TABLES = ('inventory_buildings', 'inventory_floors', 'inventory_rooms', 'inventory_items')
+
+
+def _schema() -> str:
+    parts = [f"INSERT OR IGNORE INTO data_versions (scope, version) VALUES ('{SCOPE}', 0);"]
+    for table in TABLES:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            parts.append(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_inventory_version_{table}_{event.lower()} AFTER {event} ON {table} BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE scope = '{SCOPE}';
+    END;''')
+    return '\n'.join(parts)
+
+
+SCHEMA = _schema()
+
+_cache_lock = threading.Lock()
+_cache = {'version': None, 'tree': None, 'body': None, 'etag': None}
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    conn.executescript(schema)
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def data_version(conn) -> int:
+    try:
+        row = conn.execute('SELECT version FROM data_versions WHERE scope = ?', (SCOPE,)).fetchone()
+    except sqlite3.OperationalError:
+        return -1
+    return row[0] if row else -1
+
+
+def build_tree(conn) -> list[dict]:
+    """Buildings with nested floors/rooms. Rooms carry item_count (all items) and
+    present_count (vorhanden = 1); buildings carry the sums."""
+    buildings = conn.execute('SELECT * FROM inventory_buildings ORDER BY sort_order').fetchall()
+    floors = conn.execute('SELECT * FROM inventory_floors ORDER BY sort_order').fetchall()
+    rooms = conn.execute('SELECT * FROM inventory_rooms ORDER BY sort_order').fetchall()
+
+    counts = {}
+    for row in conn.execute(
+        'SELECT room_id, COUNT(*) AS cnt, SUM(vorhanden = 1) AS present FROM inventory_items GROUP BY room_id'
+    ):
+        counts[row['room_id']] = (row['cnt'], row['present'] or 0)
+
+    floors_by_building = {}
+    for f in floors:
+        floors_by_building.setdefault(f['building_id'], []).append(dict(f))
+
+    rooms_by_floor = {}
+    rooms_by_building_no_floor = {}
+    totals = {}
+    for r in rooms:
+        rd = dict(r)
+        rd['item_count'], rd['present_count'] = counts.get(r['id'], (0, 0))
+        t = totals.setdefault(r['building_id'], [0, 0])
+        t[0] += rd['item_count']
+        t[1] += rd['present_count']
+        if r['floor_id']:
+            rooms_by_floor.setdefault(r['floor_id'], []).append(rd)
+        else:
+            rooms_by_building_no_floor.setdefault(r['building_id'], []).append(rd)
+
+    result = []
+    for b in buildings:
+        bd = dict(b)
+        bd['has_floors'] = bool(b['has_floors'])
+        bd['item_count'], bd['present_count'] = totals.get(b['id'], (0, 0))
+        bd['floors'] = []
+        if bd['has_floors']:
+            for f in floors_by_building.get(b['id'], []):
+                f['rooms'] = rooms_by_floor.get(f['id'], [])
+                bd['floors'].append(f)
+        # Also for buildings with floors: rooms not (yet) assigned to one
+        # still belong to the building (iter_rooms, Telegram listing)
+        bd['rooms'] = rooms_by_building_no_floor.get(b['id'], [])
+        result.append(bd)
+    return result
+
+
+def _cached(conn) -> dict:
+    version = data_version(conn)
+    with _cache_lock:
+        if version >= 0 and _cache['version'] == version:
+            return dict(_cache)
+    tree = build_tree(conn)
+    body = json.dumps({'buildings': tree}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    entry = {'version': version, 'tree': tree, 'body': body,
+             'etag': hashlib.sha1(body).hexdigest()[:20]}
+    if version >= 0:
+        with _cache_lock:
+            _cache.update(entry)
+    return entry
+
+
+def get_tree(conn=None) -> list[dict]:
+    """The cached tree. Treat it as read-only — it is shared between requests."""
+    own = conn is None
+    conn = conn or get_db()
+    try:
+        return _cached(conn)['tree']
+    finally:
+        if own:
+            conn.close()
+
+
+def get_tree_json(conn) -> tuple[bytes, str]:
+    """(serialized {'buildings': tree}, ETag) for the HTTP endpoint."""
+    entry = _cached(conn)
+    return entry['body'], entry['etag']
+
+
+def iter_rooms(building: dict):
+    """Rooms of one building in display order (floor rooms first, then floorless)."""
+    for f in building['floors']:
+        yield from f['rooms']
+    yield from building['rooms']
+
+
+def find_building(tree: list[dict], name: str) -> dict | None:
+    name = (name or '').strip().lower()
+    return next((b for b in tree if b['name'].lower() == name), None)
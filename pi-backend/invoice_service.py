@@ -3,29 +3,23 @@ Invoice Service for Voigt-Garten
 Generates PDF invoices with GiroCode QR codes for bank transfers.
 """
 
+import importlib.util
 import os
 import sqlite3
 from datetime import datetime, date, timedelta
 from io import BytesIO
 from typing import Optional
 
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.units import mm, cm
-    from reportlab.lib.colors import HexColor, black, white
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.styles import getSampleStyleSheet
-    from reportlab.platypus import Paragraph
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
+from credit_ledger import get_balance
+
+# reportlab/segno are only needed when a PDF is actually rendered, so they are
+# imported inside the functions below. Availability is probed without loading them.
+REPORTLAB_AVAILABLE = importlib.util.find_spec('reportlab') is not None
+if not REPORTLAB_AVAILABLE:
     print("Warning: reportlab not available, PDF generation disabled")
 
-try:
-    import segno
-    SEGNO_AVAILABLE = True
-except ImportError:
-    SEGNO_AVAILABLE = False
+SEGNO_AVAILABLE = importlib.util.find_spec('segno') is not None
+if not SEGNO_AVAILABLE:
     print("Warning: segno not available, QR code generation disabled")
 
 
@@ -80,6 +74,8 @@ def generate_girocode_qr(
     if not SEGNO_AVAILABLE:
         return None
 
+    import segno
+
     try:
         # EPC QR code format (version 002)
         epc_data = '\n'.join([
@@ -119,6 +115,11 @@ def generate_invoice_pdf(
         print("reportlab not available")
         return None
 
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.lib.colors import HexColor
+    from reportlab.pdfgen import canvas
+
     conn = get_db(db_path)
     invoice = conn.execute('SELECT * FROM invoices WHERE id = ?', (invoice_id,)).fetchone()
     if not invoice:
@@ -370,10 +371,7 @@ def create_invoice_from_booking(
     booking = dict(booking)
 
     # Check for existing credits
-    credits_total = conn.execute(
-        'SELECT COALESCE(SUM(amount), 0) as total FROM credits WHERE guest_email = ?',
-        (booking['guest_email'],)
-    ).fetchone()['total']
+    credits_total = get_balance(conn, booking['guest_email'])['total']
 
     # Generate invoice number
     invoice_number = get_next_invoice_number(db_path)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Materialized per-area status for the garden map (`map_area_stats`).
+
+One row per map area with open project count, active recurring task count,
+earliest next_due, inventory and photo counts, the description and the due
+status. Triggers on projects, recurring_tasks, inventory_buildings/_rooms/
+_items, gallery_images and map_area_descriptions recompute the affected
+area(s) in the same transaction as the write — indexed COUNTs over one area,
+not the whole garden. /api/map/areas is a single read of this table.
+
+The status ('overdue' / 'due-soon' / 'ok') depends on the date, so the agent
+scheduler re-evaluates it every night after midnight (kind 'map_area_status').
+
+Usage:
+    python map_area_stats.py rebuild    # recompute every area from the source tables
+    python map_area_stats.py refresh    # re-evaluate the due status only
+    python map_area_stats.py show
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DB_PATH  # noqa: E402
+
+RUN_HOUR = 0
+DONE_STATUSES = "('erledigt', 'abgeschlossen')"
+
+STATUS_SQL = '''CASE
+            WHEN first_due IS NULL THEN 'ok'
+            WHEN first_due < date('now', 'localtime') THEN 'overdue'
+            WHEN first_due <= date('now', 'localtime', '+7 days') THEN 'due-soon'
+            ELSE 'ok' END'''
+
+BASE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS map_area_stats (
+        area_id TEXT PRIMARY KEY,
+        open_projects INTEGER NOT NULL DEFAULT 0,
+        recurring_count INTEGER NOT NULL DEFAULT 0,
+        first_due TEXT,                     -- MIN(next_due) of active recurring tasks
+        status TEXT NOT NULL DEFAULT 'ok',
+        inventory_count INTEGER NOT NULL DEFAULT 0,
+        photo_count INTEGER NOT NULL DEFAULT 0,
+        has_description INTEGER NOT NULL DEFAULT 0,
+        description TEXT,
+        updated_at TEXT
+    ) WITHOUT ROWID;
+
+    -- per-area COUNTs in the triggers below
+    CREATE INDEX IF NOT EXISTS idx_projects_map_area ON projects(map_area, status);
+    CREATE INDEX IF NOT EXISTS idx_recurring_map_area ON recurring_tasks(map_area, is_active, next_due);
+    CREATE INDEX IF NOT EXISTS idx_gallery_map_area ON gallery_images(map_area, status);
+    CREATE INDEX IF NOT EXISTS idx_inventory_buildings_map_area ON inventory_buildings(map_area);
+    CREATE INDEX IF NOT EXISTS idx_inventory_rooms_building ON inventory_rooms(building_id);
+'''
+
+
+def _refresh_statements(area: str) -> list[str]:
+    """Statements that recompute one area; `area` is an SQL expression (NEW.map_area, :area, …)."""
+    return [
+        f"INSERT INTO map_area_stats (area_id) SELECT {area} WHERE {area} IS NOT NULL "
+        f"ON CONFLICT(area_id) DO NOTHING",
+        f'''UPDATE map_area_stats SET
+            open_projects = (SELECT COUNT(*) FROM projects
+                             WHERE map_area = {area} AND status NOT IN {DONE_STATUSES}),
+            recurring_count = (SELECT COUNT(*) FROM recurring_tasks WHERE map_area = {area} AND is_active = 1),
+            first_due = (SELECT MIN(next_due) FROM recurring_tasks WHERE map_area = {area} AND is_active = 1),
+            inventory_count = (SELECT COUNT(*) FROM inventory_buildings b
+                               JOIN inventory_rooms r ON r.building_id = b.id
+                               JOIN inventory_items i ON i.room_id = r.id
+                               WHERE b.map_area = {area}),
+            photo_count = (SELECT COUNT(*) FROM gallery_images WHERE map_area = {area} AND status = 'approved'),
+            has_description = EXISTS (SELECT 1 FROM map_area_descriptions WHERE area_id = {area}),
+            description = (SELECT description FROM map_area_descriptions WHERE area_id = {area}),
+            updated_at = datetime('now', 'localtime')
+        WHERE area_id = {area}''',
+        f"UPDATE map_area_stats SET status = {STATUS_SQL} WHERE area_id = {area}",
+        f"DELETE FROM map_area_stats WHERE area_id = {area} AND NOT has_description "
+        f"AND open_projects + recurring_count + inventory_count + photo_count = 0",
+    ]
+
+
+def _building_area(building_id: str) -> str:
+    return f"(SELECT map_area FROM inventory_buildings WHERE id = {building_id})"
+
+
+def _room_area(room_id: str) -> str:
+    return (f"(SELECT b.map_area FROM inventory_rooms r JOIN inventory_buildings b ON b.id = r.building_id "
+            f"WHERE r.id = {room_id})")
+
+
+# (table, trigger suffix, event, WHEN clause or None, area expression)
+_TRIGGERS = [
+    ('projects', 'ins', 'INSERT', None, 'NEW.map_area'),
+    ('projects', 'upd', 'UPDATE OF map_area, status', None, 'NEW.map_area'),
+    ('projects', 'upd_old', 'UPDATE OF map_area', 'OLD.map_area IS NOT NEW.map_area', 'OLD.map_area'),
+    ('projects', 'del', 'DELETE', None, 'OLD.map_area'),
+    ('recurring_tasks', 'ins', 'INSERT', None, 'NEW.map_area'),
+    ('recurring_tasks', 'upd', 'UPDATE OF map_area, is_active, next_due', None, 'NEW.map_area'),
+    ('recurring_tasks', 'upd_old', 'UPDATE OF map_area', 'OLD.map_area IS NOT NEW.map_area', 'OLD.map_area'),
+    ('recurring_tasks', 'del', 'DELETE', None, 'OLD.map_area'),
+    ('gallery_images', 'ins', 'INSERT', None, 'NEW.map_area'),
+    ('gallery_images', 'upd', 'UPDATE OF map_area, status', None, 'NEW.map_area'),
+    ('gallery_images', 'upd_old', 'UPDATE OF map_area', 'OLD.map_area IS NOT NEW.map_area', 'OLD.map_area'),
+    ('gallery_images', 'del', 'DELETE', None, 'OLD.map_area'),
+    ('inventory_items', 'ins', 'INSERT', None, _room_area('NEW.room_id')),
+    ('inventory_items', 'upd', 'UPDATE OF room_id', None, _room_area('NEW.room_id')),
+    ('inventory_items', 'upd_old', 'UPDATE OF room_id', 'OLD.room_id IS NOT NEW.room_id', _room_area('OLD.room_id')),
+    ('inventory_items', 'del', 'DELETE', None, _room_area('OLD.room_id')),
+    ('inventory_rooms', 'upd', 'UPDATE OF building_id', None, _building_area('NEW.building_id')),
+    ('inventory_rooms', 'upd_old', 'UPDATE OF building_id', 'OLD.building_id IS NOT NEW.building_id',
+     _building_area('OLD.building_id')),
+    ('inventory_rooms', 'del', 'DELETE', None, _building_area('OLD.building_id')),
+    ('inventory_buildings', 'upd', 'UPDATE OF map_area', None, 'NEW.map_area'),
+    ('inventory_buildings', 'upd_old', 'UPDATE OF map_area', 'OLD.map_area IS NOT NEW.map_area', 'OLD.map_area'),
+    ('inventory_buildings', 'del', 'DELETE', None, 'OLD.map_area'),
+    ('map_area_descriptions', 'ins', 'INSERT', None, 'NEW.area_id'),
+    ('map_area_descriptions', 'upd', 'UPDATE', None, 'NEW.area_id'),
+    ('map_area_descriptions', 'upd_old', 'UPDATE OF area_id', 'OLD.area_id IS NOT NEW.area_id', 'OLD.area_id'),
+    ('map_area_descriptions', 'del', 'DELETE', None, 'OLD.area_id'),
+]
+
+
+def _triggers_sql() -> str:
+    parts = []
+    for table, suffix, event, when, area in _TRIGGERS:
+        body = ';\n        '.join(_refresh_statements(area))
+        cond = f' WHEN {when}' if when else ''
+        parts.append(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_map_area_stats_{table}_{suffix} AFTER {event} ON {table}{cond} BEGIN
+        {body};
+    END;''')
+    return ''.join(parts)
+
+
+SCHEMA = BASE_SCHEMA + _triggers_sql()
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    conn.executescript(schema)
+    if not conn.execute('SELECT 1 FROM map_area_stats LIMIT 1').fetchone():
+        rebuild(conn, commit=False)
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def rebuild(conn: sqlite3.Connection, commit: bool = True) -> int:
+    """Recompute every area any source table mentions. Returns the number of areas."""
+    areas = [r[0] for r in conn.execute('''
+        SELECT map_area FROM projects WHERE map_area IS NOT NULL
+        UNION SELECT map_area FROM recurring_tasks WHERE map_area IS NOT NULL
+        UNION SELECT map_area FROM gallery_images WHERE map_area IS NOT NULL
+        UNION SELECT map_area FROM inventory_buildings WHERE map_area IS NOT NULL
+        UNION SELECT area_id FROM map_area_descriptions
+        UNION SELECT area_id FROM map_area_stats
+    ''')]
+    statements = _refresh_statements(':area')
+    for area in areas:
+        for sql in statements:
+            conn.execute(sql, {'area': area})
+    if commit:
+        conn.commit()
+    return len(areas)
+
+
+def refresh_status(conn: sqlite3.Connection) -> int:
+    """Re-evaluate due status against today's date. Returns the number of changed areas."""
+    cur = conn.execute(f'''
+        UPDATE map_area_stats SET status = {STATUS_SQL}, updated_at = datetime('now', 'localtime')
+        WHERE status != {STATUS_SQL}
+    ''')
+    conn.commit()
+    return cur.rowcount
+
+
+def get_areas(conn: sqlite3.Connection) -> dict:
+    """The /api/map/areas payload: {area_id: {task_count, status, inventory_count, description, photo_count}}."""
+    return {
+        row['area_id']: {
+            'task_count': row['open_projects'] + row['recurring_count'],
+            'status': row['status'],
+            'inventory_count': row['inventory_count'],
+            'description': row['description'] or '',
+            'photo_count': row['photo_count'],
+        }
+        for row in conn.execute('SELECT * FROM map_area_stats')
+    }
+
+
+def handle_refresh(conn: sqlite3.Connection, item, now: datetime) -> dict:
+    """agent_scheduler handler: nightly due-status refresh."""
+    from agent_scheduler import schedule, tomorrow_at
+    changed = refresh_status(conn)
+    schedule(conn, 'map_area_status', 0, tomorrow_at(now, RUN_HOUR))
+    return {'action': 'map_area_status', 'changed': changed}
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Materialized map area status')
+    parser.add_argument('command', choices=['rebuild', 'refresh', 'show'])
+    args = parser.parse_args(argv)
+    conn = get_db()
+    try:
+        if args.command == 'rebuild':
+            print(json.dumps({'areas': rebuild(conn)}))
+        elif args.command == 'refresh':
+            print(json.dumps({'changed': refresh_status(conn)}))
+        else:
+            print(json.dumps(get_areas(conn), indent=2, ensure_ascii=False))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Spatial index for map photo points.
+
+Photo points (approved gallery images with map_x/map_y, SVG units of the
+1602x787 garden map) are loaded once per data version into a grid pyramid:
+level z has square cells of CELL_SIZE / 2**z units, each holding the
+cluster summary (count, centroid, bounds, one sample thumbnail), and the
+finest level keeps the points themselves. A viewport query only touches the
+cells overlapping the bbox; below CLUSTER_MAX_ZOOM cells with more than one
+point come back as clusters.
+
+The index is rebuilt when data_versions['map_points'] changes (bumped by a
+trigger on every gallery_images write). Per-area aggregates live in
+map_area_stats.py.
+"""
+
+import math
+import sqlite3
+import threading
+
+from config import DB_PATH
+
+CELL_SIZE = 256.0        # level-0 cell edge in map units
+CLUSTER_MAX_ZOOM = 4     # zoom >= this: single points only
+MAP_BOUNDS = (0.0, 0.0, 1602.0, 787.0)
+
+
+def _schema() -> str:
+    parts = [
+        "INSERT OR IGNORE INTO data_versions (scope, version) VALUES ('map_points', 0);",
+        # Loading the index reads only placed, approved images
+        "CREATE INDEX IF NOT EXISTS idx_gallery_map_points ON gallery_images(map_x, map_y) "
+        "WHERE map_x IS NOT NULL AND map_y IS NOT NULL AND status = 'approved';",
+    ]
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        parts.append(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_map_points_version_gallery_images_{event.lower()} AFTER {event} ON gallery_images BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE scope = 'map_points';
+    END;''')
+    return '\n'.join(parts)
+
+
+SCHEMA = _schema()
+
+_cache_lock = threading.Lock()
+_points_cache = {'version': None, 'index': None}
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    conn.executescript(schema)
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def data_version(conn, scope: str) -> int:
+    try:
+        row = conn.execute('SELECT version FROM data_versions WHERE scope = ?', (scope,)).fetchone()
+    except sqlite3.OperationalError:
+        return -1
+    return row[0] if row else -1
+
+
+def _thumbnail_url(row) -> str:
+    """Same logic as get_gallery."""
+    thumb = row['thumbnail_path']
+    if thumb:
+        return thumb if thumb.startswith('/') else f"/images/gallery/{thumb}"
+    return f"/images/gallery/{row['filename']}"
+
+
+def format_point(row) -> dict:
+    return {
+        'id': row['id'],
+        'name': row['name'] or 'Ohne Titel',
+        'category': row['category'] or 'sonstiges',
+        'type': row['type'] or 'image',
+        'map_x': row['map_x'],
+        'map_y': row['map_y'],
+        'map_area': row['map_area'],
+        'thumbnailUrl': _thumbnail_url(row),
+    }
+
+
+class PointIndex:
+    """Grid pyramid over photo points; levels 0 … CLUSTER_MAX_ZOOM."""
+
+    def __init__(self, points: list[dict]):
+        self.points = points
+        self.levels = []
+        for z in range(CLUSTER_MAX_ZOOM + 1):
+            size = CELL_SIZE / (2 ** z)
+            cells = {}
+            for p in points:
+                key = (math.floor(p['map_x'] / size), math.floor(p['map_y'] / size))
+                cell = cells.get(key)
+                if cell is None:
+                    cells[key] = cell = {'count': 0, 'sx': 0.0, 'sy': 0.0, 'bounds': [p['map_x'], p['map_y'], p['map_x'], p['map_y']],
+                                         'points': [] if z == CLUSTER_MAX_ZOOM else None, 'sample': p}
+                cell['count'] += 1
+                cell['sx'] += p['map_x']
+                cell['sy'] += p['map_y']
+                b = cell['bounds']
+                b[0], b[1] = min(b[0], p['map_x']), min(b[1], p['map_y'])
+                b[2], b[3] = max(b[2], p['map_x']), max(b[3], p['map_y'])
+                if cell['points'] is not None:
+                    cell['points'].append(p)
+            self.levels.append((size, cells))
+
+    def _cells(self, z: int, bbox):
+        size, cells = self.levels[z]
+        if bbox is None:
+            yield from cells.values()
+            return
+        x0, y0, x1, y1 = bbox
+        cx0, cy0 = math.floor(x0 / size), math.floor(y0 / size)
+        cx1, cy1 = math.floor(x1 / size), math.floor(y1 / size)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(cells):
+            # Viewport covers more cells than exist: walk the occupied ones
+            for (cx, cy), cell in cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    yield cell
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    yield cell
+
+    def query(self, bbox=None, zoom: int | None = None) -> dict:
+        """Points (and clusters when zoom < CLUSTER_MAX_ZOOM) inside bbox (x0, y0, x1, y1).
+
+        Without a bbox every placed point counts, also those outside MAP_BOUNDS.
+        """
+        def inside(p):
+            if bbox is None:
+                return True
+            x0, y0, x1, y1 = bbox
+            return x0 <= p['map_x'] <= x1 and y0 <= p['map_y'] <= y1
+
+        if zoom is None or zoom >= CLUSTER_MAX_ZOOM:
+            points = [p for cell in self._cells(CLUSTER_MAX_ZOOM, bbox) for p in cell['points'] if inside(p)]
+            return {'points': points, 'clusters': [], 'total': len(points)}
+
+        points, clusters, total = [], [], 0
+        for cell in self._cells(max(zoom, 0), bbox):
+            if cell['count'] == 1:
+                if inside(cell['sample']):
+                    points.append(cell['sample'])
+                    total += 1
+                continue
+            # Edge cells may stick out of the viewport; the cluster is kept whole
+            clusters.append({
+                'x': round(cell['sx'] / cell['count'], 1),
+                'y': round(cell['sy'] / cell['count'], 1),
+                'count': cell['count'],
+                'bounds': [round(v, 1) for v in cell['bounds']],
+                'thumbnailUrl': cell['sample']['thumbnailUrl'],
+            })
+            total += cell['count']
+        return {'points': points, 'clusters': clusters, 'total': total}
+
+
+def get_point_index(conn) -> PointIndex:
+    version = data_version(conn, 'map_points')
+    with _cache_lock:
+        if version >= 0 and _points_cache['version'] == version:
+            return _points_cache['index']
+    rows = conn.execute(
+        "SELECT id, name, category, type, map_x, map_y, map_area, thumbnail_path, filename "
+        "FROM gallery_images WHERE map_x IS NOT NULL AND map_y IS NOT NULL AND status = 'approved'"
+    ).fetchall()
+    index = PointIndex([format_point(r) for r in rows])
+    if version >= 0:
+        with _cache_lock:
+            _points_cache.update(version=version, index=index)
+    return index
+
@@ -0,0 +1,88 @@
+"""Garden map: photo points, area status and area descriptions."""
+
+import math
+
+from flask import Blueprint, request, jsonify
+from datetime import datetime
+
+from db import get_db
+from auth import require_admin
+from map_area_stats import get_areas
+from map_index import get_point_index
+
+bp = Blueprint('map', __name__)
+
+
+@bp.route('/api/map/photo-points', methods=['GET'])
+def get_map_photo_points():
+    """Get gallery images with precise map coordinates for display on the garden map.
+
+    Optional viewport: ?bbox=x0,y0,x1,y1 (map units) limits the result to the
+    visible part; ?zoom=0..4 groups nearby points into clusters below zoom 4.
+    Without parameters all points are returned, as before.
+    """
+    bbox = None
+    if request.args.get('bbox'):
+        try:
+            bbox = [float(v) for v in request.args['bbox'].split(',')]
+        except ValueError:
+            bbox = []
+        if len(bbox) != 4 or not all(math.isfinite(v) for v in bbox) \
+                or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+            return jsonify({'error': 'bbox muss x0,y0,x1,y1 sein'}), 400
+    zoom = request.args.get('zoom', type=int)
+
+    conn = get_db()
+    try:
+        index = get_point_index(conn)
+    finally:
+        conn.close()
+
+    result = index.query(bbox, zoom)
+    if zoom is None:
+        return jsonify({'points': result['points'], 'total': result['total']})
+    return jsonify(result)
+
+
+@bp.route('/api/map/areas', methods=['GET'])
+def get_map_areas():
+    """Get aggregated data per map area for the garden map (map_area_stats, kept by triggers)."""
+    conn = get_db()
+    try:
+        areas = get_areas(conn)
+    finally:
+        conn.close()
+    return jsonify({'areas': areas})
+
+
+@bp.route('/api/map/area-descriptions', methods=['GET'])
+def get_area_descriptions():
+    """Get all map area descriptions."""
+    conn = get_db()
+    rows = conn.execute('SELECT area_id, description, updated_at, updated_by FROM map_area_descriptions').fetchall()
+    conn.close()
+    return jsonify({row['area_id']: {'description': row['description'], 'updated_at': row['updated_at'], 'updated_by': row['updated_by']} for row in rows})
+
+
+@bp.route('/api/admin/map/area-descriptions', methods=['PUT'])
+@require_admin
+def update_area_description(user):
+    """Admin: Update a map area description."""
+    data = request.get_json()
+    area_id = data.get('area_id')
+    description = data.get('description', '')
+
+    if not area_id:
+        return jsonify({'error': 'area_id erforderlich'}), 400
+
+    conn = get_db()
+    conn.execute(
+        '''INSERT INTO map_area_descriptions (area_id, description, updated_at, updated_by)
+           VALUES (?, ?, ?, ?)
+           ON CONFLICT(area_id) DO UPDATE SET description = ?, updated_at = ?, updated_by = ?''',
+        (area_id, description, datetime.now().isoformat(), user.get('email'),
+         description, datetime.now().isoformat(), user.get('email'))
+    )
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True})
@@ -0,0 +1,192 @@
+"""
+Media helpers: upload validation, slugs, WebP/thumbnail conversion and
+ffmpeg video processing for the gallery and inventory blueprints.
+"""
+
+import importlib.util
+import os
+import re
+import subprocess
+
+from config import GALLERY_DIR
+
+
+ALLOWED_IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp', 'heic', 'heif'}
+ALLOWED_VIDEO_EXTENSIONS = {'mp4', 'mov', 'webm', 'avi'}
+ALLOWED_EXTENSIONS = ALLOWED_IMAGE_EXTENSIONS | ALLOWED_VIDEO_EXTENSIONS
+
+# Pillow is probed here but only imported on first image operation, so worker
+# boot and the db CLI don't pay for it.
+PILLOW_AVAILABLE = importlib.util.find_spec('PIL') is not None
+if not PILLOW_AVAILABLE:
+    print("Warning: Pillow not available, image processing disabled")
+
+
+def _pil_image():
+    """Return the PIL.Image module (imported lazily)."""
+    from PIL import Image
+    return Image
+
+
+def allowed_file(filename):
+    """Check if file extension is allowed."""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def get_file_type(filename):
+    """Determine if file is image or video."""
+    ext = filename.rsplit('.', 1)[1].lower()
+    return 'video' if ext in ALLOWED_VIDEO_EXTENSIONS else 'image'
+
+
+def slugify(text):
+    """Convert text to URL-safe slug."""
+    if not text:
+        return None
+    # Lowercase and replace umlauts
+    text = text.lower()
+    text = text.replace('ä', 'ae').replace('ö', 'oe').replace('ü', 'ue').replace('ß', 'ss')
+    # Remove special chars, keep alphanumeric and spaces
+    text = re.sub(r'[^a-z0-9\s-]', '', text)
+    # Replace spaces with hyphens
+    text = re.sub(r'[\s]+', '-', text.strip())
+    # Remove multiple hyphens
+    text = re.sub(r'-+', '-', text)
+    return text[:50] if text else None
+
+
+def get_unique_base_name(conn, category, base_name, extension='webp'):
+    """Generate unique filename by appending -2, -3, etc. if the name is taken.
+
+    One range scan over idx_gallery_filename instead of probing the disk.
+    """
+    prefix = f"{category}/{base_name}"
+    pattern = re.compile(rf'^{re.escape(prefix)}(?:-(\d+))?\.{re.escape(extension)}$')
+    taken = [pattern.match(row[0]) for row in conn.execute(
+        'SELECT filename FROM gallery_images WHERE filename >= ? AND filename < ?',
+        (prefix, prefix + '\uffff'),
+    )]
+    numbers = [int(m.group(1) or 1) for m in taken if m]
+    new_name = f"{base_name}-{max(numbers) + 1}" if numbers else base_name
+    if os.path.exists(os.path.join(GALLERY_DIR, category, f"{new_name}.{extension}")):
+        # File on disk without a gallery row (manual copy, aborted upload)
+        import time
+        new_name = f"{base_name}-{int(time.time())}"
+    if numbers:
+        print(f"Duplicate detected: {base_name} -> {new_name}")
+    return new_name
+
+
+def convert_image_to_webp(input_path, output_path, quality=85):
+    """Convert image to WebP format, upright per EXIF orientation.
+
+    The WebP carries no metadata (no GPS in public files); capture data is
+    stored in gallery_images by image_meta.py.
+    """
+    if not PILLOW_AVAILABLE:
+        return False
+    Image = _pil_image()
+    from PIL import ImageOps
+    try:
+        with Image.open(input_path) as img:
+            img = ImageOps.exif_transpose(img)
+            # Convert to RGB if necessary (for PNG with transparency)
+            if img.mode in ('RGBA', 'LA', 'P'):
+                # Create white background for transparent images
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                if img.mode == 'P':
+                    img = img.convert('RGBA')
+                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+                img = background
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            img.save(output_path, 'WEBP', quality=quality, method=6)
+        return True
+    except Exception as e:
+        print(f"WebP conversion failed: {e}")
+        return False
+
+
+def create_thumbnail(input_path, output_path, size=(200, 200), quality=80):
+    """Create square thumbnail for image."""
+    if not PILLOW_AVAILABLE:
+        return False
+    Image = _pil_image()
+    from PIL import ImageOps
+    try:
+        with Image.open(input_path) as img:
+            # JPEG: decode at 1/2…1/8 scale when that still covers the thumbnail
+            # (large panoramas otherwise decode fully inside the upload request)
+            img.draft('RGB', (size[0] * 2, size[1] * 2))
+            img = ImageOps.exif_transpose(img)
+            # Convert to RGB
+            if img.mode in ('RGBA', 'LA', 'P'):
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                if img.mode == 'P':
+                    img = img.convert('RGBA')
+                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+                img = background
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            # Crop to square (center crop)
+            width, height = img.size
+            min_dim = min(width, height)
+            left = (width - min_dim) // 2
+            top = (height - min_dim) // 2
+            img = img.crop((left, top, left + min_dim, top + min_dim))
+
+            # Resize
+            img.thumbnail(size, Image.Resampling.LANCZOS)
+            img.save(output_path, 'WEBP', quality=quality)
+        return True
+    except Exception as e:
+        print(f"Thumbnail creation failed: {e}")
+        return False
+
+
+def create_video_thumbnail(input_path, output_path, size=(200, 200)):
+    """Create thumbnail from video using ffmpeg."""
+    try:
+        temp_frame = output_path.replace('.webp', '_frame.jpg')
+        # Extract frame at 1 second
+        subprocess.run([
+            'ffmpeg', '-y', '-i', input_path,
+            '-ss', '00:00:01', '-vframes', '1',
+            '-vf', f'scale={size[0]}:{size[1]}:force_original_aspect_ratio=increase,crop={size[0]}:{size[1]}',
+            temp_frame
+        ], capture_output=True, timeout=30)
+
+        if os.path.exists(temp_frame):
+            # Convert to WebP
+            if PILLOW_AVAILABLE:
+                with _pil_image().open(temp_frame) as img:
+                    img.save(output_path, 'WEBP', quality=80)
+                os.remove(temp_frame)
+                return True
+            else:
+                # Fallback: just use the jpg
+                os.rename(temp_frame, output_path.replace('.webp', '.jpg'))
+                return True
+    except Exception as e:
+        print(f"Video thumbnail creation failed: {e}")
+    return False
+
+
+def optimize_video(input_path, output_path, on_progress=None):
+    """Web version of a video: remux or budgeted transcode (see video_transcode.py)."""
+    from video_transcode import transcode
+    try:
+        original_size = os.path.getsize(input_path)
+        result = transcode(input_path, output_path, on_progress)
+        if result and os.path.exists(output_path):
+            new_size = os.path.getsize(output_path)
+            detail = result['action'] if result['action'] == 'remux' else \
+                f"{result['encoder']} {result.get('preset') or result.get('bitrate')} {result.get('height') or ''}p"
+            print(f"Video optimized ({detail}, {result['seconds']}s): "
+                  f"{original_size/1024/1024:.1f}MB -> {new_size/1024/1024:.1f}MB")
+            return True
+    except Exception as e:
+        print(f"Video optimization failed: {e}")
+    return False
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+One-off backfills for gallery columns added after images were uploaded.
+
+  image_hash  phash of images/panoramas (image_hash.backfill)
+  image_meta  capture metadata and map placement (image_meta.backfill)
+  panorama    multires tile pyramids (panorama_tiles.py build, child process)
+
+New uploads fill these during processing, so the backlog only has to be
+worked off once. Instead of re-running everything on every container start,
+the agent scheduler runs it (kind `media_backfill`, queued by migration 022):
+each run handles BATCH_SIZE rows per task and re-queues itself
+BATCH_PAUSE_SECONDS later while work is left, then the queue row is
+dropped. Panorama builds (PANORAMA_BATCH at a time) run detached; a later
+run collects their exit status, so the scheduler never waits for one.
+`queue` starts another round, e.g. after a restore.
+
+Files that can't be processed (missing, undecodable) are recorded in
+media_backfill_failures and skipped from then on; `retry` clears them.
+Failed panoramas are already marked in gallery_images.multires
+(`panorama_tiles.py pending --retry`).
+
+Usage:
+    python media_backfill.py status
+    python media_backfill.py run              # whole backlog in this process
+    python media_backfill.py queue
+    python media_backfill.py retry [task]
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DB_PATH  # noqa: E402
+
+KIND = 'media_backfill'
+# Tasks that record failures here (panoramas: gallery_images.multires)
+RECORDED_TASKS = ('image_hash', 'image_meta')
+BATCH_SIZE = 200
+PANORAMA_BATCH = 1
+BATCH_PAUSE_SECONDS = 60
+PANORAMA_TIMEOUT = 1800
+
+# Tile builds started by this process: image_id → (Popen, start time)
+_builds = {}
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS media_backfill_failures (
+        image_id TEXT NOT NULL,
+        task TEXT NOT NULL,                    -- image_hash | image_meta
+        error TEXT,
+        failed_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+        PRIMARY KEY (image_id, task)
+    );
+'''
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    conn.executescript(schema)
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def not_failed(task: str) -> str:
+    """WHERE fragment for gallery_images rows: skip images this task already failed on."""
+    return f"id NOT IN (SELECT image_id FROM media_backfill_failures WHERE task = '{task}')"
+
+
+def record_failure(conn, task: str, image_id: str, error: str) -> None:
+    conn.execute(
+        'INSERT OR REPLACE INTO media_backfill_failures (image_id, task, error) VALUES (?, ?, ?)',
+        (image_id, task, error[:300]),
+    )
+
+
+def _finish_build(conn, image_id: str, error: str) -> None:
+    # A killed build (OOM, timeout) stored nothing: mark it like build() marks errors
+    conn.execute('UPDATE gallery_images SET multires = ? WHERE id = ? AND multires IS NULL',
+                 (json.dumps({'error': error}), image_id))
+    conn.commit()
+
+
+def _build_panoramas(conn, limit: int, wait: bool = False) -> dict:
+    """Start up to `limit` tile builds as child processes without waiting for them.
+
+    The scheduler loop must not block for a build's minutes; the next run
+    collects finished builds (exit status) and starts the next ones.
+    """
+    import panorama_tiles
+    for image_id, (proc, started) in list(_builds.items()):
+        if wait:
+            try:
+                proc.wait(timeout=max(PANORAMA_TIMEOUT - (time.monotonic() - started), 1))
+            except subprocess.TimeoutExpired:
+                pass
+        if proc.poll() is None and time.monotonic() - started > PANORAMA_TIMEOUT:
+            proc.kill()
+            proc.wait()
+            _finish_build(conn, image_id, 'build timed out')
+        elif proc.poll() is not None:
+            _finish_build(conn, image_id, f'build exited with {proc.returncode}')
+        else:
+            continue
+        del _builds[image_id]
+
+    ids = [i for i in panorama_tiles.pending_ids(conn) if i not in _builds]
+    started = ids[:max(limit - len(_builds), 0)]
+    for image_id in started:
+        # Own process like on upload: the decoded panorama stays out of the scheduler
+        proc = subprocess.Popen([sys.executable, os.path.abspath(panorama_tiles.__file__), 'build', image_id],
+                                stdout=subprocess.DEVNULL)
+        _builds[image_id] = (proc, time.monotonic())
+    return {'started': len(started), 'running': len(_builds), 'more': bool(_builds) or len(ids) > len(started)}
+
+
+def run_batch(conn, limit: int = BATCH_SIZE, panoramas: int = PANORAMA_BATCH, wait: bool = False) -> dict:
+    """One round of every task. 'more' is set if a task may have rows left (or builds running)."""
+    from image_hash import backfill as hash_backfill
+    from image_meta import backfill as meta_backfill
+    hashed = hash_backfill(conn, limit)
+    meta = meta_backfill(conn, limit)
+    built = _build_panoramas(conn, panoramas, wait)
+    return {
+        'image_hash': hashed,
+        'image_meta': meta,
+        'panorama': built,
+        'more': (hashed['hashed'] + hashed['failed'] >= limit
+                 or meta['updated'] + meta['failed'] >= limit
+                 or built['more']),
+    }
+
+
+def handle_backfill(conn: sqlite3.Connection, item, now: datetime) -> dict:
+    """agent_scheduler handler: one batch, re-queued until the backlog is empty."""
+    from agent_scheduler import schedule, unschedule
+    stats = run_batch(conn)
+    if stats['more']:
+        schedule(conn, KIND, 0, now + timedelta(seconds=BATCH_PAUSE_SECONDS))
+        return {'action': 'media_backfill_batch', **stats}
+    unschedule(conn, KIND, 0)
+    return {'action': 'media_backfill_done', **stats}
+
+
+def status(conn) -> dict:
+    failures = {task: count for task, count in conn.execute(
+        'SELECT task, COUNT(*) FROM media_backfill_failures GROUP BY task'
+    )}
+    queued = conn.execute('SELECT due_at FROM agent_schedule WHERE kind = ? AND ref_id = 0', (KIND,)).fetchone()
+    return {'failures': failures, 'queued': queued[0] if queued else None}
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='One-off gallery media backfills')
+    parser.add_argument('command', choices=['status', 'run', 'queue', 'retry'])
+    parser.add_argument('task', nargs='?', choices=RECORDED_TASKS)
+    args = parser.parse_args(argv)
+    conn = get_db()
+    try:
+        if args.command == 'run':
+            while True:
+                stats = run_batch(conn, wait=True)
+                print(json.dumps(stats))
+                if not stats['more']:
+                    break
+        elif args.command == 'queue':
+            from agent_scheduler import schedule
+            schedule(conn, KIND, 0, datetime.now())
+            conn.commit()
+            print(json.dumps(status(conn)))
+        elif args.command == 'retry':
+            cur = conn.execute('DELETE FROM media_backfill_failures WHERE task = COALESCE(?, task)', (args.task,))
+            conn.commit()
+            print(json.dumps({'cleared': cur.rowcount}))
+        else:
+            print(json.dumps(status(conn)))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Multi-resolution cube tiles for 360° panoramas (Pannellum `multires`).
+
+upload_panorama keeps the equirectangular original untouched; this module
+slices it into the tile pyramid Pannellum's multires mode loads on demand:
+
+    <category>/<base>_tiles/<level>/<face><row>_<col>.jpg   face in f b u d l r
+    <category>/<base>_tiles/fallback/<face>.jpg             non-WebGL fallback
+
+Level 1 is the smallest (one 512px tile per face), so the viewer's first
+paint costs six small JPEGs instead of the 20–60 MB original. Same layout and
+level math as Pannellum's utils/multires/generate.py, without Hugin: every
+tile is rendered straight from the equirectangular source with a Pillow MESH
+transform (piecewise-linear over MESH_STEP px cells) from a crop of just the
+source rows/columns that tile sees.
+
+Memory stays bounded: the build runs in its own process (the upload request
+only starts it), JPEG sources above PANORAMA_MAX_PIXELS are decoded at 1/2,
+1/4 … scale via DCT scaling (Image.draft), each level reads a reduced copy
+of the source, and tiles are written one at a time. The finished config is
+stored as JSON in gallery_images.multires and returned as `multiRes` by
+/api/gallery.
+
+Usage:
+    python panorama_tiles.py build <image_id>   # (re)generate one panorama
+    python panorama_tiles.py pending [--retry]  # all panoramas without tiles
+"""
+
+import json
+import math
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DB_PATH, GALLERY_DIR  # noqa: E402
+
+TILE_SIZE = 512
+FALLBACK_SIZE = 1024
+JPEG_QUALITY = 75
+MESH_STEP = 16
+MAX_PIXELS = int(os.environ.get('PANORAMA_MAX_PIXELS', 100_000_000))
+FACES = 'fbudlr'
+URL_PREFIX = '/images/gallery'
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _pil_image():
+    """PIL.Image, imported lazily like media.py."""
+    from PIL import Image
+    return Image
+
+
+# ============ Geometry ============
+
+def _direction(face: str, a: float, b: float) -> tuple[float, float, float]:
+    """View direction (x right, y up, z forward) for face coords a (left→right), b (top→bottom) in [-1, 1]."""
+    if face == 'f':
+        return a, -b, 1.0
+    if face == 'b':
+        return -a, -b, -1.0
+    if face == 'r':
+        return 1.0, -b, -a
+    if face == 'l':
+        return -1.0, -b, a
+    if face == 'u':
+        return a, 1.0, b
+    return a, -1.0, -b  # 'd'
+
+
+def _source_xy(face: str, a: float, b: float, width: int, height: int) -> tuple[float, float]:
+    """Equirectangular pixel position (yaw 0 at the image centre) for a face point."""
+    x, y, z = _direction(face, a, b)
+    yaw = math.atan2(x, z)
+    pitch = math.atan2(y, math.hypot(x, z))
+    return (yaw / (2 * math.pi) + 0.5) * width, (0.5 - pitch / math.pi) * height
+
+
+def pyramid(cube_size: int, tile_size: int = TILE_SIZE) -> list[int]:
+    """Face edge per level, index 0 = level 1 (smallest). Mirrors Pannellum's generate.py."""
+    levels = int(math.ceil(math.log(float(cube_size) / tile_size, 2))) + 1
+    if levels > 1 and round(cube_size / 2 ** (levels - 2)) == tile_size:
+        levels -= 1
+    sizes = [cube_size]
+    for _ in range(levels - 1):
+        sizes.append(int(sizes[-1] / 2))
+    return sizes[::-1]
+
+
+def cube_size_for(width: int) -> int:
+    return max(8, 8 * int(width / math.pi / 8))
+
+
+def _wrapped_crop(source, x0: int, y0: int, x1: int, y1: int):
+    """Crop x0..x1 (may leave 0..width, wraps around the 360° seam) × y0..y1."""
+    Image = _pil_image()
+    width = source.size[0]
+    if 0 <= x0 and x1 <= width:
+        return source.crop((x0, y0, x1, y1))
+    out = Image.new(source.mode, (x1 - x0, y1 - y0))
+    x = x0
+    while x < x1:
+        sx = x % width
+        span = min(width - sx, x1 - x)
+        out.paste(source.crop((sx, y0, sx + span, y1)), (x - x0, 0))
+        x += span
+    return out
+
+
+def render_tile(source, face: str, face_size: int, left: int, top: int, tw: int, th: int):
+    """Render face pixels [left, left+tw) × [top, top+th) of a face_size cube face."""
+    Image = _pil_image()
+    width, height = source.size
+    cols = max(1, math.ceil(tw / MESH_STEP))
+    rows = max(1, math.ceil(th / MESH_STEP))
+    xs = [min(left + i * MESH_STEP, left + tw) for i in range(cols + 1)]
+    ys = [min(top + j * MESH_STEP, top + th) for j in range(rows + 1)]
+    corners = [[_source_xy(face, 2 * x / face_size - 1, 2 * y / face_size - 1, width, height) for x in xs]
+               for y in ys]
+    ref = _source_xy(face, 2 * (left + tw / 2) / face_size - 1, 2 * (top + th / 2) / face_size - 1,
+                     width, height)[0]
+
+    cells = []
+    for j in range(rows):
+        for i in range(cols):
+            quad = [corners[j][i], corners[j + 1][i], corners[j + 1][i + 1], corners[j][i + 1]]  # NW SW SE NE
+            # Keep the cell on one side of the seam, then next to the tile's reference column
+            first = quad[0][0]
+            quad = [(sx + width * round((first - sx) / width), sy) for sx, sy in quad]
+            shift = width * round((ref - quad[0][0]) / width)
+            quad = [(sx + shift, sy) for sx, sy in quad]
+            cells.append(((xs[i] - left, ys[j] - top, xs[i + 1] - left, ys[j + 1] - top), quad))
+
+    x0 = math.floor(min(sx for _, q in cells for sx, _ in q)) - 1
+    x1 = math.ceil(max(sx for _, q in cells for sx, _ in q)) + 1
+    y0 = max(0, math.floor(min(sy for _, q in cells for _, sy in q)) - 1)
+    y1 = min(height, math.ceil(max(sy for _, q in cells for _, sy in q)) + 1)
+    crop = _wrapped_crop(source, x0, y0, x1, y1)
+    mesh = [(box, tuple(v for sx, sy in quad for v in (sx - x0, sy - y0))) for box, quad in cells]
+    return crop.transform((tw, th), Image.MESH, mesh, resample=Image.BILINEAR)
+
+
+# ============ Build ============
+
+def open_source(path: str):
+    """Decode the equirectangular image as RGB, JPEG-downscaled to at most MAX_PIXELS."""
+    Image = _pil_image()
+    img = Image.open(path)
+    w, h = img.size
+    scale = 1
+    while (w // scale) * (h // scale) > MAX_PIXELS and scale < 8:
+        scale *= 2
+    if scale > 1 and img.format == 'JPEG':
+        img.draft('RGB', (w // scale, h // scale))
+    img = img.convert('RGB')
+    if img.size[0] * img.size[1] > MAX_PIXELS:
+        # Formats without DCT scaling: decode, then shrink right away
+        factor = math.ceil(math.sqrt(img.size[0] * img.size[1] / MAX_PIXELS))
+        img = img.reduce(factor)
+    return img
+
+
+def _level_source(full, face_size: int):
+    """Source reduced so it carries about as much detail as a face_size cube (antialiased)."""
+    factor = max(1, int(full.size[0] / (face_size * math.pi)))
+    return full.reduce(factor) if factor > 1 else full
+
+
+def generate(src_path: str, out_dir: str, tile_size: int = TILE_SIZE) -> dict:
+    """Write the tile pyramid into out_dir; returns the multiRes config without basePath."""
+    full = open_source(src_path)
+    width, height = full.size
+    if not 1.9 <= width / height <= 2.1:
+        raise ValueError(f"kein vollständiges 360°-Panorama (Seitenverhältnis {width}x{height})")
+    cube = cube_size_for(width)
+    sizes = pyramid(cube, tile_size)
+
+    for level, size in enumerate(sizes, start=1):
+        source = _level_source(full, size)
+        level_dir = os.path.join(out_dir, str(level))
+        os.makedirs(level_dir, exist_ok=True)
+        tiles = math.ceil(size / tile_size)
+        for face in FACES:
+            for row in range(tiles):
+                for col in range(tiles):
+                    left, top = col * tile_size, row * tile_size
+                    tile = render_tile(source, face, size, left, top,
+                                       min(tile_size, size - left), min(tile_size, size - top))
+                    tile.save(os.path.join(level_dir, f"{face}{row}_{col}.jpg"), 'JPEG', quality=JPEG_QUALITY)
+        del source
+
+    fallback = min(FALLBACK_SIZE, cube)
+    source = _level_source(full, fallback)
+    os.makedirs(os.path.join(out_dir, 'fallback'), exist_ok=True)
+    for face in FACES:
+        render_tile(source, face, fallback, 0, 0, fallback, fallback).save(
+            os.path.join(out_dir, 'fallback', f"{face}.jpg"), 'JPEG', quality=JPEG_QUALITY)
+
+    return {
+        'path': '/%l/%s%y_%x',
+        'fallbackPath': '/fallback/%s',
+        'extension': 'jpg',
+        'tileResolution': tile_size,
+        'maxLevel': len(sizes),
+        'cubeResolution': cube,
+    }
+
+
+def tiles_dir_for(filename: str) -> str:
+    """Relative tile directory next to the original: sonstiges/pano.jpg → sonstiges/pano_tiles."""
+    return os.path.splitext(filename)[0] + '_tiles'
+
+
+def build(conn: sqlite3.Connection, image_id: str) -> dict:
+    """Generate tiles for one panorama and store the config. Errors are stored too."""
+    row = conn.execute(
+        "SELECT id, filename FROM gallery_images WHERE id = ? AND type = 'panorama'", (image_id,)
+    ).fetchone()
+    if not row:
+        raise LookupError(f"Panorama {image_id} nicht gefunden")
+    rel_dir = tiles_dir_for(row['filename'])
+    final_dir = os.path.join(GALLERY_DIR, rel_dir)
+    tmp_dir = f"{final_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    try:
+        config = generate(os.path.join(GALLERY_DIR, row['filename']), tmp_dir)
+    except Exception as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        config = {'error': str(e)[:300]}
+    else:
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.rename(tmp_dir, final_dir)
+        config['basePath'] = f"{URL_PREFIX}/{rel_dir}"
+    conn.execute('UPDATE gallery_images SET multires = ? WHERE id = ?', (json.dumps(config), image_id))
+    conn.commit()
+    return config
+
+
+def multires_config(value: str | None) -> dict | None:
+    """Parsed gallery_images.multires for API responses; None while pending or failed."""
+    if not value:
+        return None
+    config = json.loads(value)
+    return config if 'basePath' in config else None
+
+
+def build_in_background(image_id: str) -> None:
+    """Start `build` in a child process (keeps the decoded panorama out of the web worker)."""
+    cmd = [sys.executable, os.path.abspath(__file__), 'build', image_id]
+
+    def run():
+        try:
+            subprocess.run(cmd, timeout=1800, check=False)
+        except Exception as e:
+            print(f"[panorama_tiles] {image_id} failed: {e}")
+
+    threading.Thread(target=run, name=f"panorama-tiles-{image_id}", daemon=True).start()
+
+
+def pending_ids(conn: sqlite3.Connection, retry: bool = False) -> list[str]:
+    sql = "SELECT id FROM gallery_images WHERE type = 'panorama' AND (multires IS NULL"
+    sql += " OR multires LIKE '{\"error\"%')" if retry else ")"
+    return [r['id'] for r in conn.execute(sql + ' ORDER BY uploaded_at')]
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Multires cube tiles for panoramas')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_build = sub.add_parser('build')
+    p_build.add_argument('image_id')
+    p_pending = sub.add_parser('pending')
+    p_pending.add_argument('--retry', action='store_true', help='also retry failed builds')
+    args = parser.parse_args(argv)
+
+    # Admin uploads only; the decode is capped by MAX_PIXELS anyway
+    _pil_image().MAX_IMAGE_PIXELS = None
+    conn = get_db()
+    try:
+        ids = [args.image_id] if args.command == 'build' else pending_ids(conn, args.retry)
+        failed = 0
+        for image_id in ids:
+            config = build(conn, image_id)
+            failed += 'error' in config
+            print(json.dumps({'id': image_id, **config}))
+    finally:
+        conn.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+Per-request sampling profiler.
+
+- Triggered per request by an admin (header `X-Profile: 1` or `?_profile=1`)
+  or randomly for /api/ requests via PROFILE_SAMPLE_RATE (0.0–1.0, default off).
+- A daemon thread samples the request thread's stack every PROFILE_INTERVAL_MS
+  via sys._current_frames() and counts collapsed stacks.
+- Output is the "folded" format (`frame;frame;frame count`) understood by
+  flamegraph.pl, speedscope and inferno. Stored under DATA_DIR/profiles so
+  both gunicorn workers share it.
+- When not triggered the cost is one header/query lookup per request.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+DATA_DIR = os.environ.get('DATA_DIR', '/app/data')
+PROFILE_DIR = os.path.join(DATA_DIR, 'profiles')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0') or 0)
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '5') or 5)
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '200'))
+
+_ID_RE = re.compile(r'^[0-9a-f]{12}$')
+
+
+class StackSampler(threading.Thread):
+    """Samples the stack of one thread at a fixed interval until stopped."""
+
+    def __init__(self, target_ident: int, interval_s: float):
+        super().__init__(name='request-profiler', daemon=True)
+        self.target_ident = target_ident
+        self.interval_s = interval_s
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval_s):
+            frame = sys._current_frames().get(self.target_ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}")
+                frame = frame.f_back
+            self.counts[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join(timeout=1)
+        return self.counts
+
+
+def wants_profile(req) -> str | None:
+    """Return the trigger ('admin' / 'sampled') if this request should be profiled."""
+    if req.headers.get('X-Profile') == '1' or req.args.get('_profile') == '1':
+        return 'admin'
+    if PROFILE_SAMPLE_RATE > 0 and req.path.startswith('/api/') and random.random() < PROFILE_SAMPLE_RATE:
+        return 'sampled'
+    return None
+
+
+def start() -> dict:
+    sampler = StackSampler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000)
+    sampler.start()
+    return {'sampler': sampler, 'started': time.perf_counter(), 'id': uuid.uuid4().hex[:12]}
+
+
+def finish(state: dict, method: str, path: str, status: int, trigger: str) -> str:
+    """Stop sampling and persist folded stacks + metadata. Returns the profile id."""
+    counts = state['sampler'].stop()
+    duration_ms = (time.perf_counter() - state['started']) * 1000
+    profile_id = state['id']
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+
+    with open(os.path.join(PROFILE_DIR, f'{profile_id}.folded'), 'w') as f:
+        for stack, count in counts.most_common():
+            f.write(f'{stack} {count}\n')
+    meta = {
+        'id': profile_id,
+        'method': method,
+        'path': path,
+        'status': status,
+        'trigger': trigger,
+        'duration_ms': round(duration_ms, 2),
+        'samples': state['sampler'].samples,
+        'interval_ms': PROFILE_INTERVAL_MS,
+        'created_at': datetime.now().isoformat(),
+    }
+    with open(os.path.join(PROFILE_DIR, f'{profile_id}.json'), 'w') as f:
+        json.dump(meta, f)
+
+    _prune()
+    return profile_id
+
+
+def _prune() -> None:
+    try:
+        entries = sorted(
+            (e for e in os.scandir(PROFILE_DIR) if e.name.endswith('.json')),
+            key=lambda e: e.stat().st_mtime,
+        )
+    except FileNotFoundError:
+        return
+    for entry in entries[:max(0, len(entries) - PROFILE_MAX_FILES)]:
+        delete_profile(entry.name[:-5])
+
+
+def list_profiles(limit: int = 100) -> list[dict]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for entry in os.scandir(PROFILE_DIR):
+        if not entry.name.endswith('.json'):
+            continue
+        try:
+            with open(entry.path) as f:
+                profiles.append(json.load(f))
+        except (OSError, json.JSONDecodeError):
+            continue
+    profiles.sort(key=lambda p: p.get('created_at', ''), reverse=True)
+    return profiles[:limit]
+
+
+def profile_filename(profile_id: str) -> str | None:
+    """Validated folded-stack filename inside PROFILE_DIR, or None."""
+    if not _ID_RE.match(profile_id or ''):
+        return None
+    name = f'{profile_id}.folded'
+    return name if os.path.isfile(os.path.join(PROFILE_DIR, name)) else None
+
+
+def delete_profile(profile_id: str) -> bool:
+    if not _ID_RE.match(profile_id or ''):
+        return False
+    removed = False
+    for ext in ('.folded', '.json'):
+        try:
+            os.remove(os.path.join(PROFILE_DIR, profile_id + ext))
+            removed = True
+        except FileNotFoundError:
+            pass
+    return removed
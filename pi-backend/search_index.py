@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Full-text search over tasks, inventory, issues and gallery (SQLite FTS5).
+
+One FTS5 table `search_fts(title, body, extra)` holds every searchable row;
+`search_docs` maps its rowid to (kind, ref) — the source table and its id —
+plus the visibility flags the API needs (issue owner, hidden gallery /
+inactive recurring rows). Triggers on the source tables keep both in sync in
+the same transaction as the write, so every writer (routes, generic_patch,
+telegram_agent, agent tools) is covered.
+
+German-aware matching:
+- tokenizer `unicode61 remove_diacritics 2` folds case and ä/ö/ü → a/o/u,
+  so "Schlussel" and "Schlüssel" are the same token
+- queries are expanded for the spellings the tokenizer can't fold:
+  ae/oe/ue ↔ ä/ö/ü and ss ↔ ß ("Schluessel", "Strasse")
+- every word is a prefix query and all words must match, ranked with
+  BM25: title > body > extra
+
+Substring matches for the list endpoints and agent tools (match_refs /
+ranked_refs): `search_trigram` holds the same rows with ä/ö/ü/ß folded and a
+trigram tokenizer, so words of 3+ letters match inside compounds like the
+old LIKE '%term%' did ("kiste" finds "Schlüsselkiste"). Shorter words go
+through search_fts as prefixes, since trigrams can't match them.
+
+Usage:
+    python search_index.py rebuild          # re-fill the index from the source tables
+    python search_index.py stats
+    python search_index.py query "rasen mäher" [--kind inventory]
+"""
+
+import html
+import json
+import os
+import re
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DB_PATH  # noqa: E402
+
+# kind -> source table, id column and the indexed expressions ({r} = NEW / OLD / table)
+SOURCES = {
+    'project': {
+        'table': 'projects', 'id': 'id',
+        'title': '{r}.title',
+        'body': '{r}.description',
+        'extra': "COALESCE({r}.category, '') || ' ' || COALESCE({r}.completion_notes, '')",
+        'owner': 'NULL', 'hidden': '0',
+        'columns': 'title, description, category, completion_notes',
+    },
+    'recurring': {
+        'table': 'recurring_tasks', 'id': 'id',
+        'title': '{r}.title',
+        'body': '{r}.description',
+        'extra': '{r}.category',
+        'owner': 'NULL', 'hidden': 'NOT COALESCE({r}.is_active, 1)',
+        'columns': 'title, description, category, is_active',
+    },
+    'inventory': {
+        'table': 'inventory_items', 'id': 'id',
+        'title': '{r}.name',
+        'body': '{r}.notes',
+        'extra': "COALESCE({r}.ablageort, '') || ' ' || COALESCE({r}.category, '')",
+        'owner': 'NULL', 'hidden': '0',
+        'columns': 'name, notes, ablageort, category',
+    },
+    'issue': {
+        'table': 'issue_reports', 'id': 'id',
+        'title': '{r}.title',
+        'body': '{r}.description',
+        'extra': "COALESCE({r}.category, '') || ' ' || COALESCE({r}.admin_notes, '')",
+        'owner': '{r}.reported_by', 'hidden': '0',
+        'columns': 'title, description, category, admin_notes, reported_by',
+    },
+    'gallery': {
+        'table': 'gallery_images', 'id': 'id',
+        'title': 'COALESCE({r}.name, {r}.original_name)',
+        'body': '{r}.description',
+        'extra': "COALESCE({r}.category, '') || ' ' || COALESCE({r}.map_area, '')",
+        'owner': 'NULL', 'hidden': "COALESCE({r}.status, 'approved') != 'approved'",
+        'columns': 'name, original_name, description, category, map_area, status',
+    },
+}
+KINDS = tuple(SOURCES)
+
+# BM25 column weights: title, body, extra
+RANK = 'bm25(search_fts, 10.0, 4.0, 2.0)'
+TRIGRAM_RANK = 'bm25(search_trigram, 10.0, 4.0, 2.0)'
+# Spellings the trigram tokenizer doesn't fold (remove_diacritics needs SQLite 3.45)
+FOLD = (('ä', 'a'), ('ö', 'o'), ('ü', 'u'), ('Ä', 'A'), ('Ö', 'O'), ('Ü', 'U'), ('ß', 'ss'))
+MAX_WORDS = 8
+# Snippet markers; replaced by <mark> after HTML-escaping the user content
+_HL_OPEN, _HL_CLOSE = '\x02', '\x03'
+
+BASE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS search_docs (
+        docid INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        ref NOT NULL,               -- source id, keeps its type (INTEGER or TEXT)
+        owner TEXT,                 -- issue_reports.reported_by
+        hidden INTEGER NOT NULL DEFAULT 0,
+        UNIQUE (kind, ref)
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+        title, body, extra,
+        tokenize = 'unicode61 remove_diacritics 2'
+    );
+'''
+
+TRIGRAM_TABLE = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_trigram USING fts5(
+        title, body, extra,
+        tokenize = 'trigram'
+    );
+'''
+
+
+def _folded(expr: str) -> str:
+    for char, plain in FOLD:
+        expr = f"replace({expr}, '{char}', '{plain}')"
+    return expr
+
+
+def _add_sql(kind: str, r: str, trigram: bool) -> str:
+    src = SOURCES[kind]
+    f = {k: src[k].format(r=r) for k in ('title', 'body', 'extra', 'owner', 'hidden')}
+    ref = f"{r}.{src['id']}"
+    sql = f'''
+        INSERT INTO search_docs (kind, ref, owner, hidden) VALUES ('{kind}', {ref}, {f['owner']}, {f['hidden']})
+        ON CONFLICT(kind, ref) DO UPDATE SET owner = excluded.owner, hidden = excluded.hidden;
+        INSERT INTO search_fts (rowid, title, body, extra)
+        SELECT docid, {f['title']}, {f['body']}, {f['extra']} FROM search_docs WHERE kind = '{kind}' AND ref = {ref};'''
+    if trigram:
+        sql += f'''
+        INSERT INTO search_trigram (rowid, title, body, extra)
+        SELECT docid, {_folded(f['title'])}, {_folded(f['body'])}, {_folded(f['extra'])} FROM search_docs WHERE kind = '{kind}' AND ref = {ref};'''
+    return sql
+
+
+def _remove_sql(kind: str, r: str, trigram: bool) -> str:
+    ref = f"{r}.{SOURCES[kind]['id']}"
+    sql = f'''
+        DELETE FROM search_fts WHERE rowid = (SELECT docid FROM search_docs WHERE kind = '{kind}' AND ref = {ref});'''
+    if trigram:
+        sql += f'''
+        DELETE FROM search_trigram WHERE rowid = (SELECT docid FROM search_docs WHERE kind = '{kind}' AND ref = {ref});'''
+    return sql + f'''
+        DELETE FROM search_docs WHERE kind = '{kind}' AND ref = {ref};'''
+
+
+def _triggers_sql(trigram: bool = True) -> str:
+    parts = []
+    for kind, src in SOURCES.items():
+        if trigram:
+            # Replaces the triggers of SCHEMA_V1, which only kept search_fts in sync
+            parts.append(f'''
+    DROP TRIGGER IF EXISTS trg_search_{kind}_ins;
+    DROP TRIGGER IF EXISTS trg_search_{kind}_upd;
+    DROP TRIGGER IF EXISTS trg_search_{kind}_del;''')
+        table = src['table']
+        parts.append(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_search_{kind}_ins AFTER INSERT ON {table} BEGIN{_add_sql(kind, 'NEW', trigram)}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_search_{kind}_upd AFTER UPDATE OF {src['id']}, {src['columns']} ON {table} BEGIN{_remove_sql(kind, 'OLD', trigram)}{_add_sql(kind, 'NEW', trigram)}
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_search_{kind}_del AFTER DELETE ON {table} BEGIN{_remove_sql(kind, 'OLD', trigram)}
+    END;''')
+    return ''.join(parts)
+
+
+# Shipped with migration 010 (search_fts only); 023 adds search_trigram
+SCHEMA_V1 = BASE_SCHEMA + _triggers_sql(trigram=False)
+SCHEMA = BASE_SCHEMA + TRIGRAM_TABLE + _triggers_sql()
+
+
+def _has_trigram(conn) -> bool:
+    return bool(conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'search_trigram'"
+    ).fetchone())
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    """Create index tables and triggers; fill the index if it is empty."""
+    conn.executescript(schema)
+    if not conn.execute('SELECT 1 FROM search_docs LIMIT 1').fetchone():
+        rebuild(conn, commit=False)
+    elif _has_trigram(conn) and not conn.execute('SELECT 1 FROM search_trigram LIMIT 1').fetchone():
+        _fill_trigram(conn)
+
+
+def _fill_trigram(conn) -> None:
+    conn.execute("DELETE FROM search_trigram")
+    conn.execute(
+        f"INSERT INTO search_trigram (rowid, title, body, extra) "
+        f"SELECT rowid, {_folded('title')}, {_folded('body')}, {_folded('extra')} FROM search_fts"
+    )
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def rebuild(conn: sqlite3.Connection, commit: bool = True) -> dict:
+    """Drop and re-fill the whole index from the source tables."""
+    conn.execute("DELETE FROM search_fts")
+    conn.execute("DELETE FROM search_docs")
+    counts = {}
+    for kind, src in SOURCES.items():
+        t = src['table']
+        f = {k: src[k].format(r=t) for k in ('title', 'body', 'extra', 'owner', 'hidden')}
+        cur = conn.execute(
+            f"INSERT INTO search_docs (kind, ref, owner, hidden) "
+            f"SELECT '{kind}', {t}.{src['id']}, {f['owner']}, {f['hidden']} FROM {t}"
+        )
+        counts[kind] = cur.rowcount
+        conn.execute(
+            f"INSERT INTO search_fts (rowid, title, body, extra) "
+            f"SELECT d.docid, {f['title']}, {f['body']}, {f['extra']} "
+            f"FROM {t} JOIN search_docs d ON d.kind = '{kind}' AND d.ref = {t}.{src['id']}"
+        )
+    conn.execute("INSERT INTO search_fts (search_fts) VALUES ('optimize')")
+    if _has_trigram(conn):
+        _fill_trigram(conn)
+    if commit:
+        conn.commit()
+    return counts
+
+
+# ─── Query building ───
+
+def _variants(word: str) -> set[str]:
+    """Spellings of one (lower-cased) word the tokenizer does not fold by itself."""
+    forms = {
+        word,
+        word.replace('ä', 'ae').replace('ö', 'oe').replace('ü', 'ue'),   # Schlüssel → schluessel
+        word.replace('ae', 'a').replace('oe', 'o').replace('ue', 'u'),   # Schluessel → schlussel (= Schlüssel)
+    }
+    for form in list(forms):
+        if 'ß' in form:
+            forms.add(form.replace('ß', 'ss'))
+        if 'ss' in form:
+            forms.add(form.replace('ss', 'ß'))
+    return forms
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r'\w+', (text or '').lower())[:MAX_WORDS]
+
+
+def _fold(word: str) -> str:
+    for char, plain in FOLD:
+        word = word.replace(char, plain)
+    return word
+
+
+def match_expression(text: str) -> str:
+    """User input → FTS5 MATCH string: every word (as prefix, any spelling) must occur.
+
+    Only \\w characters reach the expression, so FTS5 syntax in the input is
+    never interpreted. Input without words yields '""', which matches nothing.
+    """
+    words = _words(text)
+    if not words:
+        return '""'
+    terms = []
+    for word in words:
+        forms = sorted(_variants(word))
+        alts = ' OR '.join(f'"{f}"*' for f in forms)
+        terms.append(f'({alts})' if len(forms) > 1 else alts)
+    return ' AND '.join(terms)
+
+
+def _substring_terms(words: list[str]) -> list[str]:
+    """search_trigram MATCH terms for words of 3+ letters (any spelling, folded)."""
+    terms = []
+    for word in words:
+        forms = sorted({_fold(f) for f in _variants(word)})
+        alts = ' OR '.join(f'"{f}"' for f in forms)
+        terms.append(f'({alts})' if len(forms) > 1 else alts)
+    return terms
+
+
+def ranked_refs(text: str, kind: str) -> tuple[str, list]:
+    """Subquery (ref, rank) of `kind` rows containing every word, and its params.
+
+    To JOIN on and ORDER BY: `JOIN ({sql}) s ON s.ref = x.id ORDER BY s.rank`.
+    Only \\w characters reach the MATCH strings; no words matches nothing.
+    """
+    words = _words(text)
+    long_words = [w for w in words if min(len(_fold(f)) for f in _variants(w)) >= 3]
+    short_words = [w for w in words if w not in long_words]
+    if not long_words:
+        return (f'SELECT d.ref AS ref, {RANK} AS rank FROM search_fts '
+                'CROSS JOIN search_docs d ON d.docid = search_fts.rowid '
+                'WHERE search_fts MATCH ? AND d.kind = ?', [match_expression(text), kind])
+    sql = (f'SELECT d.ref AS ref, {TRIGRAM_RANK} AS rank FROM search_trigram '
+           'CROSS JOIN search_docs d ON d.docid = search_trigram.rowid '
+           'WHERE search_trigram MATCH ? AND d.kind = ?')
+    params = [' AND '.join(_substring_terms(long_words)), kind]
+    if short_words:
+        sql += ' AND d.docid IN (SELECT rowid FROM search_fts WHERE search_fts MATCH ?)'
+        params.append(match_expression(' '.join(short_words)))
+    return sql, params
+
+
+def match_refs(text: str, kind: str) -> tuple[str, list]:
+    """Subquery of matching refs for list endpoints: `... AND id IN ({sql})`, and its params."""
+    sql, params = ranked_refs(text, kind)
+    return f'SELECT ref FROM ({sql})', params
+
+
+def _marked(text: str | None) -> str:
+    escaped = html.escape(text or '')
+    return escaped.replace(_HL_OPEN, '<mark>').replace(_HL_CLOSE, '</mark>')
+
+
+def search(conn: sqlite3.Connection, text: str, kinds=None, limit: int = 20,
+           user: dict | None = None) -> list[dict]:
+    """Ranked hits across kinds with highlighted title and snippet (HTML-escaped, <mark>).
+
+    Visibility follows the list endpoints: hidden rows (pending gallery
+    uploads, inactive recurring tasks) only for admins; issues only for
+    admins or their reporter.
+    """
+    kinds = [k for k in (kinds or KINDS) if k in SOURCES]
+    if not kinds:
+        return []
+    is_admin = bool(user and user.get('role') == 'admin')
+    email = user.get('email') if user else None
+    sql = (
+        f"SELECT d.kind, d.ref, {RANK} AS score, "
+        f"highlight(search_fts, 0, '{_HL_OPEN}', '{_HL_CLOSE}') AS title, "
+        f"snippet(search_fts, 1, '{_HL_OPEN}', '{_HL_CLOSE}', '…', 16) AS body, "
+        f"snippet(search_fts, 2, '{_HL_OPEN}', '{_HL_CLOSE}', '…', 8) AS extra "
+        f"FROM search_fts CROSS JOIN search_docs d ON d.docid = search_fts.rowid "
+        f"WHERE search_fts MATCH ? AND d.kind IN ({','.join('?' * len(kinds))})"
+    )
+    params = [match_expression(text), *kinds]
+    if not is_admin:
+        sql += ' AND d.hidden = 0 AND (d.owner IS NULL OR d.owner = ?)'
+        params.append(email or '')
+        if not email:
+            sql += " AND d.kind != 'issue'"
+    sql += ' ORDER BY score LIMIT ?'
+    params.append(limit)
+
+    hits = []
+    for row in conn.execute(sql, params):
+        # Body excerpt, unless only the category / location column matched
+        snippet = row['body']
+        if _HL_OPEN not in (snippet or '') and _HL_OPEN in (row['extra'] or ''):
+            snippet = row['extra']
+        hits.append({
+            'type': row['kind'],
+            'id': row['ref'],
+            'title': _marked(row['title']),
+            'snippet': _marked(snippet),
+            'score': round(-row['score'], 3),   # bm25() is lower-is-better
+        })
+    return hits
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Full-text search index (FTS5)')
+    parser.add_argument('command', choices=['rebuild', 'stats', 'query'])
+    parser.add_argument('text', nargs='?', default='')
+    parser.add_argument('--kind', action='append', choices=KINDS)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+    conn = get_db()
+    try:
+        if args.command == 'rebuild':
+            print(json.dumps(rebuild(conn), indent=2))
+        elif args.command == 'stats':
+            rows = conn.execute('SELECT kind, COUNT(*) AS n FROM search_docs GROUP BY kind').fetchall()
+            print(json.dumps({r['kind']: r['n'] for r in rows}, indent=2))
+        else:
+            print(f'MATCH {match_expression(args.text)}')
+            for hit in search(conn, args.text, args.kind, args.limit, {'role': 'admin'}):
+                print(json.dumps(hit, ensure_ascii=False))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""Unified full-text search (FTS5 index, see search_index.py)."""
+
+from flask import Blueprint, request, jsonify
+
+from db import get_db
+from extensions import limiter
+from auth import get_current_user
+from search_index import KINDS, search
+
+bp = Blueprint('search', __name__)
+
+
+@bp.route('/api/search', methods=['GET'])
+@limiter.limit("60/minute")
+def unified_search():
+    """Search tasks, inventory, issues and gallery.
+
+    ?q=       search text (every word must match, prefix, umlaut/ß-tolerant)
+    ?types=   comma-separated subset of project,recurring,inventory,issue,gallery
+    ?limit=   max hits (default 20, max 100)
+    """
+    q = (request.args.get('q') or '').strip()
+    if not q:
+        return jsonify({'error': 'q ist erforderlich'}), 400
+    types = [t for t in (request.args.get('types') or '').split(',') if t]
+    unknown = [t for t in types if t not in KINDS]
+    if unknown:
+        return jsonify({'error': f"Unbekannte types: {', '.join(unknown)}"}), 400
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+
+    conn = get_db()
+    try:
+        results = search(conn, q, types or None, limit, get_current_user())
+    finally:
+        conn.close()
+    return jsonify({'query': q, 'results': results, 'total': len(results)})
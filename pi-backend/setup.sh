@@ -26,7 +26,7 @@ mkdir -p ../public/images/gallery/{haus,terrasse,luftaufnahmen,beete,wiese,baeum
 
 # Initialize database
 echo "🗃️ Initializing database..."
-python3 -c "from app import init_db; init_db()"
+python3 db.py migrate
 
 # Install systemd service
 echo "⚙️ Installing systemd service..."
@@ -0,0 +1,165 @@
+"""
+Shared counters and dedup keys for all gunicorn workers.
+
+Process-local state (memory:// rate limits, OrderedDict dedup) is per worker,
+so with `--workers 2` every limit was doubled and Slack retries landing on the
+other worker slipped through. This stores them in SQLite instead:
+
+- `incr(key, ttl)` — atomic fixed-window counter (single UPSERT … RETURNING)
+- `add_if_absent(key, ttl)` — dedup: True only for the first caller within ttl
+- expired rows are ignored on read and purged opportunistically
+- `SQLiteLimiterStorage` plugs the same table into Flask-Limiter
+  (`storage_uri="sqlite://"`, optionally `sqlite:///path/to/file.db`)
+
+Defaults to garten.db; set SHARED_STATE_DB to use a separate file.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from limits.storage import Storage
+
+from config import DB_PATH
+
+SHARED_STATE_DB = os.environ.get('SHARED_STATE_DB', DB_PATH)
+PURGE_PROBABILITY = 0.002  # ~ every 500 writes
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS shared_counters (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL,
+        expires_at REAL NOT NULL
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_shared_counters_expires ON shared_counters(expires_at);
+'''
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    conn.executescript(schema)
+
+
+class SharedStore:
+    """Key/counter store with TTL on one SQLite file, safe across processes and threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._schema_ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread and process (gunicorn forks after import)
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        if not self._schema_ready:
+            init_schema(conn)
+            self._schema_ready = True
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def incr(self, key: str, ttl: float, amount: int = 1, elastic: bool = False) -> int:
+        """Add `amount` to the counter and return the new value. A fresh window starts after ttl
+        (elastic: ttl counts from the latest hit)."""
+        now = time.time()
+        row = self._conn().execute('''
+            INSERT INTO shared_counters (key, value, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                value = CASE WHEN expires_at <= ? THEN excluded.value ELSE value + excluded.value END,
+                expires_at = CASE WHEN expires_at <= ? OR ? THEN excluded.expires_at ELSE expires_at END
+            RETURNING value
+        ''', (key, amount, now + ttl, now, now, elastic)).fetchone()
+        self._maybe_purge(now)
+        return row[0]
+
+    def add_if_absent(self, key: str, ttl: float) -> bool:
+        """Claim `key` for ttl seconds. False if another caller (any worker) already holds it."""
+        now = time.time()
+        cur = self._conn().execute('''
+            INSERT INTO shared_counters (key, value, expires_at) VALUES (?, 1, ?)
+            ON CONFLICT(key) DO UPDATE SET value = 1, expires_at = excluded.expires_at
+            WHERE expires_at <= ?
+        ''', (key, now + ttl, now))
+        self._maybe_purge(now)
+        return cur.rowcount == 1
+
+    def get(self, key: str) -> int:
+        row = self._conn().execute(
+            'SELECT value FROM shared_counters WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        """Epoch seconds when the key expires (now if it doesn't exist)."""
+        now = time.time()
+        row = self._conn().execute(
+            'SELECT expires_at FROM shared_counters WHERE key = ? AND expires_at > ?', (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def clear(self, key: str) -> None:
+        self._conn().execute('DELETE FROM shared_counters WHERE key = ?', (key,))
+
+    def reset(self, prefix: str = '') -> int:
+        cur = self._conn().execute(
+            "DELETE FROM shared_counters WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+        return cur.rowcount
+
+    def purge_expired(self) -> int:
+        return self._conn().execute(
+            'DELETE FROM shared_counters WHERE expires_at <= ?', (time.time(),)
+        ).rowcount
+
+    def _maybe_purge(self, now: float) -> None:
+        if random.random() < PURGE_PROBABILITY:
+            self._conn().execute('DELETE FROM shared_counters WHERE expires_at <= ?', (now,))
+
+
+store = SharedStore(SHARED_STATE_DB)
+
+
+class SQLiteLimiterStorage(Storage):
+    """Flask-Limiter / limits storage backend (fixed-window) on top of SharedStore."""
+
+    STORAGE_SCHEME = ['sqlite']
+    PREFIX = 'limiter:'
+
+    def __init__(self, uri: str | None = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        path = (uri or '').split('://', 1)[-1] if uri and '://' in uri else ''
+        self.store = SharedStore(path) if path else store
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def incr(self, key: str, expiry: int, elastic_expiry: bool = False, amount: int = 1) -> int:
+        # limits 3.x passes elastic_expiry (fixed-window-elastic strategy), 4.x doesn't
+        return self.store.incr(self.PREFIX + key, expiry, amount, elastic_expiry)
+
+    def get(self, key: str) -> int:
+        return self.store.get(self.PREFIX + key)
+
+    def get_expiry(self, key: str) -> float:
+        return self.store.get_expiry(self.PREFIX + key)
+
+    def check(self) -> bool:
+        try:
+            self.store._conn().execute('SELECT 1')
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int | None:
+        return self.store.reset(self.PREFIX)
+
+    def clear(self, key: str) -> None:
+        self.store.clear(self.PREFIX + key)
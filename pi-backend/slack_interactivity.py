@@ -13,7 +13,6 @@ import json
 import os
 import sqlite3
 
-import requests
 from flask import Blueprint, request
 
 import slack_service
@@ -42,6 +41,7 @@ def _parse_action(action: dict) -> tuple[str, str]:
 
 def _update_card(response_url: str, text: str, original_blocks: list | None = None):
     """Ersetze die Moderations-Karte durch Bestätigungstext."""
+    import requests
     if not response_url:
         return
     body = {
@@ -83,6 +83,7 @@ def _set_gallery_status(image_id: str, status: str) -> bool:
 
 @slack_interactivity_bp.route('/api/garten/slack/interactivity', methods=['POST'])
 def slack_interactivity():
+    import requests
     raw_body = request.get_data()
     if not slack_service.verify_slack_signature(raw_body, request.headers):
         return ('', 401)
@@ -31,6 +31,7 @@ EVENT_EMOJIS = {
     'invoice_sent': ':page_facing_up:',
     'invoice_paid': ':moneybag:',
     'payment_reminder': ':alarm_clock:',
+    'maintenance_due': ':wrench:',
     'email_sent': ':email:',
     'email_draft_created': ':memo:',
     'system_error': ':red_circle:',
@@ -10,7 +10,6 @@ import json
 import hmac
 import hashlib
 import time
-import requests
 
 SLACK_API = "https://slack.com/api"
 GARTEN_BOT_TOKEN = os.environ.get('GARTEN_BOT_TOKEN', '')
@@ -32,6 +31,7 @@ def is_configured() -> bool:
 
 def post_channel(text: str, blocks: list | None = None, channel: str | None = None) -> dict:
     """Post message to Garten-Channel. Returns {ok, ts, error}."""
+    import requests
     if not is_configured():
         return {"ok": False, "error": "GARTEN_BOT_TOKEN not configured"}
     payload: dict = {
@@ -54,6 +54,7 @@ def post_channel(text: str, blocks: list | None = None, channel: str | None = No
 
 def send_dm(user_id: str, text: str, blocks: list | None = None) -> dict:
     """Send direct message to a Slack user. Opens conversation first."""
+    import requests
     if not is_configured():
         return {"ok": False, "error": "GARTEN_BOT_TOKEN not configured"}
     try:
@@ -236,6 +237,7 @@ def post_with_photo(text: str, image_url: str | None, blocks: list | None = None
 def post_thread_reply(channel: str, thread_ts: str, text: str,
                       blocks: list | None = None) -> dict:
     """Reply in a Slack thread. thread_ts must be the parent message ts."""
+    import requests
     if not is_configured():
         return {"ok": False, "error": "GARTEN_BOT_TOKEN not configured"}
     payload: dict = {"channel": channel, "text": text, "thread_ts": thread_ts}
@@ -255,6 +257,7 @@ def post_thread_reply(channel: str, thread_ts: str, text: str,
 
 def add_reaction(channel: str, timestamp: str, name: str) -> dict:
     """Add an emoji reaction. name without colons (e.g. 'eyes')."""
+    import requests
     if not is_configured():
         return {"ok": False}
     try:
@@ -270,6 +273,7 @@ def add_reaction(channel: str, timestamp: str, name: str) -> dict:
 
 def fetch_thread(channel: str, thread_ts: str, limit: int = 50) -> list[dict]:
     """conversations.replies — returns list of Slack messages (oldest first)."""
+    import requests
     if not is_configured():
         return []
     try:
@@ -290,6 +294,7 @@ def fetch_thread(channel: str, thread_ts: str, limit: int = 50) -> list[dict]:
 
 def fetch_channel_history(channel: str, limit: int = 10) -> list[dict]:
     """conversations.history — returns recent channel messages, reordered oldest first."""
+    import requests
     if not is_configured():
         return []
     try:
@@ -11,17 +11,21 @@ if [ -f "$DATA_DIR/gallery.db" ] && [ ! -f "$DATA_DIR/garten.db" ]; then
   echo "Renamed gallery.db -> garten.db"
 fi
 
-# Initialize database first (creates tables if not exist)
-echo "Initializing database..."
-python -c "from app import init_db; init_db()"
+# Apply pending versioned migrations (schema, legacy migrations, project seed)
+# in one lightweight process — db.py doesn't import Flask or the media stack.
+# An up-to-date database only costs a single schema_version lookup.
+echo "Migrating database..."
+python db.py migrate
 
-# Run migrations
-echo "Running migrations..."
-python -c "from app import migrate_db; migrate_db()"
+# Uploads whose processing thread died with the previous container
+python upload_sessions.py recover > /dev/null
 
-# Run database seed (only inserts if projects table is empty)
-echo "Checking for project seed..."
-python seed_projects.py
+# Panorama tiles, perceptual hashes and capture metadata of older uploads are
+# backfilled once by the agent scheduler (media_backfill.py), not on every boot
+
+# Background-video manifests (poster, teaser, hashes) + preload links in the built pages
+# (the pages are replaced on every deploy; unchanged assets aren't re-hashed)
+nice -n 10 python asset_manifest.py build > /dev/null &
 
 # Register Telegram webhook (if configured)
 if [ -n "$TELEGRAM_BOT_TOKEN" ]; then
@@ -29,6 +33,16 @@ if [ -n "$TELEGRAM_BOT_TOKEN" ]; then
     python -c "from telegram_service import register_webhook; register_webhook('https://garten.infinityspace42.de/api/telegram/webhook')"
 fi
 
-# Start Gunicorn
+# Garten-Agent scheduler: sleeps until the next escalation / reminder is due
+# (one instance per database, guarded by a lock file)
+if [ "${AGENT_SCHEDULER:-1}" = "1" ]; then
+    echo "Starting agent scheduler..."
+    python agent_scheduler.py run &
+fi
+
+# Start Gunicorn — threaded workers so open /api/events streams (SSE)
+# don't block the regular API requests; at most CHANGE_FEED_MAX_STREAMS
+# of the GUNICORN_THREADS per worker serve streams
 echo "Starting Gunicorn..."
-exec gunicorn --bind 0.0.0.0:5055 --workers 2 --timeout 120 app:app
+exec gunicorn --bind 0.0.0.0:5055 --workers 2 --worker-class gthread \
+  --threads "${GUNICORN_THREADS:-8}" --timeout 120 app:app
@@ -0,0 +1,146 @@
+"""Static file serving (Astro build, gallery images, resized variants, shared docs) and the health check."""
+
+from flask import Blueprint, jsonify, redirect, request, send_file, send_from_directory
+import os
+from urllib.parse import quote
+from datetime import datetime
+
+import image_resize
+from config import GALLERY_DIR, STATIC_DIR
+from extensions import limiter
+
+bp = Blueprint('static_files', __name__)
+
+
+# ============ Static File Serving ============
+
+# Long-cache prefixes: hashed Astro assets + immutable image/video frames.
+# These are safe to cache aggressively because they either contain a content
+# hash in the filename (Astro) or are versioned by the deploy itself.
+_IMMUTABLE_PREFIXES = ('_astro/', 'images/scroll/', 'images/')
+_IMMUTABLE_EXTS = ('.webp', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.ico',
+                   '.woff', '.woff2', '.ttf', '.mp4', '.webm', '.js', '.css')
+
+
+def _apply_cache_headers(response, path: str):
+    """Set Cache-Control so Cloudflare caches static assets at the edge."""
+    lower = path.lower()
+    is_immutable_prefix = any(lower.startswith(p) for p in _IMMUTABLE_PREFIXES)
+    is_immutable_ext = lower.endswith(_IMMUTABLE_EXTS)
+    if is_immutable_prefix or is_immutable_ext:
+        # 1 year, immutable -> Cloudflare CDN caches at edge, no origin hits
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    elif lower.endswith('.html') or path == '' or path.endswith('/'):
+        # HTML must revalidate so deploys are picked up immediately
+        response.headers['Cache-Control'] = 'public, max-age=0, must-revalidate'
+    return response
+
+
+DOCS_SHARE_TOKEN = os.getenv('DOCS_SHARE_TOKEN', '').strip()
+SHARED_DOCS_DIR = os.environ.get('DOCS_DIR_SHARED', '/app/docs')
+SHARED_DOC_SETS = {'electric-overhaul'}
+
+
+@bp.route('/shared/<token>/<doc_set>/', defaults={'filename': '00-uebersicht.html'})
+@bp.route('/shared/<token>/<doc_set>/<path:filename>')
+@limiter.exempt
+def serve_shared_doc(token, doc_set, filename):
+    """Token-geschützte statische Dokumente (HTML/CSS/Bilder).
+
+    URL-Schema: /shared/<token>/<doc_set>/<filename>
+    Ohne gültigen Token: 404 (kein Hint dass es überhaupt was zu finden gibt).
+    """
+    if not DOCS_SHARE_TOKEN or token != DOCS_SHARE_TOKEN:
+        return jsonify({'error': 'not found'}), 404
+    if doc_set not in SHARED_DOC_SETS:
+        return jsonify({'error': 'not found'}), 404
+    target_dir = os.path.join(SHARED_DOCS_DIR, doc_set)
+    if not os.path.isfile(os.path.join(target_dir, filename)):
+        return jsonify({'error': 'not found'}), 404
+    return send_from_directory(target_dir, filename)
+
+
+@bp.route('/', defaults={'path': ''})
+@bp.route('/<path:path>')
+@limiter.exempt
+def serve_static(path):
+    """Serve Astro static files."""
+    # Default to index.html
+    if not path:
+        path = 'index.html'
+
+    # Check if file exists
+    static_path = os.path.join(STATIC_DIR, path)
+
+    if os.path.isfile(static_path):
+        return _apply_cache_headers(send_from_directory(STATIC_DIR, path), path)
+
+    # Try with .html extension (Astro pages)
+    if not path.endswith('.html') and os.path.isfile(static_path + '.html'):
+        return _apply_cache_headers(
+            send_from_directory(STATIC_DIR, path + '.html'), path + '.html'
+        )
+
+    # Check for index.html in directory
+    index_path = os.path.join(static_path, 'index.html')
+    if os.path.isdir(static_path) and os.path.isfile(index_path):
+        return _apply_cache_headers(
+            send_from_directory(os.path.join(STATIC_DIR, path), 'index.html'),
+            'index.html',
+        )
+
+    # Fallback to index.html for SPA routing
+    return _apply_cache_headers(
+        send_from_directory(STATIC_DIR, 'index.html'), 'index.html'
+    )
+
+
+@bp.route('/images/gallery/<path:filename>')
+@limiter.exempt
+def serve_gallery_image(filename):
+    """Serve gallery images."""
+    return _apply_cache_headers(
+        send_from_directory(GALLERY_DIR, filename), filename
+    )
+
+
+def _resize_cached() -> bool:
+    args = request.view_args or {}
+    return image_resize.is_cached(args.get('size', ''), args.get('filename', ''))
+
+
+@bp.route('/images/resize/<size>/<path:filename>')
+@limiter.limit("60 per minute", exempt_when=_resize_cached)
+def serve_resized_image(size, filename):
+    """Gallery image scaled to a whitelisted size (generated once, then from the disk cache).
+
+    Only renders count against the rate limit; cache hits are free.
+    """
+    try:
+        canonical = image_resize.canonical_path(image_resize.source_path(filename))
+        if canonical != filename:
+            # One URL (and one cache entry) per file: a/./x.jpg, a//x.jpg → a/x.jpg
+            return redirect(f'/images/resize/{size}/{quote(canonical)}', code=301)
+        path, key = image_resize.get_variant(size, filename)
+    except image_resize.NotAllowed:
+        return jsonify({'error': 'Größe oder Pfad nicht erlaubt'}), 400
+    except FileNotFoundError:
+        return jsonify({'error': 'Bild nicht gefunden'}), 404
+    except Exception as e:
+        print(f"[image_resize] {size}/{filename} failed: {e}")
+        return jsonify({'error': 'Bild konnte nicht skaliert werden'}), 422
+    response = send_file(path, mimetype='image/webp', etag=key, conditional=True, max_age=31536000)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+@bp.route('/api/health', methods=['GET'])
+def health():
+    """Health check endpoint. Meldet zusaetzlich den deployed Git-Commit,
+    damit CI verifizieren kann ob die aktuelle Version live ist."""
+    return jsonify({
+        'status': 'ok',
+        'service': 'voigt-garten-pi',
+        'timestamp': datetime.now().isoformat(),
+        'commit': os.environ.get('GIT_COMMIT', 'unknown')
+    })
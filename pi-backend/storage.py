@@ -2,10 +2,98 @@
 Storage Backend Interface for Voigt-Garten.
 Currently uses local filesystem. Interface prepared for future
 Google Drive / Hetzner Storage Box backends.
+
+Uploaded originals (gallery originals, panoramas, inventory, completion and
+issue photos) live in a content-addressed blob store under the same root:
+
+    blobs/<sha256[:2]>/<sha256>.<ext>
+
+The `blobs` table maps SHA-256 → path and keeps a reference count that
+triggers maintain from every column that stores such a path (REFERENCES),
+so the same photo uploaded twice is stored once and only deleted when the
+last row pointing at it is gone. Uploads are hashed while they are streamed
+to disk (`stage`), i.e. before anything decodes them.
+
+Usage:
+    python storage.py stats
+    python storage.py refcount   # recompute refcounts from the referencing columns
+    python storage.py adopt      # move pre-blob uploads into the blob store
 """
 
+import hashlib
+import json
 import os
-import shutil
+import sqlite3
+import sys
+import uuid
+from dataclasses import dataclass
+
+BLOB_DIR = 'blobs'
+CHUNK_SIZE = 1024 * 1024
+
+# (table, column) holding paths relative to the gallery root
+REFERENCES = [
+    ('gallery_images', 'filename'),
+    ('gallery_images', 'original_path'),
+    ('inventory_items', 'photo_path'),
+    ('projects', 'completion_photo'),
+    ('maintenance_log', 'photo_filename'),
+    ('issue_reports', 'photo_filename'),
+]
+
+
+def _schema() -> str:
+    parts = ['''
+    CREATE TABLE IF NOT EXISTS blobs (
+        sha256 TEXT PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,        -- relative to the gallery root
+        size INTEGER NOT NULL,
+        refcount INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_blobs_unreferenced ON blobs(created_at) WHERE refcount <= 0;
+    -- duplicate check on upload, slug probing (media.get_unique_base_name)
+    CREATE INDEX IF NOT EXISTS idx_gallery_original_path ON gallery_images(original_path);
+    CREATE INDEX IF NOT EXISTS idx_gallery_filename ON gallery_images(filename);''']
+    for table, col in REFERENCES:
+        name = f'trg_blob_ref_{table}_{col}'
+        parts.append(f'''
+    CREATE TRIGGER IF NOT EXISTS {name}_ins AFTER INSERT ON {table} WHEN NEW.{col} IS NOT NULL BEGIN
+        UPDATE blobs SET refcount = refcount + 1 WHERE path = NEW.{col};
+    END;
+    CREATE TRIGGER IF NOT EXISTS {name}_upd AFTER UPDATE OF {col} ON {table}
+    WHEN OLD.{col} IS NOT NEW.{col} BEGIN
+        UPDATE blobs SET refcount = refcount - 1 WHERE path = OLD.{col};
+        UPDATE blobs SET refcount = refcount + 1 WHERE path = NEW.{col};
+    END;
+    CREATE TRIGGER IF NOT EXISTS {name}_del AFTER DELETE ON {table} WHEN OLD.{col} IS NOT NULL BEGIN
+        UPDATE blobs SET refcount = refcount - 1 WHERE path = OLD.{col};
+    END;''')
+    return '\n'.join(parts)
+
+
+SCHEMA = _schema()
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    conn.executescript(schema)
+
+
+def blob_path(sha256: str, ext: str) -> str:
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256}.{ext.lower()}"
+
+
+def is_blob_path(relative_path: str | None) -> bool:
+    return bool(relative_path) and relative_path.startswith(BLOB_DIR + '/')
+
+
+@dataclass
+class StagedBlob:
+    """An upload hashed into a temp file, not yet part of the blob store."""
+    sha256: str
+    size: int
+    path: str        # final relative blob path
+    tmp_path: str    # absolute temp file (readable until commit_blob/discard)
 
 
 class StorageBackend:
@@ -56,3 +144,180 @@ class LocalStorage(StorageBackend):
 
     def get_full_path(self, relative_path: str) -> str:
         return os.path.join(self.base_dir, relative_path)
+
+    # ============ Content-addressed blobs ============
+
+    def stage(self, stream, ext: str) -> StagedBlob:
+        """Copy a stream to a temp file, hashing it on the way (no decoding)."""
+        tmp_dir = os.path.join(self.base_dir, BLOB_DIR, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+        with open(tmp_path, 'wb') as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        sha = digest.hexdigest()
+        return StagedBlob(sha, size, blob_path(sha, ext), tmp_path)
+
+    def stage_file(self, tmp_path: str, ext: str) -> StagedBlob:
+        """Hash a file already written under blobs/tmp (resumable uploads) in place."""
+        digest = hashlib.sha256()
+        size = 0
+        with open(tmp_path, 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+        sha = digest.hexdigest()
+        return StagedBlob(sha, size, blob_path(sha, ext), tmp_path)
+
+    def find_blob(self, conn, sha256: str) -> str | None:
+        row = conn.execute('SELECT path FROM blobs WHERE sha256 = ?', (sha256,)).fetchone()
+        return row[0] if row else None
+
+    def commit_blob(self, conn, staged: StagedBlob) -> str:
+        """Register the blob in the caller's transaction and move it into place.
+
+        Call right before inserting the referencing row, then commit: the
+        blob row insert takes the write lock, so a concurrent `release` of the
+        same content can't remove the file in between. Returns the blob path
+        (an existing one for duplicate content, whose extension may differ).
+        """
+        conn.execute(
+            'INSERT INTO blobs (sha256, path, size) VALUES (?, ?, ?) ON CONFLICT(sha256) DO NOTHING',
+            (staged.sha256, staged.path, staged.size),
+        )
+        path = self.find_blob(conn, staged.sha256)
+        full_path = self.get_full_path(path)
+        if os.path.exists(full_path):
+            os.remove(staged.tmp_path)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.replace(staged.tmp_path, full_path)
+        return path
+
+    def discard(self, staged: StagedBlob) -> None:
+        if os.path.exists(staged.tmp_path):
+            os.remove(staged.tmp_path)
+
+    def release(self, conn, relative_path: str | None) -> bool:
+        """Delete a file whose referencing row is gone (committed).
+
+        Blobs are only removed once their refcount is 0; any other path is a
+        plain file and removed directly. Returns True if a file was deleted.
+        """
+        if not relative_path:
+            return False
+        if not is_blob_path(relative_path):
+            return self.delete(relative_path)
+        cur = conn.execute('DELETE FROM blobs WHERE path = ? AND refcount <= 0', (relative_path,))
+        removed = False
+        if cur.rowcount:
+            removed = self.delete(relative_path)
+        elif not conn.execute('SELECT 1 FROM blobs WHERE path = ?', (relative_path,)).fetchone():
+            removed = self.delete(relative_path)
+        conn.commit()
+        return removed
+
+
+def recount(conn) -> int:
+    """Recompute every refcount from REFERENCES. Returns the number of corrected blobs."""
+    union = ' UNION ALL '.join(f'SELECT {col} AS path FROM {table} WHERE {col} LIKE \'{BLOB_DIR}/%\''
+                               for table, col in REFERENCES)
+    cur = conn.execute(f'''
+        UPDATE blobs SET refcount = COALESCE((SELECT COUNT(*) FROM ({union}) r WHERE r.path = blobs.path), 0)
+        WHERE refcount != COALESCE((SELECT COUNT(*) FROM ({union}) r WHERE r.path = blobs.path), 0)
+    ''')
+    conn.commit()
+    return cur.rowcount
+
+
+def adopt(conn, store: LocalStorage) -> dict:
+    """Move pre-blob uploads into the blob store and point their rows at the blob.
+
+    Gallery display files (WebP/MP4/thumbnails) keep their slug names; only
+    originals and photos are adopted. Panoramas are skipped (tile paths
+    derive from the filename).
+    """
+    candidates = [
+        "SELECT original_path FROM gallery_images WHERE original_path IS NOT NULL AND type != 'panorama'",
+        'SELECT photo_path FROM inventory_items WHERE photo_path IS NOT NULL',
+        'SELECT completion_photo FROM projects WHERE completion_photo IS NOT NULL',
+        'SELECT photo_filename FROM maintenance_log WHERE photo_filename IS NOT NULL',
+        'SELECT photo_filename FROM issue_reports WHERE photo_filename IS NOT NULL',
+    ]
+    paths = []
+    for sql in candidates:
+        for (path,) in conn.execute(sql):
+            if not is_blob_path(path) and path not in paths:
+                paths.append(path)
+
+    stats = {'adopted': 0, 'deduplicated': 0, 'missing': 0}
+    for old in paths:
+        full = store.get_full_path(old)
+        if not os.path.isfile(full):
+            stats['missing'] += 1
+            continue
+        ext = old.rsplit('.', 1)[1] if '.' in old else 'bin'
+        with open(full, 'rb') as f:
+            staged = store.stage(f, ext)
+        existed = store.find_blob(conn, staged.sha256) is not None
+        new = store.commit_blob(conn, staged)
+        for table, col in REFERENCES:
+            conn.execute(f'UPDATE {table} SET {col} = ? WHERE {col} = ?', (new, old))
+        conn.commit()
+        os.remove(full)
+        stats['deduplicated' if existed else 'adopted'] += 1
+    return stats
+
+
+def stats(conn, store: LocalStorage) -> dict:
+    row = conn.execute('''
+        SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(CASE WHEN refcount > 1 THEN (refcount - 1) * size END), 0),
+               SUM(refcount <= 0)
+        FROM blobs
+    ''').fetchone()
+    tmp_dir = os.path.join(store.base_dir, BLOB_DIR, 'tmp')
+    return {
+        'blobs': row[0],
+        'bytes': row[1],
+        'bytes_saved_by_dedup': row[2],
+        'unreferenced': row[3] or 0,
+        'staged_tmp_files': len(os.listdir(tmp_dir)) if os.path.isdir(tmp_dir) else 0,
+    }
+
+
+def main(argv=None) -> int:
+    import argparse
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from config import DB_PATH, GALLERY_DIR
+
+    parser = argparse.ArgumentParser(description='Content-addressed blob store')
+    parser.add_argument('command', choices=['stats', 'refcount', 'adopt'])
+    args = parser.parse_args(argv)
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    store = LocalStorage(GALLERY_DIR)
+    try:
+        if args.command == 'stats':
+            result = stats(conn, store)
+        elif args.command == 'refcount':
+            result = {'corrected': recount(conn)}
+        else:
+            result = adopt(conn, store)
+            result['corrected'] = recount(conn)
+    finally:
+        conn.close()
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Storage audit: diff the upload directories against the database.
+
+Deleting a gallery item removes its files best-effort, failed conversions
+leave `_original`/`_frame.jpg` files behind, a crash between staging and the
+INSERT leaves files under `blobs/tmp`, and an interrupted panorama build
+leaves `<base>_tiles.tmp-<pid>`. Nothing ever noticed. This module walks
+
+    GALLERY_DIR              gallery, blob store, inventory/completion/issue photos
+    DATA_DIR/invoices        invoices.pdf_path
+    DATA_DIR/applications    job_applications.resume_path
+    DATA_DIR/bugreports      screenshots linked from IT-task descriptions
+
+in one streaming `os.scandir` pass per root and compares every entry with
+the set of paths the database references (storage.REFERENCES plus the
+non-blob columns). The report lists
+
+  orphans    files/dirs nothing references, with a `kind`
+             (orphan, unreferenced_blob, staged_tmp, upload_tmp, frame_tmp,
+             tiles_tmp, tiles) and their size → reclaimable bytes
+  missing    referenced paths that are not on disk (table, column, row id)
+
+Entries younger than STORAGE_AUDIT_GRACE_HOURS are never reported as
+orphans (uploads stage their file before the row is committed). `clean`
+deletes the orphans; blobs go through LocalStorage.release so a blob that
+was re-referenced in the meantime survives. The nightly agent_scheduler
+kind `storage_audit` only reports (to DATA_DIR/storage_audit.json) unless
+STORAGE_AUDIT_DELETE=1.
+
+Usage:
+    python storage_audit.py report [--limit N]
+    python storage_audit.py clean
+"""
+
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DATA_DIR, DB_PATH, GALLERY_DIR  # noqa: E402
+from storage import BLOB_DIR, REFERENCES, LocalStorage, is_blob_path  # noqa: E402
+
+GRACE_HOURS = float(os.environ.get('STORAGE_AUDIT_GRACE_HOURS', 24))
+AUTO_DELETE = os.environ.get('STORAGE_AUDIT_DELETE', '0') == '1'
+REPORT_PATH = os.path.join(DATA_DIR, 'storage_audit.json')
+RUN_HOUR = 5
+
+# Gallery columns that are not blob references (display files, videos, thumbnails)
+GALLERY_REFERENCES = REFERENCES + [
+    ('gallery_images', 'thumbnail_path'),
+    ('gallery_images', 'webp_path'),
+    ('background_videos', 'video_path'),
+    ('background_videos', 'thumbnail_path'),
+]
+
+BUGREPORT_LINK = re.compile(r'/uploads/bugreports/([\w.-]+)')
+TILES_TMP = re.compile(r'_tiles\.tmp-\d+$')
+UPLOAD_TMP = re.compile(r'^upload-([0-9a-f]{32})$')
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+# ============ Database side ============
+
+def _collect(conn, sql: str, refs: dict, table: str, column: str, transform=None) -> None:
+    for row_id, value in conn.execute(sql):
+        if not value:
+            continue
+        for path in (transform(value) if transform else [value]):
+            refs.setdefault(path, (table, column, row_id))
+
+
+def gallery_references(conn) -> tuple[dict, set]:
+    """Referenced gallery paths → (table, column, id), plus panorama tile dirs."""
+    refs = {}
+    for table, col in GALLERY_REFERENCES:
+        key = 'page' if table == 'background_videos' else 'id'
+        _collect(conn, f'SELECT {key}, {col} FROM {table} WHERE {col} IS NOT NULL', refs, table, col)
+    # Posters/teasers of background videos are only referenced by their manifest
+    from asset_manifest import referenced_paths
+    for path in referenced_paths():
+        refs.setdefault(path, ('background_videos', 'manifest', path))
+    from panorama_tiles import tiles_dir_for
+    tiles = {tiles_dir_for(r[0]) for r in conn.execute(
+        "SELECT filename FROM gallery_images WHERE type = 'panorama'"
+    )}
+    return refs, tiles
+
+
+def data_references(conn) -> dict:
+    """Per DATA_DIR subdirectory: file name → (table, column, id)."""
+    invoices, applications, bugreports = {}, {}, {}
+    _collect(conn, 'SELECT id, pdf_path FROM invoices WHERE pdf_path IS NOT NULL',
+             invoices, 'invoices', 'pdf_path',
+             lambda p: [p.split('/', 1)[1]] if p.startswith('invoices/') else [p])
+    _collect(conn, 'SELECT id, resume_path FROM job_applications WHERE resume_path IS NOT NULL',
+             applications, 'job_applications', 'resume_path')
+    _collect(conn, "SELECT id, description FROM projects WHERE description LIKE '%/uploads/bugreports/%'",
+             bugreports, 'projects', 'description', BUGREPORT_LINK.findall)
+    return {'invoices': invoices, 'applications': applications, 'bugreports': bugreports}
+
+
+def _active_uploads(conn) -> set:
+    return {r[0] for r in conn.execute("SELECT id FROM upload_sessions WHERE status IN ('uploading', 'processing')")}
+
+
+# ============ Filesystem side ============
+
+def _tree_size(path: str) -> int:
+    total = 0
+    for entry in os.scandir(path):
+        if entry.is_dir(follow_symlinks=False):
+            total += _tree_size(entry.path)
+        elif entry.is_file(follow_symlinks=False):
+            total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+
+def walk(root: str, descend=None, rel: str = ''):
+    """Yield (relative path, DirEntry) for every file below root, streaming.
+
+    `descend(path, entry)` decides per directory whether to enter it, so a
+    tile directory can be handled as one unit.
+    """
+    try:
+        it = os.scandir(os.path.join(root, rel) if rel else root)
+    except FileNotFoundError:
+        return
+    with it:
+        for entry in it:
+            path = f'{rel}/{entry.name}' if rel else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if descend is None or descend(path, entry):
+                    yield from walk(root, descend, path)
+            else:
+                yield path, entry
+
+
+def _classify(path: str, blob_rows: set, active_uploads: set) -> str:
+    """Kind of an unreferenced gallery file."""
+    name = path.rsplit('/', 1)[-1]
+    if path.startswith(f'{BLOB_DIR}/tmp/'):
+        m = UPLOAD_TMP.match(name)
+        if m and m.group(1) in active_uploads:
+            return 'active'
+        return 'upload_tmp' if m else 'staged_tmp'
+    if path in blob_rows:
+        return 'unreferenced_blob'
+    if name.endswith('_frame.jpg'):
+        return 'frame_tmp'
+    return 'orphan'
+
+
+# ============ Audit ============
+
+def audit(conn, now: float | None = None) -> dict:
+    """One pass over all roots. Orphans carry absolute `full` paths for clean()."""
+    cutoff = (now or time.time()) - GRACE_HOURS * 3600
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'grace_hours': GRACE_HOURS,
+        'roots': {},
+        'orphans': [],
+        'missing': [],
+        'recent_skipped': 0,
+        'reclaimable_bytes': 0,
+    }
+
+    def orphan(root_name, full, path, kind, entry):
+        st = entry.stat(follow_symlinks=False)
+        if st.st_mtime > cutoff:
+            report['recent_skipped'] += 1
+            return
+        size = _tree_size(full) if entry.is_dir(follow_symlinks=False) else st.st_size
+        report['orphans'].append({'root': root_name, 'path': path, 'kind': kind, 'size': size,
+                                  'mtime': datetime.fromtimestamp(st.st_mtime).isoformat(timespec='seconds'),
+                                  'full': full})
+        report['reclaimable_bytes'] += size
+
+    def missing(root_name, refs, seen):
+        for path, (table, column, row_id) in refs.items():
+            if path not in seen:
+                report['missing'].append({'root': root_name, 'path': path, 'table': table,
+                                          'column': column, 'id': row_id})
+
+    # --- Gallery + blob store ---
+    refs, tiles = gallery_references(conn)
+    blob_rows = {r[0] for r in conn.execute('SELECT path FROM blobs WHERE refcount <= 0')}
+    active_uploads = _active_uploads(conn)
+    seen = set()
+    stats = {'files': 0, 'bytes': 0}
+
+    def descend(path, entry):
+        name = entry.name
+        if path in tiles:
+            seen.add(path)
+            return False
+        if TILES_TMP.search(name) or name.endswith('_tiles'):
+            orphan('gallery', entry.path, path, 'tiles_tmp' if TILES_TMP.search(name) else 'tiles', entry)
+            return False
+        return True
+
+    for path, entry in walk(GALLERY_DIR, descend):
+        stats['files'] += 1
+        stats['bytes'] += entry.stat(follow_symlinks=False).st_size
+        if path in refs:
+            seen.add(path)
+            continue
+        kind = _classify(path, blob_rows, active_uploads)
+        if kind != 'active':
+            orphan('gallery', entry.path, path, kind, entry)
+    report['roots']['gallery'] = stats
+    missing('gallery', refs, seen)
+    # Tile dirs only exist once panorama_tiles.py ran successfully
+    built = {r[0] for r in conn.execute(
+        "SELECT filename FROM gallery_images WHERE type = 'panorama' AND multires LIKE '%basePath%'"
+    )}
+    from panorama_tiles import tiles_dir_for
+    for filename in built:
+        if tiles_dir_for(filename) not in seen:
+            report['missing'].append({'root': 'gallery', 'path': tiles_dir_for(filename),
+                                      'table': 'gallery_images', 'column': 'multires', 'id': filename})
+    # Blob rows without a file (refcount 0, nothing will ever clean them)
+    report['stale_blob_rows'] = sorted(p for p in blob_rows if p not in seen
+                                       and not os.path.exists(os.path.join(GALLERY_DIR, p)))
+
+    # --- DATA_DIR subdirectories (flat) ---
+    for name, refs in data_references(conn).items():
+        root = os.path.join(DATA_DIR, name)
+        seen = set()
+        stats = {'files': 0, 'bytes': 0}
+        for path, entry in walk(root):
+            if entry.is_dir(follow_symlinks=False):
+                continue
+            stats['files'] += 1
+            stats['bytes'] += entry.stat(follow_symlinks=False).st_size
+            if path in refs:
+                seen.add(path)
+            else:
+                orphan(name, entry.path, path, 'orphan', entry)
+        report['roots'][name] = stats
+        missing(name, refs, seen)
+    return report
+
+
+def clean(conn, report: dict) -> dict:
+    """Delete the orphans of a report. Returns counts and freed bytes."""
+    store = LocalStorage(GALLERY_DIR)
+    result = {'deleted': 0, 'freed_bytes': 0, 'kept': 0, 'stale_blob_rows': 0}
+    for item in report['orphans']:
+        full = item['full']
+        try:
+            if item['root'] == 'gallery' and is_blob_path(item['path']) and item['kind'] not in ('staged_tmp', 'upload_tmp'):
+                # refcount check under the write lock; a re-referenced blob stays
+                removed = store.release(conn, item['path'])
+            elif os.path.isdir(full) and not os.path.islink(full):
+                shutil.rmtree(full)
+                removed = True
+            else:
+                os.remove(full)
+                removed = True
+        except FileNotFoundError:
+            removed = False
+        except OSError as e:
+            print(f"[storage_audit] {item['path']}: {e}")
+            removed = False
+        if removed:
+            result['deleted'] += 1
+            result['freed_bytes'] += item['size']
+        else:
+            result['kept'] += 1
+    for path in report.get('stale_blob_rows', []):
+        result['stale_blob_rows'] += conn.execute(
+            'DELETE FROM blobs WHERE path = ? AND refcount <= 0', (path,)
+        ).rowcount
+    conn.commit()
+    return result
+
+
+def summary(report: dict, limit: int | None = None) -> dict:
+    """Report for output: totals per kind, entries without absolute paths, optionally truncated."""
+    kinds = {}
+    for item in report['orphans']:
+        k = kinds.setdefault(item['kind'], {'count': 0, 'bytes': 0})
+        k['count'] += 1
+        k['bytes'] += item['size']
+    out = dict(report, orphan_kinds=kinds)
+    out['orphans'] = [{k: v for k, v in item.items() if k != 'full'} for item in report['orphans']][:limit]
+    out['missing'] = report['missing'][:limit]
+    return out
+
+
+def handle_audit(conn: sqlite3.Connection, item, now: datetime) -> dict:
+    """agent_scheduler handler: nightly report (and cleanup with STORAGE_AUDIT_DELETE=1)."""
+    from agent_scheduler import schedule, tomorrow_at
+    report = audit(conn)
+    out = summary(report, limit=500)
+    if AUTO_DELETE:
+        out['clean'] = clean(conn, report)
+    with open(REPORT_PATH, 'w') as f:
+        json.dump(out, f, indent=2)
+    schedule(conn, 'storage_audit', 0, tomorrow_at(now, RUN_HOUR))
+    return {'action': 'storage_cleaned' if AUTO_DELETE else 'storage_audited',
+            'orphans': len(report['orphans']), 'missing': len(report['missing']),
+            'reclaimable_bytes': report['reclaimable_bytes']}
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Audit upload directories against the database')
+    parser.add_argument('command', choices=['report', 'clean'])
+    parser.add_argument('--limit', type=int, default=None, help='max. listed entries per section')
+    args = parser.parse_args(argv)
+    conn = get_db()
+    try:
+        report = audit(conn)
+        out = summary(report, args.limit)
+        if args.command == 'clean':
+            out['clean'] = clean(conn, report)
+        print(json.dumps(out, indent=2))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1518 @@
+"""Projects (Kanban), recurring tasks, issue reports, unified task list, subtasks, comments, milestones."""
+
+from flask import Blueprint, request, jsonify, current_app
+import json
+from datetime import datetime, timedelta
+from collections import deque
+
+from email_service import send_activity_notification
+from config import INFINILOOP_API_KEY, INFINILOOP_URL
+from db import get_db
+from extensions import storage
+from api_helpers import parse_json_fields
+from auth import get_current_user, require_admin, require_auth
+from media import allowed_file
+from search_index import match_refs
+
+bp = Blueprint('tasks', __name__)
+
+
+# ============ Projects (Kanban) Routes ============
+
+@bp.route('/api/projects', methods=['GET'])
+def get_projects():
+    """Get all projects with optional filters."""
+    status = request.args.get('status')
+    category = request.args.get('category')
+
+    conn = get_db()
+    query = 'SELECT * FROM projects WHERE 1=1'
+    params = []
+
+    if status:
+        query += ' AND status = ?'
+        params.append(status)
+    if category:
+        query += ' AND category = ?'
+        params.append(category)
+
+    query += ' ORDER BY CASE priority WHEN "kritisch" THEN 1 WHEN "hoch" THEN 2 WHEN "mittel" THEN 3 ELSE 4 END, created_at DESC'
+
+    projects = conn.execute(query, params).fetchall()
+    conn.close()
+
+    result = []
+    for p in projects:
+        proj = parse_json_fields(dict(p))
+        if not proj.get('assigned_to_list'):
+            proj['assigned_to_list'] = []
+        if not proj.get('dependencies'):
+            proj['dependencies'] = []
+        result.append(proj)
+
+    return jsonify({
+        'projects': result,
+        'total': len(result)
+    })
+
+
+@bp.route('/api/projects', methods=['POST'])
+@require_auth
+def create_project(user):
+    """Create new project."""
+    data = request.json
+
+    # Support both 'category' (string) and 'categories' (array)
+    primary_category = data.get('category')
+    if not primary_category and data.get('categories'):
+        primary_category = data['categories'][0]
+    if not data.get('title') or not primary_category:
+        return jsonify({'error': 'Titel und Kategorie erforderlich'}), 400
+
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO projects (title, description, category, status, priority,
+                             estimated_cost, effort, timeframe, created_by, map_area, milestone_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        data['title'],
+        data.get('description'),
+        primary_category,
+        data.get('status', 'offen'),
+        data.get('priority', 'mittel'),
+        data.get('estimatedCost') or data.get('estimated_cost'),
+        data.get('effort'),
+        data.get('timeframe'),
+        user['email'],
+        data.get('map_area'),
+        data.get('milestone_id') or data.get('milestoneId')
+    ))
+    project_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+
+    # Insert category mappings into junction table
+    categories_list = data.get('categories', [data['category']] if data.get('category') else [])
+    for cat_name in categories_list:
+        cat_row = conn.execute('SELECT id FROM categories WHERE name = ?', (cat_name,)).fetchone()
+        if cat_row:
+            conn.execute(
+                'INSERT OR IGNORE INTO project_categories (project_id, category_id) VALUES (?, ?)',
+                (project_id, cat_row['id'])
+            )
+
+    conn.commit()
+    conn.close()
+
+    return jsonify({
+        'success': True,
+        'projectId': project_id,
+        'message': 'Projekt erstellt'
+    })
+
+
+@bp.route('/api/projects/<int:project_id>', methods=['GET'])
+def get_project(project_id):
+    """Get single project by ID."""
+    conn = get_db()
+    project = conn.execute('SELECT * FROM projects WHERE id = ?', (project_id,)).fetchone()
+
+    if not project:
+        conn.close()
+        return jsonify({'error': 'Projekt nicht gefunden'}), 404
+
+    proj = parse_json_fields(dict(project))
+    if not proj.get('assigned_to_list'):
+        proj['assigned_to_list'] = []
+    if not proj.get('dependencies'):
+        proj['dependencies'] = []
+
+    # Fetch categories from junction table
+    cat_rows = conn.execute('''
+        SELECT c.name FROM project_categories pc
+        JOIN categories c ON pc.category_id = c.id
+        WHERE pc.project_id = ?
+    ''', (project_id,)).fetchall()
+    proj['categories'] = [r['name'] for r in cat_rows] if cat_rows else ([proj['category']] if proj.get('category') else [])
+    conn.close()
+
+    return jsonify({'project': proj})
+
+
+@bp.route('/api/projects/<int:project_id>', methods=['PATCH'])
+@require_auth
+def update_project(project_id, user):
+    """Update project details."""
+    data = request.json
+
+    conn = get_db()
+    project = conn.execute('SELECT * FROM projects WHERE id = ?', (project_id,)).fetchone()
+
+    if not project:
+        conn.close()
+        return jsonify({'error': 'Projekt nicht gefunden'}), 404
+
+    # Circular dependency detection (BFS)
+    new_deps = data.get('dependencies') or data.get('dependencies')
+    if new_deps is not None:
+        dep_ids = json.loads(new_deps) if isinstance(new_deps, str) else new_deps
+        if dep_ids:
+            visited = set()
+            queue = deque(dep_ids)
+            while queue:
+                dep_id = queue.popleft()
+                if dep_id == project_id:
+                    conn.close()
+                    return jsonify({'error': 'Zirkuläre Abhängigkeit erkannt'}), 400
+                if dep_id in visited:
+                    continue
+                visited.add(dep_id)
+                row = conn.execute('SELECT dependencies FROM projects WHERE id = ?', (dep_id,)).fetchone()
+                if row and row['dependencies']:
+                    try:
+                        child_deps = json.loads(row['dependencies'])
+                        queue.extend(child_deps)
+                    except (json.JSONDecodeError, TypeError):
+                        pass
+
+    # Build update query dynamically
+    updates = []
+    params = []
+    allowed_fields = ['title', 'description', 'category', 'status', 'priority',
+                      'estimated_cost', 'effort', 'timeframe', 'assigned_to',
+                      'dependencies', 'start_date', 'due_date', 'assigned_to_list',
+                      'parent_task_id', 'map_area', 'milestone_id']
+    json_fields = {'dependencies', 'assigned_to_list'}
+
+    for field in allowed_fields:
+        # Also check camelCase variants
+        camel_field = ''.join(word.capitalize() if i > 0 else word for i, word in enumerate(field.split('_')))
+        value = data.get(field) or data.get(camel_field)
+        if value is not None:
+            # Serialize list/dict values as JSON strings for storage
+            if field in json_fields and not isinstance(value, str):
+                value = json.dumps(value)
+            updates.append(f'{field} = ?')
+            params.append(value)
+
+    if updates:
+        updates.append('updated_at = ?')
+        params.append(datetime.now().isoformat())
+        params.append(project_id)
+
+        conn.execute(f'''
+            UPDATE projects SET {', '.join(updates)} WHERE id = ?
+        ''', params)
+        conn.commit()
+
+    # Update junction table if categories array provided
+    categories_list = data.get('categories')
+    if categories_list is not None and isinstance(categories_list, list):
+        conn.execute('DELETE FROM project_categories WHERE project_id = ?', (project_id,))
+        for cat_name in categories_list:
+            cat_row = conn.execute('SELECT id FROM categories WHERE name = ?', (cat_name,)).fetchone()
+            if cat_row:
+                conn.execute(
+                    'INSERT OR IGNORE INTO project_categories (project_id, category_id) VALUES (?, ?)',
+                    (project_id, cat_row['id'])
+                )
+        # Update primary category field for backwards compatibility
+        if categories_list:
+            conn.execute('UPDATE projects SET category = ? WHERE id = ?', (categories_list[0], project_id))
+        conn.commit()
+
+    conn.close()
+
+    return jsonify({'success': True, 'message': 'Projekt aktualisiert'})
+
+
+def _compute_next_seasonal_due(cycle_days, seasonal_months_json):
+    """Berechnet next_due unter Berücksichtigung saisonaler Monate.
+
+    seasonal_months_json: JSON-Array der aktiven Monate (1-12). Leeres Array = alle Monate.
+    Wenn das per cycle_days errechnete Datum in einem inaktiven Monat liegt, springt es
+    auf den 1. des nächsten aktiven Monats vor.
+    """
+    from datetime import date
+    base = date.today() + timedelta(days=cycle_days or 0)
+    try:
+        seasonal = json.loads(seasonal_months_json or '[]')
+    except (ValueError, TypeError):
+        seasonal = []
+    if not seasonal:
+        return base.isoformat()
+    # Spring forward to first day of next active month (max 12 iterations)
+    for _ in range(12):
+        if base.month in seasonal:
+            return base.isoformat()
+        if base.month == 12:
+            base = date(base.year + 1, 1, 1)
+        else:
+            base = date(base.year, base.month + 1, 1)
+    return base.isoformat()
+
+
+@bp.route('/api/projects/<int:project_id>/complete', methods=['POST'])
+@require_auth
+def complete_project(project_id, user):
+    """Mark project as completed (with optional photo)."""
+    conn = get_db()
+    project = conn.execute('SELECT * FROM projects WHERE id = ?', (project_id,)).fetchone()
+
+    if not project:
+        conn.close()
+        return jsonify({'error': 'Projekt nicht gefunden'}), 404
+
+    notes = None
+    photo_path = None
+    cascade = False
+
+    # Handle multipart form data for photo upload
+    if request.content_type and 'multipart/form-data' in request.content_type:
+        notes = request.form.get('notes')
+
+        if 'photo' in request.files:
+            photo = request.files['photo']
+            if photo and allowed_file(photo.filename):
+                ext = photo.filename.rsplit('.', 1)[1].lower()
+                photo_path = storage.commit_blob(conn, storage.stage(photo.stream, ext))
+    else:
+        data = request.json or {}
+        notes = data.get('notes')
+        photo_path = data.get('photoPath')
+        cascade = data.get('cascade', False)
+
+    now_iso = datetime.now().isoformat()
+    conn.execute('''
+        UPDATE projects SET
+            status = 'done',
+            completed_at = ?,
+            completed_by = ?,
+            completion_photo = ?,
+            completion_notes = ?,
+            updated_at = ?
+        WHERE id = ?
+    ''', (now_iso, user['email'], photo_path, notes, now_iso, project_id))
+
+    # Cascade: also complete all child tasks
+    if cascade:
+        conn.execute('''
+            UPDATE projects SET
+                status = 'done',
+                completed_at = ?,
+                completed_by = ?,
+                completion_notes = 'Automatisch mit Elternaufgabe abgeschlossen',
+                updated_at = ?
+            WHERE parent_task_id = ? AND status != 'done'
+        ''', (now_iso, user['email'], now_iso, project_id))
+
+    # Auto-recreate recurring tasks
+    project_dict = dict(project)
+    if project_dict.get('is_recurring') and project_dict.get('cycle_days'):
+        seasonal_months = project_dict.get('seasonal_months') or '[]'
+        next_due = _compute_next_seasonal_due(project_dict['cycle_days'], seasonal_months)
+        conn.execute('''
+            INSERT INTO projects (title, description, category, status, priority, effort,
+                is_recurring, cycle_days, credit_value, due_date, assigned_to, map_area,
+                seasonal_months, created_by)
+            VALUES (?, ?, ?, 'offen', ?, ?, 1, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            project_dict['title'], project_dict.get('description'), project_dict['category'],
+            project_dict.get('priority', 'mittel'), project_dict.get('effort', 'mittel'),
+            project_dict['cycle_days'], project_dict.get('credit_value', 0),
+            next_due, project_dict.get('assigned_to'), project_dict.get('map_area'),
+            seasonal_months,
+            project_dict.get('created_by', 'system')
+        ))
+        # Auto-award credit
+        if project_dict.get('credit_value') and project_dict['credit_value'] > 0:
+            conn.execute('''
+                INSERT INTO credits (guest_email, amount, reason, type, created_at)
+                VALUES (?, ?, ?, 'earned', ?)
+            ''', (
+                user['email'], project_dict['credit_value'],
+                f"Wiederkehrend: {project_dict['title']}", now_iso
+            ))
+
+    conn.commit()
+    conn.close()
+
+    # Send notification to admin
+    send_activity_notification('task_completed', {
+        'Projekt': project['title'],
+        'Erledigt von': user.get('name') or user['email'],
+        'Notizen': notes or '-',
+        'Foto': 'Ja' if photo_path else 'Nein'
+    })
+
+    return jsonify({
+        'success': True,
+        'message': 'Projekt als erledigt markiert',
+        'photoUrl': f'/images/gallery/{photo_path}' if photo_path else None
+    })
+
+
+@bp.route('/api/projects/<int:project_id>/confirm', methods=['POST'])
+@require_admin
+def confirm_project(project_id, user):
+    """Admin: Confirm project completion and award credit."""
+    data = request.json or {}
+
+    conn = get_db()
+    project = conn.execute('SELECT * FROM projects WHERE id = ?', (project_id,)).fetchone()
+
+    if not project:
+        conn.close()
+        return jsonify({'error': 'Projekt nicht gefunden'}), 404
+
+    if project['status'] != 'done':
+        conn.close()
+        return jsonify({'error': 'Projekt ist noch nicht als erledigt markiert'}), 400
+
+    if project['confirmed_at']:
+        conn.close()
+        return jsonify({'error': 'Projekt wurde bereits bestätigt'}), 400
+
+    credit_amount = data.get('creditAmount', 0)
+
+    # Update project
+    conn.execute('''
+        UPDATE projects SET
+            confirmed_at = ?,
+            confirmed_by = ?,
+            credit_awarded = ?,
+            updated_at = ?
+        WHERE id = ?
+    ''', (
+        datetime.now().isoformat(),
+        user['email'],
+        credit_amount,
+        datetime.now().isoformat(),
+        project_id
+    ))
+
+    # Award credit if applicable
+    if credit_amount > 0 and project['completed_by']:
+        conn.execute('''
+            INSERT INTO credits (guest_email, amount, reason, type)
+            VALUES (?, ?, ?, 'earned')
+        ''', (
+            project['completed_by'],
+            credit_amount,
+            f"Projekt: {project['title']}"
+        ))
+
+    # Hook: wenn "Pachtvertrag unterschreiben" bestätigt wird → Impressum-Mode umschalten
+    try:
+        if project['description'] and '#impressum-trigger' in project['description']:
+            conn.execute('''
+                INSERT INTO site_config (key, value, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+            ''', ('impressum_mode', 'post_lease', datetime.now().isoformat()))
+            conn.commit()
+            print(f"Impressum mode auto-switched to post_lease via confirmed task #{project_id}")
+    except Exception as e:
+        print(f"Impressum switch hook: {e}")
+
+    conn.commit()
+    conn.close()
+
+    return jsonify({
+        'success': True,
+        'message': 'Projekt bestätigt',
+        'creditAwarded': credit_amount
+    })
+
+
+@bp.route('/api/projects/<int:project_id>', methods=['DELETE'])
+@require_admin
+def delete_project(project_id, user):
+    """Admin: Delete a project."""
+    conn = get_db()
+    project = conn.execute('SELECT * FROM projects WHERE id = ?', (project_id,)).fetchone()
+
+    if not project:
+        conn.close()
+        return jsonify({'error': 'Projekt nicht gefunden'}), 404
+
+    conn.execute('DELETE FROM projects WHERE id = ?', (project_id,))
+    conn.commit()
+
+    # Delete completion photo if exists (blob: only once nothing else references it)
+    storage.release(conn, project['completion_photo'])
+    conn.close()
+
+    return jsonify({'success': True, 'message': 'Projekt gelöscht'})
+
+
+# ============ Recurring Tasks Routes ============
+
+@bp.route('/api/recurring-tasks', methods=['GET'])
+def get_recurring_tasks():
+    """Get all recurring maintenance tasks."""
+    category = request.args.get('category')
+    active_only = request.args.get('active', 'true').lower() == 'true'
+
+    conn = get_db()
+    query = 'SELECT * FROM recurring_tasks WHERE 1=1'
+    params = []
+
+    if active_only:
+        query += ' AND is_active = 1'
+    if category:
+        query += ' AND category = ?'
+        params.append(category)
+
+    query += ' ORDER BY category, title'
+
+    tasks = conn.execute(query, params).fetchall()
+    conn.close()
+
+    # Calculate status for each task
+    today = datetime.now().date()
+    result = []
+    for task in tasks:
+        t = dict(task)
+        if t['next_due']:
+            due_date = datetime.strptime(t['next_due'], '%Y-%m-%d').date()
+            days_until = (due_date - today).days
+            if days_until < 0:
+                t['status'] = 'overdue'
+                t['days_overdue'] = abs(days_until)
+            elif days_until <= 7:
+                t['status'] = 'due-soon'
+                t['days_until'] = days_until
+            else:
+                t['status'] = 'ok'
+                t['days_until'] = days_until
+        else:
+            t['status'] = 'ok'
+        result.append(t)
+
+    return jsonify({
+        'tasks': result,
+        'total': len(result)
+    })
+
+
+@bp.route('/api/recurring-tasks', methods=['POST'])
+@require_admin
+def create_recurring_task(user):
+    """Create new recurring task (admin only)."""
+    data = request.json
+
+    if not data.get('title') or not data.get('category') or not data.get('cycle_days'):
+        return jsonify({'error': 'Titel, Kategorie und Intervall erforderlich'}), 400
+
+    next_due = data.get('next_due') or (datetime.now() + timedelta(days=data['cycle_days'])).strftime('%Y-%m-%d')
+
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO recurring_tasks (title, description, category, cycle_days, credit_value, effort, next_due)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        data['title'],
+        data.get('description'),
+        data['category'],
+        data['cycle_days'],
+        data.get('credit_value', 0),
+        data.get('effort', 'mittel'),
+        next_due
+    ))
+    task_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    conn.commit()
+    conn.close()
+
+    return jsonify({
+        'success': True,
+        'taskId': task_id,
+        'message': 'Wiederkehrende Aufgabe erstellt'
+    })
+
+
+@bp.route('/api/recurring-tasks/<int:task_id>', methods=['PATCH'])
+@require_admin
+def update_recurring_task(task_id, user):
+    """Update recurring task (admin only)."""
+    data = request.json
+
+    conn = get_db()
+    task = conn.execute('SELECT * FROM recurring_tasks WHERE id = ?', (task_id,)).fetchone()
+
+    if not task:
+        conn.close()
+        return jsonify({'error': 'Aufgabe nicht gefunden'}), 404
+
+    updates = []
+    params = []
+    allowed_fields = ['title', 'description', 'category', 'cycle_days', 'credit_value', 'effort', 'next_due', 'is_active', 'map_area', 'seasonal_months']
+
+    for field in allowed_fields:
+        if field in data:
+            value = data[field]
+            if field == 'seasonal_months' and isinstance(value, list):
+                value = json.dumps(value)
+            updates.append(f'{field} = ?')
+            params.append(value)
+
+    if updates:
+        params.append(task_id)
+        conn.execute(f'''
+            UPDATE recurring_tasks SET {', '.join(updates)} WHERE id = ?
+        ''', params)
+        conn.commit()
+
+    conn.close()
+
+    return jsonify({'success': True, 'message': 'Aufgabe aktualisiert'})
+
+
+@bp.route('/api/recurring-tasks/<int:task_id>', methods=['DELETE'])
+@require_admin
+def delete_recurring_task(task_id, user):
+    """Delete recurring task (admin only)."""
+    conn = get_db()
+    task = conn.execute('SELECT * FROM recurring_tasks WHERE id = ?', (task_id,)).fetchone()
+
+    if not task:
+        conn.close()
+        return jsonify({'error': 'Aufgabe nicht gefunden'}), 404
+
+    conn.execute('DELETE FROM recurring_tasks WHERE id = ?', (task_id,))
+    conn.commit()
+    conn.close()
+
+    return jsonify({'success': True, 'message': 'Aufgabe gelöscht'})
+
+
+@bp.route('/api/recurring-tasks/<int:task_id>/complete', methods=['POST'])
+@require_auth
+def complete_recurring_task(task_id, user):
+    """Mark recurring task as completed."""
+    conn = get_db()
+    task = conn.execute('SELECT * FROM recurring_tasks WHERE id = ?', (task_id,)).fetchone()
+
+    if not task:
+        conn.close()
+        return jsonify({'error': 'Aufgabe nicht gefunden'}), 404
+
+    notes = None
+    photo_path = None
+
+    # Handle multipart form data for photo upload
+    if request.content_type and 'multipart/form-data' in request.content_type:
+        notes = request.form.get('notes')
+
+        if 'photo' in request.files:
+            photo = request.files['photo']
+            if photo and allowed_file(photo.filename):
+                ext = photo.filename.rsplit('.', 1)[1].lower()
+                photo_path = storage.commit_blob(conn, storage.stage(photo.stream, ext))
+    else:
+        data = request.json or {}
+        notes = data.get('notes')
+
+    # Calculate next due date (seasonal-aware)
+    task_dict = dict(task)
+    next_due = _compute_next_seasonal_due(task_dict['cycle_days'], task_dict.get('seasonal_months'))
+
+    # Update task
+    conn.execute('''
+        UPDATE recurring_tasks SET
+            last_completed_at = ?,
+            last_completed_by = ?,
+            next_due = ?
+        WHERE id = ?
+    ''', (
+        datetime.now().isoformat(),
+        user['email'],
+        next_due,
+        task_id
+    ))
+
+    # Log completion in maintenance_log
+    conn.execute('''
+        INSERT INTO maintenance_log (task_id, completed_by, notes, photo_filename)
+        VALUES (?, ?, ?, ?)
+    ''', (task_id, user['email'], notes, photo_path))
+
+    # Award credit if applicable
+    if task['credit_value'] and task['credit_value'] > 0:
+        conn.execute('''
+            INSERT INTO credits (guest_email, amount, reason, type)
+            VALUES (?, ?, ?, 'earned')
+        ''', (user['email'], task['credit_value'], f"Wartung: {task['title']}"))
+
+    conn.commit()
+    conn.close()
+
+    # Send notification to admin
+    send_activity_notification('task_completed', {
+        'Aufgabe': task['title'],
+        'Kategorie': task['category'],
+        'Erledigt von': user.get('name') or user['email'],
+        'Credits': f"{task['credit_value']} Punkte" if task['credit_value'] else '-',
+        'Nächste Fälligkeit': next_due
+    })
+
+    return jsonify({
+        'success': True,
+        'message': 'Aufgabe als erledigt markiert',
+        'nextDue': next_due,
+        'creditAwarded': task['credit_value']
+    })
+
+
+# ============ Issue Reports Routes ============
+
+@bp.route('/api/issues', methods=['GET'])
+def get_issues():
+    """Get all issue reports (public: only own, admin: all)."""
+    user = get_current_user()
+    status = request.args.get('status')
+
+    conn = get_db()
+    query = 'SELECT * FROM issue_reports WHERE 1=1'
+    params = []
+
+    # Non-admin users can only see their own reports
+    if not user or user.get('role') != 'admin':
+        if user:
+            query += ' AND reported_by = ?'
+            params.append(user['email'])
+        else:
+            conn.close()
+            return jsonify({'issues': [], 'total': 0})
+
+    if status:
+        query += ' AND status = ?'
+        params.append(status)
+
+    query += ' ORDER BY created_at DESC'
+
+    issues = conn.execute(query, params).fetchall()
+    conn.close()
+
+    return jsonify({
+        'issues': [dict(i) for i in issues],
+        'total': len(issues)
+    })
+
+
+def notify_infiniloop_feedback_submitted(app_task_id, reporter_email, reporter_name, title, description, category=None, priority=None):
+    """Call InfiniLoop synchron nach Feedback-Submit. Gibt Flow-Hint zurueck oder None bei Fehler."""
+    if not INFINILOOP_API_KEY or not INFINILOOP_URL:
+        return None
+    try:
+        import requests as _req
+        payload = {
+            'project_key': 'voigt-garten',
+            'app_task_id': str(app_task_id),
+            'reporter_email': reporter_email or '',
+            'reporter_name': reporter_name or '',
+            'title': title or '',
+            'description': description or '',
+        }
+        if category:
+            payload['category'] = category
+        if priority:
+            payload['priority'] = priority
+        resp = _req.post(
+            f'{INFINILOOP_URL}/api/external/feedback_submitted',
+            headers={'X-API-Key': INFINILOOP_API_KEY, 'Content-Type': 'application/json'},
+            json=payload,
+            timeout=10,
+        )
+        if resp.status_code != 200:
+            current_app.logger.warning('InfiniLoop feedback_submitted: HTTP %s', resp.status_code)
+            return None
+        return resp.json()
+    except Exception as e:
+        current_app.logger.warning('InfiniLoop feedback_submitted fehlgeschlagen: %s', e)
+        return None
+
+
+@bp.route('/api/issues', methods=['POST'])
+@require_auth
+def create_issue(user):
+    """Report a new issue, bug, feature request, or feedback."""
+    photo_path = None
+    staged_photo = None
+    title = None
+    description = None
+    category = None
+    report_type = 'mangel'
+
+    # Handle multipart form data for photo upload
+    if request.content_type and 'multipart/form-data' in request.content_type:
+        title = request.form.get('title')
+        description = request.form.get('description')
+        category = request.form.get('category')
+        report_type = request.form.get('report_type', 'mangel')
+
+        if 'photo' in request.files:
+            photo = request.files['photo']
+            if photo and allowed_file(photo.filename):
+                ext = photo.filename.rsplit('.', 1)[1].lower()
+                staged_photo = storage.stage(photo.stream, ext)
+    else:
+        data = request.json or {}
+        title = data.get('title')
+        description = data.get('description')
+        category = data.get('category')
+        report_type = data.get('report_type', 'mangel')
+
+    if not title:
+        if staged_photo:
+            storage.discard(staged_photo)
+        return jsonify({'error': 'Titel erforderlich'}), 400
+
+    # Validate report_type
+    if report_type not in ('mangel', 'bug', 'feature', 'feedback'):
+        report_type = 'mangel'
+
+    conn = get_db()
+    if staged_photo:
+        photo_path = storage.commit_blob(conn, staged_photo)
+    conn.execute('''
+        INSERT INTO issue_reports (title, description, category, photo_filename, reported_by, report_type)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (title, description, category, photo_path, user['email'], report_type))
+    issue_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    conn.commit()
+    conn.close()
+
+    type_labels = {'mangel': 'Mangel', 'bug': 'Bug', 'feature': 'Feature-Wunsch', 'feedback': 'Feedback'}
+    # Send notification to admin
+    send_activity_notification('issue_report', {
+        'Typ': type_labels.get(report_type, report_type),
+        'Titel': title,
+        'Kategorie': category or 'Nicht angegeben',
+        'Beschreibung': description or '-',
+        'Gemeldet von': user.get('name') or user['email'],
+        'Foto': 'Ja' if photo_path else 'Nein'
+    })
+
+    infiniloop_hint = notify_infiniloop_feedback_submitted(
+        app_task_id=issue_id,
+        reporter_email=user.get('email') or '',
+        reporter_name=user.get('name') or '',
+        title=title,
+        description=description or '',
+        category=category,
+    )
+
+    response = {
+        'success': True,
+        'issueId': issue_id,
+        'message': 'Meldung eingereicht. Ein Admin wird sich das ansehen.'
+    }
+    if infiniloop_hint:
+        response['infiniloop'] = infiniloop_hint
+    return jsonify(response)
+
+
+@bp.route('/api/admin/issues', methods=['GET'])
+@require_admin
+def admin_get_issues(user):
+    """Admin: Get all issue reports."""
+    status = request.args.get('status')
+
+    conn = get_db()
+    query = 'SELECT * FROM issue_reports'
+    params = []
+
+    if status:
+        query += ' WHERE status = ?'
+        params.append(status)
+
+    query += ' ORDER BY created_at DESC'
+
+    issues = conn.execute(query, params).fetchall()
+    conn.close()
+
+    return jsonify({
+        'issues': [dict(i) for i in issues],
+        'total': len(issues)
+    })
+
+
+@bp.route('/api/admin/issues/<int:issue_id>/approve', methods=['POST'])
+@require_admin
+def approve_issue(issue_id, user):
+    """Admin: Approve issue and convert to project."""
+    data = request.json or {}
+
+    conn = get_db()
+    issue = conn.execute('SELECT * FROM issue_reports WHERE id = ?', (issue_id,)).fetchone()
+
+    if not issue:
+        conn.close()
+        return jsonify({'error': 'Meldung nicht gefunden'}), 404
+
+    if issue['status'] != 'pending':
+        conn.close()
+        return jsonify({'error': 'Meldung wurde bereits bearbeitet'}), 400
+
+    # Create project from issue
+    conn.execute('''
+        INSERT INTO projects (title, description, category, status, priority, created_by)
+        VALUES (?, ?, ?, 'offen', ?, ?)
+    ''', (
+        data.get('title') or issue['title'],
+        data.get('description') or issue['description'],
+        data.get('category') or issue['category'] or 'sonstiges',
+        data.get('priority', 'mittel'),
+        issue['reported_by']
+    ))
+    project_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+
+    # Update issue status
+    conn.execute('''
+        UPDATE issue_reports SET
+            status = 'approved',
+            admin_notes = ?,
+            converted_to_project_id = ?
+        WHERE id = ?
+    ''', (data.get('notes'), project_id, issue_id))
+
+    conn.commit()
+    conn.close()
+
+    return jsonify({
+        'success': True,
+        'projectId': project_id,
+        'message': 'Meldung genehmigt und Projekt erstellt'
+    })
+
+
+@bp.route('/api/admin/issues/<int:issue_id>/reject', methods=['POST'])
+@require_admin
+def reject_issue(issue_id, user):
+    """Admin: Reject issue report."""
+    data = request.json or {}
+
+    conn = get_db()
+    issue = conn.execute('SELECT * FROM issue_reports WHERE id = ?', (issue_id,)).fetchone()
+
+    if not issue:
+        conn.close()
+        return jsonify({'error': 'Meldung nicht gefunden'}), 404
+
+    if issue['status'] != 'pending':
+        conn.close()
+        return jsonify({'error': 'Meldung wurde bereits bearbeitet'}), 400
+
+    conn.execute('''
+        UPDATE issue_reports SET
+            status = 'rejected',
+            admin_notes = ?
+        WHERE id = ?
+    ''', (data.get('notes', 'Abgelehnt'), issue_id))
+
+    conn.commit()
+    conn.close()
+
+    return jsonify({
+        'success': True,
+        'message': 'Meldung abgelehnt'
+    })
+
+
+# ============ Categories API ============
+
+@bp.route('/api/categories', methods=['GET'])
+def get_categories():
+    """Get all categories."""
+    conn = get_db()
+    cats = conn.execute('SELECT * FROM categories ORDER BY sort_order').fetchall()
+    conn.close()
+    return jsonify({'categories': [dict(c) for c in cats]})
+
+
+# ============ Unified Tasks API ============
+
+@bp.route('/api/tasks/unified', methods=['GET'])
+def get_unified_tasks():
+    """Get combined view of recurring tasks and projects."""
+    task_type = request.args.get('type', 'all')  # 'recurring', 'project', 'all'
+    category = request.args.get('category')
+    status = request.args.get('status')
+    effort = request.args.get('effort')
+    assignee = request.args.get('assignee')
+    search = request.args.get('search')
+    priority = request.args.get('priority')
+    assigned_to = request.args.get('assigned_to')
+    map_area = request.args.get('map_area')
+    sort_by = request.args.get('sort', 'created_at')
+    order = request.args.get('order', 'desc')
+
+    conn = get_db()
+    tasks = []
+    today = datetime.now().date()
+
+    # Pre-fetch comment counts
+    comment_counts = {}
+    for row in conn.execute('SELECT task_type, task_id, COUNT(*) as cnt FROM task_comments GROUP BY task_type, task_id').fetchall():
+        comment_counts[(row['task_type'], row['task_id'])] = row['cnt']
+
+    # Pre-fetch children counts
+    children_counts = {}
+    for row in conn.execute('SELECT parent_task_id, COUNT(*) as cnt FROM projects WHERE parent_task_id IS NOT NULL GROUP BY parent_task_id').fetchall():
+        children_counts[row['parent_task_id']] = row['cnt']
+
+    # Pre-fetch category mappings from junction tables
+    project_cats = {}
+    for row in conn.execute('''
+        SELECT pc.project_id, c.name FROM project_categories pc
+        JOIN categories c ON pc.category_id = c.id
+    ''').fetchall():
+        project_cats.setdefault(row['project_id'], []).append(row['name'])
+
+    recurring_cats = {}
+    for row in conn.execute('''
+        SELECT rtc.recurring_task_id, c.name FROM recurring_task_categories rtc
+        JOIN categories c ON rtc.category_id = c.id
+    ''').fetchall():
+        recurring_cats.setdefault(row['recurring_task_id'], []).append(row['name'])
+
+    # Get recurring tasks
+    if task_type in ['recurring', 'all']:
+        query = 'SELECT * FROM recurring_tasks WHERE is_active = 1'
+        params = []
+
+        if category:
+            query += ''' AND id IN (
+                SELECT rtc.recurring_task_id FROM recurring_task_categories rtc
+                JOIN categories c ON rtc.category_id = c.id WHERE c.name = ?
+            )'''
+            params.append(category)
+        if effort:
+            query += ' AND effort = ?'
+            params.append(effort)
+        if map_area:
+            query += ' AND map_area = ?'
+            params.append(map_area)
+        if search:
+            if search.startswith('#') and search[1:].isdigit():
+                pass  # recurring tasks don't have meaningful IDs to search
+            else:
+                refs, refs_params = match_refs(search, 'recurring')
+                query += f' AND id IN ({refs})'
+                params.extend(refs_params)
+
+        recurring = conn.execute(query, params).fetchall()
+
+        for task in recurring:
+            t = dict(task)
+            t['task_type'] = 'recurring'
+            t['categories'] = recurring_cats.get(t['id'], [t['category']] if t.get('category') else [])
+
+            # Calculate status
+            if t['next_due']:
+                due_date = datetime.strptime(t['next_due'], '%Y-%m-%d').date()
+                days_until = (due_date - today).days
+                if days_until < 0:
+                    t['due_status'] = 'overdue'
+                elif days_until <= 7:
+                    t['due_status'] = 'due-soon'
+                else:
+                    t['due_status'] = 'ok'
+            else:
+                t['due_status'] = 'ok'
+
+            # Filter by status if specified
+            if status and t['due_status'] != status:
+                continue
+
+            # Computed fields
+            t['comment_count'] = comment_counts.get(('recurring', t['id']), 0)
+            t['children_count'] = 0
+            t['has_blockers'] = False
+
+            tasks.append(t)
+
+    # Get projects
+    if task_type in ['project', 'all']:
+        query = 'SELECT * FROM projects WHERE 1=1'
+        params = []
+
+        if category:
+            query += ''' AND id IN (
+                SELECT pc.project_id FROM project_categories pc
+                JOIN categories c ON pc.category_id = c.id WHERE c.name = ?
+            )'''
+            params.append(category)
+        if effort:
+            query += ' AND effort = ?'
+            params.append(effort)
+        if map_area:
+            query += ' AND map_area = ?'
+            params.append(map_area)
+        if assignee:
+            query += ' AND assigned_to = ?'
+            params.append(assignee)
+        if priority:
+            query += ' AND priority = ?'
+            params.append(priority)
+        if assigned_to:
+            query += ' AND assigned_to_list LIKE ?'
+            params.append(f'%{assigned_to}%')
+        if search:
+            if search.startswith('#') and search[1:].isdigit():
+                query += ' AND id = ?'
+                params.append(int(search[1:]))
+            else:
+                refs, refs_params = match_refs(search, 'project')
+                query += f' AND id IN ({refs})'
+                params.extend(refs_params)
+
+        projects = conn.execute(query, params).fetchall()
+
+        for project in projects:
+            p = dict(project)
+            p['task_type'] = 'project'
+            p['categories'] = project_cats.get(p['id'], [p['category']] if p.get('category') else [])
+
+            # Compute due_status from due_date
+            if p.get('due_date'):
+                try:
+                    due_dt = datetime.strptime(p['due_date'], '%Y-%m-%d').date()
+                    days_until = (due_dt - today).days
+                    if days_until < 0:
+                        p['due_status'] = 'overdue'
+                    elif days_until <= 7:
+                        p['due_status'] = 'due-soon'
+                    else:
+                        p['due_status'] = 'ok'
+                except (ValueError, TypeError):
+                    p['due_status'] = 'ok'
+            else:
+                p['due_status'] = 'ok'
+
+            # Parse JSON fields stored as text
+            parse_json_fields(p)
+            if not p.get('assigned_to_list'):
+                p['assigned_to_list'] = []
+            if not p.get('dependencies'):
+                p['dependencies'] = []
+
+            # Computed fields
+            p['comment_count'] = comment_counts.get(('project', p['id']), 0)
+            p['children_count'] = children_counts.get(p['id'], 0)
+
+            # has_blockers: check if any dependency is not done
+            has_blockers = False
+            dep_ids = p.get('dependencies', [])
+            if dep_ids and isinstance(dep_ids, list) and len(dep_ids) > 0:
+                try:
+                    placeholders = ','.join('?' for _ in dep_ids)
+                    blocker = conn.execute(
+                        f"SELECT COUNT(*) as cnt FROM projects WHERE id IN ({placeholders}) AND status != 'done'",
+                        dep_ids
+                    ).fetchone()
+                    has_blockers = blocker['cnt'] > 0
+                except (TypeError, Exception):
+                    pass
+            p['has_blockers'] = has_blockers
+
+            tasks.append(p)
+
+    # Get categories from DB for filter options
+    all_categories = conn.execute('SELECT name FROM categories ORDER BY sort_order').fetchall()
+    cat_names = [r['name'] for r in all_categories]
+    conn.close()
+
+    # Sorting
+    valid_sorts = {'start_date', 'created_at', 'priority', 'due_date', 'title'}
+    if sort_by in valid_sorts:
+        priority_order = {'hoch': 0, 'mittel': 1, 'niedrig': 2}
+        reverse = (order == 'desc')
+
+        def sort_key(t):
+            val = t.get(sort_by)
+            if sort_by == 'priority':
+                return priority_order.get(val, 99)
+            if val is None:
+                return '' if not reverse else '\xff'
+            return val
+
+        tasks.sort(key=sort_key, reverse=reverse)
+
+    efforts = list(set(t.get('effort') for t in tasks if t.get('effort')))
+    assignees_list = list(set(t.get('assigned_to') for t in tasks if t.get('assigned_to')))
+
+    return jsonify({
+        'tasks': tasks,
+        'total': len(tasks),
+        'filters': {
+            'categories': cat_names,
+            'efforts': ['leicht', 'mittel', 'schwer'],
+            'assignees': sorted(assignees_list)
+        }
+    })
+
+
+# ============ Service Providers CRUD ============
+
+@bp.route('/api/service-providers', methods=['GET'])
+def get_service_providers():
+    """Get all service providers, optionally filtered by category."""
+    category = request.args.get('category')
+    conn = get_db()
+
+    if category:
+        providers = conn.execute('SELECT * FROM service_providers WHERE category = ?', (category,)).fetchall()
+    else:
+        providers = conn.execute('SELECT * FROM service_providers').fetchall()
+
+    conn.close()
+    return jsonify({'providers': [dict(p) for p in providers]})
+
+
+@bp.route('/api/service-providers', methods=['POST'])
+@require_admin
+def create_service_provider(user):
+    """Admin: Create a service provider."""
+    data = request.json
+    if not data or not data.get('name') or not data.get('category'):
+        return jsonify({'error': 'Name und Kategorie sind erforderlich'}), 400
+
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO service_providers (category, name, email, phone, rating, notes, verified)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        data['category'],
+        data['name'],
+        data.get('email'),
+        data.get('phone'),
+        data.get('rating', 0),
+        data.get('notes'),
+        data.get('verified', False)
+    ))
+    provider_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    conn.commit()
+    conn.close()
+
+    return jsonify({'success': True, 'id': provider_id, 'message': 'Dienstleister erstellt'})
+
+
+@bp.route('/api/service-providers/<int:id>', methods=['PATCH'])
+@require_admin
+def update_service_provider(id, user):
+    """Admin: Update a service provider."""
+    data = request.json
+    conn = get_db()
+    provider = conn.execute('SELECT * FROM service_providers WHERE id = ?', (id,)).fetchone()
+
+    if not provider:
+        conn.close()
+        return jsonify({'error': 'Dienstleister nicht gefunden'}), 404
+
+    updates = []
+    params = []
+    for field in ['category', 'name', 'email', 'phone', 'rating', 'notes', 'verified']:
+        if field in data:
+            updates.append(f'{field} = ?')
+            params.append(data[field])
+
+    if updates:
+        params.append(id)
+        conn.execute(f'UPDATE service_providers SET {", ".join(updates)} WHERE id = ?', params)
+        conn.commit()
+
+    conn.close()
+    return jsonify({'success': True, 'message': 'Dienstleister aktualisiert'})
+
+
+@bp.route('/api/service-providers/<int:id>', methods=['DELETE'])
+@require_admin
+def delete_service_provider(id, user):
+    """Admin: Delete a service provider."""
+    conn = get_db()
+    provider = conn.execute('SELECT * FROM service_providers WHERE id = ?', (id,)).fetchone()
+
+    if not provider:
+        conn.close()
+        return jsonify({'error': 'Dienstleister nicht gefunden'}), 404
+
+    conn.execute('DELETE FROM service_providers WHERE id = ?', (id,))
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True, 'message': 'Dienstleister gelöscht'})
+
+
+# ============ Assignees ============
+
+@bp.route('/api/assignees', methods=['GET'])
+def get_assignees():
+    """Get combined list of users and service providers as assignees."""
+    conn = get_db()
+    users = conn.execute('SELECT id, name, email, role FROM users').fetchall()
+    providers = conn.execute('SELECT id, name, email, category FROM service_providers').fetchall()
+    conn.close()
+
+    assignees = []
+    for u in users:
+        assignees.append({
+            'id': u['id'],
+            'name': u['name'] or u['email'],
+            'email': u['email'],
+            'type': 'user'
+        })
+    for p in providers:
+        assignees.append({
+            'id': p['id'],
+            'name': p['name'],
+            'email': p['email'],
+            'type': 'provider',
+            'category': p['category']
+        })
+
+    return jsonify({'assignees': assignees})
+
+
+# ============ Subtasks ============
+
+@bp.route('/api/projects/<int:id>/subtasks', methods=['GET'])
+def get_subtasks(id):
+    """Get subtasks (children) of a project."""
+    recursive = request.args.get('recursive', 'false').lower() == 'true'
+    conn = get_db()
+
+    if recursive:
+        # Gather all descendants via BFS
+        all_subtasks = []
+        queue = deque([id])
+        while queue:
+            parent_id = queue.popleft()
+            children = conn.execute(
+                'SELECT * FROM projects WHERE parent_task_id = ?', (parent_id,)
+            ).fetchall()
+            for child in children:
+                c = dict(child)
+                all_subtasks.append(c)
+                queue.append(c['id'])
+        conn.close()
+        return jsonify({'subtasks': all_subtasks, 'total': len(all_subtasks)})
+    else:
+        subtasks = conn.execute(
+            'SELECT * FROM projects WHERE parent_task_id = ?', (id,)
+        ).fetchall()
+        conn.close()
+        return jsonify({'subtasks': [dict(s) for s in subtasks], 'total': len(subtasks)})
+
+
+@bp.route('/api/projects/<int:id>/subtasks', methods=['POST'])
+@require_auth
+def create_subtask(id, user):
+    """Create a child project (subtask) under the given parent."""
+    data = request.json
+    if not data or not data.get('title') or not data.get('category'):
+        return jsonify({'error': 'Titel und Kategorie sind erforderlich'}), 400
+
+    conn = get_db()
+    # Verify parent exists
+    parent = conn.execute('SELECT id FROM projects WHERE id = ?', (id,)).fetchone()
+    if not parent:
+        conn.close()
+        return jsonify({'error': 'Elternprojekt nicht gefunden'}), 404
+
+    conn.execute('''
+        INSERT INTO projects (title, description, category, status, priority,
+                              estimated_cost, effort, timeframe, parent_task_id, created_by)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        data['title'],
+        data.get('description'),
+        data['category'],
+        data.get('status', 'offen'),
+        data.get('priority', 'mittel'),
+        data.get('estimatedCost') or data.get('estimated_cost'),
+        data.get('effort'),
+        data.get('timeframe'),
+        id,
+        user['email']
+    ))
+    subtask_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    conn.commit()
+    conn.close()
+
+    return jsonify({
+        'success': True,
+        'id': subtask_id,
+        'message': 'Unteraufgabe erstellt'
+    })
+
+
+# ============ Dependencies / Blockers ============
+
+@bp.route('/api/projects/<int:id>/blockers', methods=['GET'])
+def get_blockers(id):
+    """Get non-completed dependencies (blockers) for a project."""
+    conn = get_db()
+    project = conn.execute('SELECT dependencies FROM projects WHERE id = ?', (id,)).fetchone()
+
+    if not project:
+        conn.close()
+        return jsonify({'error': 'Projekt nicht gefunden'}), 404
+
+    proj_dict = parse_json_fields(dict(project))
+    dep_ids = proj_dict.get('dependencies') or []
+
+    blockers = []
+    for dep_id in dep_ids:
+        dep = conn.execute('SELECT * FROM projects WHERE id = ? AND status != ?', (dep_id, 'done')).fetchone()
+        if dep:
+            blockers.append(dict(dep))
+
+    conn.close()
+    return jsonify({'blockers': blockers, 'total': len(blockers)})
+
+
+# ============ Task Comments ============
+
+@bp.route('/api/tasks/<task_type>/<int:task_id>/comments', methods=['GET'])
+def get_task_comments(task_type, task_id):
+    """Get comments for a task."""
+    if task_type not in ('project', 'recurring'):
+        return jsonify({'error': 'Ungültiger task_type (project oder recurring)'}), 400
+
+    conn = get_db()
+    comments = conn.execute(
+        'SELECT * FROM task_comments WHERE task_id = ? AND task_type = ? ORDER BY created_at ASC',
+        (task_id, task_type)
+    ).fetchall()
+    conn.close()
+
+    return jsonify({'comments': [dict(c) for c in comments], 'total': len(comments)})
+
+
+@bp.route('/api/tasks/<task_type>/<int:task_id>/comments', methods=['POST'])
+@require_auth
+def create_task_comment(task_type, task_id, user):
+    """Create a comment on a task."""
+    if task_type not in ('project', 'recurring'):
+        return jsonify({'error': 'Ungültiger task_type (project oder recurring)'}), 400
+
+    data = request.json
+    if not data or not data.get('comment'):
+        return jsonify({'error': 'Kommentar ist erforderlich'}), 400
+
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO task_comments (task_id, task_type, user_email, user_name, comment)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (task_id, task_type, user['email'], user.get('name'), data['comment']))
+    comment_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    conn.commit()
+    conn.close()
+
+    return jsonify({'success': True, 'id': comment_id, 'message': 'Kommentar erstellt'})
+
+
+@bp.route('/api/comments/<int:comment_id>', methods=['DELETE'])
+@require_auth
+def delete_comment(comment_id, user):
+    """Delete a comment (admin or author only)."""
+    conn = get_db()
+    comment = conn.execute('SELECT * FROM task_comments WHERE id = ?', (comment_id,)).fetchone()
+
+    if not comment:
+        conn.close()
+        return jsonify({'error': 'Kommentar nicht gefunden'}), 404
+
+    if comment['user_email'] != user['email'] and user.get('role') != 'admin':
+        conn.close()
+        return jsonify({'error': 'Keine Berechtigung'}), 403
+
+    conn.execute('DELETE FROM task_comments WHERE id = ?', (comment_id,))
+    conn.commit()
+    conn.close()
+
+    return jsonify({'success': True, 'message': 'Kommentar gelöscht'})
+
+
+@bp.route('/api/milestones', methods=['GET'])
+def get_milestones():
+    """Get all milestones with aggregated task progress."""
+    include_idea = request.args.get('include') == 'idea'
+    conn = get_db()
+    if include_idea:
+        query = "SELECT * FROM milestones ORDER BY sort_order, id"
+    else:
+        query = "SELECT * FROM milestones WHERE status != 'idea' ORDER BY sort_order, id"
+    rows = conn.execute(query).fetchall()
+    result = []
+    for row in rows:
+        m = dict(row)
+        counts = conn.execute('''
+            SELECT
+                COUNT(*) as total,
+                SUM(CASE WHEN status = 'done' THEN 1 ELSE 0 END) as done
+            FROM projects WHERE milestone_id = ?
+        ''', (m['id'],)).fetchone()
+        m['total_count'] = counts['total'] or 0
+        m['done_count'] = counts['done'] or 0
+        result.append(m)
+    conn.close()
+    return jsonify({'milestones': result})
+
+
+@bp.route('/api/admin/milestones', methods=['POST'])
+@require_admin
+def create_milestone(user):
+    """Admin: Create new milestone."""
+    data = request.json or {}
+    if not data.get('name'):
+        return jsonify({'error': 'Name erforderlich'}), 400
+    conn = get_db()
+    conn.execute('''
+        INSERT INTO milestones (name, description, target_date, status, image_path, sort_order)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (
+        data['name'],
+        data.get('description'),
+        data.get('target_date'),
+        data.get('status', 'active'),
+        data.get('image_path'),
+        data.get('sort_order', 0)
+    ))
+    new_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True, 'id': new_id})
+
+
+@bp.route('/api/admin/milestones/<int:milestone_id>', methods=['PATCH'])
+@require_admin
+def update_milestone(milestone_id, user):
+    """Admin: Update milestone."""
+    data = request.json or {}
+    conn = get_db()
+    allowed = ['name', 'description', 'target_date', 'status', 'image_path', 'sort_order']
+    updates = []
+    params = []
+    for f in allowed:
+        if f in data:
+            updates.append(f'{f} = ?')
+            params.append(data[f])
+    if not updates:
+        conn.close()
+        return jsonify({'error': 'Keine Änderungen'}), 400
+    params.append(milestone_id)
+    conn.execute(f"UPDATE milestones SET {', '.join(updates)} WHERE id = ?", params)
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True})
+
+
+@bp.route('/api/admin/milestones/<int:milestone_id>', methods=['DELETE'])
+@require_admin
+def delete_milestone(milestone_id, user):
+    """Admin: Delete milestone (unlinks projects)."""
+    conn = get_db()
+    conn.execute('UPDATE projects SET milestone_id = NULL WHERE milestone_id = ?', (milestone_id,))
+    conn.execute('DELETE FROM milestones WHERE id = ?', (milestone_id,))
+    conn.commit()
+    conn.close()
+    return jsonify({'success': True})
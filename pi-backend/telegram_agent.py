@@ -212,22 +212,17 @@ class GartenAgent:
         send_message(chat_id, msg)
 
     def cmd_inventory_overview(self, chat_id):
+        from inventory_tree import get_tree
         conn = self.get_db()
         try:
-            buildings = conn.execute('SELECT * FROM inventory_buildings ORDER BY sort_order').fetchall()
+            buildings = get_tree(conn)
             if not buildings:
                 send_message(chat_id, "📦 Inventar ist noch leer. Füge Gebäude über die Webseite hinzu.")
-                conn.close()
                 return
 
             msg = "<b>📦 Inventar - Gebäude</b>\n\n"
             for b in buildings:
-                item_count = conn.execute('''
-                    SELECT COUNT(*) as cnt FROM inventory_items i
-                    JOIN inventory_rooms r ON i.room_id = r.id
-                    WHERE r.building_id = ? AND i.vorhanden = 1
-                ''', (b['id'],)).fetchone()['cnt']
-                msg += f"{b['icon']} <b>{b['name']}</b> — {item_count} Items\n"
+                msg += f"{b['icon']} <b>{b['name']}</b> — {b['present_count']} Items\n"
 
             msg += "\nDetails: <code>inventar [Gebäude]</code>"
             send_message(chat_id, msg)
@@ -237,36 +232,30 @@ class GartenAgent:
             conn.close()
 
     def cmd_inventory_room(self, chat_id, building_name):
+        from inventory_tree import find_building, get_tree, iter_rooms
         conn = self.get_db()
         try:
-            building = conn.execute(
-                'SELECT * FROM inventory_buildings WHERE LOWER(name) = LOWER(?)', (building_name,)
-            ).fetchone()
+            building = find_building(get_tree(conn), building_name)
             if not building:
                 send_message(chat_id, f"❌ Gebäude '{building_name}' nicht gefunden.")
-                conn.close()
                 return
 
-            rooms = conn.execute('''
-                SELECT r.*, COUNT(i.id) as item_count
-                FROM inventory_rooms r
-                LEFT JOIN inventory_items i ON i.room_id = r.id AND i.vorhanden = 1
-                WHERE r.building_id = ?
-                GROUP BY r.id
-                ORDER BY r.sort_order
-            ''', (building['id'],)).fetchall()
+            # One query for the whole building instead of one per room
+            items_by_room = {}
+            for item in conn.execute('''
+                SELECT i.room_id, i.name, i.quantity, i.ablageort, i.category
+                FROM inventory_items i
+                JOIN inventory_rooms r ON i.room_id = r.id
+                WHERE r.building_id = ? AND i.vorhanden = 1
+                ORDER BY i.ablageort, i.name
+            ''', (building['id'],)):
+                items_by_room.setdefault(item['room_id'], []).append(item)
 
             msg = f"<b>{building['icon']} {building['name']}</b>\n\n"
-            for r in rooms:
-                msg += f"{r['icon']} <b>{r['name']}</b> — {r['item_count']} Items\n"
-
-                items = conn.execute('''
-                    SELECT name, quantity, ablageort, category
-                    FROM inventory_items WHERE room_id = ? AND vorhanden = 1
-                    ORDER BY ablageort, name LIMIT 20
-                ''', (r['id'],)).fetchall()
+            for r in iter_rooms(building):
+                msg += f"{r['icon']} <b>{r['name']}</b> — {r['present_count']} Items\n"
 
-                for item in items:
+                for item in items_by_room.get(r['id'], [])[:20]:
                     loc = f" [{item['ablageort']}]" if item['ablageort'] else ""
                     qty = f" x{item['quantity']}" if item['quantity'] > 1 else ""
                     msg += f"  • {item['name']}{qty}{loc}\n"
@@ -279,16 +268,19 @@ class GartenAgent:
             conn.close()
 
     def cmd_search_item(self, chat_id, query):
+        from search_index import ranked_refs
         conn = self.get_db()
         try:
-            items = conn.execute('''
+            refs, refs_params = ranked_refs(query, 'inventory')
+            items = conn.execute(f'''
                 SELECT i.*, r.name as room_name, b.name as building_name
-                FROM inventory_items i
+                FROM ({refs}) s
+                JOIN inventory_items i ON i.id = s.ref
                 JOIN inventory_rooms r ON i.room_id = r.id
                 JOIN inventory_buildings b ON r.building_id = b.id
-                WHERE i.name LIKE ? OR i.notes LIKE ? OR i.ablageort LIKE ?
+                ORDER BY s.rank
                 LIMIT 15
-            ''', (f'%{query}%', f'%{query}%', f'%{query}%')).fetchall()
+            ''', refs_params).fetchall()
 
             if not items:
                 send_message(chat_id, f"🔍 Keine Ergebnisse für '{query}'")
@@ -4,7 +4,6 @@ Moderation requests, messaging, and centralized admin notification hub.
 """
 
 import os
-import requests
 
 TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN', '')
 TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID', '')
@@ -13,6 +12,7 @@ TELEGRAM_API = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}"
 
 def send_moderation_request(image_id: str, thumbnail_path: str, uploader: str, name: str, category: str) -> bool:
     """Send photo with approve/reject inline buttons to Telegram chat."""
+    import requests
     if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
         print("Telegram not configured, skipping moderation request")
         return False
@@ -69,6 +69,7 @@ def send_moderation_request(image_id: str, thumbnail_path: str, uploader: str, n
 
 def answer_callback_query(callback_query_id: str, text: str) -> bool:
     """Answer a Telegram callback query (button press)."""
+    import requests
     if not TELEGRAM_BOT_TOKEN:
         return False
 
@@ -89,6 +90,7 @@ def answer_callback_query(callback_query_id: str, text: str) -> bool:
 
 def send_message(chat_id: str, text: str, reply_markup=None) -> bool:
     """Send a text message to a Telegram chat."""
+    import requests
     if not TELEGRAM_BOT_TOKEN:
         return False
     try:
@@ -104,6 +106,7 @@ def send_message(chat_id: str, text: str, reply_markup=None) -> bool:
 
 def register_webhook(webhook_url: str) -> bool:
     """Register webhook URL with Telegram Bot API."""
+    import requests
     if not TELEGRAM_BOT_TOKEN:
         print("TELEGRAM_BOT_TOKEN not set, skipping webhook registration")
         return False
@@ -140,6 +143,7 @@ EVENT_EMOJIS = {
     'invoice_sent': '📄',
     'invoice_paid': '💰',
     'payment_reminder': '⏰',
+    'maintenance_due': '🔧',
     'email_sent': '📧',
     'system_error': '🔴',
     'health_check_fail': '💔',
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Resumable uploads (tus 1.0 core subset) for large gallery files.
+
+A multipart POST to /api/gallery/upload is buffered by Werkzeug and starts
+over when a mobile connection drops. Instead, clients can
+
+    POST   /api/gallery/uploads            Upload-Length, Upload-Metadata → 201 Location
+    HEAD   /api/gallery/uploads/<id>       → Upload-Offset (resume point)
+    PATCH  /api/gallery/uploads/<id>       Upload-Offset + application/offset+octet-stream
+    POST   /api/gallery/uploads/<id>/finalize   → processing in the background
+    GET    /api/gallery/uploads/<id>       → status / result of processing
+
+Each PATCH is streamed straight into `blobs/tmp/upload-<id>` in CHUNK_SIZE
+pieces (bounded memory, fsync'd before the offset is acknowledged). The
+file size on disk is the offset, so bytes that arrived before a dropped
+connection count. A per-file flock rejects concurrent PATCHes (423).
+
+Finalize hashes the file into the blob store and runs the normal gallery
+processing (WebP/ffmpeg, thumbnail, dedup) in a thread; the result lands in
+`upload_sessions.result`. Admins may upload up to GALLERY_MAX_RESUMABLE_MB
+(drone footage), everyone else keeps the GALLERY_MAX_UPLOAD_MB limit.
+Sessions idle for UPLOAD_SESSION_HOURS are pruned nightly (agent_scheduler
+kind `upload_sessions`).
+
+The processing thread dies with its gunicorn worker. A session left in
+`processing` (no update for UPLOAD_PROCESSING_STALE_MINUTES, or any at
+container start before gunicorn runs) is recovered: back to `uploading`
+while the complete temp file is still there, so the client finalizes
+again, else `failed`.
+
+Usage:
+    python upload_sessions.py list
+    python upload_sessions.py prune
+    python upload_sessions.py recover       # start.sh: no worker is processing yet
+"""
+
+import base64
+import binascii
+import fcntl
+import json
+import os
+import sqlite3
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import DB_PATH, GALLERY_DIR, GALLERY_MAX_RESUMABLE_MB, GALLERY_MAX_UPLOAD_MB  # noqa: E402
+from storage import BLOB_DIR, CHUNK_SIZE  # noqa: E402
+
+TUS_VERSION = '1.0.0'
+SESSION_HOURS = int(os.environ.get('UPLOAD_SESSION_HOURS', 24))
+# Longer than a transcode without progress updates (VIDEO_TRANSCODE_BUDGET × 1.5, software retry)
+PROCESSING_STALE_MINUTES = int(os.environ.get('UPLOAD_PROCESSING_STALE_MINUTES', 60))
+RUN_HOUR = 4
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS upload_sessions (
+        id TEXT PRIMARY KEY,
+        user_id INTEGER,
+        filename TEXT NOT NULL,
+        length INTEGER NOT NULL,
+        received INTEGER NOT NULL DEFAULT 0,
+        metadata TEXT,                         -- JSON: category, name, description
+        status TEXT NOT NULL DEFAULT 'uploading',  -- uploading | processing | done | failed
+        result TEXT,                           -- JSON response of the gallery processing
+        created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+        updated_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+    );
+    CREATE INDEX IF NOT EXISTS idx_upload_sessions_updated ON upload_sessions(updated_at);
+'''
+
+
+class OffsetMismatch(Exception):
+    """PATCH Upload-Offset doesn't match the bytes on disk."""
+
+    def __init__(self, current: int):
+        super().__init__(f'offset is {current}')
+        self.current = current
+
+
+class UploadLocked(Exception):
+    """Another request is writing to the same upload."""
+
+
+def init_schema(conn, schema: str = SCHEMA) -> None:
+    conn.executescript(schema)
+
+
+def get_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, timeout=15)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def max_upload_bytes(user: dict) -> int:
+    mb = GALLERY_MAX_RESUMABLE_MB if user.get('role') == 'admin' else GALLERY_MAX_UPLOAD_MB
+    return mb * 1024 * 1024
+
+
+def parse_metadata(header: str | None) -> dict:
+    """tus Upload-Metadata: comma-separated `key base64value` pairs."""
+    metadata = {}
+    for pair in (header or '').split(','):
+        key, _, value = pair.strip().partition(' ')
+        if not key:
+            continue
+        try:
+            metadata[key] = base64.b64decode(value, validate=True).decode('utf-8') if value else ''
+        except (binascii.Error, UnicodeDecodeError):
+            raise ValueError(f'invalid metadata value for {key}')
+    return metadata
+
+
+def tmp_path(upload_id: str) -> str:
+    return os.path.join(GALLERY_DIR, BLOB_DIR, 'tmp', f'upload-{upload_id}')
+
+
+def create(conn, user: dict, filename: str, length: int, metadata: dict) -> str:
+    upload_id = uuid.uuid4().hex
+    path = tmp_path(upload_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    conn.execute(
+        'INSERT INTO upload_sessions (id, user_id, filename, length, metadata) VALUES (?, ?, ?, ?, ?)',
+        (upload_id, user.get('user_id'), filename, length, json.dumps(metadata)),
+    )
+    conn.commit()
+    return upload_id
+
+
+def get(conn, upload_id: str, user: dict):
+    """Session row if it exists and belongs to the user, else None."""
+    row = conn.execute('SELECT * FROM upload_sessions WHERE id = ?', (upload_id,)).fetchone()
+    if not row or row['user_id'] != user.get('user_id'):
+        return None
+    if row['status'] == 'processing' and any(recover(conn, upload_id=upload_id).values()):
+        row = conn.execute('SELECT * FROM upload_sessions WHERE id = ?', (upload_id,)).fetchone()
+    return row
+
+
+def expires_at(row) -> str:
+    updated = datetime.strptime(row['updated_at'], TS_FORMAT)
+    return (updated + timedelta(hours=SESSION_HOURS)).strftime(TS_FORMAT)
+
+
+def append(conn, row, offset: int, stream, content_length: int) -> tuple[int, bool]:
+    """Stream one PATCH body to disk at `offset`.
+
+    Returns (new offset, complete). A dropped connection keeps what was
+    written; the client resumes from the offset a HEAD reports.
+    """
+    path = tmp_path(row['id'])
+    written = 0
+    with open(path, 'ab') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadLocked()
+        current = os.fstat(f.fileno()).st_size
+        if current != offset:
+            raise OffsetMismatch(current)
+        remaining = min(content_length, row['length'] - current)
+        try:
+            while remaining > 0:
+                chunk = stream.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                written += len(chunk)
+                remaining -= len(chunk)
+        except Exception as e:
+            # Client went away mid-chunk (werkzeug ClientDisconnected etc.)
+            print(f"[upload] {row['id']}: interrupted after {written} bytes: {e}")
+        finally:
+            f.flush()
+            os.fsync(f.fileno())
+            new_offset = current + written
+            conn.execute(
+                "UPDATE upload_sessions SET received = ?, updated_at = datetime('now', 'localtime') WHERE id = ?",
+                (new_offset, row['id']),
+            )
+            conn.commit()
+    return new_offset, new_offset >= row['length']
+
+
+def current_offset(row) -> int:
+    """Bytes on disk — also counts a chunk whose offset update was lost to a crash."""
+    try:
+        return os.path.getsize(tmp_path(row['id']))
+    except FileNotFoundError:
+        return 0
+
+
+def start_processing(conn, row) -> bool:
+    """Claim a complete upload for processing (once, even with concurrent finalize calls)."""
+    size = current_offset(row)
+    if size != row['length']:
+        return False
+    cur = conn.execute(
+        "UPDATE upload_sessions SET status = 'processing', received = ?, updated_at = datetime('now', 'localtime') "
+        "WHERE id = ? AND status = 'uploading'",
+        (size, row['id']),
+    )
+    conn.commit()
+    return cur.rowcount == 1
+
+
+def set_progress(conn, upload_id: str, fraction: float) -> None:
+    """Video transcode progress while processing; replaced by the result in finish()."""
+    conn.execute(
+        "UPDATE upload_sessions SET result = ?, updated_at = datetime('now', 'localtime') "
+        "WHERE id = ? AND status = 'processing'",
+        (json.dumps({'progress': round(fraction, 3)}), upload_id),
+    )
+    conn.commit()
+
+
+def finish(conn, upload_id: str, result: dict, ok: bool) -> None:
+    conn.execute(
+        "UPDATE upload_sessions SET status = ?, result = ?, updated_at = datetime('now', 'localtime') WHERE id = ?",
+        ('done' if ok else 'failed', json.dumps(result), upload_id),
+    )
+    conn.commit()
+
+
+def delete(conn, upload_id: str) -> None:
+    conn.execute('DELETE FROM upload_sessions WHERE id = ?', (upload_id,))
+    conn.commit()
+    try:
+        os.remove(tmp_path(upload_id))
+    except FileNotFoundError:
+        pass
+
+
+def recover(conn, stale_minutes: int = PROCESSING_STALE_MINUTES, now: datetime | None = None,
+            upload_id: str | None = None) -> dict:
+    """Reset sessions stuck in 'processing' whose worker is gone.
+
+    The temp file is only moved into the blob store at the end of processing,
+    so while it is complete the upload can simply be finalized again.
+    """
+    cutoff = ((now or datetime.now()) - timedelta(minutes=stale_minutes)).strftime(TS_FORMAT)
+    query = "SELECT * FROM upload_sessions WHERE status = 'processing' AND updated_at <= ?"
+    params = [cutoff]
+    if upload_id:
+        query += ' AND id = ?'
+        params.append(upload_id)
+    counts = {'resumed': 0, 'failed': 0}
+    for row in conn.execute(query, params).fetchall():
+        if current_offset(row) == row['length']:
+            conn.execute(
+                "UPDATE upload_sessions SET status = 'uploading', result = NULL, "
+                "updated_at = datetime('now', 'localtime') WHERE id = ? AND status = 'processing'",
+                (row['id'],),
+            )
+            counts['resumed'] += 1
+        else:
+            finish(conn, row['id'], {'error': 'Verarbeitung abgebrochen'}, False)
+            counts['failed'] += 1
+    conn.commit()
+    return counts
+
+
+def prune(conn, now: datetime | None = None) -> int:
+    """Drop sessions idle past SESSION_HOURS (incomplete uploads lose their temp file)."""
+    recover(conn, now=now)
+    cutoff = ((now or datetime.now()) - timedelta(hours=SESSION_HOURS)).strftime(TS_FORMAT)
+    ids = [r[0] for r in conn.execute(
+        'SELECT id FROM upload_sessions WHERE updated_at < ?', (cutoff,)
+    )]
+    for upload_id in ids:
+        delete(conn, upload_id)
+    return len(ids)
+
+
+def handle_prune(conn: sqlite3.Connection, item, now: datetime) -> dict:
+    """agent_scheduler handler: nightly cleanup of abandoned uploads."""
+    from agent_scheduler import schedule, tomorrow_at
+    removed = prune(conn, now)
+    schedule(conn, 'upload_sessions', 0, tomorrow_at(now, RUN_HOUR))
+    return {'action': 'upload_sessions_pruned', 'removed': removed}
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Resumable upload sessions')
+    parser.add_argument('command', choices=['list', 'prune', 'recover'])
+    args = parser.parse_args(argv)
+    conn = get_db()
+    try:
+        if args.command == 'prune':
+            print(json.dumps({'removed': prune(conn)}))
+        elif args.command == 'recover':
+            print(json.dumps(recover(conn, stale_minutes=0)))
+        else:
+            for row in conn.execute('SELECT id, user_id, filename, length, received, status, updated_at '
+                                    'FROM upload_sessions ORDER BY updated_at DESC'):
+                print(json.dumps(dict(row)))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Transcode planner for gallery videos (used by media.optimize_video).
+
+A blanket `libx264 -preset medium` re-encode of a 4K phone clip takes far
+longer than 300 s on the Raspberry Pi, times out and leaves the original
+as the display file. Instead the input is probed with ffprobe first:
+
+  remux   H.264 (yuv420p, ≤ 1080p, ≤ VIDEO_REMUX_MAX_MBIT) + AAC/MP3 in an
+          MP4/MOV container is already web-compatible → stream copy with
+          `+faststart` only (seconds, no quality loss)
+  encode  otherwise; with a V4L2 M2M hardware encoder (h264_v4l2m2m, Pi 4)
+          at a fixed bitrate, else libx264 with the slowest preset and
+          the largest height (1080/720/480, short side) whose estimated
+          run time fits VIDEO_TRANSCODE_BUDGET seconds. Frame rates > 30
+          are reduced to 30.
+
+The estimate is duration × pixel rate relative to 720p30, divided by the
+preset's realtime factor on a Pi 4 (PRESET_SPEED) × VIDEO_CPU_SPEED
+(set > 1 on faster hosts). ffmpeg runs with `-progress pipe:1`; its
+out_time drives an optional progress callback, and the output is written
+to `<output>.part` and renamed, so a killed run leaves no half file.
+
+Usage:
+    python video_transcode.py plan <file>
+    python video_transcode.py run <input> <output.mp4>
+    python video_transcode.py encoders
+"""
+
+import collections
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from functools import lru_cache
+
+BUDGET_SECONDS = float(os.environ.get('VIDEO_TRANSCODE_BUDGET', 600))
+CPU_SPEED = float(os.environ.get('VIDEO_CPU_SPEED', 1.0))
+HW_ENCODER = os.environ.get('VIDEO_HW_ENCODER', 'auto')  # auto | off | encoder name
+REMUX_MAX_MBIT = float(os.environ.get('VIDEO_REMUX_MAX_MBIT', 8))
+
+MAX_FPS = 30
+HEIGHTS = [1080, 720, 480]
+# Long clips are capped at 720p regardless of budget (file size on the Pi's SD card)
+LONG_CLIP_SECONDS = 300
+# libx264 realtime factor at 720p30 on a Raspberry Pi 4, slowest first
+PRESET_SPEED = [
+    ('medium', 0.25),
+    ('fast', 0.35),
+    ('faster', 0.5),
+    ('veryfast', 0.8),
+    ('superfast', 1.2),
+    ('ultrafast', 2.0),
+]
+HW_BITRATE = {1080: '5M', 720: '2500k', 480: '1200k'}
+WEB_CONTAINERS = {'mov', 'mp4'}
+WEB_PROFILES = {'Baseline', 'Constrained Baseline', 'Main', 'High'}
+WEB_AUDIO = {'aac', 'mp3'}
+STDERR_TAIL_LINES = 20
+
+
+def probe(path: str) -> dict:
+    """ffprobe format + streams as dict; {} if ffprobe is missing or fails."""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format', '-show_streams', path],
+            capture_output=True, timeout=30,
+        )
+        return json.loads(result.stdout or b'{}')
+    except Exception as e:
+        print(f"ffprobe failed for {path}: {e}")
+        return {}
+
+
+@lru_cache(maxsize=1)
+def hardware_encoder() -> str | None:
+    """Usable V4L2 M2M H.264 encoder, verified with a one-frame test encode.
+
+    ffmpeg lists h264_v4l2m2m on every Pi build, but only hosts with the
+    encoder block (Pi 4: /dev/video11, not Pi 5) can open it.
+    """
+    if HW_ENCODER == 'off':
+        return None
+    name = 'h264_v4l2m2m' if HW_ENCODER == 'auto' else HW_ENCODER
+    try:
+        result = subprocess.run([
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            '-f', 'lavfi', '-i', 'color=size=320x240:rate=30:duration=0.2',
+            '-pix_fmt', 'yuv420p', '-c:v', name, '-b:v', '500k', '-f', 'null', '-',
+        ], capture_output=True, timeout=20)
+    except Exception:
+        return None
+    return name if result.returncode == 0 else None
+
+
+def _fps(stream: dict) -> float:
+    num, _, den = (stream.get('avg_frame_rate') or stream.get('r_frame_rate') or '0/1').partition('/')
+    try:
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def _streams(info: dict, codec_type: str) -> list:
+    return [s for s in info.get('streams', []) if s.get('codec_type') == codec_type]
+
+
+def is_web_compatible(info: dict) -> bool:
+    video = _streams(info, 'video')
+    audio = _streams(info, 'audio')
+    fmt = info.get('format', {})
+    if not video or not WEB_CONTAINERS & set((fmt.get('format_name') or '').split(',')):
+        return False
+    v = video[0]
+    short_side = min(v.get('width') or 0, v.get('height') or 0)
+    bitrate = int(fmt.get('bit_rate') or v.get('bit_rate') or 0)
+    return (v.get('codec_name') == 'h264'
+            and v.get('pix_fmt') == 'yuv420p'
+            and v.get('profile') in WEB_PROFILES
+            and 0 < short_side <= HEIGHTS[0]
+            and bitrate <= REMUX_MAX_MBIT * 1_000_000
+            and all(a.get('codec_name') in WEB_AUDIO for a in audio))
+
+
+def estimate_seconds(duration: float, height: int, fps: float, speed: float) -> float:
+    """Wall time of a libx264 encode, scaled from the 720p30 reference."""
+    pixel_rate = (height * height * 16 / 9) * fps / (1280 * 720 * 30)
+    return duration * pixel_rate / (speed * CPU_SPEED)
+
+
+def plan(info: dict, budget: float | None = None, hardware: bool = True, remux: bool = True) -> dict:
+    """Decide remux vs. encode, encoder, preset and output height for a probed input."""
+    budget = BUDGET_SECONDS if budget is None else budget
+    duration = float(info.get('format', {}).get('duration') or 0)
+    if remux and is_web_compatible(info):
+        return {'action': 'remux', 'duration': duration, 'estimate': 5.0}
+
+    video = (_streams(info, 'video') or [{}])[0]
+    short_side = min(video.get('width') or 0, video.get('height') or 0)
+    fps = min(_fps(video) or MAX_FPS, MAX_FPS)
+    heights = [h for h in HEIGHTS if h <= short_side] or [short_side or None]
+    if duration > LONG_CLIP_SECONDS:
+        heights = [h for h in heights if h is None or h <= 720] or heights[-1:]
+    result = {'action': 'encode', 'duration': duration, 'fps': fps if _fps(video) > MAX_FPS else None}
+
+    encoder = hardware_encoder() if hardware else None
+    if encoder:
+        height = heights[0]
+        return dict(result, encoder=encoder, height=height, bitrate=HW_BITRATE.get(height, '2500k'),
+                    estimate=duration / 1.5)
+
+    if not duration or heights[0] is None:
+        # Nothing probed (ffprobe missing): the old fixed profile
+        return dict(result, encoder='libx264', preset='medium', height=heights[0], estimate=None)
+    for height in heights:
+        for preset, speed in PRESET_SPEED:
+            estimate = estimate_seconds(duration, height, fps, speed)
+            if estimate <= budget * 0.8:
+                return dict(result, encoder='libx264', preset=preset, height=height, estimate=round(estimate, 1))
+    # Over budget even at the cheapest setting: try anyway, the timeout decides
+    preset, speed = PRESET_SPEED[-1]
+    return dict(result, encoder='libx264', preset=preset, height=heights[-1], over_budget=True,
+                estimate=round(estimate_seconds(duration, heights[-1], fps, speed), 1))
+
+
+def command(input_path: str, output_path: str, p: dict) -> list[str]:
+    cmd = ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error', '-nostats', '-progress', 'pipe:1',
+           '-i', input_path, '-map', '0:v:0', '-map', '0:a:0?']
+    if p['action'] == 'remux':
+        return cmd + ['-c', 'copy', '-movflags', '+faststart', '-f', 'mp4', output_path]
+
+    filters = []
+    if p.get('fps'):
+        filters.append(f"fps={MAX_FPS}")
+    h = p.get('height')
+    if h:
+        # Short side → h (portrait clips stay portrait), even dimensions for yuv420p
+        filters.append(f"scale='if(gte(iw,ih),-2,min({h},trunc(iw/2)*2))':'if(gte(iw,ih),min({h},trunc(ih/2)*2),-2)'")
+    else:
+        filters.append('scale=trunc(iw/2)*2:trunc(ih/2)*2')
+    cmd += ['-vf', ','.join(filters), '-pix_fmt', 'yuv420p', '-c:v', p['encoder']]
+    if p['encoder'] == 'libx264':
+        cmd += ['-preset', p['preset'], '-crf', '28']
+    else:
+        cmd += ['-b:v', p['bitrate']]
+    return cmd + ['-c:a', 'aac', '-b:a', '128k', '-movflags', '+faststart', '-f', 'mp4', output_path]
+
+
+def _drain(stream, tail: collections.deque) -> None:
+    """Read a pipe to EOF keeping only the last lines (ffmpeg must never block on a full pipe)."""
+    for line in stream:
+        tail.append(line)
+
+
+def run(input_path: str, output_path: str, p: dict, on_progress=None, timeout: float | None = None) -> bool:
+    """Execute a plan. on_progress(fraction) is called at most once per second."""
+    part = output_path + '.part'
+    proc = subprocess.Popen(command(input_path, part, p), stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, text=True, errors='replace')
+    # A corrupt input can log errors faster than progress lines: drain stderr concurrently
+    stderr_tail = collections.deque(maxlen=STDERR_TAIL_LINES)
+    drainer = threading.Thread(target=_drain, args=(proc.stderr, stderr_tail), daemon=True)
+    drainer.start()
+    timer = threading.Timer(timeout or max(BUDGET_SECONDS * 1.5, 60), proc.kill)
+    timer.start()
+    last = 0.0
+    try:
+        for line in proc.stdout:
+            key, _, value = line.strip().partition('=')
+            # out_time_ms is in microseconds as well (historic ffmpeg naming)
+            if key in ('out_time_us', 'out_time_ms') and on_progress and p.get('duration') and value.isdigit():
+                now = time.monotonic()
+                if now - last >= 1:
+                    last = now
+                    on_progress(min(int(value) / 1e6 / p['duration'], 1.0))
+        proc.wait()
+        drainer.join()
+    finally:
+        timer.cancel()
+    errors = ''.join(stderr_tail)
+    if proc.returncode == 0 and os.path.exists(part):
+        os.replace(part, output_path)
+        if on_progress:
+            on_progress(1.0)
+        return True
+    if os.path.exists(part):
+        os.remove(part)
+    print(f"ffmpeg {p['action']} failed ({'timeout' if proc.returncode == -9 else proc.returncode}): {errors[-500:]}")
+    return False
+
+
+def transcode(input_path: str, output_path: str, on_progress=None) -> dict | None:
+    """Probe, plan and run; a failed hardware encode is retried in software.
+
+    Returns the executed plan, or None if no web version could be produced.
+    """
+    info = probe(input_path)
+    p = plan(info)
+    started = time.monotonic()
+    ok = run(input_path, output_path, p, on_progress)
+    if not ok and (p['action'] == 'remux' or p['encoder'] != 'libx264'):
+        # Stream copy can fail on odd files, the hardware encoder on odd
+        # resolutions: software encode within what is left of the budget
+        remaining = max(BUDGET_SECONDS - (time.monotonic() - started), 60)
+        p = plan(info, budget=remaining, hardware=False, remux=False)
+        ok = run(input_path, output_path, p, on_progress)
+    if not ok:
+        return None
+    p['seconds'] = round(time.monotonic() - started, 1)
+    return p
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Transcode planner for gallery videos')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('plan').add_argument('file')
+    p_run = sub.add_parser('run')
+    p_run.add_argument('input')
+    p_run.add_argument('output')
+    sub.add_parser('encoders')
+    args = parser.parse_args(argv)
+
+    if args.command == 'encoders':
+        print(json.dumps({'hardware': hardware_encoder(), 'cpu_speed': CPU_SPEED, 'budget': BUDGET_SECONDS}))
+    elif args.command == 'plan':
+        info = probe(args.file)
+        print(json.dumps({'web_compatible': is_web_compatible(info), 'plan': plan(info)}, indent=2))
+    else:
+        result = transcode(args.input, args.output,
+                           lambda f: print(f"\r{f * 100:5.1f}%", end='', file=sys.stderr, flush=True))
+        print(file=sys.stderr)
+        print(json.dumps(result))
+        return 0 if result else 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
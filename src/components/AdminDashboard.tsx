@@ -3,6 +3,7 @@ import { useAuth } from './AuthContext';
 import LoginModal from './LoginModal';
 import EditableTable, { type ColumnDef } from './EditableTable';
 import { MAP_AREAS, getAreaLabel } from './mapAreas';
+import { useLiveEvents } from '../hooks/useLiveEvents';
 
 interface Stats {
   pendingBookings: number;
@@ -109,6 +110,18 @@ export default function AdminDashboard() {
     }
   }, [isAdmin, token]);
 
+  // Live-Updates: nur die betroffenen Listen neu laden
+  useLiveEvents(['tasks', 'gallery', 'bookings'], (event) => {
+    if (event.topic === 'reset') {
+      fetchAllData();
+      return;
+    }
+    fetchStats();
+    if (event.topic === 'tasks') fetchPendingProjects();
+    if (event.topic === 'gallery') fetchGalleryItems();
+    if (event.topic === 'bookings') fetchBookings();
+  }, { token, enabled: isAdmin && !!token });
+
   const fetchAllData = async () => {
     setIsLoading(true);
     await Promise.all([
@@ -714,7 +727,7 @@ export default function AdminDashboard() {
             )}
             {showPhoto && project.completion_photo && (
               <img
-                src={`${API_BASE}/images/gallery/${project.completion_photo}`}
+                src={`${API_BASE}/images/resize/640x480/${project.completion_photo}`}
                 alt="Beweis-Foto"
                 className="mt-2 max-w-xs rounded-lg shadow"
               />
@@ -839,7 +852,7 @@ export default function AdminDashboard() {
                   </button>
                   {showPhoto && (
                     <img
-                      src={`${API_BASE}/images/gallery/${issue.photo_filename}`}
+                      src={`${API_BASE}/images/resize/640x480/${issue.photo_filename}`}
                       alt="Mangel-Foto"
                       className="mt-2 max-w-xs rounded-lg shadow"
                     />
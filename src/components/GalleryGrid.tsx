@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import PanoramaViewer from './PanoramaViewer';
+import PanoramaViewer, { type MultiResConfig } from './PanoramaViewer';
 import LocationPickerModal from './LocationPickerModal';
 
 interface GalleryItem {
@@ -15,6 +15,11 @@ interface GalleryItem {
   map_area?: string;
   map_x?: number;
   map_y?: number;
+  multiRes?: MultiResConfig;
+  taken_at?: string | null;
+  width?: number | null;
+  height?: number | null;
+  camera?: string | null;
 }
 
 const CATEGORIES = [
@@ -44,6 +49,7 @@ export default function GalleryGrid({ refreshTrigger }: Props) {
   const [isLoading, setIsLoading] = useState(true);
   const [isAdmin, setIsAdmin] = useState(false);
   const [locationPickItem, setLocationPickItem] = useState<GalleryItem | null>(null);
+  const [sortBy, setSortBy] = useState<'uploaded' | 'taken'>('uploaded');
 
   // Check admin status from stored token
   useEffect(() => {
@@ -65,7 +71,7 @@ export default function GalleryGrid({ refreshTrigger }: Props) {
     const fetchItems = async () => {
       setIsLoading(true);
       try {
-        const response = await fetch('/api/gallery');
+        const response = await fetch(`/api/gallery?sort=${sortBy}`);
         if (response.ok) {
           const data = await response.json();
           setItems(data.items || []);
@@ -78,7 +84,7 @@ export default function GalleryGrid({ refreshTrigger }: Props) {
     };
 
     fetchItems();
-  }, [refreshTrigger]);
+  }, [refreshTrigger, sortBy]);
 
   const filteredItems = selectedCategory === 'all'
     ? items
@@ -117,6 +123,15 @@ export default function GalleryGrid({ refreshTrigger }: Props) {
               {cat.emoji} {cat.name}
             </button>
           ))}
+          <select
+            value={sortBy}
+            onChange={e => setSortBy(e.target.value as 'uploaded' | 'taken')}
+            className="ml-auto px-3 py-2 rounded-lg text-sm bg-gray-100 text-gray-700 border-0"
+            aria-label="Sortierung"
+          >
+            <option value="uploaded">Neueste Uploads</option>
+            <option value="taken">Nach Aufnahmedatum</option>
+          </select>
         </div>
       </div>
 
@@ -353,7 +368,7 @@ function Lightbox({
       >
         {item.type === 'panorama' ? (
           <div className="w-full h-full">
-            <PanoramaViewer imageUrl={item.url} />
+            <PanoramaViewer imageUrl={item.url} multiRes={item.multiRes} />
           </div>
         ) : item.type === 'image' ? (
           <img
@@ -378,6 +393,13 @@ function Lightbox({
           {item.description && (
             <p className="text-white/70 mt-1">{item.description}</p>
           )}
+          {(item.taken_at || item.camera) && (
+            <p className="text-white/50 text-sm mt-1">
+              {item.taken_at && `📅 ${new Date(item.taken_at.replace(' ', 'T')).toLocaleString('de-DE', { dateStyle: 'medium', timeStyle: 'short' })}`}
+              {item.taken_at && item.camera && ' · '}
+              {item.camera}
+            </p>
+          )}
 
           {/* Location info & button */}
           <div className="mt-3 flex items-center justify-center gap-3">
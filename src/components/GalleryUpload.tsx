@@ -1,6 +1,9 @@
 import { useState, useRef, useCallback, useEffect } from 'react';
+import { resumableUpload } from '../lib/resumableUpload';
 
 const TOKEN_KEY = 'voigt-garten-token';
+// Larger files (drone videos) go through the resumable chunked upload
+const RESUMABLE_THRESHOLD = 20 * 1024 * 1024;
 const USER_KEY = 'voigt-garten-user';
 
 interface UploadFile {
@@ -35,6 +38,7 @@ export default function GalleryUpload({ onUploadComplete }: Props) {
   const [isDragging, setIsDragging] = useState(false);
   const [isUploading, setIsUploading] = useState(false);
   const [uploadProgress, setUploadProgress] = useState(0);
+  const [processingProgress, setProcessingProgress] = useState<number | null>(null);
   const [isLoggedIn, setIsLoggedIn] = useState(false);
   const [userName, setUserName] = useState('');
   const fileInputRef = useRef<HTMLInputElement>(null);
@@ -148,27 +152,42 @@ export default function GalleryUpload({ onUploadComplete }: Props) {
     try {
       for (let i = 0; i < files.length; i++) {
         const uploadFile = files[i];
+        let result;
+
+        if (uploadFile.file.size > RESUMABLE_THRESHOLD && token) {
+          result = await resumableUpload(uploadFile.file, {
+            token,
+            metadata: {
+              category: uploadFile.category,
+              name: uploadFile.name || uploadFile.file.name,
+              description: uploadFile.description,
+            },
+            onProgress: fraction => setUploadProgress(((i + fraction) / files.length) * 100),
+            onProcessing: fraction => setProcessingProgress(fraction * 100),
+          });
+          setProcessingProgress(null);
+        } else {
+          const formData = new FormData();
+          formData.append('file', uploadFile.file);
+          formData.append('category', uploadFile.category);
+          formData.append('name', uploadFile.name || uploadFile.file.name);
+          formData.append('description', uploadFile.description);
+          formData.append('type', uploadFile.type);
+
+          const response = await fetch('/api/gallery/upload', {
+            method: 'POST',
+            headers: {
+              'Authorization': `Bearer ${token}`,
+            },
+            body: formData,
+          });
+
+          if (!response.ok) {
+            throw new Error(`Upload failed for ${uploadFile.file.name}`);
+          }
 
-        const formData = new FormData();
-        formData.append('file', uploadFile.file);
-        formData.append('category', uploadFile.category);
-        formData.append('name', uploadFile.name || uploadFile.file.name);
-        formData.append('description', uploadFile.description);
-        formData.append('type', uploadFile.type);
-
-        const response = await fetch('/api/gallery/upload', {
-          method: 'POST',
-          headers: {
-            'Authorization': `Bearer ${token}`,
-          },
-          body: formData,
-        });
-
-        if (!response.ok) {
-          throw new Error(`Upload failed for ${uploadFile.file.name}`);
+          result = await response.json();
         }
-
-        const result = await response.json();
         if (result.status === 'pending') {
           pendingCount++;
         }
@@ -192,6 +211,7 @@ export default function GalleryUpload({ onUploadComplete }: Props) {
     } finally {
       setIsUploading(false);
       setUploadProgress(0);
+      setProcessingProgress(null);
     }
   };
 
@@ -368,7 +388,11 @@ export default function GalleryUpload({ onUploadComplete }: Props) {
             {isUploading ? (
               <div>
                 <div className="flex items-center justify-between mb-2">
-                  <span className="text-sm text-gray-600">Wird hochgeladen...</span>
+                  <span className="text-sm text-gray-600">
+                    {processingProgress !== null
+                      ? `Video wird optimiert... ${Math.round(processingProgress)}%`
+                      : 'Wird hochgeladen...'}
+                  </span>
                   <span className="text-sm font-medium text-garden-600">{Math.round(uploadProgress)}%</span>
                 </div>
                 <div className="w-full bg-gray-200 rounded-full h-2">
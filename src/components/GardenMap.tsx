@@ -29,6 +29,20 @@ export interface PhotoPoint {
   thumbnailUrl: string;
 }
 
+export interface PhotoCluster {
+  x: number;
+  y: number;
+  count: number;
+  bounds: [number, number, number, number];
+  thumbnailUrl: string;
+}
+
+/** Visible part of the map for /api/map/photo-points (no bbox = whole map). */
+export interface MapViewport {
+  bbox?: [number, number, number, number];
+  zoom: number;
+}
+
 export type MapMode = 'gebaeude' | 'natur' | 'technik' | 'wasser' | 'fotos' | 'alle';
 
 interface GardenMapProps {
@@ -40,7 +54,9 @@ interface GardenMapProps {
   compact?: boolean;
   showModeSwitch?: boolean;
   photoPoints?: PhotoPoint[];
+  photoClusters?: PhotoCluster[];
   showPhotoPoints?: boolean;
+  onViewportChange?: (viewport: MapViewport) => void;
   pickMode?: boolean;
   onLocationPick?: (x: number, y: number) => void;
   pickedLocation?: { x: number; y: number } | null;
@@ -263,7 +279,9 @@ export default function GardenMap({
   compact = false,
   showModeSwitch = false,
   photoPoints = [],
+  photoClusters = [],
   showPhotoPoints = false,
+  onViewportChange,
   pickMode = false,
   onLocationPick,
   pickedLocation,
@@ -519,6 +537,52 @@ export default function GardenMap({
     setTranslate({ x: 0, y: 0 });
   }, []);
 
+  // Report the visible map part once zoom/pan settle (after the 0.2s transition)
+  useEffect(() => {
+    if (!onViewportChange || loading) return;
+    const timer = setTimeout(() => {
+      // Cluster level: 2 at 1:1 (64-unit cells), single points from 4x
+      const zoom = Math.min(4, 2 + Math.floor(Math.log2(scale)));
+      const svg = svgRef.current;
+      const ctm = svg?.getScreenCTM();
+      if (scale <= 1 || !svg || !ctm || !containerRef.current) {
+        onViewportChange({ zoom });
+        return;
+      }
+      const rect = containerRef.current.getBoundingClientRect();
+      const toMap = (x: number, y: number) => {
+        const pt = svg.createSVGPoint();
+        pt.x = x;
+        pt.y = y;
+        return pt.matrixTransform(ctm.inverse());
+      };
+      const topLeft = toMap(rect.left, rect.top);
+      const bottomRight = toMap(rect.right, rect.bottom);
+      const bbox: [number, number, number, number] = [
+        Math.max(0, Math.floor(topLeft.x)),
+        Math.max(0, Math.floor(topLeft.y)),
+        Math.min(1602, Math.ceil(bottomRight.x)),
+        Math.min(787, Math.ceil(bottomRight.y)),
+      ];
+      if (bbox[0] > bbox[2] || bbox[1] > bbox[3]) return; // panned off the map
+      onViewportChange({ bbox, zoom });
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [scale, translate, loading, onViewportChange]);
+
+  // Cluster click: zoom in (2x) centered on the cluster
+  const zoomToCluster = useCallback((cluster: PhotoCluster) => {
+    if (!containerRef.current) return;
+    const next = Math.min(4, scale * 2);
+    const width = containerRef.current.clientWidth;
+    const height = containerRef.current.clientHeight;
+    setScale(next);
+    setTranslate({
+      x: next * width * (0.5 - cluster.x / 1602),
+      y: next * height * (0.5 - cluster.y / 787),
+    });
+  }, [scale]);
+
   const handleSvgClick = useCallback((e: React.MouseEvent<SVGSVGElement>) => {
     if (!pickMode || !onLocationPick || !svgRef.current) return;
     const pt = svgRef.current.createSVGPoint();
@@ -690,7 +754,7 @@ export default function GardenMap({
                 {CATEGORY_ICONS[cat]} {CATEGORY_LABELS[cat]}
               </button>
             ))}
-            {showPhotoPoints && photoPoints.length > 0 && (
+            {showPhotoPoints && (photoPoints.length > 0 || photoClusters.length > 0) && (
               <button
                 key="fotos"
                 onClick={() => setMode('fotos')}
@@ -830,6 +894,29 @@ export default function GardenMap({
                 </g>
               ))}
 
+              {/* Photo clusters (several photos close together at this zoom) */}
+              {showPhotoPoints && (mode === 'alle' || mode === 'fotos') && photoClusters.map(cluster => (
+                <g key={`cluster-${cluster.bounds.join('-')}`}
+                   style={{ cursor: 'zoom-in' }}
+                   onClick={(e) => {
+                     e.stopPropagation();
+                     zoomToCluster(cluster);
+                   }}
+                >
+                  <title>{`${cluster.count} Fotos`}</title>
+                  <circle cx={cluster.x} cy={cluster.y} r={Math.min(24, 12 + Math.log2(cluster.count) * 3)}
+                    fill="#f59e0b" stroke="white" strokeWidth={2.5}
+                    opacity={0.9}
+                  />
+                  <text x={cluster.x} y={cluster.y + 4}
+                    textAnchor="middle" fontSize="11" fill="white"
+                    className="pointer-events-none" fontWeight="bold"
+                  >
+                    {cluster.count}
+                  </text>
+                </g>
+              ))}
+
               {/* Pick Mode: Selected Location Marker */}
               {pickMode && pickedLocation && (
                 <g className="pointer-events-none">
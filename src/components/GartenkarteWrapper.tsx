@@ -1,5 +1,5 @@
 import { useState, useCallback, useEffect } from 'react';
-import GardenMap, { type PhotoPoint } from './GardenMap';
+import GardenMap, { type MapViewport, type PhotoCluster, type PhotoPoint } from './GardenMap';
 import AreaGallery from './AreaGallery';
 import { MAP_AREAS } from './mapAreas';
 
@@ -9,19 +9,33 @@ export default function GartenkarteWrapper() {
   const [activeArea, setActiveArea] = useState<string | undefined>();
   const [previousArea, setPreviousArea] = useState<string | undefined>();
   const [photoPoints, setPhotoPoints] = useState<PhotoPoint[]>([]);
+  const [photoClusters, setPhotoClusters] = useState<PhotoCluster[]>([]);
+  // Query for the visible map part; the same string again doesn't refetch
+  const [viewportQuery, setViewportQuery] = useState('zoom=2');
 
   const handleAreaClick = useCallback((areaId: string) => {
     setPreviousArea(activeArea);
     setActiveArea(prev => prev === areaId ? undefined : areaId);
   }, [activeArea]);
 
-  // Fetch photo points for map display
+  const handleViewportChange = useCallback((viewport: MapViewport) => {
+    const params = new URLSearchParams({ zoom: String(viewport.zoom) });
+    if (viewport.bbox) params.set('bbox', viewport.bbox.join(','));
+    setViewportQuery(params.toString());
+  }, []);
+
+  // Fetch photo points (and clusters) for the visible map part
   useEffect(() => {
-    fetch(`${API_BASE}/api/map/photo-points`)
+    const controller = new AbortController();
+    fetch(`${API_BASE}/api/map/photo-points?${viewportQuery}`, { signal: controller.signal })
       .then(r => r.json())
-      .then(data => setPhotoPoints(data.points || []))
+      .then(data => {
+        setPhotoPoints(data.points || []);
+        setPhotoClusters(data.clusters || []);
+      })
       .catch(() => {});
-  }, []);
+    return () => controller.abort();
+  }, [viewportQuery]);
 
   // Area order by approximate X coordinate on the map (left to right)
   const areaOrder = MAP_AREAS.map(a => a.id);
@@ -35,7 +49,9 @@ export default function GartenkarteWrapper() {
           onAreaClick={handleAreaClick}
           activeArea={activeArea}
           photoPoints={photoPoints}
+          photoClusters={photoClusters}
           showPhotoPoints={true}
+          onViewportChange={handleViewportChange}
           onPhotoPointClick={(id) => {
             window.location.href = `/galerie#photo-${id}`;
           }}
@@ -1,7 +1,18 @@
 import { useEffect, useRef } from 'react';
 
+export interface MultiResConfig {
+  basePath: string;
+  path: string;
+  fallbackPath: string;
+  extension: string;
+  tileResolution: number;
+  maxLevel: number;
+  cubeResolution: number;
+}
+
 interface PanoramaViewerProps {
   imageUrl: string;
+  multiRes?: MultiResConfig;
   onClose?: () => void;
 }
 
@@ -11,16 +22,20 @@ declare global {
   }
 }
 
-export default function PanoramaViewer({ imageUrl, onClose }: PanoramaViewerProps) {
+export default function PanoramaViewer({ imageUrl, multiRes, onClose }: PanoramaViewerProps) {
   const containerRef = useRef<HTMLDivElement>(null);
   const viewerRef = useRef<any>(null);
 
   useEffect(() => {
     if (!containerRef.current || !window.pannellum) return;
 
+    // Tiled cube faces load per zoom level; the equirectangular original only as fallback
+    const source = multiRes
+      ? { type: 'multires', multiRes }
+      : { type: 'equirectangular', panorama: imageUrl };
+
     viewerRef.current = window.pannellum.viewer(containerRef.current, {
-      type: 'equirectangular',
-      panorama: imageUrl,
+      ...source,
       autoLoad: true,
       autoRotate: -2,
       compass: true,
@@ -34,7 +49,7 @@ export default function PanoramaViewer({ imageUrl, onClose }: PanoramaViewerProp
         viewerRef.current.destroy();
       }
     };
-  }, [imageUrl]);
+  }, [imageUrl, multiRes?.basePath]);
 
   if (onClose) {
     // Standalone fullscreen mode
@@ -898,7 +898,7 @@ export default function TaskDetailModal({
             <div>
               <h3 className="text-sm font-medium text-gray-500 mb-2">Foto der Erledigung</h3>
               <img
-                src={`${API_URL}/images/gallery/${task.completion_photo}`}
+                src={`${API_URL}/images/resize/640x480/${task.completion_photo}`}
                 alt="Completion"
                 className="rounded-lg max-h-64 object-cover"
               />
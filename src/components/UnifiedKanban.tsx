@@ -3,6 +3,7 @@ import TaskDetailModal from './TaskDetailModal';
 import IssueReportModal from './IssueReportModal';
 import LoginModal from './LoginModal';
 import { useCategories, getCategoryConfig, getTaskCategories } from '../hooks/useCategories';
+import { useLiveEvents } from '../hooks/useLiveEvents';
 
 
 interface User {
@@ -202,8 +203,14 @@ export default function UnifiedKanban() {
     fetchAssignees();
   }, [mapAreaFilter]);
 
-  const fetchTasks = async () => {
-    setIsLoading(true);
+  // Live-Updates: andere Nutzer/Agent ändern Aufgaben → Board still neu laden.
+  // Nur eingeloggt: jeder offene Stream belegt einen Backend-Thread, anonyme
+  // Besucher der öffentlichen Seite sehen Änderungen beim nächsten Laden.
+  const liveToken = user ? localStorage.getItem(TOKEN_KEY) : null;
+  useLiveEvents(['tasks'], () => fetchTasks(true), { token: liveToken, enabled: !!liveToken });
+
+  const fetchTasks = async (silent = false) => {
+    if (!silent) setIsLoading(true);
     try {
       let url = `${API_URL}/api/tasks/unified`;
       if (mapAreaFilter) url += `?map_area=${encodeURIComponent(mapAreaFilter)}`;
@@ -217,9 +224,9 @@ export default function UnifiedKanban() {
         setError(data.error || 'Fehler beim Laden');
       }
     } catch (err) {
-      setError('Verbindungsfehler');
+      if (!silent) setError('Verbindungsfehler');
     }
-    setIsLoading(false);
+    if (!silent) setIsLoading(false);
   };
 
   const fetchAssignees = async () => {
@@ -1191,7 +1198,7 @@ export default function UnifiedKanban() {
           isAuthenticated={isAuthenticated}
           isAdmin={isAdmin}
           allAssignees={allAssignees}
-          onRefresh={fetchTasks}
+          onRefresh={() => fetchTasks()}
         />
       )}
 
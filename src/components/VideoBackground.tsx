@@ -7,17 +7,52 @@ interface VideoBackgroundProps {
   overlayOpacity?: number;
 }
 
+interface Asset {
+  url: string;
+  type: string;
+}
+
+// Shape of /api/background-video and of the manifest the backend inlines into the page
+// (pi-backend/asset_manifest.py); poster/teaser are missing for videos without a manifest yet.
+interface BackgroundManifest {
+  page: string;
+  video_url: string | null;
+  thumbnail_url?: string | null;
+  poster?: Asset | null;
+  teaser?: Asset | null;
+  video?: Asset | null;
+}
+
+function inlineManifest(page: string): BackgroundManifest | null {
+  const element = document.getElementById('asset-manifest-data');
+  if (!element?.textContent) return null;
+  try {
+    const manifest = JSON.parse(element.textContent) as BackgroundManifest;
+    return manifest.page === page ? manifest : null;
+  } catch {
+    return null;
+  }
+}
+
 export default function VideoBackground({ page, children, className = '', overlayOpacity = 0.5 }: VideoBackgroundProps) {
-  const [videoUrl, setVideoUrl] = useState<string | null>(null);
+  const [manifest, setManifest] = useState<BackgroundManifest | null>(null);
+  // The short teaser plays first; once it ends the full video takes over (looped)
+  const [showFull, setShowFull] = useState(false);
 
   useEffect(() => {
+    const inlined = inlineManifest(page);
+    if (inlined) {
+      setManifest(inlined);
+      return;
+    }
+
     const fetchVideo = async () => {
       try {
         const response = await fetch(`/api/background-video?page=${encodeURIComponent(page)}`);
         if (response.ok) {
           const data = await response.json();
           if (data.video_url) {
-            setVideoUrl(data.video_url);
+            setManifest(data);
           }
         }
       } catch (error) {
@@ -28,19 +63,37 @@ export default function VideoBackground({ page, children, className = '', overla
     fetchVideo();
   }, [page]);
 
-  if (!videoUrl) {
+  useEffect(() => {
+    // Fetch the full video in the background while the teaser plays
+    if (!manifest?.teaser || !manifest.video_url) return;
+    const link = document.createElement('link');
+    link.rel = 'prefetch';
+    link.href = manifest.video_url;
+    document.head.appendChild(link);
+    return () => link.remove();
+  }, [manifest]);
+
+  if (!manifest?.video_url) {
     // No video assigned - render children with original background (gradient fallback)
     return <div className={className}>{children}</div>;
   }
 
+  const teaser = !showFull ? manifest.teaser : null;
+  const videoUrl = teaser?.url ?? manifest.video_url;
+  const poster = manifest.poster?.url ?? manifest.thumbnail_url ?? undefined;
+
   return (
     <div className={`relative overflow-hidden ${className}`}>
       {/* Video Background */}
       <video
+        key={videoUrl}
         autoPlay
         muted
-        loop
+        loop={!teaser}
         playsInline
+        poster={poster}
+        preload="auto"
+        onEnded={() => setShowFull(true)}
         className="absolute inset-0 w-full h-full object-cover"
       >
         <source src={videoUrl} type="video/mp4" />
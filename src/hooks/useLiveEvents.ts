@@ -0,0 +1,122 @@
+import { useEffect, useRef } from 'react';
+
+const API_URL = (typeof import.meta !== 'undefined' && import.meta.env?.PUBLIC_API_URL) || 'https://garten.infinityspace42.de';
+
+// Reconnect backoff; the server also answers 503 when a worker has too many streams
+const RETRY_MIN_MS = 3000;
+const RETRY_MAX_MS = 60000;
+
+export type LiveTopic = 'tasks' | 'gallery' | 'bookings';
+
+export interface LiveEvent {
+  topic: LiveTopic | 'reset';
+  entity?: string;
+  entity_id?: string | number;
+  action?: 'insert' | 'update' | 'delete';
+  data?: Record<string, any> | null;
+}
+
+/**
+ * Subscribes to /api/events (Server-Sent Events) and calls `onEvent` for every
+ * change on the given topics. Bursts are coalesced: after `debounceMs` without
+ * further events the callback fires once per topic with that topic's last event
+ * (only once with `reset` if one arrived, since it covers everything). A `reset`
+ * event means events were missed and the caller should reload everything.
+ *
+ * With a `token` the login token is swapped for a short-lived stream token
+ * (POST /api/events/token), since EventSource can only pass it in the URL.
+ * That token expires, so reconnects (stream end, errors, 503 when the server
+ * is busy) are done here with a fresh one, resuming via ?last_event_id=.
+ */
+export function useLiveEvents(
+  topics: LiveTopic[],
+  onEvent: (event: LiveEvent) => void,
+  options: { token?: string | null; enabled?: boolean; debounceMs?: number } = {},
+) {
+  const { token, enabled = true, debounceMs = 500 } = options;
+  const callbackRef = useRef(onEvent);
+  callbackRef.current = onEvent;
+  const topicKey = topics.join(',');
+
+  useEffect(() => {
+    if (!enabled || typeof EventSource === 'undefined') return;
+
+    let source: EventSource | null = null;
+    let stopped = false;
+    let lastEventId: string | null = null;
+    let retryMs = RETRY_MIN_MS;
+    let retryTimer: ReturnType<typeof setTimeout> | null = null;
+    let timer: ReturnType<typeof setTimeout> | null = null;
+    // Last event per topic within the current debounce window
+    const pending = new Map<LiveEvent['topic'], LiveEvent>();
+
+    const flush = () => {
+      timer = null;
+      const events = pending.has('reset') ? [pending.get('reset')!] : [...pending.values()];
+      pending.clear();
+      events.forEach(event => callbackRef.current(event));
+    };
+
+    const handle = (topic: LiveEvent['topic']) => (e: MessageEvent) => {
+      if (e.lastEventId) lastEventId = e.lastEventId;
+      let payload: Omit<LiveEvent, 'topic'> = {};
+      try {
+        payload = JSON.parse(e.data);
+      } catch {
+        // keepalive / empty reset payload
+      }
+      pending.set(topic, { topic, ...payload });
+      if (timer) clearTimeout(timer);
+      timer = setTimeout(flush, debounceMs);
+    };
+
+    const listeners = [...topicKey.split(','), 'reset'].map(topic => [topic, handle(topic as LiveEvent['topic'])] as const);
+
+    const retry = () => {
+      if (stopped) return;
+      retryTimer = setTimeout(connect, retryMs);
+      retryMs = Math.min(retryMs * 2, RETRY_MAX_MS);
+    };
+
+    const connect = async () => {
+      retryTimer = null;
+      let url = `${API_URL}/api/events?topics=${encodeURIComponent(topicKey)}`;
+      if (token) {
+        try {
+          const res = await fetch(`${API_URL}/api/events/token`, {
+            method: 'POST',
+            headers: { 'Authorization': `Bearer ${token}` },
+          });
+          if (!res.ok) throw new Error(`HTTP ${res.status}`);
+          const data = await res.json();
+          url += `&token=${encodeURIComponent(data.token)}`;
+        } catch {
+          retry();
+          return;
+        }
+      }
+      if (lastEventId) url += `&last_event_id=${encodeURIComponent(lastEventId)}`;
+      if (stopped) return;
+
+      const current = new EventSource(url);
+      source = current;
+      listeners.forEach(([topic, listener]) => current.addEventListener(topic, listener as EventListener));
+      current.onopen = () => { retryMs = RETRY_MIN_MS; };
+      current.onerror = () => {
+        // The browser would reconnect with the same (by then expired) stream token
+        current.close();
+        if (source === current) source = null;
+        retry();
+      };
+    };
+
+    connect();
+
+    return () => {
+      stopped = true;
+      if (timer) clearTimeout(timer);
+      if (retryTimer) clearTimeout(retryTimer);
+      source?.close();
+    };
+  }, [topicKey, token, enabled, debounceMs]);
+}
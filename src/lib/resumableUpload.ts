@@ -0,0 +1,109 @@
+/**
+ * Resumable gallery upload (tus 1.0 subset, see pi-backend/upload_sessions.py).
+ *
+ * The file is sent in CHUNK_SIZE PATCH requests; after a dropped connection
+ * the client asks the server for its offset and continues from there.
+ * The upload URL is remembered in localStorage per file, so a reload of the
+ * page resumes too. Finalize starts processing on the server, whose result
+ * (same shape as /api/gallery/upload) is polled; while a video is being
+ * transcoded the status carries its progress (onProcessing).
+ */
+
+const CHUNK_SIZE = 8 * 1024 * 1024;
+const MAX_RETRIES = 5;
+const STORAGE_PREFIX = 'voigt-garten-upload:';
+
+export interface ResumableUploadOptions {
+  token: string;
+  metadata: Record<string, string>;
+  onProgress?: (fraction: number) => void;
+  onProcessing?: (fraction: number) => void;
+}
+
+function encodeMetadata(metadata: Record<string, string>): string {
+  return Object.entries(metadata)
+    .map(([key, value]) => `${key} ${btoa(String.fromCharCode(...new TextEncoder().encode(value)))}`)
+    .join(',');
+}
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+/** Server-side offset of a previous upload, or null if it is gone or already finalized. */
+async function currentOffset(location: string, headers: Record<string, string>): Promise<number | null> {
+  const response = await fetch(location, { headers });
+  if (!response.ok) return null;
+  const status = await response.json();
+  return status.status === 'uploading' ? status.offset : null;
+}
+
+export async function resumableUpload(file: File, { token, metadata, onProgress, onProcessing }: ResumableUploadOptions) {
+  const headers = { 'Authorization': `Bearer ${token}`, 'Tus-Resumable': '1.0.0' };
+  const fingerprint = `${STORAGE_PREFIX}${file.name}:${file.size}:${file.lastModified}`;
+
+  let location = localStorage.getItem(fingerprint);
+  let offset = location ? await currentOffset(location, headers) : null;
+  if (!location || offset === null) {
+    const response = await fetch('/api/gallery/uploads', {
+      method: 'POST',
+      headers: {
+        ...headers,
+        'Upload-Length': String(file.size),
+        'Upload-Metadata': encodeMetadata({ ...metadata, filename: file.name }),
+      },
+    });
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({}));
+      throw new Error(error.error || `Upload konnte nicht gestartet werden (${response.status})`);
+    }
+    location = response.headers.get('Location')!;
+    offset = 0;
+    localStorage.setItem(fingerprint, location);
+  }
+
+  let retries = 0;
+  while (offset < file.size) {
+    onProgress?.(offset / file.size);
+    const response = await fetch(location, {
+      method: 'PATCH',
+      headers: {
+        ...headers,
+        'Upload-Offset': String(offset),
+        'Content-Type': 'application/offset+octet-stream',
+      },
+      body: file.slice(offset, offset + CHUNK_SIZE),
+    }).catch(() => null);
+    const serverOffset = response?.headers.get('Upload-Offset') ?? null;
+    if (response && (response.ok || response.status === 409) && serverOffset !== null) {
+      // 409: server has a different offset (e.g. a retried chunk already arrived);
+      // a 409 without one (upload already finalized) is an error below
+      offset = Number(serverOffset);
+      retries = 0;
+      continue;
+    }
+    if (response && response.status < 500 && response.status !== 423) {
+      throw new Error(`Upload fehlgeschlagen (${response.status})`);
+    }
+    // Network error / server busy: back off, then ask the server where to continue
+    if (++retries > MAX_RETRIES) throw new Error('Verbindung verloren – Upload kann später fortgesetzt werden');
+    await sleep(1000 * 2 ** retries);
+    offset = (await currentOffset(location, headers).catch(() => null)) ?? offset;
+  }
+  onProgress?.(1);
+
+  const finalize = async () => {
+    const response = await fetch(`${location}/finalize`, { method: 'POST', headers });
+    if (!response.ok) throw new Error(`Upload konnte nicht abgeschlossen werden (${response.status})`);
+  };
+  await finalize();
+  localStorage.removeItem(fingerprint);
+
+  while (true) {
+    const status = await fetch(location, { headers }).then(r => r.json());
+    if (status.status === 'done') return status.result;
+    // Server restarted during processing and reset the session: finalize again
+    if (status.status === 'uploading') await finalize();
+    if (status.status === 'failed') throw new Error(status.result?.error || 'Verarbeitung fehlgeschlagen');
+    if (typeof status.result?.progress === 'number') onProcessing?.(status.result.progress);
+    await sleep(2000);
+  }
+}